@@ -110,6 +110,14 @@ class RegularTesselationMap(Map):
         except IndexError:
             return None
 
+    def _get_cells_in_range(self, x1, y1, x2, y2):
+        '''Return cells in columns x1 to x2 and rows y1 to y2 (exclusive),
+        column by column.
+        '''
+        if x2 <= x1 or y2 <= y1:
+            return []
+        return [cell for column in self.cells[x1:x2] for cell in column[y1:y2]]
+
 class RectMap(RegularTesselationMap):
     '''Rectangular map.
 
@@ -143,7 +151,7 @@ class RectMap(RegularTesselationMap):
         y1 = max(0, y1 // self.th)
         x2 = min(len(self.cells), x2 // self.tw + 1)
         y2 = min(len(self.cells[0]), y2 // self.th + 1)
-        return [self.cells[x][y] for x in range(x1, x2) for y in range(y1, y2)]
+        return self._get_cells_in_range(x1, y1, x2, y2)
  
     def get(self, x, y):
         ''' Return Cell at pixel px=(x,y).
@@ -346,7 +354,7 @@ class HexMap(RegularTesselationMap):
         y1 = max(0, y1 // self.th - 1)
         x2 = min(len(self.cells), x2 // col_width + 1)
         y2 = min(len(self.cells[0]), y2 // self.th + 1)
-        return [self.cells[x][y] for x in range(x1, x2) for y in range(y1, y2)]
+        return self._get_cells_in_range(x1, y1, x2, y2)
  
     def get(self, x, y):
         '''Get the Cell at pixel px=(x,y).
@@ -11,38 +11,74 @@ __version__ = '$Id$'
 
 
 from pyglet.gl import *
+from pyglet import spatial
 from scene2d.drawable import *
 
 class SpriteLayer(object):
     '''Represents a group of sprites at the same z depth.
+
+    The sprites are kept in a spatial index (by default a
+    pyglet.spatial.GridIndex) for picking and region queries.  Add and
+    remove sprites with add_sprite and remove_sprite; if the sprites list
+    is modified directly, call reindex afterwards.
     '''
-    def __init__(self, z=0, sprites=None):
+    def __init__(self, z=0, sprites=None, index=None):
         self.z = z
         if sprites is None:
             sprites = []
         self.sprites = sprites
+        if index is None:
+            index = spatial.GridIndex()
+        self.index = index
+        self.reindex()
+
+    def add_sprite(self, sprite):
+        self.sprites.append(sprite)
+        self._add_to_index(sprite)
+
+    def remove_sprite(self, sprite):
+        self.sprites.remove(sprite)
+        if sprite in self.index:
+            self.index.remove(sprite)
+            sprite._indexes.remove(self.index)
+
+    def _add_to_index(self, sprite):
+        if sprite not in self.index:
+            sprite._indexes.append(self.index)
+        self.index.add(sprite, *sprite.get_bounds())
+
+    def reindex(self):
+        '''Rebuild the spatial index from the sprites list.'''
+        for sprite in self.index:
+            sprite._indexes.remove(self.index)
+        self.index.clear()
+        for sprite in self.sprites:
+            self._add_to_index(sprite)
+        self._indexed_sprites = self.sprites
+
+    def _check_index(self):
+        if (self.sprites is not self._indexed_sprites or
+                len(self.sprites) != len(self.index)):
+            self.reindex()
 
     def get(self, x, y):
         ''' Return object at position px=(x,y).
         Return None if out of bounds.'''
-        r = []
-        for sprite in self.sprites:
-            if sprite.contains(x, y):
-                r.append(sprite)
-        return r
+        self._check_index()
+        return [sprite for sprite in self.index.get_at(x, y)
+            if sprite.contains(x, y)]
 
     def get_in_region(self, x1, y1, x2, y2):
         '''Return Drawables that are within the pixel bounds specified by
         the bottom-left (x1, y1) and top-right (x2, y2) corners.
         '''
-        r = []
-        for sprite in self.sprites:
-            if sprite._x > x2: continue
-            if (sprite._x + sprite.width) < x1: continue
-            if sprite._y > y2: continue
-            if (sprite._y + sprite.height) < y1: continue
-            r.append(sprite)
-        return r
+        self._check_index()
+        return self.index.get_in_region(x1, y1, x2, y2)
+
+    def get_collisions(self):
+        '''Return every pair of sprites in this layer that overlap.'''
+        self._check_index()
+        return self.index.get_pairs()
 
 class Sprite(Drawable):
     '''A sprite with some dimensions, image to draw and optional animation
@@ -68,6 +104,8 @@ class Sprite(Drawable):
             self.properties = {}
         else:
             self.properties = properties
+        # spatial indexes of the SpriteLayers holding this sprite
+        self._indexes = []
 
         # pre-calculate the style to force creation of _style
         self.get_style()
@@ -127,6 +165,19 @@ class Sprite(Drawable):
         if (self.y + self.height) < rect.y: return False
         return True
 
+    def get_bounds(self):
+        '''Return the (x1, y1, x2, y2) bounds of the sprite.'''
+        return (self._x, self._y, self._x + self.width, self._y + self.height)
+
+    def update_indexes(self):
+        '''Update the spatial indexes of the SpriteLayers holding this
+        sprite.  This happens automatically when x or y change; call it
+        after changing width or height.
+        '''
+        bounds = self.get_bounds()
+        for index in self._indexes:
+            index.update(self, *bounds)
+
     def get_x(self):
         return self._x
     def set_x(self, x):
@@ -134,6 +185,8 @@ class Sprite(Drawable):
         if self._style is not None:
             # XXX remove int() if we get sub-pixel drawing of textures
             self._style.x = int(x - self.offset[0])
+        if self._indexes:
+            self.update_indexes()
     x = property(get_x, set_x)
     def get_y(self):
         return self._y
@@ -142,6 +195,8 @@ class Sprite(Drawable):
         if self._style is not None:
             # XXX remove int() if we get sub-pixel drawing of textures
             self._style.y = int(y - self.offset[1])
+        if self._indexes:
+            self.update_indexes()
     y = property(get_y, set_y)
  
     # r/w, in pixels, y extent
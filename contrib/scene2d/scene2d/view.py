@@ -102,6 +102,7 @@ class FlatView(View):
             self.sprites = []
         else:
             self.sprites = sprites
+        self._sprite_layer = None
 
     @classmethod
     def from_window(cls, window, **kw):
@@ -234,11 +235,7 @@ class FlatView(View):
 
     def get(self, x, y):
         ''' Pick whatever is on the top at the position x, y. '''
-        r = []
-
-        for sprite in self.sprites:
-            if sprite.contains(x, y):
-                r.append(sprite)
+        r = self._get_sprite_layer().get(x, y)
 
         self.layers.sort(key=operator.attrgetter('z'))
         for layer in self.layers:
@@ -248,6 +245,19 @@ class FlatView(View):
 
         return r
 
+    def get_in_region(self, x1, y1, x2, y2):
+        '''Return the sprites (not layers) within the pixel bounds specified
+        by the bottom-left (x1, y1) and top-right (x2, y2) corners.
+        '''
+        return self._get_sprite_layer().get_in_region(x1, y1, x2, y2)
+
+    def _get_sprite_layer(self):
+        # index self.sprites, and pick up a replaced list
+        layer = self._sprite_layer
+        if layer is None or layer.sprites is not self.sprites:
+            layer = self._sprite_layer = SpriteLayer(sprites=self.sprites)
+        return layer
+
     def tile_at(self, x, y):
         ' query for tile at given screen pixel position '
         raise NotImplemented()
@@ -1,7 +1,7 @@
 import os
 import math
 
-from pyglet import image, gl, clock, graphics, sprite
+from pyglet import image, gl, clock, graphics, sprite, spatial
 
 class SpriteBatchGroup(graphics.Group):
     def __init__(self, x, y, parent=None):
@@ -17,10 +17,21 @@ class SpriteBatchGroup(graphics.Group):
             gl.glTranslatef(-self.x, -self.y, 0)
 
 class SpriteBatch(graphics.Batch):
-    def __init__(self, x=0, y=0):
+    def __init__(self, x=0, y=0, index=None):
+        '''A batch of sprites that can be picked and queried by position.
+
+        Sprites are kept in a spatial index ("index" argument, a
+        pyglet.spatial.SpatialIndex, by default a GridIndex) which is
+        updated as they move.
+        '''
         super(SpriteBatch, self).__init__()
         self.state = SpriteBatchGroup(x, y)
         self.sprites = []
+        if index is None:
+            index = spatial.GridIndex()
+        self.index = index
+        self._order = {}
+        self._next_order = 0
 
     def __iter__(self): return iter(self.sprites)
 
@@ -29,18 +40,37 @@ class SpriteBatch(graphics.Batch):
     def hit(self, x, y):
         '''See whether there's a Sprite at the pixel location
 
-        XXX optimise me
+        If several sprites are there the first one added is returned.
+        '''
+        hits = self.index.get_at(x, y)
+        if not hits:
+            return None
+        return min(hits, key=self._order.__getitem__)
+
+    def get_in_region(self, x1, y1, x2, y2):
+        '''Return the sprites overlapping the pixel bounds specified by the
+        bottom-left (x1, y1) and top-right (x2, y2) corners, in no
+        particular order.
+        '''
+        return self.index.get_in_region(x1, y1, x2, y2)
+
+    def get_intersecting(self, sprite):
+        '''Return the other sprites in this batch that intersect the
+        sprite.
         '''
-        for sprite in self.sprites:
-            if sprite.contains(x, y):
-                return sprite
-        return None
+        if sprite in self.index:
+            return self.index.get_overlapping(sprite)
+        return [other for other in self.get_in_region(sprite.left,
+            sprite.bottom, sprite.right, sprite.top) if other is not sprite]
+
+    def get_collisions(self):
+        '''Return every pair of sprites in this batch that intersect.
+        '''
+        return self.index.get_pairs()
 
     def on_mouse_press(self, x, y, buttons, modifiers):
         '''See if the press occurs over a sprite and if it does, invoke the
         on_mouse_press handler on the sprite.
-
-        XXX optimise me
         '''
         sprite = self.hit(x, y)
         if sprite:
@@ -49,13 +79,29 @@ class SpriteBatch(graphics.Batch):
 
     def add_sprite(self, sprite):
         self.sprites.append(sprite)
+        self._order[sprite] = self._next_order
+        self._next_order += 1
+        self.index.add(sprite, sprite.left, sprite.bottom, sprite.right,
+            sprite.top)
+
+    def update_sprite(self, sprite):
+        '''Update the index after the sprite has moved or changed size.
+        Called automatically by Sprite.
+        '''
+        if sprite in self.index:
+            self.index.update(sprite, sprite.left, sprite.bottom,
+                sprite.right, sprite.top)
 
     def remove_sprite(self, sprite):
         self.sprites.remove(sprite)
+        del self._order[sprite]
+        self.index.remove(sprite)
 
     def clear(self):
-        for s in self.sprites: s.delete()
+        for s in list(self.sprites): s.delete()
         self.sprites = []
+        self._order.clear()
+        self.index.clear()
 
 class Sprite(sprite.Sprite):
     def __init__(self, img, x=0, y=0,
@@ -113,6 +159,12 @@ class Sprite(sprite.Sprite):
     def on_mouse_press(self, x, y, buttons, modifiers):
         pass
 
+    def _update_position(self):
+        super(Sprite, self)._update_position()
+        # keep the batch's spatial index up to date
+        if self._batch is not None and hasattr(self._batch, 'update_sprite'):
+            self._batch.update_sprite(self)
+
     def get_top(self):
         t = self._texture
         height = t.height * self._scale
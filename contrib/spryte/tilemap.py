@@ -35,7 +35,10 @@ class Map(spryte.SpriteBatch):
         y1 = max(0, y1 // self.cell_height)
         x2 = min(len(self.cells[0]), x2 // self.cell_width + 1)
         y2 = min(len(self.cells), y2 // self.cell_height + 1)
-        return [self.cells[y][x] for x in range(x1, x2) for y in range(y1, y2)]
+        if x2 <= x1 or y2 <= y1:
+            return []
+        rows = self.cells[y1:y2]
+        return [row[x] for x in range(x1, x2) for row in rows]
  
     def get(self, x, y):
         ''' Return Cell at pixel px=(x,y).
@@ -110,6 +110,50 @@ if getattr(sys, 'frozen', None):
 #:     this option is enabled if ``__debug__`` is (i.e., if Python was not run
 #:     with the -O option).  It is disabled by default when pyglet is "frozen"
 #:     within a py2exe or py2app library archive.
+#: profile_startup
+#:     If set to a filename, pyglet records how long it spends in each phase
+#:     of starting up (importing modules, loading libraries, linking OpenGL
+#:     functions, registering image codecs and probing audio drivers) as a
+#:     tree of timings, and writes it to the file when the interpreter
+#:     exits.  A filename ending in ``.json`` is written as JSON; any other
+#:     filename is written in the "folded stacks" format understood by
+#:     flame graph tools.  As recording must begin before any other pyglet
+#:     module is imported, set this option with the ``PYGLET_PROFILE_STARTUP``
+#:     environment variable.  See ``tools/profile_startup.py``.
+#:
+#:     **Since:** pyglet 1.2
+#: graphics_vao
+#:     If True (the default), `pyglet.graphics` records the vertex array
+#:     setup of each vertex domain in a vertex array object when the
+#:     context supports them (OpenGL 3.0 or
+#:     ``GL_ARB_vertex_array_object``).  Disable it to set up vertex arrays
+#:     for every draw instead, skipping only state that is unchanged.
+#:
+#:     **Since:** pyglet 1.2
+#: graphics_stream
+#:     Strategy used for vertex buffers with the ``stream`` usage (see
+#:     `pyglet.graphics.vertexdomain.create_attribute_usage`).  ``'ring'``
+#:     (the default) cycles through several copies of the buffer guarded by
+#:     fences, where the context supports them (OpenGL 3.2 or
+#:     ``GL_ARB_sync``), and otherwise orphans the buffer like ``'orphan'``,
+#:     which gives the buffer new storage before each upload.  ``'none'``
+#:     updates the buffer in place, like other usages.
+#:
+#:     **Since:** pyglet 1.2
+#: graphics_immediate_flush
+#:     If True (the default), `pyglet.graphics.draw` and
+#:     `pyglet.graphics.draw_indexed` call ``glFlush`` after drawing, as in
+#:     earlier versions.  The flush is not needed for the drawing to appear,
+#:     and disabling it avoids stalling the pipeline on every call.
+#:
+#:     **Since:** pyglet 1.2
+#: gl_lazy_link
+#:     If True (the default), OpenGL functions are looked up in the driver
+#:     on their first call rather than when `pyglet.gl` is imported.  This
+#:     considerably reduces the time taken to import pyglet.  Disable it to
+#:     link every function at import time, as in earlier versions.
+#:
+#:     **Since:** pyglet 1.2
 #: shadow_window
 #:     By default, pyglet creates a hidden window with a GL context when
 #:     pyglet.gl is imported.  This allows resources to be loaded before
@@ -146,6 +190,15 @@ if getattr(sys, 'frozen', None):
 #:
 #:     **Since:** pyglet 1.2
 #:
+#: audio_resample_quality
+#:     Quality of the resampler used when sources with different sample
+#:     rates are queued on the same player.  ``'fast'`` uses linear
+#:     interpolation, ``'medium'`` (the default) adds a simple low-pass
+#:     filter and ``'best'`` uses a windowed-sinc filter, which requires
+#:     NumPy.
+#:
+#:     **Since:** pyglet 1.2
+#:
 #: search_local_libs
 #:     If False, pyglet won't try to search for libraries in the script
 #:     directory and its `lib` subdirectory. This is useful to load a local
@@ -156,6 +209,7 @@ if getattr(sys, 'frozen', None):
 #:
 options = {
     'audio': ('directsound', 'pulse', 'openal', 'silent'),
+    'audio_resample_quality': 'medium',
     'font': ('gdiplus', 'win32'), # ignored outside win32; win32 is deprecated
     'debug_font': False,
     'debug_gl': not _enable_optimisations,
@@ -171,7 +225,12 @@ options = {
     'debug_trace_flush': True,
     'debug_win32': False,
     'debug_x11': False,
+    'gl_lazy_link': True,
     'graphics_vbo': True,
+    'graphics_vao': True,
+    'graphics_stream': 'ring',
+    'graphics_immediate_flush': True,
+    'profile_startup': '',
     'shadow_window': True,
     'vsync': None,
     'xsync': True,
@@ -182,6 +241,7 @@ options = {
 
 _option_types = {
     'audio': tuple,
+    'audio_resample_quality': str,
     'font': tuple,
     'debug_font': bool,
     'debug_gl': bool,
@@ -197,7 +257,12 @@ _option_types = {
     'debug_trace_flush': bool,
     'debug_win32': bool,
     'debug_x11': bool,
+    'gl_lazy_link': bool,
     'graphics_vbo': bool,
+    'graphics_vao': bool,
+    'graphics_stream': str,
+    'graphics_immediate_flush': bool,
+    'profile_startup': str,
     'shadow_window': bool,
     'vsync': bool,
     'xsync': bool,
@@ -233,6 +298,8 @@ def _read_environment():
                 options[key] = value in ('true', 'TRUE', 'True', '1')
             elif _option_types[key] is int:
                 options[key] = int(value)
+            elif _option_types[key] is str:
+                options[key] = value
         except KeyError:
             pass
 _read_environment()
@@ -337,6 +404,138 @@ _trace_flush = options['debug_trace_flush']
 if options['debug_trace']:
     _install_trace()
 
+# Startup profiling
+# -----------------
+
+class _StartupNode(object):
+    __slots__ = ['name', 'time', 'count', 'children']
+
+    def __init__(self, name):
+        self.name = name
+        self.time = 0.
+        self.count = 0
+        self.children = []
+
+    def get_child(self, name):
+        for child in self.children:
+            if child.name == name:
+                return child
+        child = _StartupNode(name)
+        self.children.append(child)
+        return child
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'time': self.time,
+            'count': self.count,
+            'children': [child.to_dict() for child in self.children],
+        }
+
+    def get_folded_stacks(self, prefix=''):
+        # Lines of "parent;child self-time", with times in microseconds.
+        stack = prefix + self.name
+        self_time = self.time - sum([child.time for child in self.children])
+        lines = ['%s %d' % (stack, max(self_time, 0) * 1000000)]
+        for child in self.children:
+            lines.extend(child.get_folded_stacks(stack + ';'))
+        return lines
+
+class _StartupProfiler(object):
+    '''Records a tree of startup phase timings for the main thread.
+
+    Phases with the same name under the same parent are accumulated into a
+    single node.
+    '''
+    def __init__(self, filename):
+        import thread
+        import time
+        self.filename = filename
+        self.time = time.time
+        self.thread = thread.get_ident()
+        self.get_ident = thread.get_ident
+
+        self.root = _StartupNode('pyglet')
+        self.root.count = 1
+        self.start = self.time()
+        self.stack = [(self.root, self.start)]
+
+    def begin(self, name):
+        if self.get_ident() != self.thread:
+            return False
+        node = self.stack[-1][0].get_child(name)
+        self.stack.append((node, self.time()))
+        return True
+
+    def end(self):
+        node, start = self.stack.pop()
+        node.time += self.time() - start
+        node.count += 1
+
+    def install_import_hook(self):
+        import __builtin__
+        builtin_import = __builtin__.__import__
+        modules = sys.modules
+
+        def _profile_import(name, *args, **kwargs):
+            if name in modules or not self.begin('import %s' % name):
+                return builtin_import(name, *args, **kwargs)
+            try:
+                return builtin_import(name, *args, **kwargs)
+            finally:
+                self.end()
+        __builtin__.__import__ = _profile_import
+
+    def get_tree(self):
+        '''Return the timing tree as nested dicts, with times in seconds.'''
+        self.root.time = self.time() - self.start
+        return self.root.to_dict()
+
+    def write(self):
+        self.root.time = self.time() - self.start
+        if self.filename.endswith('.json'):
+            import json
+            data = json.dumps(self.get_tree(), indent=1)
+        else:
+            data = '\n'.join(self.root.get_folded_stacks()) + '\n'
+        f = open(self.filename, 'w')
+        f.write(data)
+        f.close()
+
+def _profile_startup(name):
+    '''Decorator recording calls to a function as a startup phase.
+
+    `name` is either the phase name or a function returning it, given the
+    positional arguments of the call.  The function is returned unchanged
+    if startup profiling is disabled.
+    '''
+    def decorator(func):
+        if not _startup_profiler:
+            return func
+
+        def profile_startup_wrapper(*args, **kwargs):
+            if callable(name):
+                phase = name(args)
+            else:
+                phase = name
+            if not _startup_profiler.begin(phase):
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _startup_profiler.end()
+        profile_startup_wrapper.__name__ = func.__name__
+        profile_startup_wrapper.__doc__ = func.__doc__
+        return profile_startup_wrapper
+    return decorator
+
+_startup_profiler = None
+if options['profile_startup']:
+    import atexit
+    _startup_profiler = _StartupProfiler(options['profile_startup'])
+    _startup_profiler.install_import_hook()
+    atexit.register(_startup_profiler.write)
+
 # Lazy loading
 # ------------
 
@@ -388,6 +587,7 @@ if True:
     lib = _ModuleProxy('lib')
     media = _ModuleProxy('media')
     resource = _ModuleProxy('resource')
+    spatial = _ModuleProxy('spatial')
     sprite = _ModuleProxy('sprite')
     text = _ModuleProxy('text')
     window = _ModuleProxy('window')
@@ -408,6 +608,7 @@ if False:
     import lib
     import media
     import resource
+    import spatial
     import sprite
     import text
     import window
@@ -65,7 +65,10 @@ default policy is to wait until all windows are closed)::
 
 :attr:`event_loop` is the global event loop.  Applications can replace this
 with their own subclass of :class:`EventLoop` before calling 
-:meth:`EventLoop.run`.
+:meth:`EventLoop.run`.  When windows are redrawn is controlled by the event
+loop's :attr:`EventLoop.pacing` strategy (see :mod:`pyglet.app.pacing`), and
+frame time histograms are available from :attr:`EventLoop.frame_times` and
+:attr:`EventLoop.draw_times`.
 
 :attr:`platform_event_loop` is the platform-dependent event loop. 
 Applications must not subclass or replace this :class:`PlatformEventLoop` 
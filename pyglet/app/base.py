@@ -13,6 +13,7 @@ import Queue
 from pyglet import app
 from pyglet import clock
 from pyglet import event
+from pyglet.app import pacing
 
 _is_epydoc = hasattr(sys, 'is_epydoc') and sys.is_epydoc
 
@@ -106,6 +107,20 @@ class EventLoop(event.EventDispatcher):
     in some other way.  You should not in general override `run`, as
     this method contains platform-specific code that ensures the application
     remains responsive to the user while keeping CPU usage to a minimum.
+
+    The choice of when to redraw windows and how long to sleep is delegated
+    to the `pacing` strategy; see `pyglet.app.pacing`.
+
+    :Ivariables:
+        `pacing` : `pyglet.app.pacing.Pacing`
+            Frame pacing strategy.  Defaults to
+            `pyglet.app.pacing.ScheduledPacing`.  Since pyglet 1.2.
+        `frame_times` : `pyglet.app.pacing.FrameTimeHistogram`
+            Histogram of the intervals between redraws.  Since pyglet 1.2.
+        `draw_times` : `pyglet.app.pacing.FrameTimeHistogram`
+            Histogram of the time taken to redraw windows (including
+            ``on_draw`` handlers and ``flip``).  Since pyglet 1.2.
+
     '''
 
     _has_exit_condition = None
@@ -115,6 +130,9 @@ class EventLoop(event.EventDispatcher):
         self._has_exit_condition = threading.Condition()
         self.clock = clock.get_default()
         self.is_running = False
+        self.pacing = pacing.ScheduledPacing()
+        self.frame_times = pacing.FrameTimeHistogram()
+        self.draw_times = pacing.FrameTimeHistogram()
 
     def run(self):
         '''Begin processing events, scheduled functions and window updates.
@@ -257,32 +275,25 @@ class EventLoop(event.EventDispatcher):
         For example, return ``1.0`` to have the idle method called every
         second, or immediately after any user events.
 
-        The default implementation dispatches the
-        `pyglet.window.Window.on_draw` event for all windows and uses
-        `pyglet.clock.tick` and `pyglet.clock.get_sleep_time` on the default
-        clock to determine the return value.
+        The default implementation delivers any coalesced window events, then
+        defers to the `pacing` strategy to call scheduled functions, dispatch
+        the `pyglet.window.Window.on_draw` event to windows needing a redraw
+        and determine the return value.
 
         This method should be overridden by advanced users only.  To have
         code execute at regular intervals, use the
-        `pyglet.clock.schedule` methods.
+        `pyglet.clock.schedule` methods; to change when windows are
+        redrawn, set `pacing`.
 
         :rtype: float
         :return: The number of seconds before the idle method should
             be called again, or `None` to block for user input.
         '''
-        dt = self.clock.update_time()
-        redraw_all = self.clock.call_scheduled_functions(dt)
-
-        # Redraw all windows
+        # Deliver any input events held back by coalescing
         for window in app.windows:
-            if redraw_all or (window._legacy_invalid and window.invalid):
-                window.switch_to()
-                window.dispatch_event('on_draw')
-                window.flip()
-                window._legacy_invalid = False
-
-        # Update timout
-        return self.clock.get_sleep_time(True)
+            window.flush_coalesced_events()
+
+        return self.pacing.idle(self)
 
     def _get_has_exit(self):
         self._has_exit_condition.acquire()
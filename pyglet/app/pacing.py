@@ -0,0 +1,420 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+# 
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions 
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright 
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+
+'''Frame pacing strategies for the application event loop.
+
+The `pyglet.app.EventLoop` delegates the work done on each iteration --
+calling scheduled functions, deciding which windows to redraw, and how
+long to wait before the next iteration -- to its `EventLoop.pacing`
+strategy.  Replace the strategy before (or while) running the event loop::
+
+    from pyglet.app import pacing
+
+    pyglet.app.event_loop.pacing = pacing.InvalidatedPacing()
+    pyglet.app.run()
+
+The following strategies are provided:
+
+`ScheduledPacing`
+    The default.  Windows are redrawn after any scheduled function is called
+    or any event is handled, and the loop sleeps until the next scheduled
+    function is due.
+`InvalidatedPacing`
+    Windows are redrawn only when their ``invalid`` attribute is set (or
+    they are resized).  Suitable for applications whose contents change
+    rarely, such as tools and dashboards.
+`DeadlinePacing`
+    Windows are redrawn at a fixed interval.  The loop sleeps until just
+    before each frame deadline and then spin-waits for the remaining time,
+    giving regular frame intervals at the cost of a little CPU time.
+`FixedTimestepPacing`
+    As `DeadlinePacing`, but additionally calls an update function with a
+    fixed time step, and provides an interpolation factor for rendering
+    between simulation steps.
+
+Every strategy records the interval between frames and the time taken to
+draw them into the `FrameTimeHistogram` objects
+`EventLoop.frame_times` and `EventLoop.draw_times`.
+
+:since: pyglet 1.2
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+from pyglet import app
+
+class FrameTimeHistogram(object):
+    '''Histogram of frame times.
+
+    Times are counted in bins of equal width; times exceeding the range of
+    the histogram are counted in the last bin.
+
+    :Ivariables:
+        `bin_width` : float
+            Width of each bin, in seconds.
+        `counts` : list of int
+            Number of times counted in each bin.
+        `count` : int
+            Total number of times counted.
+        `total` : float
+            Sum of all times counted, in seconds.
+        `max` : float
+            Largest time counted, in seconds.
+
+    '''
+    def __init__(self, bin_width=0.001, bin_count=100):
+        '''Create an empty histogram.
+
+        :Parameters:
+            `bin_width` : float
+                Width of each bin, in seconds.  Defaults to 1 millisecond.
+            `bin_count` : int
+                Number of bins.  Defaults to 100.
+
+        '''
+        self.bin_width = bin_width
+        self.counts = [0] * bin_count
+        self.reset()
+
+    def reset(self):
+        '''Discard all counted times.
+        '''
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+
+    def add(self, t):
+        '''Count a frame time.
+
+        :Parameters:
+            `t` : float
+                Frame time, in seconds.
+
+        '''
+        index = min(int(t / self.bin_width), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += t
+        if t > self.max:
+            self.max = t
+
+    def _get_mean(self):
+        if not self.count:
+            return 0.
+        return self.total / self.count
+
+    mean = property(_get_mean,
+                    doc='''Mean of the times counted, in seconds.
+
+    :type: float
+    ''')
+
+    def get_percentile(self, percent):
+        '''Get the upper edge of the bin containing the given percentile.
+
+        For example, ``get_percentile(99)`` returns a time that at least 99%
+        of frames did not exceed (to within the bin width).
+
+        :Parameters:
+            `percent` : float
+                Percentile, between 0 and 100.
+
+        :rtype: float
+        :return: Time in seconds, or 0 if no times have been counted.
+        '''
+        if not self.count:
+            return 0.
+        threshold = self.count * percent / 100.
+        accumulated = 0
+        for i, count in enumerate(self.counts[:-1]):
+            accumulated += count
+            if accumulated >= threshold:
+                return min((i + 1) * self.bin_width, self.max)
+
+        # Overflow bin
+        return self.max
+
+class Pacing(object):
+    '''Abstract frame pacing strategy.
+
+    Subclasses implement `idle`, and use `redraw` to draw windows so that
+    frame times are recorded.
+    '''
+    _last_frame_ts = None
+
+    def idle(self, event_loop):
+        '''Perform one iteration of the event loop.
+
+        Called by `EventLoop.idle`; see that method for details.
+
+        :Parameters:
+            `event_loop` : `EventLoop`
+                The event loop being run.
+
+        :rtype: float
+        :return: The number of seconds before this method should be called
+            again, or `None` to block for user input.
+        '''
+        raise NotImplementedError('abstract')
+
+    def redraw(self, event_loop, windows):
+        '''Dispatch ``on_draw`` to and flip each of the given windows,
+        recording the frame times.
+
+        :Parameters:
+            `event_loop` : `EventLoop`
+                The event loop being run.
+            `windows` : sequence of `pyglet.window.Window`
+                Windows to redraw.
+
+        '''
+        time = event_loop.clock.time
+        ts = time()
+        if self._last_frame_ts is not None:
+            event_loop.frame_times.add(ts - self._last_frame_ts)
+        self._last_frame_ts = ts
+
+        for window in windows:
+            window.switch_to()
+            window.dispatch_event('on_draw')
+            window.flip()
+            window._legacy_invalid = False
+
+        event_loop.draw_times.add(time() - ts)
+
+class ScheduledPacing(Pacing):
+    '''Redraw after scheduled functions or handled events.
+
+    Windows are redrawn whenever any scheduled function is called, or when
+    the window handled an event and its ``invalid`` attribute is set.  The
+    event loop sleeps until the next scheduled function is due.
+
+    This is the default strategy, and matches the behaviour of the event
+    loop in earlier versions of pyglet 1.2.
+    '''
+    def idle(self, event_loop):
+        clock = event_loop.clock
+        dt = clock.update_time()
+        redraw_all = clock.call_scheduled_functions(dt)
+
+        windows = [window for window in app.windows \
+                   if redraw_all or (window._legacy_invalid and window.invalid)]
+        if windows:
+            self.redraw(event_loop, windows)
+
+        return clock.get_sleep_time(True)
+
+class InvalidatedPacing(Pacing):
+    '''Redraw windows only when they are invalidated.
+
+    A window is redrawn only when its ``invalid`` attribute is ``True`` or
+    its size has changed.  The attribute is cleared after the window is
+    redrawn, so the application must set it again whenever the window
+    contents need updating; for example, from an ``on_mouse_press`` or
+    ``on_expose`` handler, or from a scheduled function.
+
+    Scheduled functions are called as usual, but do not themselves cause a
+    redraw.  When nothing is scheduled the event loop blocks until the next
+    event, using no CPU time.
+    '''
+    def __init__(self):
+        self._sizes = {}
+
+    def idle(self, event_loop):
+        clock = event_loop.clock
+        dt = clock.update_time()
+        clock.call_scheduled_functions(dt)
+
+        windows = []
+        sizes = {}
+        for window in app.windows:
+            size = window.get_size()
+            if window.invalid or self._sizes.get(window) != size:
+                windows.append(window)
+            sizes[window] = size
+        # Replacing the dict each iteration forgets closed windows.
+        self._sizes = sizes
+
+        for window in windows:
+            window.invalid = False
+        if windows:
+            self.redraw(event_loop, windows)
+
+        return clock.get_sleep_time(True)
+
+class DeadlinePacing(Pacing):
+    '''Redraw at a regular interval, using deadline-based sleeps.
+
+    A frame deadline is kept every `interval` seconds.  Between deadlines
+    the event loop sleeps, processing events and scheduled functions as they
+    arrive, until `spin_time` seconds before the deadline; the remaining time
+    is spent busy-waiting, as operating system sleeps are too coarse to wake
+    exactly on time.  Every window is then redrawn; the ``invalid``
+    attribute of windows is left for the application to manage.
+
+    If a frame is missed by more than a whole interval, the deadlines are
+    restarted from the current time rather than drawing several frames in
+    quick succession.
+
+    An `interval` of 0 redraws on every iteration of the event loop without
+    sleeping, which is appropriate when the window is synchronised to the
+    display's vertical retrace (vsync).
+    '''
+    def __init__(self, interval=1/60., spin_time=0.002):
+        '''Create a deadline pacing strategy.
+
+        :Parameters:
+            `interval` : float
+                Time between frames, in seconds.  Defaults to 1/60.
+            `spin_time` : float
+                Time before each deadline to busy-wait rather than sleep,
+                in seconds.  Defaults to 2 milliseconds.
+
+        '''
+        self.interval = interval
+        self.spin_time = spin_time
+        self._deadline = None
+
+    def idle(self, event_loop):
+        clock = event_loop.clock
+        time = clock.time
+        if self._deadline is None:
+            self._deadline = time()
+
+        draw = time() >= self._deadline - self.spin_time
+        if draw:
+            # Spin-wait the tail of the interval
+            while time() < self._deadline:
+                pass
+
+        dt = clock.update_time()
+        clock.call_scheduled_functions(dt)
+
+        if draw:
+            self.on_frame(event_loop)
+            self.redraw(event_loop, list(app.windows))
+
+            self._deadline += self.interval
+            now = time()
+            if now - self._deadline > self.interval:
+                self._deadline = now + self.interval
+
+        timeout = max(self._deadline - self.spin_time - time(), 0.)
+        sleep_time = clock.get_sleep_time(True)
+        if sleep_time is not None:
+            timeout = min(timeout, sleep_time)
+        return timeout
+
+    def on_frame(self, event_loop):
+        '''Called immediately before windows are redrawn at each deadline.
+
+        The default implementation does nothing.
+
+        :Parameters:
+            `event_loop` : `EventLoop`
+                The event loop being run.
+
+        '''
+        pass
+
+class FixedTimestepPacing(DeadlinePacing):
+    '''Advance a simulation with a fixed time step, and redraw at deadlines.
+
+    Before each frame, `update` is called with `step` as its only argument
+    as many times as needed to catch up with the elapsed time.  Time left
+    over is carried to the next frame; `alpha` gives it as a fraction of
+    `step`, so that ``on_draw`` handlers can interpolate between the
+    previous and current simulation states::
+
+        def on_draw():
+            x = previous_x + (current_x - previous_x) * strategy.alpha
+
+    At most `max_steps` updates are made for a single frame; if the
+    simulation falls further behind, the backlog is discarded rather than
+    allowing the application to spiral into ever-longer frames.
+
+    :Ivariables:
+        `alpha` : float
+            Fraction of a step elapsed since the last update, between 0
+            and 1.
+
+    '''
+    alpha = 0.
+
+    def __init__(self, update, step=1/60., interval=None, max_steps=5,
+                 spin_time=0.002):
+        '''Create a fixed time step pacing strategy.
+
+        :Parameters:
+            `update` : callable
+                Function to call with the time step to advance the
+                simulation.
+            `step` : float
+                Simulation time step, in seconds.  Defaults to 1/60.
+            `interval` : float
+                Time between frames, in seconds.  Defaults to `step`; see
+                `DeadlinePacing`.
+            `max_steps` : int
+                Maximum number of updates per frame.
+            `spin_time` : float
+                Time before each deadline to busy-wait, in seconds.
+
+        '''
+        if interval is None:
+            interval = step
+        super(FixedTimestepPacing, self).__init__(interval, spin_time)
+        self.update = update
+        self.step = step
+        self.max_steps = max_steps
+        self._accumulator = 0.
+        self._last_ts = None
+
+    def on_frame(self, event_loop):
+        ts = event_loop.clock.time()
+        if self._last_ts is not None:
+            self._accumulator += ts - self._last_ts
+        self._last_ts = ts
+
+        steps = 0
+        while self._accumulator >= self.step:
+            if steps == self.max_steps:
+                self._accumulator %= self.step
+                break
+            self.update(self.step)
+            self._accumulator -= self.step
+            steps += 1
+
+        self.alpha = self._accumulator / self.step
@@ -134,6 +134,23 @@ updates the application state and checks for new events::
 Not all event dispatchers require the call to ``dispatch_events``; check with
 the particular class documentation.
 
+Coalescing events
+=================
+
+Some events, such as ``on_mouse_motion``, can be generated far more often
+than an application is able to usefully respond to them.  A dispatcher can be
+asked to coalesce such an event type: instead of invoking the handlers
+immediately, the event is held back and merged with any following event of
+the same type.  The held event is dispatched as soon as any other event is
+dispatched (preserving the order of events), or when
+`EventDispatcher.flush_coalesced_events` is called::
+
+    window.coalesce_event('on_mouse_motion', pyglet.event.merge_motion)
+
+By default the most recent arguments replace the held ones; `merge_motion`
+instead accumulates the relative ``dx`` and ``dy`` arguments of the motion and
+drag events, so no movement is lost.
+
 '''
 
 __docformat__ = 'restructuredtext'
@@ -149,6 +166,24 @@ class EventException(Exception):
     '''
     pass
 
+def merge_motion(held_args, args):
+    '''Merge function for coalescing mouse motion and drag events.
+
+    The absolute coordinates are taken from the most recent event and the
+    relative ``dx`` and ``dy`` arguments are summed.  Events whose remaining
+    arguments (for example, the buttons and modifiers of ``on_mouse_drag``)
+    differ are not merged.
+
+    :since: pyglet 1.2
+    '''
+    if held_args[4:] != args[4:]:
+        return None
+    return (args[0], args[1],
+            held_args[2] + args[2], held_args[3] + args[3]) + args[4:]
+
+def _merge_latest(held_args, args):
+    return args
+
 class EventDispatcher(object):
     '''Generic event dispatcher interface.
 
@@ -157,6 +192,15 @@ class EventDispatcher(object):
     # Placeholder empty stack; real stack is created only if needed
     _event_stack = ()
 
+    # Map of event type to (stack handlers, class has handler), rebuilt
+    # lazily after the stack is modified.
+    _event_handlers = None
+
+    # Map of coalesced event type to merge function, and the list of
+    # [event_type, args] held back for dispatch.  Created only if needed.
+    _coalesced_types = None
+    _coalesced_events = ()
+
     @classmethod
     def register_event_type(cls, name):
         '''Register an event type with the dispatcher.
@@ -190,6 +234,7 @@ class EventDispatcher(object):
 
         # Place dict full of new handlers at beginning of stack
         self._event_stack.insert(0, {})
+        self._event_handlers = None
         self.set_handlers(*args, **kwargs)
 
     def _get_handlers(self, args, kwargs):
@@ -242,6 +287,7 @@ class EventDispatcher(object):
             self._event_stack = [{}]
 
         self._event_stack[0][name] = handler
+        self._event_handlers = None
 
     def pop_handlers(self):
         '''Pop the top level of event handlers off the stack.
@@ -249,6 +295,7 @@ class EventDispatcher(object):
         assert self._event_stack and 'No handlers pushed'
 
         del self._event_stack[0]
+        self._event_handlers = None
 
     def remove_handlers(self, *args, **kwargs):
         '''Remove event handlers from the event stack.
@@ -279,6 +326,8 @@ class EventDispatcher(object):
         if not frame:
             return
 
+        self._event_handlers = None
+
         # Remove each handler from the frame.
         for name, handler in handlers:
             try:
@@ -311,6 +360,7 @@ class EventDispatcher(object):
             try:
                 if frame[name] == handler:
                     del frame[name]
+                    self._event_handlers = None
                     break
             except KeyError:
                 pass
@@ -344,35 +394,133 @@ class EventDispatcher(object):
         '''
         assert event_type in self.event_types, "%r not found in %r.event_types == %r" % (event_type, self, self.event_types)
 
+        if self._coalesced_types is not None:
+            if event_type in self._coalesced_types:
+                self._hold_event(event_type, args)
+                return EVENT_UNHANDLED
+            elif self._coalesced_events:
+                self.flush_coalesced_events()
+
+        return self._dispatch_event(event_type, args)
+
+    def _dispatch_event(self, event_type, args):
+        # Look up the stack handlers for this event; the tuple is a snapshot,
+        # so handlers may safely modify the stack while it is iterated.
+        handlers = self._event_handlers
+        if handlers is None:
+            handlers = self._event_handlers = {}
+        try:
+            stack_handlers, class_handler = handlers[event_type]
+        except KeyError:
+            stack_handlers, class_handler = handlers[event_type] = \
+                self._get_stack_handlers(event_type)
+
         invoked = False
 
         # Search handler stack for matching event handlers
-        for frame in list(self._event_stack):
-            handler = frame.get(event_type, None)
-            if handler:
-                try:
-                    invoked = True
-                    if handler(*args):
-                        return EVENT_HANDLED
-                except TypeError:
-                    self._raise_dispatch_exception(event_type, args, handler)
-
+        for handler in stack_handlers:
+            try:
+                invoked = True
+                if handler(*args):
+                    return EVENT_HANDLED
+            except TypeError:
+                self._raise_dispatch_exception(event_type, args, handler)
 
         # Check instance for an event handler
-        if hasattr(self, event_type):
+        if class_handler or event_type in self.__dict__:
+            handler = getattr(self, event_type)
             try:
                 invoked = True
-                if getattr(self, event_type)(*args):
+                if handler(*args):
                     return EVENT_HANDLED
             except TypeError:
-                self._raise_dispatch_exception(
-                    event_type, args, getattr(self, event_type))
+                self._raise_dispatch_exception(event_type, args, handler)
 
         if invoked:
             return EVENT_UNHANDLED
 
         return False
 
+    def _get_stack_handlers(self, event_type):
+        handlers = []
+        for frame in self._event_stack:
+            handler = frame.get(event_type, None)
+            if handler:
+                handlers.append(handler)
+        return tuple(handlers), hasattr(self.__class__, event_type)
+
+    def coalesce_event(self, name, merge=None):
+        '''Coalesce consecutive dispatches of an event type.
+
+        While coalesced, a dispatched event of this type is held back rather
+        than passed to the handlers.  A subsequent event of the same type is
+        merged with the held event; any other event first causes the held
+        event to be dispatched.  Held events can also be dispatched
+        explicitly with `flush_coalesced_events`.
+
+        `dispatch_event` returns `EVENT_UNHANDLED` for held events.
+
+        :Parameters:
+            `name` : str
+                Name of the event type to coalesce.
+            `merge` : callable
+                Function taking the held and the new argument tuples, and
+                returning the merged argument tuple, or ``None`` if the
+                events cannot be merged (in which case the held event is
+                dispatched first).  If omitted, the new arguments replace
+                the held ones.  See `merge_motion`.
+
+        :since: pyglet 1.2
+        '''
+        if name not in self.event_types:
+            raise EventException('Unknown event "%s"' % name)
+
+        if self._coalesced_types is None:
+            self._coalesced_types = {}
+            self._coalesced_events = []
+        self._coalesced_types[name] = merge or _merge_latest
+
+    def uncoalesce_event(self, name):
+        '''Stop coalescing an event type.
+
+        Any held events are dispatched first.
+
+        :Parameters:
+            `name` : str
+                Name of the event type previously passed to
+                `coalesce_event`.
+
+        :since: pyglet 1.2
+        '''
+        self.flush_coalesced_events()
+        if self._coalesced_types is not None:
+            self._coalesced_types.pop(name, None)
+            if not self._coalesced_types:
+                del self._coalesced_types
+                del self._coalesced_events
+
+    def flush_coalesced_events(self):
+        '''Dispatch all events currently held back by coalescing.
+
+        :since: pyglet 1.2
+        '''
+        events = self._coalesced_events
+        while events:
+            event_type, args = events.pop(0)
+            self._dispatch_event(event_type, args)
+
+    def _hold_event(self, event_type, args):
+        events = self._coalesced_events
+        if events:
+            held = events[-1]
+            if held[0] == event_type:
+                merged = self._coalesced_types[event_type](held[1], args)
+                if merged is not None:
+                    held[1] = merged
+                    return
+            self.flush_coalesced_events()
+        events.append([event_type, args])
+
     def _raise_dispatch_exception(self, event_type, args, handler):
         # A common problem in applications is having the wrong number of
         # arguments in an event handler.  This is caught as a TypeError in
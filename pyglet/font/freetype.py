@@ -316,6 +316,7 @@ class FreeTypeFont(base.Font):
             self.descent = int(f26p6_to_float(metrics.descender))
 
     @staticmethod
+    @pyglet._profile_startup('fontconfig match')
     def get_fontconfig_match(name, size, bold, italic):
         if bold:
             bold = FC_WEIGHT_BOLD
@@ -39,6 +39,7 @@ __docformat__ = 'restructuredtext'
 __version__ = '$Id$'
 
 import ctypes
+import sys
 
 import pyglet
 
@@ -130,6 +131,61 @@ def decorate_function(func, name):
              name[:3] not in ('glX', 'agl', 'wgl'):
             func.errcheck = errcheck
 
+class LazyFunctionProxy(object):
+    '''Placeholder for a GL function that is linked on its first call.
+
+    Looking up and building a ctypes prototype for every function at import
+    time is a large part of the cost of importing `pyglet.gl`, though most
+    applications call only a small number of the functions.
+
+    Once linked, the proxy replaces itself with the real function in the
+    module that defined it, in `pyglet.gl`, and in the global namespace of
+    each caller (typically a module that imported it with
+    ``from pyglet.gl import *``), so subsequent calls bypass the proxy.
+    '''
+    __slots__ = ['name', 'restype', 'argtypes', 'requires', 'suggestions',
+                 'link', 'module', 'func']
+    def __init__(self, link, module, name, restype, argtypes,
+                 requires, suggestions):
+        self.link = link
+        self.module = module
+        self.name = name
+        self.restype = restype
+        self.argtypes = argtypes
+        self.requires = requires
+        self.suggestions = suggestions
+        self.func = None
+
+    def __call__(self, *args, **kwargs):
+        func = self.func
+        if func is None:
+            func = self._link()
+
+        caller_globals = sys._getframe(1).f_globals
+        if caller_globals.get(self.name) is self:
+            caller_globals[self.name] = func
+        return func(*args, **kwargs)
+
+    @pyglet._profile_startup('link GL functions')
+    def _link(self):
+        self.func = func = self.link(self.name, self.restype, self.argtypes,
+                                     self.requires, self.suggestions)
+        for module_name in (self.module, 'pyglet.gl'):
+            module = sys.modules.get(module_name)
+            if module and getattr(module, self.name, None) is self:
+                setattr(module, self.name, func)
+        return func
+
+def _lazy_link(link):
+    if link is None:
+        return None
+
+    def link_lazily(name, restype, argtypes, requires=None, suggestions=None):
+        module = sys._getframe(1).f_globals.get('__name__')
+        return LazyFunctionProxy(link, module, name, restype, argtypes,
+                                 requires, suggestions)
+    return link_lazily
+
 link_AGL = None
 link_GLX = None
 link_WGL = None
@@ -141,3 +197,20 @@ elif pyglet.compat_platform == 'darwin':
 else:
     from pyglet.gl.lib_glx import link_GL, link_GLU, link_GLX
 
+if pyglet.options['gl_lazy_link']:
+    link_GL = _lazy_link(link_GL)
+    link_GLU = _lazy_link(link_GLU)
+    link_AGL = _lazy_link(link_AGL)
+    link_GLX = _lazy_link(link_GLX)
+    link_WGL = _lazy_link(link_WGL)
+elif pyglet._startup_profiler:
+    _profile_link = pyglet._profile_startup('link GL functions')
+    link_GL = _profile_link(link_GL)
+    link_GLU = _profile_link(link_GLU)
+    if link_AGL:
+        link_AGL = _profile_link(link_AGL)
+    if link_GLX:
+        link_GLX = _profile_link(link_GLX)
+    if link_WGL:
+        link_WGL = _profile_link(link_WGL)
+
@@ -155,24 +155,99 @@ present.  This also permits use of ``GL_POLYGON``, ``GL_LINE_LOOP`` and
 ``GL_TRIANGLE_FAN``.   Unfortunately the extension is not provided by older
 video drivers, and requires indexed vertex lists.
 
+Vertex lists added to a batch with the `INDEXED_QUADS` mode give quads of 4
+vertices, as for ``GL_QUADS``, but are drawn as ``GL_TRIANGLES`` using an
+index buffer shared by all such lists (see
+`vertexdomain.QuadVertexDomain`).  Drivers that emulate ``GL_QUADS``
+draw them faster.
+
 :since: pyglet 1.1
 '''
 
 __docformat__ = 'restructuredtext'
 __version__ = '$Id: $'
 
+import bisect
 import ctypes
+import time
+import weakref
 
 import pyglet
 from pyglet.gl import *
 from pyglet import gl
+from pyglet import spatial
 from pyglet.graphics import vertexbuffer, vertexattribute, vertexdomain
 
+#: Drawing mode for `Batch.add` giving quads of 4 vertices each, which are
+#: drawn as indexed triangles.
+#:
+#: :since: pyglet 1.2
+INDEXED_QUADS = 'indexed_quads'
+
 _debug_graphics_batch = pyglet.options['debug_graphics_batch']
+_immediate_flush = pyglet.options['graphics_immediate_flush']
+
+# Attributes and memory reused by `draw` and `draw_indexed`.  The data is
+# drawn from client-side arrays, which OpenGL has read by the time the draw
+# call returns, so the same memory serves every call (and every context).
+_immediate_attributes = {}
+_immediate_buffer = None
+
+def _get_immediate_attribute(format):
+    try:
+        return _immediate_attributes[format]
+    except KeyError:
+        attribute = vertexattribute.create_attribute(format)
+        _immediate_attributes[format] = attribute
+        return attribute
+
+def _set_immediate_data(size, data, index_c_type=None, indices=()):
+    # Copy the attribute data, followed by any indices, into the immediate
+    # buffer, and point the attributes at it.  Returns the buffer and the
+    # offset of the indices.
+    global _immediate_buffer
+
+    # Each attribute's data starts at a multiple of its stride, so that it
+    # can be placed with `set_region`.
+    attributes = []
+    offset = 0
+    for format, array in data:
+        attribute = _get_immediate_attribute(format)
+        assert size == len(array) // attribute.count, \
+            'Data for %s is incorrect length' % format
+        start = (offset + attribute.stride - 1) // attribute.stride
+        attributes.append((attribute, start, array))
+        offset = (start + size) * attribute.stride
+    if index_c_type is not None:
+        index_size = ctypes.sizeof(index_c_type)
+        offset = index_offset = \
+            (offset + index_size - 1) // index_size * index_size
+        offset += index_size * len(indices)
+    else:
+        index_offset = None
+
+    buffer = _immediate_buffer
+    if buffer is None or buffer.size < offset:
+        buffer = _immediate_buffer = vertexbuffer.create_mappable_buffer(
+            vertexdomain._nearest_pow2(max(offset, 1024)), vbo=False)
+
+    for attribute, start, array in attributes:
+        attribute.set_region(buffer, start, size, array)
+        attribute.enable()
+        attribute.set_pointer(buffer.ptr + start * attribute.stride)
+    if index_c_type is not None and indices:
+        region = buffer.get_region(index_offset,
+            index_size * len(indices),
+            ctypes.POINTER(index_c_type * len(indices)))
+        region.array[:] = indices
+    return buffer, index_offset
 
 def draw(size, mode, *data):
     '''Draw a primitive immediately.
 
+    The data is copied into memory that is reused by each call, and drawn
+    from client-side vertex arrays.
+
     :Parameters:
         `size` : int
             Number of vertices given
@@ -186,21 +261,10 @@ def draw(size, mode, *data):
     '''
     glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
 
-    buffers = []
-    for format, array in data:
-        attribute = vertexattribute.create_attribute(format)
-        assert size == len(array) // attribute.count, \
-            'Data for %s is incorrect length' % format
-        buffer = vertexbuffer.create_mappable_buffer(
-            size * attribute.stride, vbo=False)
-
-        attribute.set_region(buffer, 0, size, array)
-        attribute.enable()
-        attribute.set_pointer(buffer.ptr)
-        buffers.append(buffer)
-
+    _set_immediate_data(size, data)
     glDrawArrays(mode, 0, size)
-    glFlush()
+    if _immediate_flush:
+        glFlush()
         
     glPopClientAttrib()
 
@@ -220,19 +284,6 @@ def draw_indexed(size, mode, indices, *data):
     '''
     glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
 
-    buffers = []
-    for format, array in data:
-        attribute = vertexattribute.create_attribute(format)
-        assert size == len(array) // attribute.count, \
-            'Data for %s is incorrect length' % format
-        buffer = vertexbuffer.create_mappable_buffer(
-            size * attribute.stride, vbo=False)
-
-        attribute.set_region(buffer, 0, size, array)
-        attribute.enable()
-        attribute.set_pointer(buffer.ptr)
-        buffers.append(buffer)
-
     if size <= 0xff:
         index_type = GL_UNSIGNED_BYTE
         index_c_type = ctypes.c_ubyte
@@ -243,9 +294,11 @@ def draw_indexed(size, mode, indices, *data):
         index_type = GL_UNSIGNED_INT
         index_c_type = ctypes.c_uint
 
-    index_array = (index_c_type * len(indices))(*indices)
-    glDrawElements(mode, len(indices), index_type, index_array)
-    glFlush()
+    buffer, index_offset = _set_immediate_data(size, data,
+                                               index_c_type, indices)
+    glDrawElements(mode, len(indices), index_type, buffer.ptr + index_offset)
+    if _immediate_flush:
+        glFlush()
     
     glPopClientAttrib()
 
@@ -310,15 +363,43 @@ class Batch(object):
     '''Manage a collection of vertex lists for batched rendering.
 
     Vertex lists are added to a `Batch` using the `add` and `add_indexed`
-    methods.  An optional group can be specified along with the vertex list,
-    which gives the OpenGL state required for its rendering.  Vertex lists
+    methods, and meshes drawn once per instance using `add_instanced`.  An
+    optional group can be specified along with the vertex list, which gives
+    the OpenGL state required for its rendering.  Vertex lists
     with shared mode and group are allocated into adjacent areas of memory and
     sent to the graphics card in a single operation.
 
     Call `VertexList.delete` to remove a vertex list from the batch.
+
+    A batch created with culling keeps the bounding rectangle of each of its
+    vertex lists in a `pyglet.spatial.GridIndex`, so that `draw` can be
+    given a view rectangle and draw only the lists within it.  The bounds of
+    a list are computed again when it is next drawn after its ``vertices``
+    were accessed.
+
+    The batch keeps the children of each group sorted, inserting and
+    removing groups as they are used and left empty, and rebuilds only the
+    part of its draw list for the groups that changed (and their ancestors).
+    Call `invalidate` after changing the order of groups already in the
+    batch.
     '''
-    def __init__(self):
-        '''Create a graphics batch.'''
+
+    #: Size of the cells of the grid used for culling, in the units of the
+    #: vertex coordinates.  A few times the size of a typical vertex list
+    #: works best.
+    #:
+    #: :since: pyglet 1.2
+    cull_cell_size = 256
+
+    def __init__(self, culling=False):
+        '''Create a graphics batch.
+
+        :Parameters:
+            `culling` : bool
+                If True, the bounds of the vertex lists are kept so that
+                `draw` can cull them.  **Since:** pyglet 1.2
+
+        '''
         # Mapping to find domain.  
         # group -> (attributes, mode, indexed) -> domain
         self.group_map = {}
@@ -329,9 +410,42 @@ class Batch(object):
         # List of top-level groups
         self.top_groups = []
 
+        # Sort key of each group, and the keys of the children of each
+        # group (or of the top-level groups, for None) in order.
+        self._group_keys = {}
+        self._sibling_keys = {None: []}
+
+        # Group and key of each domain in group_map.
+        self._domain_groups = {}
+
         self._draw_list = []
         self._draw_list_dirty = False
 
+        # Draw list of each group, including its children.  The lists of
+        # the dirty groups, and of their ancestors, are built again before
+        # the batch is next drawn; domains that became empty are removed
+        # then.
+        self._group_draw_lists = {}
+        self._dirty_groups = set()
+        self._empty_domains = []
+        self._full_rebuild = False
+
+        # Domains left with little of their capacity allocated, compacted
+        # before the batch is next drawn if they still are.
+        self._underused_domains = set()
+
+        self._rebuild_count = 0
+        self._full_rebuild_count = 0
+        self._rebuilt_group_count = 0
+        self._rebuild_time = 0.
+
+        if culling:
+            self._cull_index = spatial.GridIndex(self.cull_cell_size)
+            self._cull_dirty = set()
+        else:
+            self._cull_index = None
+            self._cull_dirty = None
+
     def invalidate(self):
         '''Force the batch to update the draw list.
 
@@ -341,6 +455,7 @@ class Batch(object):
         :since: pyglet 1.2
         '''
         self._draw_list_dirty = True
+        self._full_rebuild = True
 
     def add(self, count, mode, group, *data):
         '''Add a vertex list to the batch.
@@ -365,6 +480,7 @@ class Batch(object):
             
         # Create vertex list and initialize
         vlist = domain.create(count)
+        self._add_cullable(vlist)
         for i, array in initial_arrays:
             vlist._set_attribute_data(i, array)
 
@@ -390,6 +506,9 @@ class Batch(object):
 
         :rtype: `IndexedVertexList`
         '''
+        if mode == INDEXED_QUADS:
+            raise ValueError('INDEXED_QUADS lists are indexed by the batch; '
+                             'use add, or add_indexed with GL_TRIANGLES')
         formats, initial_arrays = _parse_data(data)
         domain = self._get_domain(True, mode, group, formats)
             
@@ -397,11 +516,66 @@ class Batch(object):
         vlist = domain.create(count, len(indices))
         start = vlist.start
         vlist._set_index_data(map(lambda i: i + start, indices))
+        self._add_cullable(vlist)
         for i, array in initial_arrays:
             vlist._set_attribute_data(i, array)
 
         return vlist 
 
+    def add_instanced(self, count, mode, group, indices, instance_formats,
+                      *data):
+        '''Add a mesh to the batch, to be drawn once for each of its
+        instances.
+
+        Instances are added to the returned domain with
+        `InstancedVertexDomain.add_instance`, each with its own values of the
+        attributes given by `instance_formats`.  These are usually generic
+        attributes (for example, ``'3g2f'``) read by a vertex program; see
+        `vertexdomain.InstancedVertexDomain` for when instanced arrays are
+        used.
+
+        :Parameters:
+            `count` : int
+                The number of vertices in the mesh.
+            `mode` : int
+                OpenGL drawing mode enumeration; for example, one of
+                ``GL_POINTS``, ``GL_LINES``, ``GL_TRIANGLES``, etc.
+                See the module summary for additional information.
+            `group` : `Group`
+                Group of the mesh, or ``None`` if no group is required.
+            `indices` : sequence
+                Sequence of integers giving indices into the vertices of the
+                mesh, or ``None`` if the mesh is not indexed.
+            `instance_formats` : sequence of str
+                Attribute formats of each instance.
+            `data` : data items
+                Attribute formats and initial data for the mesh.  See the
+                module summary for details.
+
+        :rtype: `InstancedVertexDomain`
+        :since: pyglet 1.2
+        '''
+        if mode == INDEXED_QUADS:
+            raise ValueError('INDEXED_QUADS cannot be used for instances')
+        formats, initial_arrays = _parse_data(data)
+        attribute_usages = [vertexdomain.create_attribute_usage(f) \
+                            for f in formats]
+        instance_attribute_usages = [vertexdomain.create_attribute_usage(f) \
+                                     for f in instance_formats]
+        domain = vertexdomain.InstancedVertexDomain(count, indices,
+            attribute_usages, instance_attribute_usages)
+        for i, array in initial_arrays:
+            domain.set_mesh_attribute_data(i, array)
+
+        if group is None:
+            group = null_group
+        if group not in self.group_map:
+            self._add_group(group)
+
+        # Each mesh has a domain of its own, so the domain is its own key.
+        self._add_domain(group, (formats, mode, domain), domain)
+        return domain
+
     def migrate(self, vertex_list, mode, group, batch):
         '''Migrate a vertex list to another batch and/or group.
 
@@ -428,6 +602,34 @@ class Batch(object):
         formats = vertex_list.domain.__formats
         domain = batch._get_domain(False, mode, group, formats)
         vertex_list.migrate(domain)
+        if batch is not self:
+            vertex_list._cull_dirty = None
+            batch._add_cullable(vertex_list)
+
+    def _is_cullable(self, domain):
+        return (self._cull_index is not None and
+                isinstance(domain, vertexdomain.VertexDomain) and
+                'vertices' in domain.attribute_names)
+
+    def _add_cullable(self, vertex_list):
+        if self._is_cullable(vertex_list.domain):
+            vertex_list._cull_dirty = self._cull_dirty
+            self._cull_dirty.add(vertex_list)
+
+    def _update_cull_index(self):
+        # Compute the bounds of lists that may have changed, and remove
+        # lists that were deleted or left the batch.
+        index = self._cull_index
+        dirty = self._cull_dirty
+        for vertex_list in dirty:
+            bounds = None
+            if vertex_list._cull_dirty is dirty:
+                bounds = vertex_list.get_bounds()
+            if bounds is not None:
+                index.add(vertex_list, *bounds)
+            elif vertex_list in index:
+                index.remove(vertex_list)
+        dirty.clear()
 
     def _get_domain(self, indexed, mode, group, formats):
         if group is None:
@@ -447,79 +649,212 @@ class Batch(object):
             # Create domain
             if indexed:
                 domain = vertexdomain.create_indexed_domain(*formats)
+            elif mode == INDEXED_QUADS:
+                domain = vertexdomain.create_quad_domain(*formats)
             else:
                 domain = vertexdomain.create_domain(*formats)
             domain.__formats = formats
-            domain_map[key] = domain
-            self._draw_list_dirty = True 
+            self._add_domain(group, key, domain)
 
         return domain
 
+    def _add_domain(self, group, key, domain):
+        self.group_map[group][key] = domain
+        self._domain_groups[domain] = group, key
+        # The domain tells the batch when it becomes empty.
+        domain._batch = weakref.ref(self)
+        self._dirty_groups.add(group)
+        self._draw_list_dirty = True
+
+    def _domain_emptied(self, domain):
+        # Called by a domain of this batch when its last vertex list is
+        # deleted.  It is removed when the batch is next drawn, unless it
+        # has been used again.
+        self._empty_domains.append(domain)
+        self._draw_list_dirty = True
+
+    def _domain_underused(self, domain):
+        # Called by a domain of this batch when deleting vertex lists leaves
+        # little of its capacity allocated.
+        self._underused_domains.add(domain)
+
+    def _compact_domains(self):
+        for domain in self._underused_domains:
+            if domain in self._domain_groups and domain._is_underused():
+                domain.compact()
+        self._underused_domains = set()
+
     def _add_group(self, group):
         self.group_map[group] = {}
-        if group.parent is None:
-            self.top_groups.append(group)
+        parent = group.parent
+        if parent is None:
+            siblings = self.top_groups
         else:
-            if group.parent not in self.group_map:
-                self._add_group(group.parent)
-            if group.parent not in self.group_children:
-                self.group_children[group.parent] = []
-            self.group_children[group.parent].append(group)
+            if parent not in self.group_map:
+                self._add_group(parent)
+            if parent not in self.group_children:
+                self.group_children[parent] = []
+                self._sibling_keys[parent] = []
+            siblings = self.group_children[parent]
+
+        # Insert the group at its sorted position.
+        key = self._group_keys[group] = _get_group_key(group)
+        keys = self._sibling_keys[parent]
+        i = bisect.bisect_right(keys, key)
+        keys.insert(i, key)
+        siblings.insert(i, group)
+
+        self._dirty_groups.add(group)
         self._draw_list_dirty = True
 
-    def _update_draw_list(self):
-        '''Visit group tree in preorder and create a list of bound methods
-        to call.
-        '''
-
-        def visit(group):
-            draw_list = []
-
-            # Draw domains using this group
+    def _remove_group(self, group):
+        # Remove a group without domains or children, and then its parent
+        # if that is left empty.
+        parent = group.parent
+        if parent is None:
+            siblings = self.top_groups
+        else:
+            siblings = self.group_children[parent]
+        keys = self._sibling_keys[parent]
+        i = bisect.bisect_left(keys, self._group_keys.pop(group))
+        if i >= len(siblings) or siblings[i] is not group:
+            # The order of the groups has changed since they were sorted.
+            i = siblings.index(group)
+        del keys[i]
+        del siblings[i]
+
+        del self.group_map[group]
+        self.group_children.pop(group, None)
+        self._sibling_keys.pop(group, None)
+        self._group_draw_lists.pop(group, None)
+        self._dirty_groups.discard(group)
+
+        if parent is not None:
+            if not siblings:
+                del self.group_children[parent]
+                del self._sibling_keys[parent]
+                if not self.group_map[parent]:
+                    self._remove_group(parent)
+                    return
+            self._dirty_groups.add(parent)
+
+    def _remove_empty_domains(self, domains):
+        for domain in domains:
+            if not domain._is_empty() or domain not in self._domain_groups:
+                continue
+            group, key = self._domain_groups.pop(domain)
             domain_map = self.group_map[group]
-            for (formats, mode, indexed), domain in list(domain_map.items()):
-                # Remove unused domains from batch
-                if domain._is_empty():
-                    del domain_map[(formats, mode, indexed)]
-                    continue
-                draw_list.append(
-                    (lambda d, m: lambda: d.draw(m))(domain, mode))
-
-            # Sort and visit child groups of this group
-            children = self.group_children.get(group)
-            if children:
-                children.sort()
-                for child in list(children):
-                    draw_list.extend(visit(child))
-
-            if children or domain_map:
-                return [group.set_state] + draw_list + [group.unset_state]
+            del domain_map[key]
+            if not domain_map and group not in self.group_children:
+                self._remove_group(group)
             else:
-                # Remove unused group from batch
-                del self.group_map[group]
-                if group.parent:
-                    self.group_children[group.parent].remove(group)
-                try:
-                    del self.group_children[group]
-                except KeyError:
-                    pass
-                try:
-                    self.top_groups.remove(group)
-                except ValueError:
-                    pass
-                return []
-
-        self._draw_list = []
+                self._dirty_groups.add(group)
+
+    def _sort_groups(self):
+        # Sort the children of every group again, as their order may have
+        # changed.
+        self._group_keys = dict([(group, _get_group_key(group)) \
+                                 for group in self.group_map])
+        sibling_lists = [(None, self.top_groups)] + \
+                        self.group_children.items()
+        for parent, siblings in sibling_lists:
+            siblings.sort(key=self._group_keys.__getitem__)
+            self._sibling_keys[parent] = [self._group_keys[group] \
+                                          for group in siblings]
 
-        self.top_groups.sort()
-        for group in list(self.top_groups):
-            self._draw_list.extend(visit(group))
+    def _update_draw_list(self):
+        '''Rebuild the draw lists of the groups that changed, and the
+        draw list of the batch.
+        '''
+        start_time = time.time()
+
+        if self._full_rebuild:
+            self._sort_groups()
+            domains = [domain for domain_map in self.group_map.values() \
+                              for domain in domain_map.values()]
+            self._remove_empty_domains(domains)
+            self._dirty_groups.update(self.group_map)
+            self._full_rebuild = False
+            self._full_rebuild_count += 1
+        elif self._empty_domains:
+            self._remove_empty_domains(self._empty_domains)
+        self._empty_domains = []
+
+        # Rebuild the dirty groups and their ancestors, children first.
+        depths = {}
+        for group in self._dirty_groups:
+            path = []
+            while group is not None and group not in depths:
+                path.append(group)
+                group = group.parent
+            if group is None:
+                depth = 0
+            else:
+                depth = depths[group] + 1
+            for group in reversed(path):
+                depths[group] = depth
+                depth += 1
+        rebuilt = depths.keys()
+        rebuilt.sort(key=depths.__getitem__, reverse=True)
+        for group in rebuilt:
+            self._update_group_draw_list(group)
+
+        draw_list = []
+        for group in self.top_groups:
+            draw_list.extend(self._group_draw_lists[group])
+        self._draw_list = draw_list
 
+        self._dirty_groups = set()
         self._draw_list_dirty = False
+        self._rebuild_count += 1
+        self._rebuilt_group_count += len(rebuilt)
+        self._rebuild_time += time.time() - start_time
 
         if _debug_graphics_batch:
             self._dump_draw_list()
 
+    def _update_group_draw_list(self, group):
+        # Build the draw list of a group from those of its children.
+        draw_list = [_unbinding(group.set_state)]
+        for (formats, mode, indexed), domain in self.group_map[group].items():
+            draw_list.append(
+                (lambda d, m: lambda: d.draw(m))(domain, mode))
+        for child in self.group_children.get(group, ()):
+            draw_list.extend(self._group_draw_lists[child])
+        draw_list.append(_unbinding(group.unset_state))
+        self._group_draw_lists[group] = draw_list
+
+    def get_stats(self):
+        '''Get statistics of the batch's groups and draw list.
+
+        The result is a dict with the following keys:
+
+        ``groups``
+            Number of groups in the batch.
+        ``domains``
+            Number of domains in the batch.
+        ``rebuilds``
+            Number of times the draw list has been rebuilt.
+        ``full_rebuilds``
+            Number of those rebuilds that sorted and rebuilt every group,
+            following `invalidate`.
+        ``rebuilt_groups``
+            Total number of group draw lists rebuilt.
+        ``rebuild_time``
+            Total time spent rebuilding the draw list, in seconds.
+
+        :rtype: dict
+        :since: pyglet 1.2
+        '''
+        return {
+            'groups': len(self.group_map),
+            'domains': len(self._domain_groups),
+            'rebuilds': self._rebuild_count,
+            'full_rebuilds': self._full_rebuild_count,
+            'rebuilt_groups': self._rebuilt_group_count,
+            'rebuild_time': self._rebuild_time,
+        }
+
     def _dump_draw_list(self):
         def dump(group, indent=''):
             print indent, 'Begin group', group
@@ -544,21 +879,48 @@ class Batch(object):
         for group in self.top_groups:
             dump(group)
         
-    def draw(self):
+    def draw(self, view_rect=None):
         '''Draw the batch.
+
+        :Parameters:
+            `view_rect` : (int, int, int, int)
+                If the batch was created with culling, only vertex lists
+                whose bounds intersect this rectangle, given as ``(x1, y1,
+                x2, y2)`` in the units of the vertex coordinates, are drawn.
+                Domains without vertex positions, and instanced meshes, are
+                always drawn.  **Since:** pyglet 1.2
+
         '''
+        if self._cull_dirty:
+            # Also when drawing everything, so the lists changed or deleted
+            # since the last draw are not kept.
+            self._update_cull_index()
         if self._draw_list_dirty:
             self._update_draw_list()
-
-        for func in self._draw_list:
-            func()
+        if self._underused_domains:
+            self._compact_domains()
+        if view_rect is not None and self._cull_index is not None:
+            self._draw_subset(self._cull_index.get_in_region(*view_rect),
+                              True)
+            return
+
+        # Domains drawn in one scope only change the client state that
+        # differs between them.
+        state = vertexdomain.get_client_state()
+        state.begin()
+        try:
+            for func in self._draw_list:
+                func()
+        finally:
+            state.end()
 
     def draw_subset(self, vertex_lists):
         '''Draw only some vertex lists in the batch.
 
-        The use of this method is highly discouraged, as it is quite
-        inefficient.  Usually an application can be redesigned so that batches
-        can always be drawn in their entirety, using `draw`.
+        The lists are grouped by domain, and the lists of each domain are
+        drawn together with `VertexDomain.draw_subset`.  Only the groups
+        of the given lists (and their ancestors) are set.  Drawing the whole
+        batch with `draw` is still faster when most of its lists are drawn.
 
         The given vertex lists must belong to this batch; behaviour is
         undefined if this condition is not met.
@@ -568,29 +930,149 @@ class Batch(object):
                 Vertex lists to draw.
 
         '''
-        # Horrendously inefficient.
+        if self._cull_dirty:
+            self._update_cull_index()
+        if self._draw_list_dirty:
+            self._update_draw_list()
+        if self._underused_domains:
+            self._compact_domains()
+        self._draw_subset(vertex_lists, False)
+
+    def _draw_subset(self, vertex_lists, draw_uncullable):
+        # Draw the given lists, and the domains that are not culled if
+        # `draw_uncullable` is True.
+        domain_lists = {}
+        for vertex_list in vertex_lists:
+            try:
+                domain_lists[vertex_list.domain].append(vertex_list)
+            except KeyError:
+                domain_lists[vertex_list.domain] = [vertex_list]
+
+        def is_drawn(domain):
+            return domain in domain_lists or \
+                (draw_uncullable and not self._is_cullable(domain))
+
+        # Find the groups with domains to draw, and their ancestors.
+        groups = set()
+        for group, domain_map in self.group_map.items():
+            for domain in domain_map.itervalues():
+                if is_drawn(domain):
+                    while group is not None and group not in groups:
+                        groups.add(group)
+                        group = group.parent
+                    break
+        if not groups:
+            return
+
         def visit(group):
-            group.set_state()
+            _unbinding(group.set_state)()
 
             # Draw domains using this group
             domain_map = self.group_map[group]
             for (_, mode, _), domain in domain_map.items():
-                for alist in vertex_lists:
-                    if alist.domain is domain:
-                        alist.draw(mode)
-
-            # Sort and visit child groups of this group
-            children = self.group_children.get(group)
-            if children:
-                children.sort()
-                for child in children:
+                if domain in domain_lists:
+                    domain.draw_subset(mode, domain_lists[domain])
+                elif is_drawn(domain):
+                    domain.draw(mode)
+
+            # Visit child groups of this group
+            for child in self.group_children.get(group, ()):
+                if child in groups:
                     visit(child)
 
-            group.unset_state()
+            _unbinding(group.unset_state)()
 
-        self.top_groups.sort()
-        for group in self.top_groups:
-            visit(group)
+        state = vertexdomain.get_client_state()
+        state.begin()
+        try:
+            for group in self.top_groups:
+                if group in groups:
+                    visit(group)
+        finally:
+            state.end()
+
+    def draw_visible(self, vertex_lists, rect=None, predicate=None):
+        '''Draw the vertex lists in the batch that are visible.
+
+        A vertex list is visible if the bounding rectangle of its vertices
+        (see `VertexList.get_bounds`) intersects `rect`, and `predicate`
+        returns True for it.  The visible lists are drawn with
+        `draw_subset`.
+
+        :Parameters:
+            `vertex_lists` : sequence of `VertexList` or `IndexedVertexList`
+                Vertex lists of this batch to consider.
+            `rect` : (int, int, int, int)
+                Visible area, as ``(x1, y1, x2, y2)``, in the coordinates of
+                the vertices; or ``None`` to skip this test.
+            `predicate` : callable
+                Function taking a vertex list and returning True if it is
+                visible; or ``None`` to skip this test.
+
+        :rtype: int
+        :return: The number of vertex lists drawn.
+
+        :since: pyglet 1.2
+        '''
+        visible = []
+        if rect is not None:
+            x1, y1, x2, y2 = rect
+        for vertex_list in vertex_lists:
+            if rect is not None:
+                bounds = vertex_list.get_bounds()
+                if (bounds is None or
+                    bounds[0] > x2 or bounds[2] < x1 or
+                    bounds[1] > y2 or bounds[3] < y1):
+                    continue
+            if predicate is not None and not predicate(vertex_list):
+                continue
+            visible.append(vertex_list)
+        self.draw_subset(visible)
+        return len(visible)
+
+def _unbinding(func):
+    # Wrap a group's set_state or unset_state so that the buffers bound for
+    # the last domain drawn are unbound first, in case it draws from
+    # client-side arrays.  The default (empty) methods are not wrapped.
+    if getattr(func, 'im_func', None) in _default_state_funcs:
+        return func
+    def call():
+        vertexdomain.get_client_state().unbind()
+        func()
+    return call
+
+def _get_sort_key(group):
+    # Groups sort by the order of ordered groups (0 for other groups), then
+    # by hash.
+    if isinstance(group, OrderedGroup):
+        return group.order, hash(group)
+    return 0, hash(group)
+
+class _GroupOrder(object):
+    # Sort key of a group that defines its own order, comparing the groups
+    # themselves.
+    __slots__ = ['group']
+
+    def __init__(self, group):
+        self.group = group
+
+    def __lt__(self, other):
+        if isinstance(other, tuple):
+            return self.group < other[-1]
+        return self.group < other.group
+
+    def __gt__(self, other):
+        if isinstance(other, tuple):
+            return other[-1] < self.group
+        return other.group < self.group
+
+def _get_group_key(group):
+    # Key of a group among its siblings in a batch.  Groups using the
+    # default order have tuple keys, which compare without calling back
+    # into the groups.
+    if getattr(group.__lt__, 'im_func', None) in _default_lt:
+        return _get_sort_key(group) + (group,)
+    return _GroupOrder(group)
 
 class Group(object):
     '''Group of common OpenGL state.
@@ -599,6 +1081,11 @@ class Group(object):
     that state's ancestors' states.  This can be defined arbitrarily on
     subclasses; the default state change has no effect, and groups vertex
     lists only in the order in which they are drawn.
+
+    Groups sharing a parent are drawn in an arbitrary but consistent order,
+    after any `OrderedGroup` with a negative order and before those with a
+    positive order.  Subclasses may define ``__lt__`` to order them
+    otherwise.
     '''
     def __init__(self, parent=None):
         '''Create a group.
@@ -612,10 +1099,16 @@ class Group(object):
         self.parent = parent
 
     def __lt__(self, other):
-        return hash(self) < hash(other)
+        return _get_sort_key(self) < _get_sort_key(other)
 
     def set_state(self):
         '''Apply the OpenGL state change.  
+
+        Groups are set while a batch is being drawn, and must not change the
+        vertex array client state (see `vertexdomain.ClientState`).  No
+        buffer objects are bound when a group that overrides this method
+        is set or unset, so it may draw from client-side arrays, for
+        example with `pyglet.graphics.draw`.
         
         The default implementation does nothing.'''
         pass
@@ -662,6 +1155,9 @@ class TextureGroup(Group):
     '''A group that enables and binds a texture.
 
     Texture groups are equal if their textures' targets and names are equal.
+    The regions of a `pyglet.image.atlas.TextureArray` share one texture, and
+    so one group; vertex lists using them need three texture coordinates per
+    vertex (for example, ``'t3f'``) to select their layer.
     '''
     # Don't use this, create your own group classes that are more specific.
     # This is just an example.
@@ -702,7 +1198,8 @@ class OrderedGroup(Group):
 
     Ordered groups with a common parent are rendered in ascending order of
     their ``order`` field.  This is a useful way to render multiple layers of
-    a scene within a single batch.
+    a scene within a single batch.  Other groups sharing the parent are
+    rendered as if their order were 0.
     '''
     # This can be useful as a top-level group, or as a superclass for other
     # groups that need to be ordered.
@@ -738,3 +1235,9 @@ class OrderedGroup(Group):
 
     def __repr__(self):
         return '%s(%d)' % (self.__class__.__name__, self.order)
+
+# Group orders that the keys of `_get_group_key` reproduce.
+_default_lt = (Group.__lt__.im_func, OrderedGroup.__lt__.im_func)
+
+# Group state methods that do nothing; see `_unbinding`.
+_default_state_funcs = (Group.set_state.im_func, Group.unset_state.im_func)
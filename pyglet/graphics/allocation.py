@@ -41,7 +41,9 @@ by `pyglet.graphics.vertexbuffer`.
  
 The allocator will at times request more space from the buffers. The current
 policy is to double the buffer size when there is not enough room to fulfil an
-allocation.  The buffer is never resized smaller.
+allocation.  The allocator itself never resizes the buffer smaller; a vertex
+domain that has moved its regions together may reduce the capacity with
+`Allocator.set_capacity`.
 
 The allocator maintains references to free space only; it is the caller's
 responsibility to maintain the allocated regions.
@@ -71,7 +73,8 @@ __version__ = '$Id: $'
 #  to provide accurate (start, size) tuple, which completely describes
 #  a region from the allocator's point of view.
 # -this means that compacting is probably not feasible, or would be hideously
-#  expensive
+#  expensive.  (Domains compact themselves instead, since they know their
+#  vertex lists; see VertexDomain.compact.)
 
 class AllocatorMemoryException(Exception):
     '''The buffer is not large enough to fulfil an allocation.
@@ -119,14 +122,15 @@ class Allocator(object):
     def set_capacity(self, size):
         '''Resize the maximum buffer size.
         
-        The capaity cannot be reduced.
+        The capacity cannot be reduced below the end of the last allocated
+        region.
 
         :Parameters:
             `size` : int
                 New maximum size of the buffer.
 
         '''
-        assert size > self.capacity
+        assert not self.starts or size >= self.starts[-1] + self.sizes[-1]
         self.capacity = size
 
     def alloc(self, size):
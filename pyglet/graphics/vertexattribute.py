@@ -266,6 +266,15 @@ class AbstractAttribute(object):
     '''
     
     _fixed_count = None
+
+    #: Client-side array enabled by this attribute, for example
+    #: ``GL_COLOR_ARRAY``; None for generic attributes.
+    client_array = None
+
+    #: Texture unit selected with ``glClientActiveTexture`` before enabling
+    #: this attribute or setting its pointer, or None if the attribute does
+    #: not depend on it.
+    client_texture = None
     
     def __init__(self, count, gl_type):
         '''Create the attribute accessor.
@@ -290,6 +299,25 @@ class AbstractAttribute(object):
         '''Enable the attribute using ``glEnableClientState``.'''
         raise NotImplementedError('abstract')
 
+    def disable(self):
+        '''Disable the attribute using ``glDisableClientState``.
+
+        :since: pyglet 1.2
+        '''
+        glDisableClientState(self.client_array)
+
+    def _get_state_key(self):
+        return (self.client_array, self.client_texture)
+
+    state_key = property(lambda self: self._get_state_key(),
+        doc='''Hashable key identifying the client array set up by this
+        attribute.  Attributes with equal keys replace each other's
+        pointer.
+
+        :type: tuple
+        :since: pyglet 1.2
+        ''')
+
     def set_pointer(self, offset):
         '''Setup this attribute to point to the currently bound buffer at
         the given offset.
@@ -376,6 +404,7 @@ class ColorAttribute(AbstractAttribute):
     '''Color vertex attribute.'''
 
     plural = 'colors'
+    client_array = GL_COLOR_ARRAY
     
     def __init__(self, count, gl_type):
         assert count in (3, 4), 'Color attributes must have count of 3 or 4'
@@ -393,6 +422,7 @@ class EdgeFlagAttribute(AbstractAttribute):
 
     plural = 'edge_flags'
     _fixed_count = 1
+    client_array = GL_EDGE_FLAG_ARRAY
     
     def __init__(self, gl_type):
         assert gl_type in (GL_BYTE, GL_UNSIGNED_BYTE, GL_BOOL), \
@@ -409,6 +439,7 @@ class FogCoordAttribute(AbstractAttribute):
     '''Fog coordinate attribute.'''
 
     plural = 'fog_coords'
+    client_array = GL_FOG_COORD_ARRAY
     
     def __init__(self, count, gl_type):
         super(FogCoordAttribute, self).__init__(count, gl_type)
@@ -425,6 +456,7 @@ class NormalAttribute(AbstractAttribute):
 
     plural = 'normals'
     _fixed_count = 3
+    client_array = GL_NORMAL_ARRAY
 
     def __init__(self, gl_type):
         assert gl_type in (GL_BYTE, GL_SHORT, GL_INT, GL_FLOAT, GL_DOUBLE), \
@@ -442,6 +474,7 @@ class SecondaryColorAttribute(AbstractAttribute):
 
     plural = 'secondary_colors'
     _fixed_count = 3
+    client_array = GL_SECONDARY_COLOR_ARRAY
 
     def __init__(self, gl_type):
         super(SecondaryColorAttribute, self).__init__(3, gl_type)
@@ -457,6 +490,8 @@ class TexCoordAttribute(AbstractAttribute):
     '''Texture coordinate attribute.'''
 
     plural = 'tex_coords'
+    client_array = GL_TEXTURE_COORD_ARRAY
+    client_texture = 0
 
     def __init__(self, count, gl_type):
         assert gl_type in (GL_SHORT, GL_INT, GL_INT, GL_FLOAT, GL_DOUBLE), \
@@ -479,6 +514,9 @@ class TexCoordAttribute(AbstractAttribute):
 class MultiTexCoordAttribute(AbstractAttribute):
     '''Texture coordinate attribute.'''
 
+    client_array = GL_TEXTURE_COORD_ARRAY
+    client_texture = property(lambda self: self.texture)
+
     def __init__(self, texture, count, gl_type):
         assert gl_type in (GL_SHORT, GL_INT, GL_INT, GL_FLOAT, GL_DOUBLE), \
             'Texture coord attribute must have non-byte signed type'
@@ -497,6 +535,7 @@ class VertexAttribute(AbstractAttribute):
     '''Vertex coordinate attribute.'''
 
     plural = 'vertices'
+    client_array = GL_VERTEX_ARRAY
 
     def __init__(self, count, gl_type):
         assert count > 1, \
@@ -523,6 +562,12 @@ class GenericAttribute(AbstractAttribute):
     def enable(self):
         glEnableVertexAttribArray(self.index)
 
+    def disable(self):
+        glDisableVertexAttribArray(self.index)
+
+    def _get_state_key(self):
+        return ('generic', self.index)
+
     def set_pointer(self, pointer):
         glVertexAttribPointer(self.index, self.count, self.gl_type,
                               self.normalized, self.stride, 
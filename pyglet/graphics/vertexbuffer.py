@@ -42,6 +42,12 @@ Buffers can optionally be created "mappable" (incorporating the
 `AbstractMappable` mix-in).  In this case the buffer provides a ``get_region``
 method which provides the most efficient path for updating partial data within
 the buffer.
+
+Mappable buffer objects hold their data in system memory and upload the
+ranges that changed when they are next bound.  Buffers created with the
+``GL_STREAM_DRAW`` usage, for data that is rewritten every frame, use a
+streaming strategy chosen by the ``graphics_stream`` option: see
+`OrphaningVertexBufferObject` and `RingVertexBufferObject`.
 '''
 
 __docformat__ = 'restructuredtext'
@@ -54,6 +60,7 @@ import pyglet
 from pyglet.gl import *
 
 _enable_vbo = pyglet.options['graphics_vbo']
+_stream_buffer = pyglet.options['graphics_stream']
 
 # Enable workaround permanently if any VBO is created on a context that has
 # this workaround.  (On systems with multiple contexts where one is
@@ -106,6 +113,9 @@ def create_mappable_buffer(size,
             True if a `VertexBufferObject` should be created if the driver
             supports it; otherwise only a `VertexArray` is created.
 
+    If `usage` is ``GL_STREAM_DRAW``, the class of VBO created depends on
+    the ``graphics_stream`` option.
+
     :rtype: `AbstractBuffer` with `AbstractMappable`
     '''
     from pyglet import gl
@@ -113,10 +123,39 @@ def create_mappable_buffer(size,
         gl_info.have_version(1, 5) and
         _enable_vbo and
         not gl.current_context._workaround_vbo):
+        if usage == GL_STREAM_DRAW and _stream_buffer != 'none':
+            if (_stream_buffer == 'ring' and
+                (gl_info.have_version(3, 2) or
+                 gl_info.have_extension('GL_ARB_sync'))):
+                return RingVertexBufferObject(size, target, usage)
+            return OrphaningVertexBufferObject(size, target, usage)
         return MappableVertexBufferObject(size, target, usage)
     else:
         return VertexArray(size)
 
+def _have_copy_buffer():
+    return (gl_info.have_version(3, 1) or
+            gl_info.have_extension('GL_ARB_copy_buffer'))
+
+def _merge_ranges(ranges, gap, max_ranges):
+    # Sort and merge byte ranges [start, end) that overlap or are separated
+    # by fewer than `gap` bytes; too many ranges are merged into one.
+    if len(ranges) < 2:
+        return [list(r) for r in ranges]
+    ranges = sorted(ranges)
+    merged = [list(ranges[0])]
+    last = merged[0]
+    for start, end in ranges:
+        if start <= last[1] + gap:
+            if end > last[1]:
+                last[1] = end
+        else:
+            last = [start, end]
+            merged.append(last)
+    if len(merged) > max_ranges:
+        merged = [[merged[0][0], merged[-1][1]]]
+    return merged
+
 class AbstractBuffer(object):
     '''Abstract buffer of byte data.
 
@@ -125,7 +164,8 @@ class AbstractBuffer(object):
             Size of buffer, in bytes
         `ptr` : int
             Memory offset of the buffer, as used by the ``glVertexPointer``
-            family of functions
+            family of functions.  For a `RingVertexBufferObject` the offset
+            changes when pending data is committed.
         `target` : int
             OpenGL buffer target, for example ``GL_ARRAY_BUFFER``
         `usage` : int
@@ -144,6 +184,20 @@ class AbstractBuffer(object):
         '''Reset the buffer's OpenGL target.'''
         raise NotImplementedError('abstract')
 
+    def commit(self):
+        '''Upload data held in system memory that has not yet been sent to
+        OpenGL.
+
+        Buffers that hold no pending data do nothing.  Otherwise the buffer
+        is bound to its target, as if by `bind`.
+
+        :rtype: bool
+        :return: True if the buffer was bound.
+
+        :since: pyglet 1.2
+        '''
+        return False
+
     def set_data(self, data):
         '''Set the entire contents of the buffer.
 
@@ -353,12 +407,37 @@ class VertexBufferObject(AbstractBuffer):
         glDeleteBuffers(1, id)
         self.id = None
 
-    def resize(self, size):
-        # Map, create a copy, then reinitialize.
-        temp = (ctypes.c_byte * size)()
+    def _copy_storage(self, size):
+        # Give the bound buffer new storage of `size` bytes, keeping its
+        # contents by copying them on the GPU through a temporary buffer.
+        # The buffer keeps its name, so vertex array objects referring to
+        # it remain valid.
+        if not _have_copy_buffer():
+            return False
+        keep = min(size, self.size)
+        if keep:
+            temp = GLuint()
+            glGenBuffers(1, temp)
+            glBindBuffer(GL_COPY_WRITE_BUFFER, temp)
+            glBufferData(GL_COPY_WRITE_BUFFER, keep, None, GL_STREAM_COPY)
+            glCopyBufferSubData(self.target, GL_COPY_WRITE_BUFFER, 0, 0, keep)
+        glBufferData(self.target, size, None, self.usage)
+        if keep:
+            glCopyBufferSubData(GL_COPY_WRITE_BUFFER, self.target, 0, 0, keep)
+            glBindBuffer(GL_COPY_WRITE_BUFFER, 0)
+            glDeleteBuffers(1, temp)
+        return True
 
+    def resize(self, size):
         glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
         glBindBuffer(self.target, self.id)
+        if self._copy_storage(size):
+            self.size = size
+            glPopClientAttrib()
+            return
+
+        # Map, create a copy, then reinitialize.
+        temp = (ctypes.c_byte * size)()
         data = glMapBuffer(self.target, GL_READ_ONLY)
         ctypes.memmove(temp, data, min(size, self.size))
         glUnmapBuffer(self.target)
@@ -374,44 +453,99 @@ class MappableVertexBufferObject(VertexBufferObject, AbstractMappable):
     held in local memory until `bind` is called.  The advantage is that fewer
     OpenGL calls are needed, increasing performance.
 
-    There may also be less performance penalty for resizing this buffer.
+    The ranges of the buffer that changed are tracked separately, and each
+    is uploaded with its own ``glBufferSubData``; ranges closer together
+    than `merge_gap` bytes are uploaded as one.  Resizing the buffer copies
+    the data already uploaded with ``glCopyBufferSubData`` where OpenGL 3.1
+    or the ``GL_ARB_copy_buffer`` extension is available; otherwise the
+    whole buffer is uploaded again when it is next bound.
 
     Updates to data via `map` are committed immediately.
     '''
+
+    #: Changed ranges separated by fewer bytes than this are uploaded in a
+    #: single call.
+    #:
+    #: :since: pyglet 1.2
+    merge_gap = 256
+
+    #: If more ranges than this are pending, the span covering all of them
+    #: is uploaded in a single call.
+    #:
+    #: :since: pyglet 1.2
+    max_ranges = 16
+
     def __init__(self, size, target, usage):
         super(MappableVertexBufferObject, self).__init__(size, target, usage)
         self.data = (ctypes.c_byte * size)()
         self.data_ptr = ctypes.cast(self.data, ctypes.c_void_p).value
-        self._dirty_min = sys.maxint
-        self._dirty_max = 0
+        self._dirty_ranges = []
+
+    def _invalidate(self, start, end):
+        ranges = self._dirty_ranges
+        if ranges:
+            # Vertex lists are usually updated in order; extend the last
+            # range rather than growing the list.
+            last = ranges[-1]
+            if start <= last[1] + self.merge_gap and \
+               end >= last[0] - self.merge_gap:
+                if start < last[0]:
+                    last[0] = start
+                if end > last[1]:
+                    last[1] = end
+                return
+            if len(ranges) >= self.max_ranges * 4:
+                ranges = self._dirty_ranges = _merge_ranges(ranges,
+                    self.merge_gap, self.max_ranges)
+        ranges.append([start, end])
+
+    def get_dirty_ranges(self):
+        '''Get the ranges of data not yet uploaded to OpenGL.
+
+        :rtype: list of (int, int)
+        :return: Sorted list of ``(start, end)`` byte offsets, as they would
+            be uploaded by the next `bind`.
+
+        :since: pyglet 1.2
+        '''
+        return [tuple(r) for r in _merge_ranges(self._dirty_ranges,
+                                                self.merge_gap,
+                                                self.max_ranges)]
 
     def bind(self):
         # Commit pending data
         super(MappableVertexBufferObject, self).bind()
-        size = self._dirty_max - self._dirty_min
-        if size > 0:
-            if size == self.size:
-                glBufferData(self.target, self.size, self.data, self.usage)
-            else:
-                glBufferSubData(self.target, self._dirty_min, size,
-                    self.data_ptr + self._dirty_min)
-            self._dirty_min = sys.maxint
-            self._dirty_max = 0
+        if self._dirty_ranges:
+            ranges = _merge_ranges(self._dirty_ranges, self.merge_gap,
+                                   self.max_ranges)
+            self._dirty_ranges = []
+            self._upload(ranges)
+
+    def _upload(self, ranges):
+        # Upload the merged dirty ranges; the buffer is bound.
+        if ranges[0][0] <= 0 and ranges[0][1] >= self.size:
+            glBufferData(self.target, self.size, self.data, self.usage)
+        else:
+            for start, end in ranges:
+                glBufferSubData(self.target, start, end - start,
+                    self.data_ptr + start)
+
+    def commit(self):
+        if self._dirty_ranges:
+            self.bind()
+            return True
+        return False
 
     def set_data(self, data):
-        super(MappableVertexBufferObject, self).set_data(data)
         ctypes.memmove(self.data, data, self.size)
-        self._dirty_min = 0
-        self._dirty_max = self.size
+        self._dirty_ranges = [[0, self.size]]
 
     def set_data_region(self, data, start, length):
         ctypes.memmove(self.data_ptr + start, data, length)
-        self._dirty_min = min(start, self._dirty_min)
-        self._dirty_max = max(start + length, self._dirty_max)
+        self._invalidate(start, start + length)
 
     def map(self, invalidate=False):
-        self._dirty_min = 0
-        self._dirty_max = self.size
+        self._dirty_ranges = [[0, self.size]]
         return self.data
 
     def unmap(self):
@@ -427,14 +561,123 @@ class MappableVertexBufferObject(VertexBufferObject, AbstractMappable):
         self.data = data
         self.data_ptr = ctypes.cast(self.data, ctypes.c_void_p).value
 
+        # Copy the contents already uploaded on the GPU where possible; the
+        # ranges not yet uploaded stay pending.  Otherwise allocate the new
+        # storage now, but upload it with any changes made before the
+        # buffer is next bound.
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        glBindBuffer(self.target, self.id)
+        if self._copy_storage(size):
+            self._dirty_ranges = [[start, min(end, size)] \
+                for start, end in self._dirty_ranges if start < size]
+        else:
+            glBufferData(self.target, size, None, self.usage)
+            self._dirty_ranges = [[0, size]]
+        glPopClientAttrib()
+        self.size = size
+
+class OrphaningVertexBufferObject(MappableVertexBufferObject):
+    '''A mappable VBO for data that is rewritten every frame.
+
+    Each upload orphans the buffer's storage with a ``glBufferData`` of no
+    data before writing the whole buffer, so that the driver can give the
+    buffer new storage instead of waiting for OpenGL to finish drawing from
+    the previous contents.
+
+    :since: pyglet 1.2
+    '''
+    def _upload(self, ranges):
+        glBufferData(self.target, self.size, None, self.usage)
+        glBufferSubData(self.target, 0, self.size, self.data)
+
+class RingVertexBufferObject(MappableVertexBufferObject):
+    '''A mappable VBO for data that is rewritten every frame, cycling
+    through several copies of the data.
+
+    The OpenGL buffer holds `frames` segments of `size` bytes.  Each upload
+    writes the next segment, and `ptr` is set to its offset, so that OpenGL
+    may still be drawing from the other segments.  A fence is set when
+    leaving a segment, and waited on before writing to it again; a segment
+    is only written with the data that changed since it was last used.
+
+    Requires OpenGL 3.2 or the ``GL_ARB_sync`` extension.
+
+    :since: pyglet 1.2
+    '''
+
+    #: Number of segments.
+    frames = 3
+
+    def __init__(self, size, target, usage, frames=None):
+        if frames is not None:
+            self.frames = frames
+        super(RingVertexBufferObject, self).__init__(size, target, usage)
+        self._segment = 0
+        self._fences = [None] * self.frames
+        self._pending = [[] for i in range(self.frames)]
+
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        glBindBuffer(self.target, self.id)
+        glBufferData(self.target, self.size * self.frames, None, self.usage)
+        glPopClientAttrib()
+
+    def _upload(self, ranges):
+        fences = self._fences
+        fences[self._segment] = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+
+        segment = (self._segment + 1) % self.frames
+        fence = fences[segment]
+        if fence:
+            while glClientWaitSync(fence, GL_SYNC_FLUSH_COMMANDS_BIT,
+                                   1000000) == GL_TIMEOUT_EXPIRED:
+                pass
+            glDeleteSync(fence)
+            fences[segment] = None
+
+        for i, pending in enumerate(self._pending):
+            if i == segment:
+                upload = _merge_ranges(pending + ranges, self.merge_gap,
+                                       self.max_ranges)
+                self._pending[i] = []
+            else:
+                self._pending[i] = _merge_ranges(pending + ranges,
+                    self.merge_gap, self.max_ranges)
+
+        offset = segment * self.size
+        for start, end in upload:
+            glBufferSubData(self.target, offset + start, end - start,
+                self.data_ptr + start)
+        self._segment = segment
+        self.ptr = offset
+
+    def _delete_fences(self):
+        for i, fence in enumerate(self._fences):
+            if fence:
+                glDeleteSync(fence)
+                self._fences[i] = None
+
+    def delete(self):
+        self._delete_fences()
+        super(RingVertexBufferObject, self).delete()
+
+    def resize(self, size):
+        data = (ctypes.c_byte * size)()
+        ctypes.memmove(data, self.data, min(size, self.size))
+        self.data = data
+        self.data_ptr = ctypes.cast(self.data, ctypes.c_void_p).value
+
+        # The old storage is orphaned, so its fences no longer matter.
+        self._delete_fences()
         self.size = size
         glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
         glBindBuffer(self.target, self.id)
-        glBufferData(self.target, self.size, self.data, self.usage)
+        glBufferData(self.target, self.size * self.frames, None, self.usage)
         glPopClientAttrib()
 
-        self._dirty_min = sys.maxint
-        self._dirty_max = 0
+        self._segment = 0
+        self.ptr = 0
+        self._pending = [[[0, size]] for i in range(self.frames)]
+        self._dirty_ranges = [[0, size]]
 
 class AbstractBufferRegion(object):
     '''A mapped region of a buffer.
@@ -464,9 +707,7 @@ class VertexBufferObjectRegion(AbstractBufferRegion):
         self.array = array
 
     def invalidate(self):
-        buffer = self.buffer
-        buffer._dirty_min = min(buffer._dirty_min, self.start)
-        buffer._dirty_max = max(buffer._dirty_max, self.end)
+        self.buffer._invalidate(self.start, self.end)
 
 class VertexArrayRegion(AbstractBufferRegion):
     '''A mapped region of a vertex array.
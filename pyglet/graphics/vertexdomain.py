@@ -54,17 +54,34 @@ buffers automatically.
 The entire domain can be efficiently drawn in one step with the
 `VertexDomain.draw` method, assuming all the vertices comprise primitives of
 the same OpenGL primitive mode.
+
+Domains double the capacity of their buffers when they run out of space.
+`VertexDomain.compact` moves the vertex lists of a domain together and
+shrinks its buffers; a batch does this before drawing for each of its
+domains left with little of its capacity allocated.  `VertexDomain.get_stats`
+describes the use a domain makes of its buffers.
+
+Domains set up the vertex array client state they need through the
+`ClientState` of the current context, which avoids repeating calls that
+would leave the state unchanged.  When the domain's buffers are all vertex
+buffer objects and the context supports vertex array objects, the state of
+each domain is recorded once in a VAO.
 '''
 
 __docformat__ = 'restructuredtext'
 __version__ = '$Id: $'
 
+import bisect
 import ctypes
 import re
+import weakref
 
+import pyglet
 from pyglet.gl import *
 from pyglet.graphics import allocation, vertexattribute, vertexbuffer
 
+_enable_vao = pyglet.options['graphics_vao']
+
 _usage_format_re = re.compile(r'''
     (?P<attribute>[^/]*)
     (/ (?P<usage> static|dynamic|stream|none))?
@@ -88,6 +105,89 @@ def _nearest_pow2(v):
     v |= v >> 16
     return v + 1
 
+def _merge_regions(regions):
+    # Sort (start, size) regions, joining those that are adjacent or
+    # overlap.  Returns (starts, sizes).
+    starts = []
+    sizes = []
+    end = -1
+    for start, size in sorted(regions):
+        if start <= end:
+            if start + size > end:
+                sizes[-1] += start + size - end
+                end = start + size
+        else:
+            starts.append(start)
+            sizes.append(size)
+            end = start + size
+    return starts, sizes
+
+def _draw_element_regions(mode, starts, sizes, gl_type, ptr, element_size):
+    # Draw regions of an index buffer given in indices; the client state
+    # is set.
+    primcount = len(starts)
+    if primcount == 1:
+        # Common case
+        glDrawElements(mode, sizes[0], gl_type, ptr + starts[0] * element_size)
+    elif gl_info.have_version(1, 4):
+        starts = [ptr + start * element_size for start in starts]
+        starts = ctypes.cast((ctypes.c_void_p * primcount)(*starts),
+                             ctypes.POINTER(ctypes.c_void_p))
+        sizes = (GLsizei * primcount)(*sizes)
+        glMultiDrawElements(mode, sizes, gl_type, starts, primcount)
+    else:
+        for start, size in zip(starts, sizes):
+            glDrawElements(mode, size, gl_type, ptr + start * element_size)
+
+def _move_regions(buffer, moves):
+    # Move regions of elements within a mappable buffer.  `moves` is a
+    # sorted list of (old_start, new_start, size), each region moving
+    # towards the start of the buffer.
+    moves = [move for move in moves if move[0] != move[1]]
+    if not moves:
+        return
+    element_size = buffer.element_size
+    first = moves[0][1] * element_size
+    end = (moves[-1][0] + moves[-1][2]) * element_size
+    region = buffer.get_region(first, end - first,
+                               ctypes.POINTER(ctypes.c_byte * (end - first)))
+    ptr = ctypes.addressof(region.array) - first
+    for old, new, size in moves:
+        ctypes.memmove(ptr + new * element_size, ptr + old * element_size,
+                       size * element_size)
+    region.invalidate()
+
+def _move_positions(moves, positions):
+    # Get the new positions of elements within the regions of `moves`.
+    olds = [move[0] for move in moves]
+    result = []
+    for position in positions:
+        i = bisect.bisect_right(olds, position) - 1
+        if i >= 0:
+            old, new, _ = moves[i]
+            position += new - old
+        result.append(position)
+    return result
+
+def _compact_allocator(allocator, buffers, minimum):
+    # Move the allocated regions of the buffers together at their start,
+    # and reduce their capacity to the smallest power of two (but no less
+    # than `minimum`) that holds them.  Returns the allocator for the new
+    # capacity and the moves made, as for `_move_regions`.
+    moves = []
+    used = 0
+    for start, size in zip(*allocator.get_allocated_regions()):
+        moves.append((start, used, size))
+        used += size
+    capacity = min(max(_nearest_pow2(used), minimum), allocator.capacity)
+    for buffer in buffers:
+        _move_regions(buffer, moves)
+        if capacity < allocator.capacity:
+            buffer.resize(capacity * buffer.element_size)
+    allocator = allocation.Allocator(capacity)
+    allocator.alloc(used)
+    return allocator, moves
+
 def create_attribute_usage(format):
     '''Create an attribute and usage pair from a format string.  The
     format string is as documented in `pyglet.graphics.vertexattribute`, with
@@ -97,8 +197,11 @@ def create_attribute_usage(format):
 
     If the usage is not given it defaults to 'dynamic'.  The usage corresponds
     to the OpenGL VBO usage hint, and for ``static`` also indicates a
-    preference for interleaved arrays.  If ``none`` is specified a buffer
-    object is not created, and vertex data is stored in system memory.
+    preference for interleaved arrays.  Attributes with ``stream`` usage are
+    expected to be rewritten every frame, and are stored in a streaming
+    buffer chosen by the ``graphics_stream`` option (see
+    `vertexbuffer.create_mappable_buffer`).  If ``none`` is specified a
+    buffer object is not created, and vertex data is stored in system memory.
 
     Some examples:
 
@@ -146,6 +249,286 @@ def create_indexed_domain(*attribute_usage_formats):
                         for f in attribute_usage_formats]
     return IndexedVertexDomain(attribute_usages)
 
+def create_quad_domain(*attribute_usage_formats):
+    '''Create a domain of quads drawn as indexed triangles.  See documentation
+    for `create_attribute_usage` and `vertexattribute.create_attribute` for
+    the grammar of these format strings.
+
+    :rtype: `QuadVertexDomain`
+    :since: pyglet 1.2
+    '''
+    attribute_usages = [create_attribute_usage(f) \
+                        for f in attribute_usage_formats]
+    return QuadVertexDomain(attribute_usages)
+
+def create_instanced_domain(count, indices, attribute_usage_formats,
+                            instance_attribute_usage_formats):
+    '''Create a domain drawing instances of a mesh.  See documentation for
+    `create_attribute_usage` and `vertexattribute.create_attribute` for the
+    grammar of the usage formats.
+
+    :Parameters:
+        `count` : int
+            Number of vertices in the mesh.
+        `indices` : sequence of int
+            Indices into the vertices of the mesh, or ``None`` if the mesh
+            is not indexed.
+        `attribute_usage_formats` : sequence of str
+            Attribute formats of the mesh.
+        `instance_attribute_usage_formats` : sequence of str
+            Attribute formats of each instance; usually generic attributes.
+
+    :rtype: `InstancedVertexDomain`
+    :since: pyglet 1.2
+    '''
+    attribute_usages = [create_attribute_usage(f) \
+                        for f in attribute_usage_formats]
+    instance_attribute_usages = [create_attribute_usage(f) \
+                                 for f in instance_attribute_usage_formats]
+    return InstancedVertexDomain(count, indices, attribute_usages,
+                                 instance_attribute_usages)
+
+class ClientState(object):
+    '''Vertex array client state of an OpenGL context.
+
+    Drawing a domain sets up the buffer bindings, enabled arrays and
+    pointers it needs within a scope delimited by `begin` and `end`.  The
+    first `begin` saves the client state with ``glPushClientAttrib`` and
+    the last `end` restores it.  Within the scope the state left by the
+    previous domain is remembered, so that a domain only enables, disables
+    and points the arrays that differ.  `pyglet.graphics.Batch.draw` draws
+    all its domains within one scope.
+
+    Within a scope, vertex array client state must only be changed by
+    drawing domains (for example, not by `Group.set_state`).  The buffers
+    of the last domain drawn stay bound until `unbind` is called;
+    `pyglet.graphics.Batch` calls it before groups that define their own
+    state are set or unset, so they may draw from client-side arrays.
+
+    Use `get_client_state` to get the instance for the current context.
+
+    :Ivariables:
+        `have_vao` : bool
+            True if vertex array objects are used for domains whose
+            buffers are all vertex buffer objects.
+
+    :since: pyglet 1.2
+    '''
+    def __init__(self):
+        self.have_vao = bool(_enable_vao and
+            (gl_info.have_version(3, 0) or
+             gl_info.have_extension('GL_ARB_vertex_array_object')))
+        self._depth = 0
+        self._vaos = {}                 # id(domain) -> [ref, vao, version]
+        self._doomed_vaos = []
+        self._reset()
+
+    def _reset(self):
+        # State assumed at the start of a scope; this is the initial OpenGL
+        # state for everything pyglet does not track.
+        self._enabled = {}              # state key -> attribute
+        self._pointers = {}             # state key -> pointer signature
+        self._buffers = {GL_ARRAY_BUFFER: 0, GL_ELEMENT_ARRAY_BUFFER: 0}
+        self._client_texture = 0
+        self._vao = 0
+        self._domain = None
+        self._domain_version = None
+
+    def begin(self):
+        '''Begin a scope in which domains are drawn.
+
+        Scopes may be nested; only the outermost one saves and restores
+        the client state.
+        '''
+        if not self._depth:
+            if self._doomed_vaos:
+                vaos = self._doomed_vaos[:]
+                self._doomed_vaos[0:len(vaos)] = []
+                glDeleteVertexArrays(len(vaos), (GLuint * len(vaos))(*vaos))
+            glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        self._depth += 1
+
+    def end(self):
+        '''End a scope begun with `begin`.
+        '''
+        self._depth -= 1
+        if not self._depth:
+            self.unbind()
+            glPopClientAttrib()
+            self._reset()
+
+    def unbind(self):
+        '''Unbind the vertex array object and buffer objects bound for the
+        last domain drawn.
+
+        Call this within a scope before drawing from client-side arrays
+        (for example, with `pyglet.graphics.draw`).  The next domain drawn
+        binds its buffers again.
+        '''
+        if self._vao:
+            glBindVertexArray(0)
+            self._vao = 0
+            self._domain = None
+        for target, id in self._buffers.items():
+            if id:
+                glBindBuffer(target, 0)
+                self._buffers[target] = 0
+                self._domain = None
+
+    def _bind_buffer(self, buffer, target):
+        id = getattr(buffer, 'id', 0)
+        if self._buffers[target] != id:
+            if id:
+                buffer.bind()
+            else:
+                # Client-side array; unbind the buffer object.
+                glBindBuffer(target, 0)
+            self._buffers[target] = id
+
+    def _set_client_texture(self, texture):
+        if texture is not None and texture != self._client_texture:
+            glClientActiveTexture(GL_TEXTURE0 + texture)
+            self._client_texture = texture
+
+    def _commit(self, buffer):
+        if buffer.commit():
+            self._buffers[buffer.target] = buffer.id
+
+    def set_domain(self, domain):
+        '''Set up the client state for drawing a domain.
+
+        Must be called within a scope.
+
+        :Parameters:
+            `domain` : `VertexDomain`
+                Domain to be drawn.
+
+        '''
+        index_buffer = getattr(domain, 'index_buffer', None)
+        if (self._domain is domain and
+            self._domain_version == domain._version and
+            not domain._ring_buffers):
+            # Only pending data needs uploading.
+            for buffer, _ in domain.buffer_attributes:
+                self._commit(buffer)
+            if index_buffer is not None:
+                if self._vao:
+                    index_buffer.commit()
+                else:
+                    self._commit(index_buffer)
+            return
+
+        if self.have_vao and domain._vao_capable:
+            self._set_domain_vao(domain, index_buffer)
+        else:
+            self._set_domain_arrays(domain, index_buffer)
+        self._domain = domain
+        self._domain_version = domain._version
+
+    def _set_domain_vao(self, domain, index_buffer):
+        entry = self._vaos.get(id(domain))
+        if entry is None:
+            vao = GLuint()
+            glGenVertexArrays(1, byref(vao))
+            key = id(domain)
+            def release(ref):
+                # The domain has been collected; delete its VAO at the next
+                # `begin`, when this context is current again.
+                self._doomed_vaos.append(self._vaos.pop(key)[1])
+            entry = self._vaos[key] = [weakref.ref(domain, release),
+                                       vao.value, None]
+
+        vao = entry[1]
+        if vao != self._vao:
+            glBindVertexArray(vao)
+            self._vao = vao
+
+        if entry[2] != domain._version:
+            # Record the state.  Only the array buffer binding and the
+            # client texture unit can leak out of the VAO.
+            for buffer, attributes in domain.buffer_attributes:
+                buffer.bind()
+                self._buffers[GL_ARRAY_BUFFER] = buffer.id
+                for attribute in attributes:
+                    self._set_client_texture(attribute.client_texture)
+                    attribute.enable()
+                    attribute.set_pointer(buffer.ptr)
+            if index_buffer is not None:
+                index_buffer.bind()
+            self._client_texture = None
+            entry[2] = domain._version
+        else:
+            for buffer, _ in domain.buffer_attributes:
+                self._commit(buffer)
+            if index_buffer is not None:
+                # Binds the same buffer, so the VAO is unchanged.
+                index_buffer.commit()
+
+    def _set_domain_arrays(self, domain, index_buffer):
+        if self._vao:
+            glBindVertexArray(0)
+            self._vao = 0
+
+        enabled = self._enabled
+        pointers = self._pointers
+        new_enabled = {}
+        for buffer, attributes in domain.buffer_attributes:
+            self._commit(buffer)
+            buffer_id = getattr(buffer, 'id', 0)
+            for attribute in attributes:
+                key = attribute.state_key
+                pointer = (buffer_id, attribute.count, attribute.gl_type,
+                           attribute.stride, attribute.offset + buffer.ptr)
+                if key not in enabled:
+                    self._set_client_texture(attribute.client_texture)
+                    attribute.enable()
+                if pointers.get(key) != pointer:
+                    self._bind_buffer(buffer, GL_ARRAY_BUFFER)
+                    self._set_client_texture(attribute.client_texture)
+                    attribute.set_pointer(buffer.ptr)
+                    pointers[key] = pointer
+                new_enabled[key] = attribute
+
+        for key, attribute in enabled.items():
+            if key not in new_enabled:
+                self._set_client_texture(attribute.client_texture)
+                attribute.disable()
+        self._enabled = new_enabled
+
+        if index_buffer is not None:
+            self._commit(index_buffer)
+            self._bind_buffer(index_buffer, GL_ELEMENT_ARRAY_BUFFER)
+
+_last_context = None
+_last_client_state = None
+_client_states = weakref.WeakKeyDictionary()
+
+def get_client_state():
+    '''Get the `ClientState` of the current context.
+
+    :rtype: `ClientState`
+    :since: pyglet 1.2
+    '''
+    global _last_context, _last_client_state
+    context = pyglet.gl.current_context
+    if context is not _last_context:
+        state = _client_states.get(context)
+        if state is None:
+            state = _client_states[context] = ClientState()
+        _last_context = context
+        _last_client_state = state
+    return _last_client_state
+
+def _notify_batch(domain):
+    # Tell the batch holding the domain, if any, that it is empty or has
+    # little of its capacity allocated.
+    batch = domain._batch and domain._batch()
+    if batch is not None:
+        if domain._is_empty():
+            batch._domain_emptied(domain)
+        elif domain._is_underused():
+            batch._domain_underused(domain)
+
 class VertexDomain(object):
     '''Management of a set of vertex lists.
 
@@ -155,9 +538,27 @@ class VertexDomain(object):
     _version = 0
     _initial_count = 16
 
+    #: When less than this fraction of the domain's capacity is allocated
+    #: before the batch holding it is drawn, the domain is compacted; see
+    #: `compact`.  ``None`` disables compacting the domain automatically.
+    #:
+    #: :since: pyglet 1.2
+    shrink_threshold = 0.25
+
+    _allocated_count = 0
+    _resize_count = 0
+    _compact_count = 0
+
+    # Weak reference to the batch holding the domain, told when the domain
+    # becomes empty or underused.
+    _batch = None
+
     def __init__(self, attribute_usages):
         self.allocator = allocation.Allocator(self._initial_count)
 
+        # Vertex lists to update when the domain is compacted.
+        self._vertex_lists = weakref.WeakKeyDictionary()
+
         # If there are any MultiTexCoord attributes, then a TexCoord attribute
         # must be converted.
         have_multi_texcoord = False
@@ -203,6 +604,16 @@ class VertexDomain(object):
             for attribute in static_attributes:
                 attribute.buffer = buffer
 
+        # The offset of a ring buffer moves each time it is committed, so
+        # its pointers must be set again.
+        self._ring_buffers = [buffer for buffer, _ in self.buffer_attributes \
+            if isinstance(buffer, vertexbuffer.RingVertexBufferObject)]
+
+        # Vertex array objects are only used with buffer objects.
+        self._vao_capable = not self._ring_buffers and \
+            all([isinstance(buffer, vertexbuffer.VertexBufferObject) \
+                 for buffer, _ in self.buffer_attributes])
+
         # Create named attributes for each attribute
         self.attributes = attributes
         self.attribute_names = {}
@@ -242,11 +653,13 @@ class VertexDomain(object):
 
     def _safe_alloc(self, count):
         '''Allocate vertices, resizing the buffers if necessary.'''
+        self._allocated_count += count
         try:
             return self.allocator.alloc(count)
         except allocation.AllocatorMemoryException, e:
             capacity = _nearest_pow2(e.requested_capacity)
             self._version += 1
+            self._resize_count += 1
             for buffer, _ in self.buffer_attributes:
                 buffer.resize(capacity * buffer.element_size)
             self.allocator.set_capacity(capacity)
@@ -254,16 +667,110 @@ class VertexDomain(object):
 
     def _safe_realloc(self, start, count, new_count):
         '''Reallocate vertices, resizing the buffers if necessary.'''
+        self._allocated_count += new_count - count
         try:
             return self.allocator.realloc(start, count, new_count)
         except allocation.AllocatorMemoryException, e:
             capacity = _nearest_pow2(e.requested_capacity)
             self._version += 1
+            self._resize_count += 1
             for buffer, _ in self.buffer_attributes:
                 buffer.resize(capacity * buffer.element_size)
             self.allocator.set_capacity(capacity)
             return self.allocator.realloc(start, count, new_count)
 
+    def _dealloc(self, start, count):
+        '''Free vertices.'''
+        self._allocated_count -= count
+        self.allocator.dealloc(start, count)
+
+    def _is_underused(self):
+        # True if the domain should be compacted.  The capacity is then at
+        # most twice that allocated, so the domain does not grow again until
+        # the allocation doubles.
+        return (self.shrink_threshold is not None and
+                self.allocator.capacity > self._initial_count and
+                self._allocated_count <
+                    self.allocator.capacity * self.shrink_threshold)
+
+    def _check_usage(self):
+        # Called when vertex lists leave the domain.  Vertex lists are often
+        # deleted and added again before the next frame (for example, when
+        # a text layout is updated), so the batch only compacts the domain
+        # if it is still underused when drawn.
+        if self._is_empty() or self._is_underused():
+            _notify_batch(self)
+
+    def compact(self):
+        '''Move the vertex lists of the domain together, and reduce the
+        capacity of its buffers to the smallest power of two that holds
+        them.
+
+        Compacting joins the regions drawn by `draw` into one, and frees
+        the memory of a domain that has grown much larger than the vertex
+        lists it now holds.  The ``start`` of each vertex list is updated,
+        and arrays obtained from the attributes of the vertex lists before
+        compacting must not be used again.
+
+        A `Batch` compacts its domains automatically before it is drawn,
+        if less than `shrink_threshold` of their capacity is allocated.
+        Other domains are only compacted by calling this method.
+
+        :since: pyglet 1.2
+        '''
+        self._compact()
+        self._version += 1
+        self._compact_count += 1
+
+    def _compact(self):
+        # Compact the vertices, returning the moves made.
+        capacity = self.allocator.capacity
+        self.allocator, moves = _compact_allocator(self.allocator,
+            [buffer for buffer, _ in self.buffer_attributes],
+            self._initial_count)
+        if self.allocator.capacity != capacity:
+            self._resize_count += 1
+        vertex_lists = self._vertex_lists.keys()
+        starts = _move_positions(moves, [vertex_list.start \
+                                         for vertex_list in vertex_lists])
+        for vertex_list, start in zip(vertex_lists, starts):
+            vertex_list.start = start
+        return moves
+
+    def get_stats(self):
+        '''Get statistics of the domain's use of its buffers.
+
+        The result is a dict with the following keys:
+
+        ``lists``
+            Number of vertex lists in the domain.
+        ``capacity``
+            Number of vertices the buffers can hold.
+        ``allocated``
+            Number of vertices allocated to vertex lists.
+        ``fragmentation``
+            Fraction of the free space that lies between allocated regions.
+        ``buffer_size``
+            Total size of the vertex buffers, in bytes.
+        ``resizes``
+            Number of times the buffers have been resized.
+        ``compactions``
+            Number of times the domain has been compacted.
+
+        :rtype: dict
+        :since: pyglet 1.2
+        '''
+        return {
+            'lists': len(self._vertex_lists),
+            'capacity': self.allocator.capacity,
+            'allocated': self._allocated_count,
+            'fragmentation': self.allocator.get_fragmentation(),
+            'buffer_size': sum([buffer.size \
+                                for buffer, _ in self.buffer_attributes]),
+            'resizes': self._resize_count,
+            'compactions': self._compact_count,
+        }
+
     def create(self, count):
         '''Create a `VertexList` in this domain.
 
@@ -292,36 +799,63 @@ class VertexDomain(object):
                 Vertex list to draw, or ``None`` for all lists in this domain.
 
         '''
-        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
-        for buffer, attributes in self.buffer_attributes:
-            buffer.bind()
-            for attribute in attributes:
-                attribute.enable()
-                attribute.set_pointer(attribute.buffer.ptr)
-        if vertexbuffer._workaround_vbo_finish:
-            glFinish()
-
         if vertex_list is not None:
-            glDrawArrays(mode, vertex_list.start, vertex_list.count)
+            starts, sizes = self._get_list_regions((vertex_list,))
         else:
-            starts, sizes = self.allocator.get_allocated_regions()
-            primcount = len(starts)
-            if primcount == 0:
-                pass
-            elif primcount == 1:
-                # Common case
-                glDrawArrays(mode, starts[0], sizes[0])
-            elif gl_info.have_version(1, 4):
-                starts = (GLint * primcount)(*starts)
-                sizes = (GLsizei * primcount)(*sizes)
-                glMultiDrawArrays(mode, starts, sizes, primcount)
-            else:
-                for start, size in zip(starts, sizes):
-                    glDrawArrays(mode, start, size)
+            starts, sizes = self._get_regions()
+        self._draw(mode, starts, sizes)
+
+    def draw_subset(self, mode, vertex_lists):
+        '''Draw some of the vertex lists in the domain.
 
-        for buffer, _ in self.buffer_attributes:
-            buffer.unbind()
-        glPopClientAttrib()
+        The regions of the lists are sorted and adjacent regions joined, so
+        that all of them are drawn with a single call where
+        ``glMultiDrawArrays`` (or ``glMultiDrawElements``) is available.
+
+        :Parameters:
+            `mode` : int
+                OpenGL drawing mode, e.g. ``GL_POINTS``, ``GL_LINES``, etc.
+            `vertex_lists` : sequence of `VertexList`
+                Vertex lists of this domain to draw.
+
+        :since: pyglet 1.2
+        '''
+        starts, sizes = self._get_list_regions(vertex_lists)
+        self._draw(mode, starts, sizes)
+
+    def _draw(self, mode, starts, sizes):
+        if not starts:
+            return
+        state = get_client_state()
+        state.begin()
+        state.set_domain(self)
+        if vertexbuffer._workaround_vbo_finish:
+            glFinish()
+        self._draw_regions(mode, starts, sizes)
+        state.end()
+
+    def _get_regions(self):
+        # Regions to draw for the whole domain.
+        return self.allocator.get_allocated_regions()
+
+    def _get_list_regions(self, vertex_lists):
+        # Regions to draw for the given lists.
+        return _merge_regions([(vertex_list.start, vertex_list.count) \
+                               for vertex_list in vertex_lists])
+
+    def _draw_regions(self, mode, starts, sizes):
+        # Draw the regions; the client state is set.
+        primcount = len(starts)
+        if primcount == 1:
+            # Common case
+            glDrawArrays(mode, starts[0], sizes[0])
+        elif gl_info.have_version(1, 4):
+            starts = (GLint * primcount)(*starts)
+            sizes = (GLsizei * primcount)(*sizes)
+            glMultiDrawArrays(mode, starts, sizes, primcount)
+        else:
+            for start, size in zip(starts, sizes):
+                glDrawArrays(mode, start, size)
 
     def _is_empty(self):
         return not self.allocator.starts
@@ -335,11 +869,16 @@ class VertexList(object):
     `VertexDomain.create` to construct this list.
     '''
 
+    # Set of lists whose bounds may have changed, of the culling batch that
+    # owns this list.
+    _cull_dirty = None
+
     def __init__(self, domain, start, count):
         # TODO make private
         self.domain = domain
         self.start = start
         self.count = count
+        domain._vertex_lists[self] = True
 
     def get_size(self):
         '''Get the number of vertices in the list.
@@ -355,6 +894,26 @@ class VertexList(object):
         '''
         return self.domain
 
+    def get_bounds(self):
+        '''Get the bounding rectangle of the vertex positions in the list.
+
+        Only the x and y coordinates of the vertices are considered.
+
+        :rtype: (int, int, int, int)
+        :return: ``(x1, y1, x2, y2)``, or ``None`` if the list has no
+            vertices.
+
+        :since: pyglet 1.2
+        '''
+        if not self.count:
+            return None
+        attribute = self.domain.attribute_names['vertices']
+        region = attribute.get_region(attribute.buffer, self.start, self.count)
+        vertices = region.array[:]
+        xs = vertices[0::attribute.count]
+        ys = vertices[1::attribute.count]
+        return min(xs), min(ys), max(xs), max(ys)
+
     def draw(self, mode):
         '''Draw this vertex list in the given OpenGL mode.
 
@@ -385,6 +944,8 @@ class VertexList(object):
                 new.invalidate()
         self.start = new_start
         self.count = count
+        if self._cull_dirty is not None:
+            self._cull_dirty.add(self)
 
         self._colors_cache_version = None
         self._fog_coords_cache_version = None
@@ -396,7 +957,13 @@ class VertexList(object):
 
     def delete(self):
         '''Delete this group.'''
-        self.domain.allocator.dealloc(self.start, self.count)
+        domain = self.domain
+        domain._dealloc(self.start, self.count)
+        domain._vertex_lists.pop(self, None)
+        if self._cull_dirty is not None:
+            self._cull_dirty.add(self)
+            self._cull_dirty = None
+        domain._check_usage()
 
     def migrate(self, domain):
         '''Move this group from its current domain and add to the specified
@@ -421,9 +988,15 @@ class VertexList(object):
             new.array[:] = old.array[:]
             new.invalidate()
 
-        self.domain.allocator.dealloc(self.start, self.count)
+        old_domain = self.domain
+        old_domain._dealloc(self.start, self.count)
+        old_domain._vertex_lists.pop(self, None)
+        domain._vertex_lists[self] = True
         self.domain = domain
         self.start = new_start
+        if self._cull_dirty is not None:
+            self._cull_dirty.add(self)
+        old_domain._check_usage()
 
         self._colors_cache_version = None
         self._fog_coords_cache_version = None
@@ -439,6 +1012,8 @@ class VertexList(object):
         region = attribute.get_region(attribute.buffer, self.start, self.count)
         region.array[:] = data
         region.invalidate()
+        if self._cull_dirty is not None:
+            self._cull_dirty.add(self)
 
     # ---
 
@@ -588,6 +1163,9 @@ class VertexList(object):
 
         region = self._vertices_cache
         region.invalidate()
+        if self._cull_dirty is not None:
+            # The vertices may be about to change.
+            self._cull_dirty.add(self)
         return region.array
 
     def _set_vertices(self, data):
@@ -615,6 +1193,9 @@ class IndexedVertexDomain(VertexDomain):
         self.index_buffer = vertexbuffer.create_mappable_buffer(
             self.index_allocator.capacity * self.index_element_size,
             target=GL_ELEMENT_ARRAY_BUFFER)
+        self.index_buffer.element_size = self.index_element_size
+        self._vao_capable = (self._vao_capable and
+            isinstance(self.index_buffer, vertexbuffer.VertexBufferObject))
 
     def _safe_index_alloc(self, count):
         '''Allocate indices, resizing the buffers if necessary.'''
@@ -623,6 +1204,7 @@ class IndexedVertexDomain(VertexDomain):
         except allocation.AllocatorMemoryException, e:
             capacity = _nearest_pow2(e.requested_capacity)
             self._version += 1
+            self._resize_count += 1
             self.index_buffer.resize(capacity * self.index_element_size)
             self.index_allocator.set_capacity(capacity)
             return self.index_allocator.alloc(count)
@@ -634,6 +1216,7 @@ class IndexedVertexDomain(VertexDomain):
         except allocation.AllocatorMemoryException, e:
             capacity = _nearest_pow2(e.requested_capacity)
             self._version += 1
+            self._resize_count += 1
             self.index_buffer.resize(capacity * self.index_element_size)
             self.index_allocator.set_capacity(capacity)
             return self.index_allocator.realloc(start, count, new_count)
@@ -652,6 +1235,48 @@ class IndexedVertexDomain(VertexDomain):
         index_start = self._safe_index_alloc(index_count)
         return IndexedVertexList(self, start, count, index_start, index_count)
 
+    def _compact(self):
+        moves = super(IndexedVertexDomain, self)._compact()
+
+        capacity = self.index_allocator.capacity
+        self.index_allocator, index_moves = _compact_allocator(
+            self.index_allocator, [self.index_buffer],
+            self._initial_index_count)
+        if self.index_allocator.capacity != capacity:
+            self._resize_count += 1
+        vertex_lists = self._vertex_lists.keys()
+        starts = _move_positions(index_moves,
+            [vertex_list.index_start for vertex_list in vertex_lists])
+        for vertex_list, start in zip(vertex_lists, starts):
+            vertex_list.index_start = start
+
+        # Indices refer to the vertices by position.
+        if [move for move in moves if move[0] != move[1]]:
+            for start, size in \
+                    zip(*self.index_allocator.get_allocated_regions()):
+                region = self.get_index_region(start, size)
+                region.array[:] = _move_positions(moves, region.array)
+                region.invalidate()
+        return moves
+
+    def get_stats(self):
+        '''Get statistics of the domain's use of its buffers.
+
+        In addition to the keys described in `VertexDomain.get_stats`, the
+        result has the keys ``index_capacity``, ``index_allocated`` and
+        ``index_buffer_size``.
+
+        :rtype: dict
+        :since: pyglet 1.2
+        '''
+        stats = super(IndexedVertexDomain, self).get_stats()
+        allocator = self.index_allocator
+        stats['index_capacity'] = allocator.capacity
+        stats['index_allocated'] = allocator.capacity - \
+            allocator.get_free_size()
+        stats['index_buffer_size'] = self.index_buffer.size
+        return stats
+
     def get_index_region(self, start, count):
         '''Get a region of the index buffer.
 
@@ -668,61 +1293,17 @@ class IndexedVertexDomain(VertexDomain):
         ptr_type = ctypes.POINTER(self.index_c_type * count)
         return self.index_buffer.get_region(byte_start, byte_count, ptr_type)
 
-    def draw(self, mode, vertex_list=None):
-        '''Draw vertices in the domain.
-
-        If `vertex_list` is not specified, all vertices in the domain are
-        drawn.  This is the most efficient way to render primitives.
-
-        If `vertex_list` specifies a `VertexList`, only primitives in that
-        list will be drawn.
-
-        :Parameters:
-            `mode` : int
-                OpenGL drawing mode, e.g. ``GL_POINTS``, ``GL_LINES``, etc.
-            `vertex_list` : `IndexedVertexList`
-                Vertex list to draw, or ``None`` for all lists in this domain.
-
-        '''
-        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
-        for buffer, attributes in self.buffer_attributes:
-            buffer.bind()
-            for attribute in attributes:
-                attribute.enable()
-                attribute.set_pointer(attribute.buffer.ptr)
-        self.index_buffer.bind()
-        if vertexbuffer._workaround_vbo_finish:
-            glFinish()
+    def _get_regions(self):
+        return self.index_allocator.get_allocated_regions()
 
-        if vertex_list is not None:
-            glDrawElements(mode, vertex_list.index_count, self.index_gl_type,
-                self.index_buffer.ptr +
-                    vertex_list.index_start * self.index_element_size)
-        else:
-            starts, sizes = self.index_allocator.get_allocated_regions()
-            primcount = len(starts)
-            if primcount == 0:
-                pass
-            elif primcount == 1:
-                # Common case
-                glDrawElements(mode, sizes[0], self.index_gl_type,
-                    self.index_buffer.ptr + starts[0])
-            elif gl_info.have_version(1, 4):
-                starts = [s * self.index_element_size + self.index_buffer.ptr for s in starts]
-                starts = ctypes.cast((GLuint * primcount)(*starts), ctypes.POINTER(ctypes.c_void_p))
-                sizes = (GLsizei * primcount)(*sizes)
-                glMultiDrawElements(mode, sizes, GL_UNSIGNED_INT, starts,
-                                    primcount)
-            else:
-                for start, size in zip(starts, sizes):
-                    glDrawElements(mode, size, self.index_gl_type,
-                        self.index_buffer.ptr +
-                            start * self.index_element_size)
+    def _get_list_regions(self, vertex_lists):
+        return _merge_regions([(vertex_list.index_start,
+                                vertex_list.index_count) \
+                               for vertex_list in vertex_lists])
 
-        self.index_buffer.unbind()
-        for buffer, _ in self.buffer_attributes:
-            buffer.unbind()
-        glPopClientAttrib()
+    def _draw_regions(self, mode, starts, sizes):
+        _draw_element_regions(mode, starts, sizes, self.index_gl_type,
+                              self.index_buffer.ptr, self.index_element_size)
 
 class IndexedVertexList(VertexList):
     '''A list of vertices within an `IndexedVertexDomain` that are indexed.
@@ -771,8 +1352,10 @@ class IndexedVertexList(VertexList):
 
     def delete(self):
         '''Delete this group.'''
-        super(IndexedVertexList, self).delete()
+        # Free the indices first, as deleting the vertices may report the
+        # domain to its batch.
         self.domain.index_allocator.dealloc(self.index_start, self.index_count)
+        super(IndexedVertexList, self).delete()
 
     def _set_index_data(self, data):
         # TODO without region
@@ -801,3 +1384,379 @@ class IndexedVertexList(VertexList):
     _indices_cache_version = None
     indices = property(_get_indices, _set_indices,
                        doc='''Array of index data.''')
+
+def _get_quad_index_buffer(quads):
+    '''Get the index buffer shared by the quad domains of the current
+    object space, with indices for at least the given number of quads.
+    '''
+    object_space = pyglet.gl.current_context.object_space
+    buffer = getattr(object_space, 'pyglet_graphics_quad_index_buffer', None)
+    if buffer is None:
+        buffer = vertexbuffer.create_buffer(0,
+            target=GL_ELEMENT_ARRAY_BUFFER, usage=GL_STATIC_DRAW)
+        buffer.quads = 0
+        object_space.pyglet_graphics_quad_index_buffer = buffer
+
+    if buffer.quads < quads:
+        # Grow in powers of two, keeping the same buffer object so that
+        # vertex array objects referring to it remain valid.
+        quads = _nearest_pow2(quads)
+        indices = []
+        for i in range(0, quads * 4, 4):
+            indices.extend((i, i + 1, i + 2, i, i + 2, i + 3))
+        size = len(indices) * ctypes.sizeof(GLuint)
+        if isinstance(buffer, vertexbuffer.VertexArray):
+            buffer.resize(size)
+        else:
+            buffer.size = size
+        buffer.set_data((GLuint * len(indices))(*indices))
+        buffer.quads = quads
+    return buffer
+
+class QuadVertexDomain(VertexDomain):
+    '''Management of a set of vertex lists of quads, drawn as triangles.
+
+    Each quad is given by 4 consecutive vertices, as for ``GL_QUADS``, and is
+    drawn as two triangles using indices from a static index buffer.  The
+    index buffer is the same for every quad domain, and is shared by all
+    the domains of an object space; it grows in powers of two as the
+    domains do.  Unlike an `IndexedVertexDomain`, no indices are held for
+    each vertex list.
+
+    The lists of a quad domain must all have a multiple of 4 vertices.  The
+    mode given to `draw` is ignored.
+
+    Construction of a quad domain is usually done with the
+    `create_quad_domain` function, or by adding vertex lists to a batch with
+    the `pyglet.graphics.INDEXED_QUADS` mode.
+
+    :since: pyglet 1.2
+    '''
+    def __init__(self, attribute_usages):
+        super(QuadVertexDomain, self).__init__(attribute_usages)
+        self.index_buffer = _get_quad_index_buffer(
+            self.allocator.capacity // 4)
+        self._vao_capable = (self._vao_capable and
+            isinstance(self.index_buffer, vertexbuffer.VertexBufferObject))
+
+    def _safe_alloc(self, count):
+        start = super(QuadVertexDomain, self)._safe_alloc(count)
+        _get_quad_index_buffer(self.allocator.capacity // 4)
+        return start
+
+    def _safe_realloc(self, start, count, new_count):
+        start = super(QuadVertexDomain, self)._safe_realloc(
+            start, count, new_count)
+        _get_quad_index_buffer(self.allocator.capacity // 4)
+        return start
+
+    def _draw_regions(self, mode, starts, sizes):
+        # Quad i is drawn by the 6 indices starting at i * 6.
+        _draw_element_regions(GL_TRIANGLES,
+                              [start // 4 * 6 for start in starts],
+                              [size // 4 * 6 for size in sizes],
+                              GL_UNSIGNED_INT, self.index_buffer.ptr,
+                              ctypes.sizeof(GLuint))
+
+def _have_instanced_arrays():
+    return (gl_info.have_version(3, 3) or
+            (gl_info.have_extension('GL_ARB_instanced_arrays') and
+             gl_info.have_extension('GL_ARB_draw_instanced')))
+
+class InstancedVertexDomain(object):
+    '''Management of the instances of a mesh.
+
+    The vertices (and indices, if any) of the mesh are held once, and each
+    instance added with `add_instance` has its own values of the instance
+    attributes.  Where the context supports instanced arrays (OpenGL 3.3,
+    or the ``GL_ARB_instanced_arrays`` and ``GL_ARB_draw_instanced``
+    extensions) and the instance attributes are all generic attributes, the
+    instance attributes are held in buffers of their own, advanced once per
+    instance with ``glVertexAttribDivisor``, and each contiguous range of
+    instances is drawn with one call.  A vertex program is then needed to
+    apply the instance attributes.
+
+    Otherwise the instances are expanded: the mesh is copied for each
+    instance, with the instance attributes repeated for each of its
+    vertices, and drawn as an ordinary domain.
+
+    Construction is usually done with the `create_instanced_domain`
+    function or `pyglet.graphics.Batch.add_instanced`.
+
+    :Ivariables:
+        `count` : int
+            Number of vertices in the mesh.
+        `indices` : list of int
+            Indices into the vertices of the mesh, or ``None``.
+        `expanded` : bool
+            True if each instance is drawn from its own copy of the mesh.
+
+    :since: pyglet 1.2
+    '''
+    def __init__(self, count, indices, attribute_usages,
+                 instance_attribute_usages, expand=None):
+        '''Create an instanced domain.
+
+        :Parameters:
+            `count` : int
+                Number of vertices in the mesh.
+            `indices` : sequence of int
+                Indices into the vertices of the mesh, or ``None`` if the
+                mesh is not indexed.
+            `attribute_usages` : list of tuple
+                Attribute usages of the mesh, as returned by
+                `create_attribute_usage`.
+            `instance_attribute_usages` : list of tuple
+                Attribute usages of each instance.
+            `expand` : bool
+                If True, instances are expanded even if instanced arrays
+                are supported.  If ``None`` (the default), they are only
+                expanded when needed.
+
+        '''
+        self.count = count
+        if indices is not None:
+            indices = list(indices)
+        self.indices = indices
+        self._mesh_attributes = [a for a, _, _ in attribute_usages]
+        self._instance_attributes = [a for a, _, _ in instance_attribute_usages]
+        self._deleted = False
+        self._batch = None
+
+        if expand is None:
+            expand = not (_have_instanced_arrays() and
+                all([isinstance(attribute, vertexattribute.GenericAttribute) \
+                     for attribute in self._instance_attributes]))
+        self.expanded = expand
+
+        if expand:
+            # Each instance is a vertex list holding a copy of the mesh.
+            attribute_usages = (list(attribute_usages) +
+                                list(instance_attribute_usages))
+            if indices is None:
+                self._domain = VertexDomain(attribute_usages)
+            else:
+                self._domain = IndexedVertexDomain(attribute_usages)
+            self._mesh_data = [None] * len(self._mesh_attributes)
+        else:
+            # Each instance is a vertex list of one element.
+            if indices is None:
+                self._mesh_domain = VertexDomain(attribute_usages)
+                self._mesh = self._mesh_domain.create(count)
+            else:
+                self._mesh_domain = IndexedVertexDomain(attribute_usages)
+                self._mesh = self._mesh_domain.create(count, len(indices))
+                start = self._mesh.start
+                self._mesh._set_index_data([i + start for i in indices])
+            self._domain = VertexDomain(instance_attribute_usages)
+
+    def _get_allocator(self):
+        return self._domain.allocator
+
+    allocator = property(_get_allocator,
+                         doc='''Allocator of the vertices holding the
+                         instances.''')
+
+    def _get_attribute_names(self):
+        return self._domain.attribute_names
+
+    attribute_names = property(_get_attribute_names,
+                               doc='''Attributes of the vertices holding
+                               the instances, by name.''')
+
+    def set_mesh_attribute_data(self, i, data):
+        '''Set the values of an attribute of the mesh.
+
+        :Parameters:
+            `i` : int
+                Index of the attribute in the mesh's attribute formats.
+            `data` : sequence
+                Values of the attribute for every vertex of the mesh.
+
+        '''
+        if not self.expanded:
+            self._mesh._set_attribute_data(i, data)
+            return
+
+        # Update the copy held by each instance.
+        data = list(data)
+        self._mesh_data[i] = data
+        attribute = self._mesh_attributes[i]
+        for start, size in zip(*self._domain.allocator.get_allocated_regions()):
+            region = attribute.get_region(attribute.buffer, start, size)
+            region.array[:] = data * (size // self.count)
+            region.invalidate()
+
+    def add_instance(self, *data):
+        '''Add an instance of the mesh.
+
+        :Parameters:
+            `data` : sequence
+                Initial values of each instance attribute, in the order of
+                the instance attribute formats.  ``None`` leaves the values
+                of an attribute unset.
+
+        :rtype: `Instance`
+        '''
+        if self.expanded:
+            if self.indices is None:
+                vertex_list = self._domain.create(self.count)
+            else:
+                vertex_list = self._domain.create(self.count,
+                                                  len(self.indices))
+                start = vertex_list.start
+                vertex_list._set_index_data([i + start for i in self.indices])
+            for i, array in enumerate(self._mesh_data):
+                if array is not None:
+                    vertex_list._set_attribute_data(i, array)
+        else:
+            vertex_list = self._domain.create(1)
+
+        instance = Instance(self, vertex_list)
+        for i, array in enumerate(data):
+            if array is not None:
+                instance.set_attribute_data(i, array)
+        return instance
+
+    def get_instance_count(self):
+        '''Get the number of instances.
+
+        :rtype: int
+        '''
+        starts, sizes = self._domain.allocator.get_allocated_regions()
+        if self.expanded:
+            return sum(sizes) // self.count
+        return sum(sizes)
+
+    def draw(self, mode):
+        '''Draw all instances of the mesh.
+
+        :Parameters:
+            `mode` : int
+                OpenGL drawing mode, e.g. ``GL_POINTS``, ``GL_LINES``, etc.
+
+        '''
+        if self._deleted:
+            return
+        if self.expanded:
+            self._domain.draw(mode)
+            return
+
+        starts, sizes = self._domain.allocator.get_allocated_regions()
+        if not starts:
+            return
+
+        if gl_info.have_version(3, 3):
+            vertex_attrib_divisor = glVertexAttribDivisor
+            draw_arrays_instanced = glDrawArraysInstanced
+            draw_elements_instanced = glDrawElementsInstanced
+        else:
+            vertex_attrib_divisor = glVertexAttribDivisorARB
+            draw_arrays_instanced = glDrawArraysInstancedARB
+            draw_elements_instanced = glDrawElementsInstancedARB
+
+        state = get_client_state()
+        state.begin()
+        state.set_domain(self._mesh_domain)
+        for buffer, _ in self._domain.buffer_attributes:
+            state._commit(buffer)
+        for attribute in self._instance_attributes:
+            attribute.enable()
+            vertex_attrib_divisor(attribute.index, 1)
+        if vertexbuffer._workaround_vbo_finish:
+            glFinish()
+
+        mesh = self._mesh
+        mesh_domain = self._mesh_domain
+        for start, size in zip(starts, sizes):
+            # Point the instance attributes at the first instance of the
+            # range.
+            for attribute in self._instance_attributes:
+                buffer = attribute.buffer
+                state._bind_buffer(buffer, GL_ARRAY_BUFFER)
+                attribute.set_pointer(buffer.ptr + start * buffer.element_size)
+            if self.indices is None:
+                draw_arrays_instanced(mode, mesh.start, mesh.count, size)
+            else:
+                draw_elements_instanced(mode, mesh.index_count,
+                    mesh_domain.index_gl_type,
+                    mesh_domain.index_buffer.ptr +
+                        mesh.index_start * mesh_domain.index_element_size,
+                    size)
+
+        # Leave the arrays of the mesh as the client state expects them,
+        # and forget the pointers of the instance attributes.
+        for attribute in self._instance_attributes:
+            vertex_attrib_divisor(attribute.index, 0)
+            attribute.disable()
+            state._pointers.pop(attribute.state_key, None)
+        state.end()
+
+    def delete(self):
+        '''Stop drawing the mesh and its instances.
+
+        The domain is removed from its batch when the batch is next drawn.
+        '''
+        self._deleted = True
+        _notify_batch(self)
+
+    def _is_empty(self):
+        # Instances may be added to an empty domain at any time, so it is
+        # only removed from its batch once deleted.
+        return self._deleted
+
+    def __repr__(self):
+        return '<%s@%x %d instances>' % (self.__class__.__name__, id(self),
+                                         self.get_instance_count())
+
+class Instance(object):
+    '''An instance of the mesh of an `InstancedVertexDomain`.
+
+    Use `InstancedVertexDomain.add_instance` to create an instance.
+
+    :Ivariables:
+        `domain` : `InstancedVertexDomain`
+            Domain holding the instance.
+
+    :since: pyglet 1.2
+    '''
+    def __init__(self, domain, vertex_list):
+        self.domain = domain
+        self._vertex_list = vertex_list
+
+    def _get_region(self, i, count):
+        attribute = self.domain._instance_attributes[i]
+        return attribute.get_region(attribute.buffer,
+                                    self._vertex_list.start, count)
+
+    def set_attribute_data(self, i, data):
+        '''Set the values of an instance attribute.
+
+        :Parameters:
+            `i` : int
+                Index of the attribute in the instance attribute formats.
+            `data` : sequence
+                Values of the attribute.
+
+        '''
+        region = self._get_region(i, self._vertex_list.count)
+        if self.domain.expanded:
+            region.array[:] = list(data) * self.domain.count
+        else:
+            region.array[:] = data
+        region.invalidate()
+
+    def get_attribute_data(self, i):
+        '''Get the values of an instance attribute.
+
+        :Parameters:
+            `i` : int
+                Index of the attribute in the instance attribute formats.
+
+        :rtype: list
+        '''
+        return self._get_region(i, 1).array[:]
+
+    def delete(self):
+        '''Remove the instance from its domain.'''
+        self._vertex_list.delete()
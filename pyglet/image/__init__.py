@@ -51,6 +51,11 @@ object instead of a filename::
 The hint helps the module locate an appropriate decoder to use based on the
 file extension.  It is optional.
 
+Many images can be decoded in parallel (the texture uploads remain on the
+calling thread)::
+
+    pics = image.load_many(['a.png', 'b.png', 'c.bmp'])
+
 Once loaded, images can be used directly by most other modules of pyglet.  All
 images have a width and height you can access::
 
@@ -133,8 +138,10 @@ from __future__ import division
 __docformat__ = 'restructuredtext'
 __version__ = '$Id$'
 
+import itertools
 import sys
 import re
+import time
 import warnings
 import weakref
 
@@ -167,8 +174,9 @@ def load(filename, file=None, decoder=None):
         `file` : file-like object or None
             Source of image data in any supported format.        
         `decoder` : ImageDecoder or None
-            If unspecified, all decoders that are registered for the filename
-            extension are tried.  If none succeed, the exception from the
+            If unspecified, all decoders that are registered for the format
+            identified from the start of the file, or for the filename
+            extension, are tried.  If none succeed, the exception from the
             first decoder is raised.
 
     :rtype: AbstractImage
@@ -187,16 +195,27 @@ def load(filename, file=None, decoder=None):
         if decoder:
             return decoder.decode(file, filename)
         else:
+            # Decode from the current position of the file.
+            position = file.tell()
+            header = file.read(codecs.FILE_MAGIC_SIZE)
+            file.seek(position)
+
+            # Decoders of other formats are tried last.
             first_exception = None
-            for decoder in codecs.get_decoders(filename):
+            for decoder in codecs._with_fallback(
+                    codecs.get_decoders(filename, header),
+                    codecs.get_decoders):
+                start = time.time()
                 try:
                     image = decoder.decode(file, filename)
+                    codecs._record_decode(decoder, time.time() - start, False)
                     return image
                 except codecs.ImageDecodeException, e:
+                    codecs._record_decode(decoder, time.time() - start, True)
                     if (not first_exception or
                         first_exception.exception_priority < e.exception_priority):
                         first_exception = e
-                    file.seek(0)
+                    file.seek(position)
 
             if not first_exception:
                 raise codecs.ImageDecodeException('No image decoders are available')
@@ -205,6 +224,108 @@ def load(filename, file=None, decoder=None):
         if opened_file:
             opened_file.close()
 
+def _load_job(job):
+    # Run in a worker thread or process by `load_many`.
+    index, (filename, file, decoder) = job
+    if isinstance(file, bytes_type):
+        file = BytesIO(file)
+    return index, load(filename, file, decoder)
+
+def load_many(filenames, files=None, decoder=None, workers=None,
+              processes=False, callback=None):
+    '''Load several images, decoding them in parallel.
+
+    Decoding is done by a pool of worker threads, or processes if
+    `processes` is True; the images returned are not yet uploaded to OpenGL,
+    so they can be turned into textures (or added to a `TextureBin` with
+    `TextureBin.add_many`) together on the calling thread.
+
+    Pure-Python decoders such as the PNG and BMP decoders hold the global
+    interpreter lock, so they only run concurrently in separate processes.
+    Processes must be able to import the main module, so on Windows
+    `load_many` with `processes` set must not be called while the main module
+    is being imported (guard it with ``if __name__ == '__main__'``).
+
+    :Parameters:
+        `filenames` : sequence of str
+            Filenames of the images, as for `load`.
+        `files` : sequence of file-like object or None
+            If given, the source of each image's data, as for `load`.  Any
+            element may be None, in which case that image is loaded from its
+            filename.  Files are not closed.
+        `decoder` : ImageDecoder or None
+            Decoder to use for every image, as for `load`.
+        `workers` : int
+            Number of images to decode at once.  Defaults to the number of
+            processors.  If 1, the images are decoded on the calling thread.
+        `processes` : bool
+            If True, decode in separate processes instead of threads.
+        `callback` : callable
+            Called on the calling thread as ``callback(count, total)``
+            whenever another image has been decoded, for example to update a
+            progress bar.
+
+    :rtype: list of AbstractImage
+    :return: The images, in the same order as `filenames`.  If an image
+        fails to load, the remaining work is abandoned and its exception is
+        raised.
+
+    :since: pyglet 1.2
+    '''
+    filenames = list(filenames)
+    total = len(filenames)
+    if files is None:
+        files = [None] * total
+    else:
+        files = list(files)
+        assert len(files) == total, 'Expected one file per filename'
+    if processes:
+        # File objects cannot be sent to another process.
+        files = [file and file.read() for file in files]
+    jobs = list(enumerate(zip(filenames, files, [decoder] * total)))
+
+    if workers is None:
+        workers = _get_cpu_count()
+    workers = min(workers, total)
+
+    pool = None
+    if workers > 1:
+        try:
+            if processes:
+                from multiprocessing import Pool
+            else:
+                from multiprocessing.pool import ThreadPool as Pool
+            pool = Pool(workers)
+        except (ImportError, OSError):
+            # Some platforms lack the semaphores multiprocessing needs.
+            pool = None
+
+    images = [None] * total
+    try:
+        if pool:
+            results = pool.imap_unordered(_load_job, jobs)
+        else:
+            results = itertools.imap(_load_job, jobs)
+        for count, (index, image) in enumerate(results):
+            images[index] = image
+            if callback:
+                callback(count + 1, total)
+    except:
+        if pool:
+            pool.terminate()
+        raise
+    if pool:
+        pool.close()
+        pool.join()
+    return images
+
+def _get_cpu_count():
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):
+        return 1
+
 def create(width, height, pattern=None):
     '''Create an image optionally filled with the given pattern.
 
@@ -457,7 +578,8 @@ class AbstractImage(object):
             encoder.encode(self, file, filename)
         else:
             first_exception = None
-            for encoder in codecs.get_encoders(filename):
+            for encoder in codecs._with_fallback(
+                    codecs.get_encoders(filename), codecs.get_encoders):
                 try:
                     encoder.encode(self, file, filename)
                     return
@@ -652,6 +774,9 @@ class ImageData(AbstractImage):
         self.mipmap_images = []
 
     def __getstate__(self):
+        # Decoders may leave the data in a ctypes array, which can't be
+        # pickled.
+        self._ensure_string_data()
         return {
             'width': self.width, 
             'height': self.height, 
@@ -1076,39 +1201,7 @@ class ImageData(AbstractImage):
             self._current_data = buf.raw
 
     def _get_gl_format_and_type(self, format):
-        if format == 'I':
-            return GL_LUMINANCE, GL_UNSIGNED_BYTE
-        elif format == 'L':
-            return GL_LUMINANCE, GL_UNSIGNED_BYTE
-        elif format == 'LA':
-            return GL_LUMINANCE_ALPHA, GL_UNSIGNED_BYTE
-        elif format == 'R':
-            return GL_RED, GL_UNSIGNED_BYTE
-        elif format == 'G':
-            return GL_GREEN, GL_UNSIGNED_BYTE
-        elif format == 'B':
-            return GL_BLUE, GL_UNSIGNED_BYTE
-        elif format == 'A':
-            return GL_ALPHA, GL_UNSIGNED_BYTE
-        elif format == 'RGB':
-            return GL_RGB, GL_UNSIGNED_BYTE
-        elif format == 'RGBA':
-            return GL_RGBA, GL_UNSIGNED_BYTE
-        elif (format == 'ARGB' and
-              gl_info.have_extension('GL_EXT_bgra') and
-              gl_info.have_extension('GL_APPLE_packed_pixels')):
-            return GL_BGRA, GL_UNSIGNED_INT_8_8_8_8_REV
-        elif (format == 'ABGR' and
-              gl_info.have_extension('GL_EXT_abgr')):
-            return GL_ABGR_EXT, GL_UNSIGNED_BYTE
-        elif (format == 'BGR' and
-              gl_info.have_extension('GL_EXT_bgra')):
-            return GL_BGR, GL_UNSIGNED_BYTE
-        elif (format == 'BGRA' and
-              gl_info.have_extension('GL_EXT_bgra')):
-            return GL_BGRA, GL_UNSIGNED_BYTE
-
-        return None, None
+        return _get_gl_format_and_type(format)
 
     def _get_internalformat(self, format):
         if len(format) == 4:
@@ -1372,6 +1465,41 @@ class CompressedImageData(AbstractImage):
                 self.gl_format,
                 len(self.data), self.data)
         
+def _get_gl_format_and_type(format):
+    if format == 'I':
+        return GL_LUMINANCE, GL_UNSIGNED_BYTE
+    elif format == 'L':
+        return GL_LUMINANCE, GL_UNSIGNED_BYTE
+    elif format == 'LA':
+        return GL_LUMINANCE_ALPHA, GL_UNSIGNED_BYTE
+    elif format == 'R':
+        return GL_RED, GL_UNSIGNED_BYTE
+    elif format == 'G':
+        return GL_GREEN, GL_UNSIGNED_BYTE
+    elif format == 'B':
+        return GL_BLUE, GL_UNSIGNED_BYTE
+    elif format == 'A':
+        return GL_ALPHA, GL_UNSIGNED_BYTE
+    elif format == 'RGB':
+        return GL_RGB, GL_UNSIGNED_BYTE
+    elif format == 'RGBA':
+        return GL_RGBA, GL_UNSIGNED_BYTE
+    elif (format == 'ARGB' and
+          gl_info.have_extension('GL_EXT_bgra') and
+          gl_info.have_extension('GL_APPLE_packed_pixels')):
+        return GL_BGRA, GL_UNSIGNED_INT_8_8_8_8_REV
+    elif (format == 'ABGR' and
+          gl_info.have_extension('GL_EXT_abgr')):
+        return GL_ABGR_EXT, GL_UNSIGNED_BYTE
+    elif (format == 'BGR' and
+          gl_info.have_extension('GL_EXT_bgra')):
+        return GL_BGR, GL_UNSIGNED_BYTE
+    elif (format == 'BGRA' and
+          gl_info.have_extension('GL_EXT_bgra')):
+        return GL_BGRA, GL_UNSIGNED_BYTE
+
+    return None, None
+
 def _nearest_pow2(v):
     # From http://graphics.stanford.edu/~seander/bithacks.html#RoundUpPowerOf2
     # Credit: Sean Anderson
@@ -1406,10 +1534,16 @@ class Texture(AbstractImage):
             The GL texture target (e.g., ``GL_TEXTURE_2D``).
         `level` : int
             The mipmap level of this texture.
+        `internalformat` : int
+            The GL internal format the texture was created with (for
+            example, ``GL_RGBA``), or None if unknown.
+
+            **Since:** pyglet 1.2
 
     '''
 
     region_class = None # Set to TextureRegion after it's defined
+    internalformat = None
     tex_coords = (0., 0., 0., 1., 0., 0., 1., 1., 0., 0., 1., 0.)
     tex_coords_order = (0, 1, 2, 3)
     level = 0
@@ -1514,6 +1648,7 @@ class Texture(AbstractImage):
                      blank)
 
         texture = cls(texture_width, texture_height, target, id.value)
+        texture.internalformat = internalformat
         texture.min_filter = min_filter
         texture.mag_filter = mag_filter
         if rectangle:
@@ -1934,6 +2069,170 @@ class DepthTexture(Texture):
         glBindTexture(self.target, self.id)
         source.blit_to_texture(self.level, x, y, z)
 
+class StreamingTexture(Texture):
+    '''A texture whose contents are replaced frequently, for example by
+    video playback.
+
+    Image data is uploaded through a ring of pixel buffer objects, so that
+    ``glTexSubImage2D`` copies from video memory asynchronously instead of
+    blocking on client memory.  While the GPU is still reading one buffer,
+    the next one in the ring can be mapped and written.  Producers that can
+    write pixels themselves may obtain the mapped memory directly with
+    `map_buffer` and commit it with `unmap_buffer`; `blit_into` does the
+    same for any `ImageData` source.
+
+    If the driver does not support pixel buffer objects the texture behaves
+    like a regular `Texture`.
+
+    Use the `create` classmethod to construct.
+
+    :since: pyglet 1.2
+    '''
+
+    #: Number of pixel buffer objects in the ring.
+    buffer_count = 2
+
+    _buffers = None
+    _buffer_index = 0
+    _mapped = None
+
+    @staticmethod
+    def have_pixel_buffers():
+        '''Determine if pixel buffer objects are supported by the current
+        context.
+
+        :rtype: bool
+        '''
+        return (gl_info.have_version(2, 1) or
+                gl_info.have_extension('GL_ARB_pixel_buffer_object'))
+
+    def _get_buffer(self, size):
+        if not self._buffers or self._buffers[0].size < size:
+            self._delete_buffers()
+            self._buffers = [graphics.vertexbuffer.VertexBufferObject(size,
+                                 GL_PIXEL_UNPACK_BUFFER, GL_STREAM_DRAW)
+                             for i in range(self.buffer_count)]
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        buffer = self._buffers[self._buffer_index]
+        self._buffer_index = (self._buffer_index + 1) % len(self._buffers)
+        return buffer
+
+    def _delete_buffers(self):
+        if self._buffers:
+            for buffer in self._buffers:
+                buffer.delete()
+        self._buffers = None
+        self._buffer_index = 0
+
+    def map_buffer(self, width, height, format, pitch=None):
+        '''Map the next pixel buffer in the ring for writing.
+
+        The returned array must be filled with `height` rows of pixel data,
+        in the given format, bottom row first, then committed to the texture
+        with `unmap_buffer`.  The previous contents of the buffer are
+        discarded, so mapping never waits for an upload still in progress.
+
+        :Parameters:
+            `width` : int
+                Width of the region to upload.
+            `height` : int
+                Height of the region to upload.
+            `format` : str
+                Format string of the pixel data, for example ``'RGB'``.
+            `pitch` : int
+                Number of bytes per row.  Defaults to
+                ``width * len(format)``.  Must be positive.
+
+        :rtype: ctypes array of ``c_byte``
+        :return: The mapped buffer memory, or ``None`` if pixel buffer
+            objects are not supported or `format` cannot be uploaded
+            directly.
+        '''
+        assert self._mapped is None, 'A pixel buffer is already mapped'
+        if not self.have_pixel_buffers():
+            return None
+
+        gl_format, gl_type = _get_gl_format_and_type(format)
+        if gl_format is None:
+            return None
+
+        if pitch is None:
+            pitch = width * len(format)
+        assert pitch > 0, 'Top-to-bottom pixel data cannot be mapped'
+
+        buffer = self._get_buffer(pitch * height)
+        array = buffer.map(invalidate=True)
+        buffer.unbind()
+        self._mapped = (buffer, width, height, len(format), pitch,
+                        gl_format, gl_type)
+        return array
+
+    def unmap_buffer(self, x=0, y=0):
+        '''Upload the currently mapped pixel buffer into the texture.
+
+        :Parameters:
+            `x` : int
+                X coordinate of the bottom-left corner of the destination.
+            `y` : int
+                Y coordinate of the bottom-left corner of the destination.
+
+        '''
+        assert self._mapped is not None, 'No pixel buffer is mapped'
+        buffer, width, height, components, pitch, gl_format, gl_type = \
+            self._mapped
+        self._mapped = None
+
+        if pitch & 0x1:
+            alignment = 1
+        elif pitch & 0x2:
+            alignment = 2
+        else:
+            alignment = 4
+
+        buffer.bind()
+        buffer.unmap()
+        glBindTexture(self.target, self.id)
+        glPushClientAttrib(GL_CLIENT_PIXEL_STORE_BIT)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, alignment)
+        glPixelStorei(GL_UNPACK_ROW_LENGTH, pitch // components)
+        glTexSubImage2D(self.target, self.level,
+                        x, y, width, height,
+                        gl_format, gl_type,
+                        None)
+        glPopClientAttrib()
+        buffer.unbind()
+
+    def blit_into(self, source, x, y, z):
+        image = source.get_image_data()
+        format = image.format
+        pitch = abs(image.pitch)
+        if (gl.current_context._workaround_unpack_row_length or
+            image.anchor_x or image.anchor_y):
+            array = None
+        else:
+            array = self.map_buffer(image.width, image.height, format, pitch)
+
+        if array is None:
+            super(StreamingTexture, self).blit_into(source, x, y, z)
+            return
+
+        data = image.get_data(format, pitch)
+        memmove(array, data, pitch * image.height)
+        self.unmap_buffer(x, y)
+
+    def __del__(self):
+        # No context need be current while the texture is collected, so the
+        # pixel buffers are left to be deleted by the next context of the
+        # object space to be made current.
+        if self._buffers:
+            doomed = self._context.object_space._doomed_buffers
+            for buffer in self._buffers:
+                if buffer.id is not None:
+                    doomed.append(buffer.id)
+                    buffer.id = None
+            self._buffers = None
+        super(StreamingTexture, self).__del__()
+
 class BufferManager(object):
     '''Manages the set of framebuffers for a context.
 
@@ -2419,8 +2718,9 @@ def load_animation(filename, file=None, decoder=None):
         `file` : file-like object or None
             File object containing the animation stream.
         `decoder` : ImageDecoder or None
-            If unspecified, all decoders that are registered for the filename
-            extension are tried.  If none succeed, the exception from the
+            If unspecified, all decoders that are registered for the format
+            identified from the start of the file, or for the filename
+            extension, are tried.  If none succeed, the exception from the
             first decoder is raised.
 
     :rtype: Animation
@@ -2433,14 +2733,23 @@ def load_animation(filename, file=None, decoder=None):
     if decoder:
         return decoder.decode(file, filename)
     else:
+        position = file.tell()
+        header = file.read(codecs.FILE_MAGIC_SIZE)
+        file.seek(position)
+
         first_exception = None
-        for decoder in codecs.get_animation_decoders(filename):
+        for decoder in codecs._with_fallback(
+                codecs.get_animation_decoders(filename, header),
+                codecs.get_animation_decoders):
+            start = time.time()
             try:
                 image = decoder.decode_animation(file, filename)
+                codecs._record_decode(decoder, time.time() - start, False)
                 return image
             except codecs.ImageDecodeException, e:
+                codecs._record_decode(decoder, time.time() - start, True)
                 first_exception = first_exception or e
-                file.seek(0)
+                file.seek(position)
 
         if not first_exception:
             raise codecs.ImageDecodeException('No image decoders are available')
@@ -2473,15 +2782,19 @@ class Animation(object):
         '''Add the images of the animation to a `TextureBin`.
 
         The animation frames are modified in-place to refer to the texture bin
-        regions.
+        regions.  Frames that share an image also share its region.
 
         :Parameters:
             `bin` : `TextureBin`
                 Texture bin to upload animation frames into.
 
         '''
+        regions = {}
         for frame in self.frames:
-            frame.image = bin.add(frame.image)
+            image = frame.image
+            if id(image) not in regions:
+                regions[id(image)] = image, bin.add(image)
+            frame.image = regions[id(image)][1]
 
     def get_transform(self, flip_x=False, flip_y=False, rotate=0):
         '''Create a copy of this animation applying a simple transformation.
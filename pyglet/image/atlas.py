@@ -38,6 +38,11 @@ This module is used by `pyglet.resource` to efficiently pack small images into
 larger textures.  `TextureAtlas` maintains one texture; `TextureBin` manages a
 collection of atlases of a given size.
 
+`TextureArray` and `TextureArrayBin` are alternatives that pack the images
+into the layers of a 3D texture instead.  Images in different layers have
+the same texture, so sprites and vertex lists using them share a single
+group and are drawn together.
+
 Example usage::
 
     # Load images from disk
@@ -62,6 +67,7 @@ __docformat__ = 'restructuredtext'
 __version__ = '$Id: $'
 
 import pyglet
+from pyglet import gl
 
 class AllocatorException(Exception):
     '''The allocator does not have sufficient free space for the requested
@@ -208,6 +214,16 @@ class TextureAtlas(object):
         region = self.texture.get_region(x, y, img.width, img.height)
         return region
 
+    def get_memory_usage(self):
+        '''Get the number of bytes of texture memory used by the atlas.
+
+        This method is useful for debugging and profiling only.
+
+        :rtype: int
+        :since: pyglet 1.2
+        '''
+        return self.texture.width * self.texture.height * 4
+
 class TextureBin(object):
     '''Collection of texture atlases.
 
@@ -257,3 +273,186 @@ class TextureBin(object):
         atlas = TextureAtlas(self.texture_width, self.texture_height)
         self.atlases.append(atlas)
         return atlas.add(img)
+
+    def add_many(self, images):
+        '''Add several images into this texture bin.
+
+        The images are added in decreasing order of height, which the
+        `Allocator` packs most tightly, so this usually needs fewer atlases
+        than adding the same images one at a time with `add`.
+
+        :Parameters:
+            `images` : sequence of `AbstractImage`
+                The images to add.
+
+        :rtype: list of `TextureRegion`
+        :return: The regions containing the newly added images, in the same
+            order as `images`.
+
+        :since: pyglet 1.2
+        '''
+        images = list(images)
+        regions = [None] * len(images)
+        order = sorted(range(len(images)), key=lambda i: -images[i].height)
+        for i in order:
+            regions[i] = self.add(images[i])
+        return regions
+
+    def get_memory_usage(self):
+        '''Get the number of bytes of texture memory used by the atlases in
+        this bin.
+
+        This method is useful for debugging and profiling only.
+
+        :rtype: int
+        :since: pyglet 1.2
+        '''
+        return sum([atlas.get_memory_usage() for atlas in self.atlases])
+
+class TextureArray(object):
+    '''Collection of images within the layers of a 3D texture.
+
+    Each layer is packed like a `TextureAtlas`.  The regions returned by
+    `add` select their layer with the third (``r``) texture coordinate,
+    which is placed at the centre of the layer so that linear filtering
+    does not blend neighbouring layers.  Vertex lists drawing the regions
+    must therefore use 3 texture coordinates, as `pyglet.sprite.Sprite`
+    does.
+
+    A 3D texture is used rather than a ``GL_TEXTURE_2D_ARRAY`` texture, as
+    array textures cannot be drawn without a shader.
+
+    :since: pyglet 1.2
+    '''
+    def __init__(self, width=256, height=256, layers=16):
+        '''Create a texture array of the given size.
+
+        :Parameters:
+            `width` : int
+                Width of each layer of the underlying texture.
+            `height` : int
+                Height of each layer of the underlying texture.
+            `layers` : int
+                Number of layers.  This is limited by the largest 3D
+                texture supported by the context.
+
+        '''
+        max_layers = gl.GLint()
+        gl.glGetIntegerv(gl.GL_MAX_3D_TEXTURE_SIZE, max_layers)
+        layers = min(layers, max_layers.value)
+        if not gl.gl_info.have_version(2, 0):
+            layers = pyglet.image._nearest_pow2(layers)
+
+        texture = pyglet.image.Texture3D.create_for_size(gl.GL_TEXTURE_3D,
+                                                         width, height)
+        texture.images = layers
+        for wrap in (gl.GL_TEXTURE_WRAP_S, gl.GL_TEXTURE_WRAP_T,
+                     gl.GL_TEXTURE_WRAP_R):
+            gl.glTexParameteri(texture.target, wrap, gl.GL_CLAMP_TO_EDGE)
+        blank = (gl.GLubyte * (texture.width * texture.height * layers * 4))()
+        gl.glTexImage3D(texture.target, texture.level, gl.GL_RGBA,
+                        texture.width, texture.height, layers, 0,
+                        gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, blank)
+        gl.glFlush()
+
+        # Sample the centre of each layer.
+        r = 0.5 / layers
+        texture.tex_coords = (0., 0., r, 1., 0., r, 1., 1., r, 0., 1., r)
+        texture.items = [
+            texture.region_class(0, 0, i, width, height, texture) \
+            for i in range(layers)]
+        texture.item_width = width
+        texture.item_height = height
+
+        self.texture = texture
+        self.allocators = [Allocator(width, height) for i in range(layers)]
+
+    def add(self, img):
+        '''Add an image to the first layer with room for it.
+
+        `AllocatorException` will be raised if no layer has room for the
+        image.
+
+        :Parameters:
+            `img` : `AbstractImage`
+                The image to add.
+
+        :rtype: `TextureRegion`
+        :return: The region of the texture containing the newly added
+            image.
+        '''
+        for layer, allocator in enumerate(self.allocators):
+            try:
+                x, y = allocator.alloc(img.width, img.height)
+            except AllocatorException:
+                continue
+            self.texture.blit_into(img, x + img.anchor_x, y + img.anchor_y,
+                                   layer)
+            return self.texture.region_class(x, y, layer,
+                img.width, img.height, self.texture)
+
+        raise AllocatorException('No more space in %r for box %dx%d' % (
+                self, img.width, img.height))
+
+    def get_memory_usage(self):
+        '''Get the number of bytes of texture memory used by the array.
+
+        This method is useful for debugging and profiling only.
+
+        :rtype: int
+        '''
+        texture = self.texture
+        return texture.width * texture.height * texture.images * 4
+
+class TextureArrayBin(TextureBin):
+    '''Collection of texture arrays.
+
+    `TextureArrayBin` is used like `TextureBin`, but packs the images into
+    the layers of `TextureArray` textures, creating a new array when all
+    the layers are full.  Sprites of images within one array share a
+    texture, and so are drawn in one batch operation even when they are in
+    different layers.
+
+    :since: pyglet 1.2
+    '''
+    def __init__(self, texture_width=256, texture_height=256, layers=16):
+        '''Create a texture bin for holding arrays of the given size.
+
+        :Parameters:
+            `texture_width` : int
+                Width of the layers of texture arrays to create.
+            `texture_height` : int
+                Height of the layers of texture arrays to create.
+            `layers` : int
+                Number of layers of texture arrays to create.
+
+        '''
+        super(TextureArrayBin, self).__init__(texture_width, texture_height)
+        self.layers = layers
+
+    def add(self, img):
+        '''Add an image into this texture bin.
+
+        This method calls `TextureArray.add` for the first array that has
+        room for the image.
+
+        `AllocatorException` is raised if the image exceeds the dimensions of
+        ``texture_width`` and ``texture_height``.
+
+        :Parameters:
+            `img` : `AbstractImage`
+                The image to add.
+
+        :rtype: `TextureRegion`
+        :return: The region of an array containing the newly added image.
+        '''
+        for atlas in self.atlases:
+            try:
+                return atlas.add(img)
+            except AllocatorException:
+                pass
+
+        atlas = TextureArray(self.texture_width, self.texture_height,
+                             self.layers)
+        self.atlases.append(atlas)
+        return atlas.add(img)
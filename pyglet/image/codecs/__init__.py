@@ -46,13 +46,23 @@ Modules must also implement the two functions::
     def get_encoders():
         # Return a list of ImageEncoder instances or []
         return []
-    
+
+Codec modules can be added immediately with `add_decoders` and
+`add_encoders`, or lazily with `add_codec_module`, in which case the module
+is imported only when a file with one of its extensions (or whose contents
+are recognised as such a file) is loaded or saved.
+
 '''
 
 __docformat__ = 'restructuredtext'
 __version__ = '$Id: $'
 
+import itertools
 import os.path
+import sys
+import threading
+
+import pyglet
 from pyglet import compat_platform
 
 _decoders = []              # List of registered ImageDecoders
@@ -61,6 +71,32 @@ _decoder_animation_extensions = {}
                             # Map str -> list of matching ImageDecoders
 _encoders = []              # List of registered ImageEncoders
 _encoder_extensions = {}    # Map str -> list of matching ImageEncoders
+_codec_modules = []         # List of _CodecModules not yet imported
+_codec_modules_lock = threading.Lock()
+_codec_ranks = {}           # Map codec -> preference (lowest first)
+_ranks = itertools.count()
+_decoder_stats = {}         # Map decoder class name -> DecoderStats
+
+# Leading bytes identifying common file formats, and the file extension
+# decoders for that format are registered with.  See `guess_file_extension`.
+_file_magic = [
+    ('\x89PNG\r\n\x1a\n', '.png'),
+    ('\xff\xd8\xff', '.jpg'),
+    ('GIF87a', '.gif'),
+    ('GIF89a', '.gif'),
+    ('BM', '.bmp'),
+    ('DDS ', '.dds'),
+    ('II*\x00', '.tif'),
+    ('MM\x00*', '.tif'),
+    ('\x00\x00\x01\x00', '.ico'),
+    ('\x00\x00\x02\x00', '.cur'),
+    ('/* XPM */', '.xpm'),
+]
+
+#: Number of bytes at the start of a file required by `guess_file_extension`.
+#:
+#: :since: pyglet 1.2
+FILE_MAGIC_SIZE = max([len(magic) for magic, extension in _file_magic])
 
 class ImageDecodeException(Exception):
     exception_priority = 10
@@ -110,133 +146,319 @@ class ImageEncoder(object):
         '''
         raise NotImplementedError()
 
+class DecoderStats(object):
+    '''Statistics of the decode attempts made with a decoder class by
+    `pyglet.image.load` and `pyglet.image.load_animation`.
+
+    :Ivariables:
+        `attempts` : int
+            Number of files the decoder was asked to decode.
+        `failures` : int
+            Number of those attempts that raised `ImageDecodeException`.
+        `time` : float
+            Total time spent in the decoder, in seconds, including failed
+            attempts.
+
+    :since: pyglet 1.2
+    '''
+    def __init__(self):
+        self.attempts = 0
+        self.failures = 0
+        self.time = 0.
+
+    def __repr__(self):
+        return '%s(attempts=%d, failures=%d, time=%f)' % (
+            self.__class__.__name__, self.attempts, self.failures, self.time)
+
+def get_decoder_stats():
+    '''Get the decode statistics of each decoder class used so far.
+
+    :rtype: dict
+    :return: Map of decoder class name to `DecoderStats`.
+
+    :since: pyglet 1.2
+    '''
+    return dict(_decoder_stats)
+
+def _record_decode(decoder, time, failed):
+    name = decoder.__class__.__name__
+    try:
+        stats = _decoder_stats[name]
+    except KeyError:
+        stats = _decoder_stats[name] = DecoderStats()
+    stats.attempts += 1
+    stats.time += time
+    if failed:
+        stats.failures += 1
+
+def guess_file_extension(header):
+    '''Guess the file format from the first bytes of a file.
+
+    :Parameters:
+        `header` : str
+            At least `FILE_MAGIC_SIZE` bytes from the start of the file
+            (or the entire file, if shorter).
+
+    :rtype: str
+    :return: The usual file extension of the format, for example ``'.png'``,
+        or None if the format was not recognised.
+
+    :since: pyglet 1.2
+    '''
+    if not header:
+        return None
+    for magic, extension in _file_magic:
+        if header.startswith(magic):
+            return extension
+    return None
+
+def _get_extensions(filename, header):
+    # File extensions to prefer, in order: that of the format identified by
+    # its contents, then that of the filename.
+    extensions = []
+    extension = guess_file_extension(header)
+    if extension:
+        extensions.append(extension)
+    if filename:
+        extension = os.path.splitext(filename)[1].lower()
+        if extension and extension not in extensions:
+            extensions.append(extension)
+    return extensions
+
+def _load_codec_modules(extensions, attribute):
+    # Import the codec modules that handle any of the given extensions
+    # (according to the named _CodecModule attribute).  If none do, all
+    # codec modules are imported, as any of them might recognise the file.
+    # Images may be decoded from several threads (see `load_many`), so
+    # only one thread imports modules at a time.
+    if not _codec_modules:
+        return
+    _codec_modules_lock.acquire()
+    try:
+        matched = [codec for codec in _codec_modules \
+                   if [e for e in extensions \
+                       if e in getattr(codec, attribute)]]
+        if not matched:
+            matched = list(_codec_modules)
+        for codec in matched:
+            codec.load()
+    finally:
+        _codec_modules_lock.release()
+
+def _order(extensions, extension_map, registered):
+    # The codecs registered for the extensions, or all codecs if there are
+    # none.  Codecs registered for other extensions are left out, as which
+    # of them are registered depends on the codec modules imported so far.
+    ordered = []
+    for extension in extensions:
+        ordered += [e for e in extension_map.get(extension, []) \
+                    if e not in ordered]
+    if not ordered:
+        ordered = list(registered)
+    return ordered
+
+def _with_fallback(codecs, get_all_codecs):
+    # Iterate over the given codecs, then over those of every codec module
+    # (importing them all) if none of the given codecs succeeded.
+    for codec in codecs:
+        yield codec
+    for codec in get_all_codecs():
+        if codec not in codecs:
+            yield codec
+
 def get_encoders(filename=None):
     '''Get an ordered list of encoders to attempt.  filename can be used
     as a hint for the filetype.
+
+    If any encoders are registered for the filename extension, only those
+    are returned.
     '''
-    encoders = []
-    if filename:
-        extension = os.path.splitext(filename)[1].lower()
-        encoders += _encoder_extensions.get(extension, [])
-    encoders += [e for e in _encoders if e not in encoders]
-    return encoders
+    extensions = _get_extensions(filename, None)
+    _load_codec_modules(extensions, 'encoder_extensions')
+    return _order(extensions, _encoder_extensions, _encoders)
 
-def get_decoders(filename=None):
+def get_decoders(filename=None, header=None):
     '''Get an ordered list of decoders to attempt.  filename can be used
-     as a hint for the filetype.
+    as a hint for the filetype.
+
+    If `header` is given, it is used to identify the file format (see
+    `guess_file_extension`); decoders for that format are returned first.
+    If any decoders are registered for the identified format or the
+    filename extension, only those are returned; otherwise all decoders
+    are, importing every codec module added with `add_codec_module`.
     '''
-    decoders = []
-    if filename:
-        extension = os.path.splitext(filename)[1].lower()
-        decoders += _decoder_extensions.get(extension, [])
-    decoders += [e for e in _decoders if e not in decoders]
-    return decoders
+    extensions = _get_extensions(filename, header)
+    _load_codec_modules(extensions, 'extensions')
+    return _order(extensions, _decoder_extensions, _decoders)
 
-def get_animation_decoders(filename=None):
+def get_animation_decoders(filename=None, header=None):
     '''Get an ordered list of decoders to attempt.  filename can be used
-     as a hint for the filetype.
-    '''
-    decoders = []
-    if filename:
-        extension = os.path.splitext(filename)[1].lower()
-        decoders += _decoder_animation_extensions.get(extension, [])
-    decoders += [e for e in _decoders if e not in decoders]
-    return decoders
+    as a hint for the filetype.
 
-def add_decoders(module):
-    '''Add a decoder module.  The module must define `get_decoders`.  Once
-    added, the appropriate decoders defined in the codec will be returned by
-    pyglet.image.codecs.get_decoders.
+    See `get_decoders` for the use of `header`.
     '''
+    extensions = _get_extensions(filename, header)
+    _load_codec_modules(extensions, 'animation_extensions')
+    return _order(extensions, _decoder_animation_extensions, _decoders)
+
+def _insert(codecs, codec, rank):
+    # Insert codec into the list, after all codecs of lower or equal rank.
+    i = len(codecs)
+    while i and _codec_ranks[codecs[i - 1]] > rank:
+        i -= 1
+    codecs.insert(i, codec)
+
+def _add_decoders(module, rank):
     for decoder in module.get_decoders():
-        _decoders.append(decoder)
+        _codec_ranks[decoder] = rank
+        _insert(_decoders, decoder, rank)
         for extension in decoder.get_file_extensions():
             if extension not in _decoder_extensions:
                 _decoder_extensions[extension] = []
-            _decoder_extensions[extension].append(decoder)
+            _insert(_decoder_extensions[extension], decoder, rank)
         for extension in decoder.get_animation_file_extensions():
             if extension not in _decoder_animation_extensions:
                 _decoder_animation_extensions[extension] = []
-            _decoder_animation_extensions[extension].append(decoder)
+            _insert(_decoder_animation_extensions[extension], decoder, rank)
+
+def _add_encoders(module, rank):
+    for encoder in module.get_encoders():
+        _codec_ranks[encoder] = rank
+        _insert(_encoders, encoder, rank)
+        for extension in encoder.get_file_extensions():
+            if extension not in _encoder_extensions:
+                _encoder_extensions[extension] = []
+            _insert(_encoder_extensions[extension], encoder, rank)
+
+def add_decoders(module):
+    '''Add a decoder module.  The module must define `get_decoders`.  Once
+    added, the appropriate decoders defined in the codec will be returned by
+    pyglet.image.codecs.get_decoders.
+    '''
+    _add_decoders(module, next(_ranks))
 
 def add_encoders(module):
     '''Add an encoder module.  The module must define `get_encoders`.  Once
     added, the appropriate encoders defined in the codec will be returned by
     pyglet.image.codecs.get_encoders.
     '''
-    for encoder in module.get_encoders():
-        _encoders.append(encoder)
-        for extension in encoder.get_file_extensions():
-            if extension not in _encoder_extensions:
-                _encoder_extensions[extension] = []
-            _encoder_extensions[extension].append(encoder)
- 
+    _add_encoders(module, next(_ranks))
+
+class _CodecModule(object):
+    def __init__(self, name, extensions, animation_extensions,
+                 encoder_extensions):
+        self.name = name
+        self.extensions = extensions
+        self.animation_extensions = animation_extensions
+        self.encoder_extensions = encoder_extensions
+        self.rank = next(_ranks)
+
+    def load(self):
+        _codec_modules.remove(self)
+        try:
+            __import__(self.name)
+        except ImportError:
+            return
+        module = sys.modules[self.name]
+        _add_encoders(module, self.rank)
+        _add_decoders(module, self.rank)
+
+def add_codec_module(name, extensions=(), animation_extensions=(),
+                     encoder_extensions=()):
+    '''Add a codec module to be imported when it is first needed.
+
+    The module is imported, and its codecs added with `add_encoders` and
+    `add_decoders`, the first time a file with any of the given extensions is
+    loaded or saved.  The extensions should match those returned by the
+    codecs' ``get_file_extensions`` and ``get_animation_file_extensions``
+    methods.  If the module cannot be imported, it is silently ignored.
+
+    Codec modules are preferred in the order they are added.
+
+    :Parameters:
+        `name` : str
+            Fully-qualified name of the codec module.
+        `extensions` : sequence of str
+            Lower-case file extensions its decoders accept.
+        `animation_extensions` : sequence of str
+            Lower-case file extensions its decoders accept as animations.
+        `encoder_extensions` : sequence of str
+            Lower-case file extensions its encoders accept.
+
+    :since: pyglet 1.2
+    '''
+    _codec_modules.append(_CodecModule(name, extensions, 
+        animation_extensions, encoder_extensions))
+
+#: File extensions of the default codec modules, added by
+#: `add_default_image_codecs`: a tuple of the extensions of its decoders,
+#: their animation extensions, and the extensions of its encoders.  These
+#: must match the extensions the codecs themselves report.
+_default_codec_extensions = {
+    'pyglet.image.codecs.dds': (['.dds'], [], []),
+    'pyglet.image.codecs.quartz': (
+        ['.bmp', '.cur', '.gif', '.ico', '.jp2', '.jpg', '.jpeg', '.pcx',
+         '.png', '.tga', '.tif', '.tiff', '.xbm', '.xpm'],
+        ['.gif'], []),
+    'pyglet.image.codecs.quicktime': (
+        ['.bmp', '.cur', '.gif', '.ico', '.jpg', '.jpeg', '.pcx', '.png',
+         '.tga', '.tif', '.tiff', '.xbm', '.xpm'],
+        ['.gif'], []),
+    'pyglet.image.codecs.gdiplus': (
+        ['.bmp', '.gif', '.jpg', '.jpeg', '.exif', '.png', '.tif', '.tiff'],
+        ['.gif'], []),
+    'pyglet.image.codecs.gdkpixbuf2': (
+        ['.png', '.xpm', '.jpg', '.jpeg', '.tif', '.tiff', '.pnm', '.ras',
+         '.bmp', '.gif'],
+        ['.gif', '.ani'], []),
+    'pyglet.image.codecs.pil': (
+        ['.bmp', '.cur', '.gif', '.ico', '.jpg', '.jpeg', '.pcx', '.png',
+         '.tga', '.tif', '.tiff', '.xbm', '.xpm'],
+        [],
+        ['.bmp', '.eps', '.gif', '.jpg', '.jpeg', '.pcx', '.png', '.ppm',
+         '.tiff', '.xbm']),
+    'pyglet.image.codecs.gif': (['.gif'], ['.gif'], []),
+    'pyglet.image.codecs.png': (['.png'], [], ['.png']),
+    'pyglet.image.codecs.bmp': (['.bmp'], [], []),
+}
+
+def _add_default_codec_module(name):
+    add_codec_module(name, *_default_codec_extensions[name])
+
+@pyglet._profile_startup('add_default_image_codecs')
 def add_default_image_codecs():
     # Add the codecs we know about.  These should be listed in order of
-    # preference.  This is called automatically by pyglet.image.
+    # preference.  This is called automatically by pyglet.image.  Modules
+    # are imported only once a file they might decode is loaded.
 
     # Compressed texture in DDS format
-    try:
-        from pyglet.image.codecs import dds
-        add_encoders(dds)
-        add_decoders(dds)
-    except ImportError:
-        pass
+    _add_default_codec_module('pyglet.image.codecs.dds')
 
     # Mac OS X default: Quicktime for Carbon, Quartz for Cocoa.
     # TODO: Make ctypes Quartz the default for both Carbon & Cocoa.
     if compat_platform == 'darwin':
-        try:
-            from pyglet import options as pyglet_options
-            if pyglet_options['darwin_cocoa']:
-                import pyglet.image.codecs.quartz
-                add_encoders(quartz)
-                add_decoders(quartz)
-            else:
-                import pyglet.image.codecs.quicktime
-                add_encoders(quicktime)
-                add_decoders(quicktime)
-        except ImportError:
-            pass
+        from pyglet import options as pyglet_options
+        if pyglet_options['darwin_cocoa']:
+            _add_default_codec_module('pyglet.image.codecs.quartz')
+        else:
+            _add_default_codec_module('pyglet.image.codecs.quicktime')
 
     # Windows XP default: GDI+
     if compat_platform in ('win32', 'cygwin'):
-        try:
-            import pyglet.image.codecs.gdiplus
-            add_encoders(gdiplus)
-            add_decoders(gdiplus)
-        except ImportError:
-            pass
+        _add_default_codec_module('pyglet.image.codecs.gdiplus')
 
     # Linux default: GdkPixbuf 2.0
     if compat_platform.startswith('linux'):
-        try:
-            import pyglet.image.codecs.gdkpixbuf2
-            add_encoders(gdkpixbuf2)
-            add_decoders(gdkpixbuf2)
-        except ImportError:
-            pass
+        _add_default_codec_module('pyglet.image.codecs.gdkpixbuf2')
 
     # Fallback: PIL
-    try:
-        import pyglet.image.codecs.pil
-        add_encoders(pil)
-        add_decoders(pil)
-    except ImportError:
-        pass
+    _add_default_codec_module('pyglet.image.codecs.pil')
+
+    # Fallback: GIF loader (slow)
+    _add_default_codec_module('pyglet.image.codecs.gif')
 
     # Fallback: PNG loader (slow)
-    try:
-        import pyglet.image.codecs.png
-        add_encoders(png)
-        add_decoders(png)
-    except ImportError:
-        pass
+    _add_default_codec_module('pyglet.image.codecs.png')
 
     # Fallback: BMP loader (slow)
-    try:
-        import pyglet.image.codecs.bmp
-        add_encoders(bmp)
-        add_decoders(bmp)
-    except ImportError:
-        pass
+    _add_default_codec_module('pyglet.image.codecs.bmp')
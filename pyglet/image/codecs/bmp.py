@@ -48,6 +48,7 @@ __docformat__ = 'restructuredtext'
 __version__ = '$Id$'
 
 import ctypes
+import operator
 
 from pyglet.image import ImageData
 from pyglet.image.codecs import ImageDecoder, ImageDecodeException
@@ -257,52 +258,66 @@ class BMPImageDecoder(ImageDecoder):
             return decoder(bits, r_mask, g_mask, b_mask, 
                            width, height, pitch, pitch_sign)
 
+# Pixels are expanded a whole image at a time, using `bytes.translate` with
+# lookup tables built for the image's palette or bitfield masks.
+
+def get_bits_data(bits):
+    return ctypes.string_at(ctypes.addressof(bits), ctypes.sizeof(bits))
+
+_unpack_tables = {}
+
+def get_unpack_tables(bitcount):
+    # One table for each pixel packed into a byte, mapping the byte to that
+    # pixel's palette index (the first pixel is in the high bits).
+    try:
+        return _unpack_tables[bitcount]
+    except KeyError:
+        pixels = 8 // bitcount
+        mask = (1 << bitcount) - 1
+        tables = []
+        for i in range(pixels):
+            shift = 8 - bitcount * (i + 1)
+            tables.append(bytes(bytearray(
+                [(value >> shift) & mask for value in range(256)])))
+        _unpack_tables[bitcount] = tables
+        return tables
+
+def unpack_indices(data, bitcount):
+    tables = get_unpack_tables(bitcount)
+    pixels = len(tables)
+    indices = bytearray(len(data) * pixels)
+    for i, table in enumerate(tables):
+        indices[i::pixels] = data.translate(table)
+    return bytes(indices)
+
+def expand_palette(indices, palette):
+    # Indices beyond the end of the palette are black.
+    colors = list(palette)[:256]
+    padding = [0] * (256 - len(colors))
+    buffer = bytearray(len(indices) * 3)
+    for i, channel in enumerate(('rgbRed', 'rgbGreen', 'rgbBlue')):
+        table = bytes(bytearray(
+            [getattr(rgb, channel) for rgb in colors] + padding))
+        buffer[i::3] = indices.translate(table)
+    return bytes(buffer)
+
 def decode_1bit(bits, palette, width, height, pitch, pitch_sign):
     rgb_pitch = (((pitch << 3) + 7) & ~0x7) * 3
-    buffer = (ctypes.c_ubyte * (height * rgb_pitch))()
-    i = 0
-    for row in bits:
-        for packed in row:
-            for _ in range(8):
-                rgb = palette[(packed & 0x80) >> 7]
-                buffer[i] = rgb.rgbRed
-                buffer[i + 1] = rgb.rgbGreen
-                buffer[i + 2] = rgb.rgbBlue
-                i += 3
-                packed <<= 1
-
+    indices = unpack_indices(get_bits_data(bits), 1)
+    buffer = expand_palette(indices, palette)
     return ImageData(width, height, 'RGB', buffer, pitch_sign * rgb_pitch)
 
 def decode_4bit(bits, palette, width, height, pitch, pitch_sign):
     rgb_pitch = (((pitch << 1) + 1) & ~0x1) * 3
-    buffer = (ctypes.c_ubyte * (height * rgb_pitch))()
-    i = 0
-    for row in bits:
-        for packed in row:
-            for index in ((packed & 0xf0) >> 4, packed & 0xf):
-                rgb = palette[index]
-                buffer[i] = rgb.rgbRed
-                buffer[i + 1] = rgb.rgbGreen
-                buffer[i + 2] = rgb.rgbBlue
-                i += 3
-
+    indices = unpack_indices(get_bits_data(bits), 4)
+    buffer = expand_palette(indices, palette)
     return ImageData(width, height, 'RGB', buffer, pitch_sign * rgb_pitch)
 
 def decode_8bit(bits, palette, width, height, pitch, pitch_sign):
     rgb_pitch = pitch * 3
-    buffer = (ctypes.c_ubyte * (height * rgb_pitch))()
-    i = 0
-    for row in bits:
-        for index in row:
-            rgb = palette[index]
-            buffer[i] = rgb.rgbRed
-            buffer[i + 1] = rgb.rgbGreen
-            buffer[i + 2] = rgb.rgbBlue
-            i += 3
-
+    buffer = expand_palette(get_bits_data(bits), palette)
     return ImageData(width, height, 'RGB', buffer, pitch_sign * rgb_pitch)
 
-
 def decode_24bit(bits, palette, width, height, pitch, pitch_sign):
     buffer = (ctypes.c_ubyte * (height * pitch))()
     ctypes.memmove(buffer, bits, len(buffer))
@@ -333,6 +348,24 @@ def get_shift(mask):
     else:
         return s, 0
 
+def unpack_bitfield(data, size, mask, shift1, shift2):
+    # Each byte of a (little-endian) pixel contributes separate bits to the
+    # channel, so the channel is the OR of a lookup in each byte.
+    channel = None
+    for i in range(size):
+        table = bytearray([((value << (i << 3)) & mask) >> shift1 << shift2 \
+                           & 0xff for value in range(256)])
+        if not any(table):
+            continue
+        values = bytearray(data[i::size].translate(bytes(table)))
+        if channel is None:
+            channel = values
+        else:
+            channel = bytearray(map(operator.or_, channel, values))
+    if channel is None:
+        channel = bytearray(len(data) // size)
+    return channel
+
 def decode_bitfields(bits, r_mask, g_mask, b_mask, 
                      width, height, pitch, pitch_sign):
     r_shift1, r_shift2 = get_shift(r_mask)
@@ -340,17 +373,15 @@ def decode_bitfields(bits, r_mask, g_mask, b_mask,
     b_shift1, b_shift2 = get_shift(b_mask)
 
     rgb_pitch = 3 * len(bits[0])
-    buffer = (ctypes.c_ubyte * (height * rgb_pitch))()
-
-    i = 0
-    for row in bits:
-        for packed in row:
-            buffer[i] = (packed & r_mask) >> r_shift1 << r_shift2
-            buffer[i+1] = (packed & g_mask) >> g_shift1 << g_shift2
-            buffer[i+2] = (packed & b_mask) >> b_shift1 << b_shift2
-            i += 3
-
-    return ImageData(width, height, 'RGB', buffer, pitch_sign * rgb_pitch)
+    data = get_bits_data(bits)
+    size = ctypes.sizeof(bits[0]._type_)
+    buffer = bytearray(len(data) // size * 3)
+    buffer[0::3] = unpack_bitfield(data, size, r_mask, r_shift1, r_shift2)
+    buffer[1::3] = unpack_bitfield(data, size, g_mask, g_shift1, g_shift2)
+    buffer[2::3] = unpack_bitfield(data, size, b_mask, b_shift1, b_shift2)
+
+    return ImageData(width, height, 'RGB', bytes(buffer), 
+                     pitch_sign * rgb_pitch)
 
 def get_decoders():
     return [BMPImageDecoder()]
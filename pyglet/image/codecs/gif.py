@@ -32,7 +32,14 @@
 # POSSIBILITY OF SUCH DAMAGE.
 # ----------------------------------------------------------------------------
 
-'''Read GIF control data.
+'''Read GIF control data, and decode GIF images and animations.
+
+GIFs are decoded in pure Python, so this decoder is used when no platform
+decoder is available.  Animation frames are composited onto a canvas
+following each frame's disposal method; only the rectangle that changed
+since the previous frame is kept for each frame, and full frames are
+recreated one at a time as they are requested (for example, while being
+added to a texture bin with `Animation.add_to_texture_bin`).
 
 http://www.w3.org/Graphics/GIF/spec-gif89a.txt
 '''
@@ -40,9 +47,11 @@ http://www.w3.org/Graphics/GIF/spec-gif89a.txt
 __docformat__ = 'restructuredtext'
 __version__ = '$Id$'
 
+import re
 import struct
 
-from pyglet.image.codecs import ImageDecodeException
+from pyglet.image import AbstractImage, ImageData, Animation, AnimationFrame
+from pyglet.image.codecs import ImageDecoder, ImageDecodeException
 
 class GIFStream(object):
     def __init__(self):
@@ -50,9 +59,13 @@ class GIFStream(object):
 
 class GIFImage(object):
     delay = None
+    disposal = 0
+    transparent_index = None
 
 class GraphicsScope(object):
     delay = None
+    disposal = 0
+    transparent_index = None
 
 # Appendix A.
 LABEL_EXTENSION_INTRODUCER = 0x21
@@ -60,6 +73,11 @@ LABEL_GRAPHIC_CONTROL_EXTENSION = 0xf9
 LABEL_IMAGE_DESCRIPTOR = 0x2c
 LABEL_TRAILER = 0x3b
 
+# 23. Disposal methods
+DISPOSE_NONE = 1
+DISPOSE_BACKGROUND = 2
+DISPOSE_PREVIOUS = 3
+
 def unpack(format, file):
     size = struct.calcsize(format)
     data = file.read(size)
@@ -94,10 +112,13 @@ def read(file):
      pixel_aspect_ratio) = unpack('HHBBB', file)
     global_color_table_flag = fields & 0x80
     global_color_table_size = fields & 0x7
+    stream.width = logical_screen_width
+    stream.height = logical_screen_height
 
     # 19. Global color table
+    stream.color_table = None
     if global_color_table_flag:
-        global_color_table = file.read(6 << global_color_table_size)
+        stream.color_table = file.read(6 << global_color_table_size)
 
     # <Data>*
     graphics_scope = GraphicsScope()
@@ -128,10 +149,21 @@ def skip_data_sub_blocks(file):
         data = file.read(block_size)
         block_size = read_byte(file)
 
+def read_data_sub_blocks(file):
+    # 15. Data sub-blocks
+    data = []
+    block_size = read_byte(file)
+    while block_size != 0:
+        data.append(file.read(block_size))
+        block_size = read_byte(file)
+    return b''.join(data)
+
 def read_table_based_image(file, stream, graphics_scope):
     gif_image = GIFImage()
     stream.images.append(gif_image)
     gif_image.delay = graphics_scope.delay
+    gif_image.disposal = graphics_scope.disposal
+    gif_image.transparent_index = graphics_scope.transparent_index
         
     # 20. Image descriptor
     (image_left_position,
@@ -139,17 +171,24 @@ def read_table_based_image(file, stream, graphics_scope):
      image_width,
      image_height,
      fields) = unpack('HHHHB', file)
+    gif_image.x = image_left_position
+    gif_image.y = image_top_position
+    gif_image.width = image_width
+    gif_image.height = image_height
 
     local_color_table_flag = fields & 0x80
+    interlace_flag = fields & 0x40
     local_color_table_size = fields & 0x7
+    gif_image.interlaced = bool(interlace_flag)
 
     # 21. Local color table
+    gif_image.color_table = stream.color_table
     if local_color_table_flag:
-        local_color_table = file.read(6 << local_color_table_size)
+        gif_image.color_table = file.read(6 << local_color_table_size)
 
     # 22. Table based image data
-    lzw_code_size = file.read(1)
-    skip_data_sub_blocks(file)
+    gif_image.lzw_code_size = read_byte(file)
+    gif_image.data = read_data_sub_blocks(file)
 
 def read_graphic_control_extension(file, stream, graphics_scope):
     # 23. Graphic control extension
@@ -160,6 +199,10 @@ def read_graphic_control_extension(file, stream, graphics_scope):
      terminator) = unpack('BBHBB', file)
     if block_size != 4:
         raise ImageDecodeException('Incorrect block size')
+
+    graphics_scope.disposal = (fields >> 2) & 0x7
+    if fields & 0x1:
+        graphics_scope.transparent_index = transparent_color_index
     
     if delay_time:
         # Follow Firefox/Mac behaviour: use 100ms delay for any delay
@@ -167,3 +210,285 @@ def read_graphic_control_extension(file, stream, graphics_scope):
         if delay_time <= 1:
             delay_time = 10
         graphics_scope.delay = float(delay_time) / 100
+
+# Appendix F.  Codes are read least significant bit first, starting with
+# code size `lzw_code_size` + 1 and growing to at most 12 bits.  The table
+# maps each code directly to the string of indices it stands for, which
+# makes emitting a code a single list append.
+_lzw_roots = [[bytes(bytearray([i])) for i in range(1 << code_size)] \
+              for code_size in range(9)]
+
+def decode_lzw(data, lzw_code_size):
+    '''Decompress the LZW-encoded image data of a table based image.
+
+    :rtype: str
+    :return: Color table indices, one byte per pixel.
+    '''
+    if not 1 <= lzw_code_size <= 8:
+        raise ImageDecodeException('Invalid LZW code size')
+    clear_code = 1 << lzw_code_size
+    end_code = clear_code + 1
+    roots = _lzw_roots[lzw_code_size] + [None, None]
+
+    table = list(roots)
+    code_size = lzw_code_size + 1
+    code_limit = 1 << code_size
+    previous = None
+    output = []
+    append = output.append
+    bits = 0
+    bit_count = 0
+    for byte in bytearray(data):
+        bits |= byte << bit_count
+        bit_count += 8
+        while bit_count >= code_size:
+            code = bits & (code_limit - 1)
+            bits >>= code_size
+            bit_count -= code_size
+
+            if code == clear_code:
+                table = list(roots)
+                code_size = lzw_code_size + 1
+                code_limit = 1 << code_size
+                previous = None
+                continue
+            elif code == end_code:
+                return b''.join(output)
+
+            if code < len(table):
+                entry = table[code]
+                if previous is not None and len(table) < 4096:
+                    table.append(previous + entry[:1])
+            elif code == len(table) and previous is not None:
+                entry = previous + previous[:1]
+                table.append(entry)
+            else:
+                raise ImageDecodeException('Invalid LZW code')
+            append(entry)
+            previous = entry
+
+            if len(table) == code_limit and code_size < 12:
+                code_size += 1
+                code_limit <<= 1
+
+    # Some encoders omit the end code.
+    return b''.join(output)
+
+def deinterlace(indices, width, height):
+    # Rows are stored every 8th from 0, every 8th from 4, every 4th from 2
+    # and every 2nd from 1.
+    rows = [indices[i * width:(i + 1) * width] for i in range(height)]
+    order = range(0, height, 8) + range(4, height, 8) + \
+            range(2, height, 4) + range(1, height, 2)
+    result = [None] * height
+    for row, y in zip(rows, order):
+        result[y] = row
+    return b''.join(result)
+
+def get_rgba_tables(color_table, transparent_index):
+    channels = [bytearray(256) for i in range(4)]
+    color_table = bytearray(color_table or b'')
+    for i in range(min(len(color_table) // 3, 256)):
+        channels[0][i], channels[1][i], channels[2][i] = \
+            color_table[i * 3:i * 3 + 3]
+        channels[3][i] = 255
+    if transparent_index is not None:
+        channels[3][transparent_index] = 0
+    return [bytes(channel) for channel in channels]
+
+class Canvas(object):
+    '''RGBA pixels of the logical screen, stored top row first.'''
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.data = bytearray(width * height * 4)
+
+    def clip(self, x, y, width, height):
+        x1 = min(max(x, 0), self.width)
+        y1 = min(max(y, 0), self.height)
+        x2 = min(max(x + width, 0), self.width)
+        y2 = min(max(y + height, 0), self.height)
+        return x1, y1, x2 - x1, y2 - y1
+
+    def get_region(self, x, y, width, height):
+        pitch = self.width * 4
+        return b''.join([bytes(self.data[start:start + width * 4]) \
+                         for start in range(y * pitch + x * 4,
+                                            (y + height) * pitch, pitch)])
+
+    def set_region(self, x, y, width, height, data):
+        pitch = self.width * 4
+        row_size = width * 4
+        for i, start in enumerate(range(y * pitch + x * 4,
+                                        (y + height) * pitch, pitch)):
+            self.data[start:start + row_size] = \
+                data[i * row_size:(i + 1) * row_size]
+
+    def draw(self, gif_image):
+        '''Draw a table based image over the canvas, leaving pixels with
+        the transparent color index unchanged.'''
+        indices = decode_lzw(gif_image.data, gif_image.lzw_code_size)
+        width = gif_image.width
+        height = gif_image.height
+        indices = indices[:width * height].ljust(width * height, b'\0')
+        if gif_image.interlaced:
+            indices = deinterlace(indices, width, height)
+
+        rgba = bytearray(len(indices) * 4)
+        tables = get_rgba_tables(gif_image.color_table,
+                                 gif_image.transparent_index)
+        for i, table in enumerate(tables):
+            rgba[i::4] = indices.translate(table)
+
+        x, y, clip_width, clip_height = self.clip(
+            gif_image.x, gif_image.y, width, height)
+        pitch = self.width * 4
+        if gif_image.transparent_index is None:
+            runs = None
+        else:
+            transparent = re.escape(bytes(bytearray(
+                [gif_image.transparent_index])))
+            runs = re.compile(b'[^' + transparent + b']+')
+        for row in range(clip_height):
+            source = (row + y - gif_image.y) * width + x - gif_image.x
+            dest = (row + y) * pitch + x * 4
+            if runs is None:
+                self.data[dest:dest + clip_width * 4] = \
+                    rgba[source * 4:(source + clip_width) * 4]
+            else:
+                for match in runs.finditer(indices, source,
+                                           source + clip_width):
+                    start, end = match.span()
+                    self.data[dest + (start - source) * 4:
+                              dest + (end - source) * 4] = \
+                        rgba[start * 4:end * 4]
+
+class Compositor(object):
+    '''Recreates full animation frames from the rectangles that changed
+    between frames.
+
+    Frames are recreated by replaying the changes onto a canvas, so
+    requesting frames in order is cheap, while going back to an earlier frame
+    replays the animation from the start.
+    '''
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.changes = []
+        self.canvas = None
+        self.index = -1
+
+    def add_change(self, x, y, width, height, data):
+        self.changes.append((x, y, width, height, data))
+        return len(self.changes) - 1
+
+    def get_frame(self, index):
+        if index < self.index or self.canvas is None:
+            self.canvas = Canvas(self.width, self.height)
+            self.index = -1
+        while self.index < index:
+            self.index += 1
+            self.canvas.set_region(*self.changes[self.index])
+        return ImageData(self.width, self.height, 'RGBA', 
+                         bytes(self.canvas.data), -self.width * 4)
+
+class GIFFrameImage(AbstractImage):
+    '''A frame of a GIF animation, recreated by its `Compositor` when its
+    image data or texture is required.'''
+    _texture = None
+
+    def __init__(self, compositor, index):
+        super(GIFFrameImage, self).__init__(compositor.width, 
+                                            compositor.height)
+        self.compositor = compositor
+        self.index = index
+
+    def get_image_data(self):
+        return self.compositor.get_frame(self.index)
+
+    def get_texture(self, rectangle=False, force_rectangle=False):
+        if not self._texture:
+            self._texture = self.get_image_data().get_texture(
+                rectangle, force_rectangle)
+        return self._texture
+
+    def get_mipmapped_texture(self):
+        return self.get_image_data().get_mipmapped_texture()
+
+    def get_region(self, x, y, width, height):
+        return self.get_image_data().get_region(x, y, width, height)
+
+    def blit(self, x, y, z=0):
+        self.get_texture().blit(x, y, z)
+
+    def blit_to_texture(self, target, level, x, y, z=0):
+        self.get_image_data().blit_to_texture(target, level, x, y, z)
+
+def composite(stream):
+    '''Composite the images of a GIF stream into animation frames.
+
+    :rtype: list of (`AbstractImage`, float)
+    :return: The image and delay of each frame.  Frames that are identical
+        to the one before share its image.
+    '''
+    if not stream.images:
+        raise ImageDecodeException('GIF stream contains no images')
+    canvas = Canvas(stream.width, stream.height)
+    compositor = Compositor(stream.width, stream.height)
+    frames = []
+    dispose = None
+    image = None
+    for gif_image in stream.images:
+        rect = canvas.clip(gif_image.x, gif_image.y,
+                           gif_image.width, gif_image.height)
+
+        # The changed rectangle covers the previous image if it was disposed
+        # of, as well as this image.
+        changed = rect
+        if dispose:
+            x1 = min(rect[0], dispose[0])
+            y1 = min(rect[1], dispose[1])
+            x2 = max(rect[0] + rect[2], dispose[0] + dispose[2])
+            y2 = max(rect[1] + rect[3], dispose[1] + dispose[3])
+            changed = (x1, y1, x2 - x1, y2 - y1)
+        before = canvas.get_region(*changed)
+
+        if dispose:
+            canvas.set_region(*dispose)
+        dispose = None
+        if gif_image.disposal == DISPOSE_BACKGROUND:
+            dispose = rect + (b'\0' * (rect[2] * rect[3] * 4),)
+        elif gif_image.disposal == DISPOSE_PREVIOUS:
+            dispose = rect + (canvas.get_region(*rect),)
+        canvas.draw(gif_image)
+
+        after = canvas.get_region(*changed)
+        if image is None or after != before:
+            index = compositor.add_change(*(changed + (after,)))
+            image = GIFFrameImage(compositor, index)
+        frames.append((image, gif_image.delay))
+    return frames
+
+class GIFImageDecoder(ImageDecoder):
+    def get_file_extensions(self):
+        return ['.gif']
+
+    def get_animation_file_extensions(self):
+        return ['.gif']
+
+    def decode(self, file, filename):
+        stream = read(file)
+        image, delay = composite(stream)[0]
+        return image.get_image_data()
+
+    def decode_animation(self, file, filename):
+        stream = read(file)
+        frames = [AnimationFrame(image, delay) \
+                  for image, delay in composite(stream)]
+        return Animation(frames)
+
+def get_decoders():
+    return [GIFImageDecoder()]
+
+def get_encoders():
+    return []
@@ -86,6 +86,8 @@ class _TraceLibrary(object):
 class LibraryLoader(object):
     darwin_not_found_error = "image not found"
     linux_not_found_error  = "No such file or directory"
+    @pyglet._profile_startup(
+        lambda args: 'load_library %s' % ', '.join(args[1:]))
     def load_library(self, *names, **kwargs):
         '''Find and load a library.  
         
@@ -396,6 +396,200 @@ class MediaEvent(object):
     def __lt__(self, other):
         return hash(self) < hash(other)
 
+class _MediaEventBatch(object):
+    '''A list of `MediaEvent` to be dispatched together to a player.
+
+    The batch is posted to the application event loop in place of the player
+    itself, so that all events that fell due at once are dispatched in a
+    single iteration of the main thread, rather than waking it for each.
+    '''
+    def __init__(self, player, events):
+        self.player = player
+        self.events = events
+
+    def post(self):
+        pyglet.app.platform_event_loop.post_event(self, 'on_media_events')
+
+    def dispatch_event(self, event_type):
+        for event in self.events:
+            self.player.dispatch_event(event.event, *event.args)
+
+class AudioClock(object):
+    '''Sample-counted playback clock.
+
+    Audio players record each block of samples handed to the device with
+    `write` and, if the device can report it, the number of samples actually
+    played with `update`.  Devices typically report their play cursor only
+    every few tens of milliseconds; between updates the clock interpolates
+    using the system time.  The interpolated position never runs backwards
+    and never passes the last sample written, so it is safe to use for
+    synchronisation during an underrun.
+
+    Events can be scheduled at a sample position with `schedule_event`, and
+    all events reached by the clock are retrieved together with
+    `get_due_events`.
+
+    The clock is not thread-safe; audio players must hold their own lock
+    while using it.
+
+    :Ivariables:
+        `sample_rate` : int
+            Samples per second counted by the clock.
+
+    :since: pyglet 1.2
+    '''
+
+    def __init__(self, sample_rate, time_func=time.time):
+        '''Create a clock at sample 0, paused.
+
+        :Parameters:
+            `sample_rate` : int
+                Samples per second, as given by `AudioFormat.sample_rate`.
+            `time_func` : function
+                Function returning the current system time in seconds.
+
+        '''
+        self.sample_rate = sample_rate
+        self._time_func = time_func
+
+        # Sample position reported at the last update and the system time of
+        # that update (None if paused).
+        self._samples = 0
+        self._update_time = None
+
+        # Last position returned, to keep the clock monotonic.
+        self._last_samples = 0
+
+        # Total samples written to the device.
+        self._written = 0
+
+        # Heap of (samples, sequence, MediaEvent)
+        self._events = []
+        self._event_sequence = 0
+
+    def reset(self):
+        '''Reset the clock to sample 0 and discard all scheduled events.
+
+        The clock remains playing if it was playing.
+        '''
+        self._samples = self._last_samples = self._written = 0
+        if self._update_time is not None:
+            self._update_time = self._time_func()
+        del self._events[:]
+
+    def play(self):
+        '''Begin interpolating from the current position.'''
+        if self._update_time is None:
+            self._samples = self._last_samples
+            self._update_time = self._time_func()
+
+    def pause(self):
+        '''Stop interpolating, holding the current position.'''
+        if self._update_time is not None:
+            self._samples = self.get_samples()
+            self._update_time = None
+
+    playing = property(lambda self: self._update_time is not None,
+        doc='''True if the clock is interpolating.  Read-only.
+
+        :type: bool
+        ''')
+
+    def write(self, samples):
+        '''Record that samples have been handed to the device.
+
+        :Parameters:
+            `samples` : int
+                Number of samples written.
+
+        '''
+        if (self._update_time is not None and
+            self.get_samples() >= self._written):
+            # Recovering from underrun; don't count the time spent waiting.
+            self._samples = self._last_samples
+            self._update_time = self._time_func()
+        self._written += samples
+
+    written = property(lambda self: self._written,
+        doc='''Total number of samples written.  Read-only.
+
+        :type: int
+        ''')
+
+    def update(self, samples):
+        '''Report the device play position.
+
+        :Parameters:
+            `samples` : int
+                Number of samples played since the clock was reset.
+
+        '''
+        self._samples = samples
+        if self._update_time is not None:
+            self._update_time = self._time_func()
+
+    def get_samples(self):
+        '''Get the interpolated play position.
+
+        :rtype: int
+        :return: number of samples played since the clock was reset.
+        '''
+        samples = self._samples
+        if self._update_time is not None:
+            samples += int((self._time_func() - self._update_time) *
+                           self.sample_rate)
+        samples = max(min(samples, self._written), self._last_samples)
+        self._last_samples = samples
+        return samples
+
+    def get_time(self):
+        '''Get the interpolated play position in seconds.
+
+        :rtype: float
+        '''
+        return self.get_samples() / float(self.sample_rate)
+
+    def schedule_event(self, samples, event):
+        '''Schedule an event to become due at a sample position.
+
+        Events scheduled at the same position are returned in the order they
+        were scheduled.
+
+        :Parameters:
+            `samples` : int
+                Sample position of the event.
+            `event` : `MediaEvent`
+                Event to schedule.
+
+        '''
+        heapq.heappush(self._events, (samples, self._event_sequence, event))
+        self._event_sequence += 1
+
+    def get_next_event_samples(self):
+        '''Get the sample position of the next scheduled event.
+
+        :rtype: int
+        :return: the position, or ``None`` if no events are scheduled.
+        '''
+        if self._events:
+            return self._events[0][0]
+
+    def get_due_events(self, samples=None):
+        '''Remove and return all events scheduled at or before a position.
+
+        :Parameters:
+            `samples` : int
+                Sample position; defaults to the current position.
+
+        :rtype: list of `MediaEvent`
+        '''
+        if samples is None:
+            samples = self.get_samples()
+        events = []
+        while self._events and self._events[0][0] <= samples:
+            events.append(heapq.heappop(self._events)[2])
+        return events
+
 class SourceInfo(object):
     '''Source metadata information.
 
@@ -538,6 +732,17 @@ class Source(object):
         '''
         pass
 
+    def skip_video_frame(self):
+        '''Discard the next video frame.
+
+        Sources that decode video can override this to avoid the cost of
+        producing an image that will never be displayed.  The default
+        implementation retrieves and discards the frame.
+
+        :since: pyglet 1.2
+        '''
+        self.get_next_video_frame()
+
     # Internal methods that SourceGroup calls on the source:
 
     def seek(self, timestamp):
@@ -673,12 +878,13 @@ class StaticMemorySource(StaticSource):
         return AudioData(data, len(data), timestamp, duration, [])
 
 class SourceGroup(object):
-    '''Read data from a queue of sources, with support for looping.  All
-    sources must share the same audio format.
+    '''Read data from a queue of sources, with support for looping.  Queued
+    sources with a different audio format are converted to the group's
+    format as they are played.
     
     :Ivariables:
         `audio_format` : `AudioFormat`
-            Required audio format for queued sources.
+            Audio format of data provided by the group.
 
     '''
 
@@ -701,7 +907,11 @@ class SourceGroup(object):
 
     def queue(self, source):
         source = source._get_queue_source()
-        assert(source.audio_format == self.audio_format)
+        assert (source.audio_format is None) == (self.audio_format is None)
+        if source.audio_format and source.audio_format != self.audio_format:
+            from pyglet.media.convert import ConvertedSource
+            # Raises MediaException if the format cannot be converted.
+            source = ConvertedSource(source, self.audio_format)
         self._sources.append(source)
         self.duration += source.duration
 
@@ -821,6 +1031,12 @@ class SourceGroup(object):
         '''
         return self._sources[0].get_next_video_frame()
 
+    def skip_video_frame(self):
+        '''Discard the next video frame without decoding it into an image,
+        where the source supports this.
+        '''
+        self._sources[0].skip_video_frame()
+
 class AbstractAudioPlayer(object):
     '''Base class for driver audio players.
     '''
@@ -978,8 +1194,7 @@ class Player(pyglet.event.EventDispatcher):
             self._groups.append(source)
         else:
             if (self._groups and
-                source.audio_format == self._groups[-1].audio_format and
-                source.video_format == self._groups[-1].video_format):
+                self._can_join(source, self._groups[-1])):
                 self._groups[-1].queue(source)
             else:
                 group = SourceGroup(source.audio_format, source.video_format)
@@ -989,6 +1204,18 @@ class Player(pyglet.event.EventDispatcher):
 
         self._set_playing(self._playing)
 
+    def _can_join(self, source, group):
+        # Sources with a different audio format are converted by the group,
+        # if their format can be converted.
+        if source.video_format != group.video_format:
+            return False
+        if source.audio_format == group.audio_format:
+            return True
+        if source.audio_format is None or group.audio_format is None:
+            return False
+        from pyglet.media.convert import can_convert
+        return can_convert(source.audio_format, group.audio_format)
+
     def _set_playing(self, playing):
         #stopping = self._playing and not playing
         #starting = not self._playing and playing
@@ -1130,7 +1357,7 @@ class Player(pyglet.event.EventDispatcher):
 
     def _create_texture(self):
         video_format = self.source.video_format
-        self._texture = pyglet.image.Texture.create(
+        self._texture = pyglet.image.StreamingTexture.create(
             video_format.width, video_format.height, rectangle=True)
         self._texture = self._texture.get_transform(flip_y=True)
         self._texture.anchor_y = 0
@@ -1158,7 +1385,7 @@ class Player(pyglet.event.EventDispatcher):
 
         ts = self._groups[0].get_next_video_timestamp()
         while ts is not None and ts < time:
-            self._groups[0].get_next_video_frame() # Discard frame
+            self._groups[0].skip_video_frame()
             ts = self._groups[0].get_next_video_timestamp()
 
         if ts is None:
@@ -1435,6 +1662,7 @@ def load(filename, file=None, streaming=True):
         source = StaticSource(source)
     return source
 
+@pyglet._profile_startup('get_audio_driver')
 def get_audio_driver():
     global _audio_driver
 
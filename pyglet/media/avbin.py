@@ -227,6 +227,10 @@ class VideoPacket(object):
         # Decoded image.  0 == not decoded yet; None == Error or discarded
         self.image = 0
 
+        # If True, the frame will not be displayed; decode it only to keep
+        # the decoder state current.
+        self.skip = False
+
         self.id = self._next_id
         self.__class__._next_id += 1
 
@@ -318,6 +322,7 @@ class AVbinSource(StreamingSource):
             
         if self.video_format:
             self._video_packets = []
+            self._skip_buffer = None
             self._decode_thread = WorkerThread()
             self._decode_thread.start()
             self._condition = threading.Condition()
@@ -495,6 +500,18 @@ class AVbinSource(StreamingSource):
         width = self.video_format.width
         height = self.video_format.height
         pitch = width * 3
+
+        if packet.skip:
+            # Skipped frames are decoded into a scratch buffer, which is
+            # only ever touched by the decoder thread.
+            if self._skip_buffer is None:
+                self._skip_buffer = (ctypes.c_uint8 * (pitch * height))()
+            av.avbin_decode_video(self._video_stream,
+                                  packet.data, packet.size,
+                                  self._skip_buffer)
+            packet.image = None
+            return
+
         buffer = (ctypes.c_uint8 * (pitch * height))()
         result = av.avbin_decode_video(self._video_stream, 
                                        packet.data, packet.size, 
@@ -559,6 +576,18 @@ class AVbinSource(StreamingSource):
                 print 'Returning', packet
             return packet.image
 
+    def skip_video_frame(self):
+        if not self.video_format:
+            return
+
+        if self._ensure_video_packets():
+            # Don't wait for the decoder; the frame is decoded without
+            # creating an image, if decoding has not already begun.
+            packet = self._video_packets.pop(0)
+            packet.skip = True
+            if _debug:
+                print 'Skipping', packet
+
 av.avbin_init()
 if pyglet.options['debug_media']:
     _debug = True
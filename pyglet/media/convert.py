@@ -0,0 +1,370 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+# 
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions 
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright 
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+
+
+'''Streaming conversion of audio data between formats.
+
+Sources queued on the same `SourceGroup` must normally share an
+`AudioFormat`.  A source with a different sample rate, channel count or
+sample size is wrapped in a `ConvertedSource`, which converts its audio data
+to the group's format as it is played.  `Player` queues a source whose
+format cannot be converted (see `can_convert`) in a new group instead.
+
+Conversion is done on whole packets using the ``audioop`` module, and NumPy
+if it is available, so no Python code runs per sample.  The resampler
+quality is chosen with the ``audio_resample_quality`` pyglet option:
+
+``'fast'``
+    Linear interpolation.  Cheapest, but aliases when downsampling.
+``'medium'``
+    Linear interpolation with a simple low-pass filter.  This is the default.
+``'best'``
+    Polyphase windowed-sinc filter.  Requires NumPy; if NumPy is not
+    installed ``'medium'`` is used instead.
+
+:since: pyglet 1.2
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import audioop
+import math
+
+import pyglet
+from pyglet.media import Source, AudioData, MediaException
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#: Filter weights passed to ``audioop.ratecv`` for each quality.
+_ratecv_weights = {
+    'fast': (1, 0),
+    'medium': (1, 1),
+}
+
+class SincResampler(object):
+    '''Polyphase windowed-sinc resampler for signed 16-bit data.
+
+    The input and output rates are reduced to a ratio of integers L/M;
+    output sample ``n`` is computed from the inputs preceding position
+    ``n * M / L`` with the filter phase ``n * M % L``.  Each packet is
+    resampled with a single vectorized multiply-accumulate over all output
+    samples and channels.
+
+    Output lags input by half the filter length, which is less than
+    a millisecond at typical rates.
+    '''
+
+    #: Number of filter taps per phase.
+    taps = 32
+
+    #: Kaiser window shape parameter.
+    beta = 8.6
+
+    def __init__(self, channels, in_rate, out_rate):
+        assert numpy, 'SincResampler requires NumPy'
+        self.channels = channels
+        divisor = _gcd(in_rate, out_rate)
+        self.up = out_rate // divisor
+        self.down = in_rate // divisor
+
+        # Prototype low-pass filter, cutoff at the lower Nyquist frequency,
+        # scaled for unity gain in each phase.
+        up = self.up
+        length = self.taps * up
+        cutoff = 1. / max(up, self.down)
+        t = numpy.arange(length) - (length - 1) / 2.
+        h = numpy.sinc(cutoff * t) * numpy.kaiser(length, self.beta)
+        h *= up / h.sum()
+
+        # bank[p, j] is the coefficient applied to the input j samples
+        # before the current position for phase p.
+        self._bank = h.reshape(self.taps, up).T.astype(numpy.float32)
+        self.reset()
+
+    def reset(self):
+        '''Discard history, as after a seek.'''
+        self._history = numpy.zeros((self.taps - 1, self.channels), 
+                                    numpy.float32)
+        self._consumed = 0
+        self._produced = 0
+
+    def resample(self, data):
+        '''Resample a packet of interleaved signed 16-bit samples.
+
+        :rtype: str
+        '''
+        samples = numpy.frombuffer(data, numpy.int16).reshape(
+            -1, self.channels)
+        buffer = numpy.concatenate((self._history, samples))
+
+        # Absolute input index of buffer[taps - 1] is self._consumed.
+        end = self._consumed + len(samples)
+        n_end = (end * self.up + self.down - 1) // self.down
+        n = numpy.arange(self._produced, n_end)
+        position = n * self.down
+        index = position // self.up - self._consumed + self.taps - 1
+        phase = position % self.up
+
+        # Gather the window of inputs for every output sample at once.
+        window = index[:, numpy.newaxis] - numpy.arange(self.taps)
+        out = numpy.einsum('nt,ntc->nc', self._bank[phase], buffer[window])
+
+        self._history = buffer[len(buffer) - self.taps + 1:]
+        self._consumed = end
+        self._produced = n_end
+
+        out = numpy.clip(numpy.round(out), -32768, 32767)
+        return out.astype(numpy.int16).tostring()
+
+def _gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+def can_convert(source_format, target_format):
+    '''Determine if audio data can be converted between two formats.
+
+    Mono and stereo audio with 8 or 16 bit samples, at any sample rate, can
+    be converted.
+
+    :Parameters:
+        `source_format` : `AudioFormat`
+            Format of the input data.
+        `target_format` : `AudioFormat`
+            Format of the output data.
+
+    :rtype: bool
+    '''
+    for audio_format in (source_format, target_format):
+        if (audio_format.channels not in (1, 2) or
+            audio_format.sample_size not in (8, 16)):
+            return False
+    return True
+
+class AudioConverter(object):
+    '''Streaming converter between two `AudioFormat`.
+
+    Data is converted in packets; the converter keeps the resampler state
+    between packets, so consecutive packets join without clicks.  Call
+    `reset` after a discontinuity (for example, a seek).
+
+    :Ivariables:
+        `source_format` : `AudioFormat`
+            Format of the data given to `convert`.
+        `target_format` : `AudioFormat`
+            Format of the data returned by `convert`.
+        `quality` : str
+            Resampler quality; one of ``'fast'``, ``'medium'`` or
+            ``'best'``.
+
+    '''
+
+    def __init__(self, source_format, target_format, quality=None):
+        '''Create a converter.
+
+        :Parameters:
+            `source_format` : `AudioFormat`
+                Format of the input data.
+            `target_format` : `AudioFormat`
+                Format of the output data.
+            `quality` : str
+                Resampler quality; defaults to the
+                ``audio_resample_quality`` option.
+
+        '''
+        for audio_format in (source_format, target_format):
+            if audio_format.channels not in (1, 2):
+                raise MediaException('Cannot convert %d channel audio' % 
+                                     audio_format.channels)
+            if audio_format.sample_size not in (8, 16):
+                raise MediaException('Cannot convert %d bit audio' % 
+                                     audio_format.sample_size)
+
+        if quality is None:
+            quality = pyglet.options['audio_resample_quality']
+        if quality == 'best' and not numpy:
+            quality = 'medium'
+        if quality not in ('fast', 'medium', 'best'):
+            raise MediaException('Unknown resample quality %r' % quality)
+
+        self.source_format = source_format
+        self.target_format = target_format
+        self.quality = quality
+
+        # Resample with the fewest channels.
+        self._channels = min(source_format.channels, target_format.channels)
+        self._resample = source_format.sample_rate != target_format.sample_rate
+        self._sinc = None
+        if self._resample and quality == 'best':
+            self._sinc = SincResampler(self._channels,
+                                       source_format.sample_rate,
+                                       target_format.sample_rate)
+        self.reset()
+
+    def reset(self):
+        '''Discard buffered data and resampler state.'''
+        self._remainder = ''
+        self._ratecv_state = None
+        if self._sinc:
+            self._sinc.reset()
+
+    def get_source_bytes(self, bytes):
+        '''Get the number of input bytes that convert to approximately the
+        given number of output bytes.
+
+        :rtype: int
+        '''
+        source_format = self.source_format
+        bytes = int(bytes * source_format.bytes_per_second / 
+                    float(self.target_format.bytes_per_second))
+        bytes -= bytes % source_format.bytes_per_sample
+        return max(bytes, source_format.bytes_per_sample)
+
+    def convert(self, data):
+        '''Convert a packet of data.
+
+        :Parameters:
+            `data` : str
+                Sample data in the source format.  Need not contain a whole
+                number of samples; incomplete samples are kept until the next
+                call.
+
+        :rtype: str
+        :return: Sample data in the target format.
+        '''
+        source_format = self.source_format
+        target_format = self.target_format
+
+        # Keep incomplete sample frames for next time.
+        if self._remainder:
+            data = self._remainder + data
+        extra = len(data) % source_format.bytes_per_sample
+        if extra:
+            self._remainder = data[-extra:]
+            data = data[:-extra]
+        else:
+            self._remainder = ''
+
+        # Convert to signed 16-bit.  8-bit audio is unsigned.
+        if source_format.sample_size == 8:
+            data = audioop.lin2lin(audioop.bias(data, 1, -128), 1, 2)
+
+        if source_format.channels == 2 and target_format.channels == 1:
+            data = audioop.tomono(data, 2, 0.5, 0.5)
+
+        if self._resample:
+            if self._sinc:
+                data = self._sinc.resample(data)
+            else:
+                weight_a, weight_b = _ratecv_weights[self.quality]
+                data, self._ratecv_state = audioop.ratecv(data, 2, 
+                    self._channels, 
+                    source_format.sample_rate, target_format.sample_rate,
+                    self._ratecv_state, weight_a, weight_b)
+
+        if source_format.channels == 1 and target_format.channels == 2:
+            data = audioop.tostereo(data, 2, 1, 1)
+
+        if target_format.sample_size == 8:
+            data = audioop.bias(audioop.lin2lin(data, 2, 1), 1, 128)
+
+        return data
+
+class ConvertedSource(Source):
+    '''A source whose audio data is converted to another format as it is
+    played.
+
+    Video frames are passed through unchanged.  `SourceGroup` wraps queued
+    sources in this class automatically when their format differs from the
+    group's.
+    '''
+
+    def __init__(self, source, audio_format, quality=None):
+        '''Wrap a source.
+
+        :Parameters:
+            `source` : `Source`
+                Queue source to convert.
+            `audio_format` : `AudioFormat`
+                Format to produce.
+            `quality` : str
+                Resampler quality; see `AudioConverter`.
+
+        '''
+        self._source = source
+        self._converter = AudioConverter(source.audio_format, audio_format,
+                                         quality)
+        self.audio_format = audio_format
+        self.video_format = source.video_format
+        self.info = source.info
+        self._duration = source.duration
+
+    def seek(self, timestamp):
+        self._source.seek(timestamp)
+        self._converter.reset()
+
+    def get_audio_data(self, bytes):
+        converter = self._converter
+        source_bytes = converter.get_source_bytes(bytes)
+        timestamp = None
+        events = []
+        while True:
+            audio_data = self._source.get_audio_data(source_bytes)
+            if not audio_data:
+                return None
+
+            # A packet may convert to no data, its samples being kept by
+            # the converter; they (and its events) start the next packet.
+            if timestamp is None:
+                timestamp = audio_data.timestamp
+            events.extend(audio_data.events)
+            data = converter.convert(audio_data.get_string_data())
+            if data:
+                break
+
+        duration = len(data) / float(self.audio_format.bytes_per_second)
+        return AudioData(data, len(data), timestamp, duration, events)
+
+    def get_next_video_timestamp(self):
+        return self._source.get_next_video_timestamp()
+
+    def get_next_video_frame(self):
+        return self._source.get_next_video_frame()
+
+    def skip_video_frame(self):
+        self._source.skip_video_frame()
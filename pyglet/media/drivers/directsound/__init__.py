@@ -528,6 +528,7 @@ class DirectSoundDriver(AbstractAudioDriver):
         ux, uy, uz = self._up_orientation
         self._listener.SetOrientation(x, y, -z, ux, uy, -uz, lib.DS3D_IMMEDIATE)
 
+@pyglet._profile_startup('create directsound audio driver')
 def create_audio_driver():
     global driver
     driver = DirectSoundDriver()
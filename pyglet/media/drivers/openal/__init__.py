@@ -43,7 +43,8 @@ import atexit
 import lib_openal as al
 import lib_alc as alc
 from pyglet.media import MediaException, MediaEvent, AbstractAudioPlayer, \
-    AbstractAudioDriver, AbstractListener, MediaThread
+    AbstractAudioDriver, AbstractListener, MediaThread, AudioClock, \
+    _MediaEventBatch
 
 import pyglet
 _debug = pyglet.options['debug_media']
@@ -293,6 +294,9 @@ class OpenALAudioPlayer(AbstractAudioPlayer):
         if not context.have_1_1:
             self._buffer_system_time = time.time()
 
+        # Sample-counted play cursor, interpolated between updates.
+        self._clock = AudioClock(audio_format.sample_rate)
+
         self.refill(self._ideal_buffer_size)
 
     def __del__(self):
@@ -332,6 +336,9 @@ class OpenALAudioPlayer(AbstractAudioPlayer):
         if _debug:
             print 'OpenALAudioPlayer.play()'
         self._playing = True
+        self._lock.acquire()
+        self._clock.play()
+        self._lock.release()
         self._al_play()
         if not context.have_1_1:
             self._buffer_system_time = time.time()
@@ -359,6 +366,9 @@ class OpenALAudioPlayer(AbstractAudioPlayer):
         al.alSourcePause(self._al_source)
         context.unlock()
         self._playing = False
+        self._lock.acquire()
+        self._clock.pause()
+        self._lock.release()
 
         context.worker.remove(self)
 
@@ -372,6 +382,12 @@ class OpenALAudioPlayer(AbstractAudioPlayer):
         al.alSourceStop(self._al_source)
         self._playing = False
 
+        # The samples queued will not be played; hold the clock at the end
+        # of them instead of interpolating along the old timeline.
+        self._clock.pause()
+        self._clock.update(self._write_cursor //
+                           self.source_group.audio_format.bytes_per_sample)
+
         del self._events[:]
         self._underrun_timestamp = None
         self._buffer_timestamps = [None for _ in self._buffer_timestamps]
@@ -436,10 +452,16 @@ class OpenALAudioPlayer(AbstractAudioPlayer):
                     (time.time() - self._buffer_system_time) * \
                         self.source_group.audio_format.bytes_per_second)
 
-        # Process events
+        self._clock.update(self._play_cursor // 
+                           self.source_group.audio_format.bytes_per_sample)
+
+        # Process events, dispatching all that are due together
+        events = []
         while self._events and self._events[0][0] < self._play_cursor:
             _, event = self._events.pop(0)
-            event._sync_dispatch_to_player(self.player)
+            events.append(event)
+        if events:
+            _MediaEventBatch(self.player, events).post()
 
         self._lock.release()
 
@@ -494,6 +516,8 @@ class OpenALAudioPlayer(AbstractAudioPlayer):
             context.unlock()
 
             self._write_cursor += audio_data.length
+            self._clock.write(audio_data.length //
+                              self.source_group.audio_format.bytes_per_sample)
             self._buffer_sizes.append(audio_data.length)
             self._buffer_timestamps.append(audio_data.timestamp)
             write_size -= audio_data.length
@@ -512,17 +536,25 @@ class OpenALAudioPlayer(AbstractAudioPlayer):
         self._lock.release()
 
     def get_time(self):
+        self._lock.acquire()
         try:
-            buffer_timestamp = self._buffer_timestamps[0]
-        except IndexError:
-            return self._underrun_timestamp
-
-        if buffer_timestamp is None:
-            return None
-
-        return buffer_timestamp + \
-            (self._play_cursor - self._buffer_cursor) / \
-                float(self.source_group.audio_format.bytes_per_second)
+            try:
+                buffer_timestamp = self._buffer_timestamps[0]
+            except IndexError:
+                return self._underrun_timestamp
+
+            if buffer_timestamp is None:
+                return None
+
+            # Interpolate the play cursor past the last update.
+            audio_format = self.source_group.audio_format
+            play_cursor = self._clock.get_samples() * \
+                audio_format.bytes_per_sample
+            return buffer_timestamp + \
+                (play_cursor - self._buffer_cursor) / \
+                    float(audio_format.bytes_per_second)
+        finally:
+            self._lock.release()
 
     def set_volume(self, volume):
         context.lock()
@@ -675,6 +707,7 @@ class OpenALListener(AbstractListener):
 
 context = None
 
+@pyglet._profile_startup('create openal audio driver')
 def create_audio_driver(device_name=None):
     global context
     context = OpenALDriver(device_name)
@@ -543,6 +543,7 @@ class PulseAudioPlayer(AbstractAudioPlayer):
                                         None)
                                         
 
+@pyglet._profile_startup('create pulse audio driver')
 def create_audio_driver():
     global context
     context = PulseAudioDriver()
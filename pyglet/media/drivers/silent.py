@@ -9,7 +9,7 @@ __version__ = '$Id$'
 import time
 
 from pyglet.media import AbstractAudioPlayer, AbstractAudioDriver, \
-                         MediaThread, MediaEvent
+                         MediaThread, MediaEvent, AudioClock, _MediaEventBatch
 
 import pyglet
 _debug = pyglet.options['debug_media']
@@ -36,16 +36,20 @@ class SilentAudioPlayerPacketConsumer(AbstractAudioPlayer):
     def __init__(self, source_group, player):
         super(SilentAudioPlayerPacketConsumer, self).__init__(source_group, player)
 
-        # System time of first timestamp
-        self._timestamp_time = None
+        # The silent "device" plays samples in real time, counted by the
+        # clock.
+        self._clock = AudioClock(source_group.audio_format.sample_rate)
+
+        # Clock position already consumed from the buffered packets.
+        self._consumed_samples = 0
 
         # List of buffered SilentAudioPacket
         self._packets = []
         self._packets_duration = 0
-        self._events = []
 
         # Actual play state.
         self._playing = False
+        self._eos = False
 
         # TODO Be nice to avoid creating this thread if user doesn't care
         #      about EOS events and there's no video format.
@@ -66,7 +70,7 @@ class SilentAudioPlayerPacketConsumer(AbstractAudioPlayer):
         self._thread.condition.acquire()
         if not self._playing:
             self._playing = True
-            self._timestamp_time = time.time()
+            self._clock.play()
             self._thread.condition.notify()
         self._thread.condition.release()
 
@@ -76,11 +80,8 @@ class SilentAudioPlayerPacketConsumer(AbstractAudioPlayer):
 
         self._thread.condition.acquire()
         if self._playing:
-            timestamp = self.get_time()
-            if self._packets:
-                packet = self._packets[0]
-                self._packets_duration -= timestamp - packet.timestamp
-                packet.consume(timestamp - packet.timestamp)
+            self._consume_packets()
+            self._clock.pause()
             self._playing = False
         self._thread.condition.release()
 
@@ -91,39 +92,42 @@ class SilentAudioPlayerPacketConsumer(AbstractAudioPlayer):
         self._thread.condition.acquire()
         del self._packets[:]
         self._packets_duration = 0
-        del self._events[:]
+        self._consumed_samples = 0
+        self._clock.reset()
+        self._eos = False
         self._thread.condition.release()
 
+    def _consume_packets(self):
+        # Use up "buffered" audio up to the current clock position.  Must be
+        # called with the thread condition held.  Returns the position.
+        samples = self._clock.get_samples()
+        offset = (samples - self._consumed_samples) / \
+            float(self._clock.sample_rate)
+        self._consumed_samples = samples
+
+        packets = self._packets
+        while packets:
+            packet = packets[0]
+            if offset > packet.duration:
+                del packets[0]
+                offset -= packet.duration
+                self._packets_duration -= packet.duration
+            else:
+                packet.consume(offset)
+                self._packets_duration -= offset
+                break
+        return samples
+
     def get_time(self):
         if _debug:
             print 'SilentAudioPlayer.get_time()'
         self._thread.condition.acquire()
 
-        packets = self._packets
-
-        if self._playing:
-            # Consume timestamps
-            result = None
-            offset = time.time() - self._timestamp_time
-            while packets:
-                packet = packets[0]
-                if offset > packet.duration:
-                    del packets[0]
-                    self._timestamp_time += packet.duration
-                    offset -= packet.duration
-                    self._packets_duration -= packet.duration
-                else:
-                    packet.consume(offset)
-                    self._packets_duration -= offset
-                    self._timestamp_time += offset
-                    result = packet.timestamp
-                    break
+        self._consume_packets()
+        if self._packets:
+            result = self._packets[0].timestamp
         else:
-            # Paused
-            if packets:
-                result = packets[0].timestamp
-            else:
-                result = None
+            result = None
 
         self._thread.condition.release()
 
@@ -134,60 +138,59 @@ class SilentAudioPlayerPacketConsumer(AbstractAudioPlayer):
     # Worker func that consumes audio data and dispatches events
     def _worker_func(self):
         thread = self._thread
-        #buffered_time = 0
-        eos = False
-        events = self._events
+        clock = self._clock
+        audio_format = self.source_group.audio_format
 
         while True:
             thread.condition.acquire()
-            if thread.stopped or (eos and not events):
+            if thread.stopped or (self._eos and
+                                  clock.get_next_event_samples() is None):
                 thread.condition.release()
                 break
 
-            # Use up "buffered" audio based on amount of time passed.
-            timestamp = self.get_time()
+            samples = self._consume_packets()
             if _debug:
-                print 'timestamp: %r' % timestamp
+                print 'samples: %r' % samples
 
-            # Dispatch events
-            while events and timestamp is not None:
-                if (events[0].timestamp is None or
-                    events[0].timestamp <= timestamp):
-                    events[0]._sync_dispatch_to_player(self.player)
-                    del events[0]
+            # Dispatch all events that are due together
+            events = clock.get_due_events(samples)
+            if events:
+                _MediaEventBatch(self.player, events).post()
 
             # Calculate how much data to request from source
             secs = self._buffer_time - self._packets_duration
-            bytes = secs * self.source_group.audio_format.bytes_per_second
+            bytes = secs * audio_format.bytes_per_second
             if _debug:
                 print 'Trying to buffer %d bytes (%r secs)' % (bytes, secs)
 
-            while bytes > self._min_update_bytes and not eos:
+            while bytes > self._min_update_bytes and not self._eos:
                 # Pull audio data from source
                 audio_data = self.source_group.get_audio_data(int(bytes))
-                if not audio_data and not eos:
-                    events.append(MediaEvent(timestamp, 'on_eos'))
-                    events.append(MediaEvent(timestamp, 'on_source_group_eos'))
-                    eos = True
+                if not audio_data:
+                    clock.schedule_event(clock.written,
+                                         MediaEvent(0, 'on_eos'))
+                    clock.schedule_event(clock.written,
+                                         MediaEvent(0, 'on_source_group_eos'))
+                    self._eos = True
                     break
-    
+
                 # Pretend to buffer audio data, collect events.
-                if self._playing and not self._packets:
-                    self._timestamp_time = time.time()
+                for event in audio_data.events:
+                    clock.schedule_event(clock.written + 
+                        int(event.timestamp * audio_format.sample_rate), event)
+                clock.write(audio_data.length // audio_format.bytes_per_sample)
                 self._packets.append(SilentAudioPacket(audio_data.timestamp,
                                                        audio_data.duration))
                 self._packets_duration += audio_data.duration
-                for event in audio_data.events:
-                    event.timestamp += audio_data.timestamp
-                    events.append(event)
-                events.extend(audio_data.events)
                 bytes -= audio_data.length
 
             sleep_time = self._sleep_time
+            next_event = clock.get_next_event_samples()
             if not self._playing:
                 sleep_time = None
-            elif events and events[0].timestamp and timestamp:
-                sleep_time = min(sleep_time, events[0].timestamp - timestamp)
+            elif next_event is not None:
+                sleep_time = min(sleep_time, 
+                    max(0, next_event - samples) / float(clock.sample_rate))
 
             if _debug:
                 print 'SilentAudioPlayer(Worker).sleep', sleep_time
@@ -233,6 +236,7 @@ class SilentAudioDriver(AbstractAudioDriver):
         else:
             return SilentTimeAudioPlayer(source_group, player)
 
+@pyglet._profile_startup('create silent audio driver')
 def create_audio_driver():
     return SilentAudioDriver()
 
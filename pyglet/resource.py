@@ -48,6 +48,13 @@ As well as providing file references (with the `file` function), the resource
 module also contains convenience functions for loading images, textures,
 fonts, media and documents.
 
+Resources can also be loaded in the background, without blocking the main
+thread, with the ``_async`` functions such as `image_async`.  These return a
+`LoadFuture`, which completes while the application's clock is running::
+
+    future = resource.image_async('zone2/tiles.png', priority=1)
+    future.add_done_callback(lambda future: add_tiles(future.result()))
+
 3rd party modules or packages not bound to a specific application should
 construct their own `Loader` instance and override the path to use the
 resources in the module's directory.
@@ -81,19 +88,31 @@ platforms.
 The default path is ``['.']``.  If you modify the path, you must call
 `reindex`.
 
+ZIP files on the path are read through a memory map (see `ZIPArchive`), so
+members stored without compression are not copied into memory before they are
+read.  The ``tools/pack_resources.py`` script creates such archives, with an
+index that saves listing the archive each time the path is indexed.
+
 :since: pyglet 1.1
 '''
 
 __docformat__ = 'restructuredtext'
 __version__ = '$Id: $'
 
+import collections
+import heapq
+import mmap
 import os
+import struct
+import threading
+import time
 import weakref
 import sys
 import zipfile
+import zlib
 
 import pyglet
-from pyglet.compat import BytesIO
+from pyglet.compat import BytesIO, asbytes
 
 class ResourceNotFoundException(Exception):
     '''The named resource was not found on the search path.'''
@@ -178,6 +197,597 @@ def get_settings_path(name):
     else:
         return os.path.expanduser('~/.%s' % name)
 
+class LoadCancelledException(Exception):
+    '''The result of a cancelled `LoadFuture` was requested.'''
+    pass
+
+class LoadFuture(object):
+    '''Handle to a resource being loaded in the background.
+
+    Futures are returned by the ``_async`` methods of `Loader`, such as
+    `Loader.image_async`.  The file is read and decoded by a worker thread;
+    any steps that need OpenGL (such as creating textures) are then completed
+    on the main thread by a function scheduled with
+    `pyglet.clock.schedule_once`, so the application's clock must be ticking
+    (for example, by `pyglet.app.run`) for futures to complete.
+
+    Futures must only be used from the main thread.
+
+    :Ivariables:
+        `name` : str
+            Filename of the resource being loaded.
+        `priority` : int
+            Futures with higher priority are loaded first.  Use
+            `set_priority` to change it.
+
+    :since: pyglet 1.2
+    '''
+    _pending = 'pending'
+    _running = 'running'
+    _decoded = 'decoded'
+    _done = 'done'
+    _cancelled = 'cancelled'
+
+    def __init__(self, queue, name, priority, decode, finish=None):
+        self.name = name
+        self.priority = priority
+        self._queue = queue
+        self._decode = decode
+        self._finish = finish
+        self._state = self._pending
+        self._result = None
+        self._exc_info = None
+        self._callbacks = []
+
+    def __repr__(self):
+        return '<%s %r %s>' % (self.__class__.__name__, self.name, 
+                               self._state)
+
+    def done(self):
+        '''Determine if the future has completed or been cancelled.
+
+        :rtype: bool
+        '''
+        return self._state in (self._done, self._cancelled)
+
+    def cancelled(self):
+        '''Determine if the future was cancelled.
+
+        :rtype: bool
+        '''
+        return self._state == self._cancelled
+
+    def cancel(self):
+        '''Cancel loading the resource.
+
+        A resource already being decoded by a worker thread finishes decoding,
+        but its result is discarded.  Done callbacks are called immediately.
+
+        :rtype: bool
+        :return: False if the future had already completed, otherwise True.
+        '''
+        if self.done():
+            return False
+        self._state = self._cancelled
+        self._queue._finished(self)
+        self._decode = self._finish = None
+        self._call_callbacks()
+        return True
+
+    def set_priority(self, priority):
+        '''Change the priority of the future.
+
+        This has no effect once a worker thread has started decoding the
+        resource.
+
+        :Parameters:
+            `priority` : int
+                The new priority.  Futures with higher priority are loaded
+                first.
+
+        '''
+        self.priority = priority
+        if self._state == self._pending:
+            self._queue._reprioritize(self)
+
+    def add_done_callback(self, callback):
+        '''Add a function to call when the future completes or is
+        cancelled.
+
+        The function is called on the main thread with the future as its
+        only argument.  If the future is already done it is called
+        immediately.
+
+        :Parameters:
+            `callback` : callable
+                The function to call.
+
+        '''
+        if self.done():
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def result(self):
+        '''Get the loaded resource, waiting for it if necessary.
+
+        A future that no worker thread has started yet is loaded immediately
+        on the calling thread; one that is being decoded is waited for.
+
+        :raise LoadCancelledException: if the future was cancelled.
+        :raise Exception: the exception raised while loading the resource,
+            if any.
+        '''
+        if self._queue._take(self):
+            self._result, self._exc_info = self._run()
+            self._state = self._decoded
+        else:
+            self._queue._wait(self)
+        self._complete()
+
+        if self._state == self._cancelled:
+            raise LoadCancelledException(self.name)
+        if self._exc_info:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._result
+
+    def exception(self):
+        '''Get the exception raised while loading the resource, waiting for
+        it if necessary (see `result`).
+
+        :rtype: Exception
+        :return: The exception, or None if the resource loaded successfully.
+        '''
+        try:
+            self.result()
+        except LoadCancelledException:
+            raise
+        except Exception:
+            pass
+        return self._exc_info and self._exc_info[1]
+
+    def _run(self):
+        # Called on a worker thread (or the main thread, from `result`) once
+        # the future has been taken from the queue.
+        try:
+            return self._decode(), None
+        except Exception:
+            return None, sys.exc_info()
+
+    def _complete(self):
+        # Called on the main thread once decoded.
+        if self._state != self._decoded:
+            return
+        self._queue._finished(self)
+        if self._finish and not self._exc_info:
+            try:
+                self._result = self._finish(self._result)
+            except Exception:
+                self._exc_info = sys.exc_info()
+        self._state = self._done
+        self._decode = self._finish = None
+        self._call_callbacks()
+
+    def _call_callbacks(self):
+        callbacks = self._callbacks
+        self._callbacks = []
+        for callback in callbacks:
+            callback(self)
+
+class _LoadQueue(object):
+    # Priority queue of futures, decoded by up to `workers` threads.  Decoded
+    # futures are completed on the main thread, by a function that keeps
+    # rescheduling itself with the clock while any futures are outstanding,
+    # spending at most `time_budget` seconds on each tick (but completing at
+    # least one future).
+    def __init__(self, workers, time_budget):
+        self.workers = workers
+        self.time_budget = time_budget
+        self._condition = threading.Condition()
+        self._heap = []
+        self._entries = {}
+        self._sequence = 0
+        self._decoded = collections.deque()
+        self._outstanding = 0
+        self._threads = []
+        self._scheduled = False
+
+    def submit(self, future):
+        self._condition.acquire()
+        try:
+            self._push(future)
+            self._outstanding += 1
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work)
+                thread.setDaemon(True)
+                self._threads.append(thread)
+                thread.start()
+            self._condition.notify()
+        finally:
+            self._condition.release()
+        if not self._scheduled:
+            self._scheduled = True
+            pyglet.clock.schedule_once(self._dispatch, 0)
+
+    def _push(self, future):
+        # Entries are lists so a superseded entry can be disabled in place.
+        self._sequence += 1
+        entry = [-future.priority, self._sequence, future]
+        self._entries[future] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _reprioritize(self, future):
+        self._condition.acquire()
+        try:
+            entry = self._entries.get(future)
+            if entry and entry[2] is future:
+                entry[2] = None
+                self._push(future)
+        finally:
+            self._condition.release()
+
+    def _take(self, future):
+        # Remove a pending future from the queue so the caller can run it.
+        self._condition.acquire()
+        try:
+            entry = self._entries.pop(future, None)
+            if not entry:
+                return False
+            entry[2] = None
+            future._state = future._running
+            return True
+        finally:
+            self._condition.release()
+
+    def _finished(self, future):
+        # The future has completed or been cancelled.
+        self._condition.acquire()
+        try:
+            entry = self._entries.pop(future, None)
+            if entry:
+                entry[2] = None
+            if future in self._decoded:
+                self._decoded.remove(future)
+            self._outstanding -= 1
+        finally:
+            self._condition.release()
+
+    def _wait(self, future):
+        self._condition.acquire()
+        try:
+            while future._state == future._running:
+                self._condition.wait()
+        finally:
+            self._condition.release()
+
+    def _work(self):
+        while True:
+            self._condition.acquire()
+            try:
+                future = None
+                while future is None:
+                    while not self._heap:
+                        self._condition.wait()
+                    future = heapq.heappop(self._heap)[2]
+                del self._entries[future]
+                future._state = future._running
+            finally:
+                self._condition.release()
+
+            result, exc_info = future._run()
+
+            self._condition.acquire()
+            try:
+                # The future may have been cancelled meanwhile.
+                if future._state == future._running:
+                    future._result = result
+                    future._exc_info = exc_info
+                    future._state = future._decoded
+                    self._decoded.append(future)
+                self._condition.notifyAll()
+            finally:
+                self._condition.release()
+
+    def _dispatch(self, dt):
+        start = time.time()
+        try:
+            while self._decoded:
+                self._decoded[0]._complete()
+                if time.time() - start > self.time_budget:
+                    break
+        finally:
+            # A failing done-callback must not stop later futures from
+            # completing.
+            if self._outstanding:
+                pyglet.clock.schedule_once(self._dispatch, 0)
+            else:
+                self._scheduled = False
+
+def get_resource_size(resource):
+    '''Estimate the texture memory used by a loaded resource.
+
+    Textures count their width times height times the size of a texel of
+    their internal format; texture regions (for example, images in an atlas)
+    count only their own area.  Animations count each distinct frame image.
+    Other resources count as 0 bytes.
+
+    :Parameters:
+        `resource` : object
+            A `Texture`, `TextureRegion`, `Animation` or other resource.
+
+    :rtype: int
+    :since: pyglet 1.2
+    '''
+    from pyglet import gl
+    from pyglet import image
+    if isinstance(resource, image.Animation):
+        images = dict((id(frame.image), frame.image) \
+                      for frame in resource.frames)
+        return sum([get_resource_size(image) for image in images.values()])
+    elif isinstance(resource, image.Texture):
+        owner = getattr(resource, 'owner', resource)
+        texel_size = {
+            gl.GL_ALPHA: 1,
+            gl.GL_LUMINANCE: 1,
+            gl.GL_LUMINANCE_ALPHA: 2,
+            gl.GL_RGB: 3,
+        }.get(owner.internalformat, 4)
+        return resource.width * resource.height * texel_size
+    return 0
+
+class _LRUDict(object):
+    # Map that keeps its keys in the order they were set, oldest first, in
+    # a circular doubly linked list of [prev, next, key, value] links.
+    # Setting a key makes it the newest.  Provides the parts of
+    # collections.OrderedDict (new in Python 2.7) used by the caches here.
+    def __init__(self):
+        self._links = {}
+        self._root = root = []
+        root[:] = [root, root, None, None]
+
+    def __len__(self):
+        return len(self._links)
+
+    def __contains__(self, key):
+        return key in self._links
+
+    def __iter__(self):
+        root = self._root
+        link = root[1]
+        while link is not root:
+            yield link[2]
+            link = link[1]
+
+    def __getitem__(self, key):
+        return self._links[key][3]
+
+    def __setitem__(self, key, value):
+        self.pop(key, None)
+        root = self._root
+        last = root[0]
+        link = [last, root, key, value]
+        last[1] = root[0] = self._links[key] = link
+
+    def pop(self, key, *default):
+        try:
+            link = self._links.pop(key)
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        prev, next = link[0], link[1]
+        prev[1] = next
+        next[0] = prev
+        return link[3]
+
+    def popitem(self, last=True):
+        if not self._links:
+            raise KeyError('dictionary is empty')
+        if last:
+            key = self._root[0][2]
+        else:
+            key = self._root[1][2]
+        return key, self.pop(key)
+
+    def clear(self):
+        self._links.clear()
+        root = self._root
+        root[:] = [root, root, None, None]
+
+def _import_json():
+    # json is new in Python 2.6; simplejson provides it for earlier
+    # versions.  Returns None if neither is available.
+    try:
+        import json
+    except ImportError:
+        try:
+            import simplejson as json
+        except ImportError:
+            return None
+    return json
+
+class ResourceCache(object):
+    '''Cache of loaded resources with a memory budget.
+
+    Resources are cached under a kind (such as ``'image'``) and a name.
+    Every resource stays cached for as long as the application holds a
+    reference to it.  The most recently used resources are also kept alive
+    by the cache itself, up to `budget` bytes as estimated by
+    `get_resource_size`; the least recently used are released first.
+    Resources with a pinned name are always kept alive.
+
+    :Ivariables:
+        `budget` : int
+            Maximum number of bytes of unpinned resources kept alive.
+        `size` : int
+            Number of bytes of resources kept alive, including pinned ones.
+        `hits` : int
+            Number of lookups that found a cached resource.
+        `misses` : int
+            Number of resources loaded and added to the cache.
+        `evictions` : int
+            Number of resources released to keep within the budget.
+
+    :since: pyglet 1.2
+    '''
+    def __init__(self, budget):
+        '''Create an empty cache.
+
+        :Parameters:
+            `budget` : int
+                Maximum number of bytes of unpinned resources to keep alive.
+
+        '''
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._weak = {}
+        self._lru = _LRUDict()                  # (kind, name) -> (value, size)
+        self._pinned = {}                       # (kind, name) -> (value, size)
+        self._pinned_names = set()
+
+    def get_kind(self, kind):
+        '''Get a dictionary-like view of the resources of one kind.
+
+        The view supports ``in``, item access and assignment, `keys` and
+        `get`.
+
+        :rtype: `ResourceCacheView`
+        '''
+        return ResourceCacheView(self, kind)
+
+    def _get_weak(self, kind):
+        try:
+            return self._weak[kind]
+        except KeyError:
+            weak = self._weak[kind] = weakref.WeakValueDictionary()
+            return weak
+
+    def _get(self, kind, name):
+        value = self._get_weak(kind)[name]
+        self.hits += 1
+        self._keep(kind, name, value)
+        return value
+
+    def _set(self, kind, name, value):
+        self._get_weak(kind)[name] = value
+        self.misses += 1
+        self._keep(kind, name, value)
+
+    def _keep(self, kind, name, value):
+        key = (kind, name)
+        if key in self._pinned:
+            return
+        entry = self._lru.pop(key, None)
+        if entry is None or entry[0] is not value:
+            if entry:
+                self.size -= entry[1]
+            entry = (value, get_resource_size(value))
+            self.size += entry[1]
+        if name in self._pinned_names:
+            self._pinned[key] = entry
+        else:
+            self._lru[key] = entry
+            self._evict()
+
+    def _evict(self):
+        pinned_size = sum([size for value, size in self._pinned.values()])
+        while self._lru and self.size - pinned_size > self.budget:
+            key, (value, size) = self._lru.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+    def pin(self, name):
+        '''Keep resources with the given name alive regardless of the
+        budget, until `unpin` is called.
+
+        Resources loaded later with this name are pinned too.
+
+        :Parameters:
+            `name` : str
+                Filename of the resources to pin.
+
+        '''
+        self._pinned_names.add(name)
+        for key in list(self._lru):
+            if key[1] == name:
+                self._pinned[key] = self._lru.pop(key)
+        for kind, weak in self._weak.items():
+            value = weak.get(name)
+            if value is not None and (kind, name) not in self._pinned:
+                self._keep(kind, name, value)
+
+    def unpin(self, name):
+        '''Allow resources with the given name to be released again.
+
+        They become the most recently used resources.
+
+        :Parameters:
+            `name` : str
+                Filename of the resources to unpin.
+
+        '''
+        self._pinned_names.discard(name)
+        for key in list(self._pinned):
+            if key[1] == name:
+                self._lru[key] = self._pinned.pop(key)
+        self._evict()
+
+    def get_pinned_names(self):
+        '''Get the names of pinned resources.
+
+        :rtype: list of str
+        '''
+        return list(self._pinned_names)
+
+    def get_sizes(self, kind):
+        '''Get the estimated size of each cached resource of a kind.
+
+        This is useful for debugging and profiling only.
+
+        :rtype: dict
+        :return: Map of name to size in bytes.
+        '''
+        return dict((name, get_resource_size(value)) \
+                    for name, value in self._get_weak(kind).items())
+
+    def clear(self):
+        '''Release all resources kept alive by the cache, including pinned
+        ones.  Names stay pinned.
+        '''
+        self._lru.clear()
+        self._pinned.clear()
+        self.size = 0
+
+class ResourceCacheView(object):
+    '''Resources of one kind in a `ResourceCache`, accessed by name.
+
+    :since: pyglet 1.2
+    '''
+    def __init__(self, cache, kind):
+        self.cache = cache
+        self.kind = kind
+
+    def __contains__(self, name):
+        return name in self.cache._get_weak(self.kind)
+
+    def __getitem__(self, name):
+        return self.cache._get(self.kind, name)
+
+    def __setitem__(self, name, value):
+        self.cache._set(self.kind, name, value)
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.cache._get_weak(self.kind).keys()
+
 class Location(object):
     '''Abstract resource location.
 
@@ -233,15 +843,359 @@ class ZIPLocation(Location):
         '''
         self.zip = zip
         self.dir = dir
+        self._lock = threading.Lock()
 
     def open(self, filename, mode='rb'):
         if self.dir:
             path = self.dir + '/' + filename
         else:
             path = filename
-        text = self.zip.read(path)
+        # ZipFile can't be read from several threads at once.
+        self._lock.acquire()
+        try:
+            text = self.zip.read(path)
+        finally:
+            self._lock.release()
         return BytesIO(text)
 
+class _MappedFile(object):
+    # Read-only file object over a slice of a memory map.  Data is copied
+    # out of the map only as it is read.
+    def __init__(self, map, offset, size, name):
+        self._map = map
+        self._start = offset
+        self._end = offset + size
+        self._position = offset
+        self.name = name
+
+    def read(self, size=-1):
+        start = self._position
+        if size < 0:
+            end = self._end
+        else:
+            end = min(start + size, self._end)
+        self._position = max(start, end)
+        return self._map[start:end]
+
+    def readline(self):
+        end = self._map.find(asbytes('\n'), self._position)
+        if end < 0 or end >= self._end:
+            return self.read()
+        return self.read(end + 1 - self._position)
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._position - self._start
+        elif whence == 2:
+            offset += self._end - self._start
+        self._position = self._start + max(offset, 0)
+
+    def tell(self):
+        return self._position - self._start
+
+    def close(self):
+        self._map = None
+
+class _InflatingFile(object):
+    # Read-only file object decompressing a deflated slice of a memory map
+    # as it is read.  Seeking backwards starts again from the beginning.
+    chunk_size = 64 * 1024
+
+    def __init__(self, map, offset, compressed_size, name):
+        self._map = map
+        self._start = offset
+        self._end = offset + compressed_size
+        self.name = name
+        self._rewind()
+
+    def _rewind(self):
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        self._input = self._start
+        self._buffer = asbytes('')
+        self._position = 0
+
+    def _fill(self, size):
+        while (size < 0 or len(self._buffer) < size) and \
+              (self._input < self._end or 
+               self._decompressor.unconsumed_tail):
+            data = self._decompressor.unconsumed_tail
+            if not data:
+                end = min(self._input + self.chunk_size, self._end)
+                data = self._map[self._input:end]
+                self._input = end
+            self._buffer += self._decompressor.decompress(data, 
+                                                          self.chunk_size)
+
+    def read(self, size=-1):
+        self._fill(size)
+        if size < 0:
+            size = len(self._buffer)
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        self._position += len(data)
+        return data
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._position
+        elif whence == 2:
+            self.read()
+            offset += self._position
+        if offset < self._position:
+            self._rewind()
+        self.read(offset - self._position)
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        self._map = None
+
+class ZIPArchive(object):
+    '''A ZIP file read through a memory map.
+
+    Stored (uncompressed) members are read directly from the map, without
+    being copied into memory first.  Deflated members are decompressed as
+    they are read; those smaller than a quarter of `cache_size` are
+    decompressed completely and kept in a cache of at most `cache_size` bytes,
+    least recently used first out.  Members compressed with other methods
+    are read with the ``zipfile`` module.
+
+    Listing the members of a large archive can take some time; an index
+    written with `write_index` is used instead of reading the archive's
+    central directory, as long as the archive has not been modified since.
+
+    :Ivariables:
+        `path` : str
+            Filename of the archive.
+        `entries` : dict
+            Map of member name to tuple ``(offset, size, compressed_size,
+            compress_type)``, where ``offset`` is the position of the
+            member's data within the archive.
+
+    :since: pyglet 1.2
+    '''
+    #: Default maximum number of bytes of decompressed members to cache.
+    cache_size = 16 * 1024 * 1024
+
+    def __init__(self, path, cache_size=None):
+        '''Open a ZIP file.
+
+        :Parameters:
+            `path` : str
+                Filename of the ZIP file.
+            `cache_size` : int
+                Maximum number of bytes of decompressed members to cache.
+
+        '''
+        self.path = path
+        if cache_size is not None:
+            self.cache_size = cache_size
+        self._cache = _LRUDict()
+        self._cache_used = 0
+        self._lock = threading.Lock()
+        self._stat = self._get_stat()
+
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, 
+                                  access=mmap.ACCESS_READ)
+        except:
+            self._file.close()
+            raise
+        self.entries = self._read_index()
+        if self.entries is None:
+            self.entries = self._read_entries()
+
+    def _get_stat(self):
+        stat = os.stat(self.path)
+        return stat.st_size, int(stat.st_mtime)
+
+    def is_modified(self):
+        '''Determine if the archive has changed on disk since it was
+        opened.
+
+        :rtype: bool
+        '''
+        try:
+            return self._get_stat() != self._stat
+        except OSError:
+            return True
+
+    def get_index_filename(self):
+        '''Get the filename of the index written by `write_index`.
+
+        :rtype: str
+        '''
+        return self.path + '.index'
+
+    def _read_index(self):
+        json = _import_json()
+        if json is None:
+            return None
+        try:
+            file = open(self.get_index_filename(), 'rb')
+        except IOError:
+            return None
+        try:
+            index = json.load(file)
+        except ValueError:
+            return None
+        finally:
+            file.close()
+        if index.get('version') != 2 or \
+           tuple(index.get('stat', ())) != self._stat:
+            return None
+        entries = {}
+        for item in index['entries']:
+            name, is_unicode, entry = item[0], item[1], tuple(item[2:])
+            if not is_unicode:
+                name = name.encode('latin-1')
+            entries[name] = entry
+        return entries
+
+    def write_index(self, filename=None):
+        '''Write an index of the archive's members.
+
+        Archives opened later find their members from the index rather than
+        reading the ZIP central directory.  The index is ignored if the
+        archive is modified after it is written.
+
+        The index is written as JSON, which requires Python 2.6 or later, or
+        the ``simplejson`` module; without them, indexes are neither written
+        nor read.
+
+        :Parameters:
+            `filename` : str
+                Filename to write to.  Defaults to the result of
+                `get_index_filename`, which is where the index is looked for.
+
+        '''
+        json = _import_json()
+        if json is None:
+            raise ImportError('Writing an index requires the json or '
+                              'simplejson module')
+        if filename is None:
+            filename = self.get_index_filename()
+        # Names are byte strings unless zipfile decoded them from UTF-8.
+        # JSON only holds unicode, so byte strings are stored through
+        # latin-1, which maps each byte to one character, and flagged to be
+        # encoded back to the same name.
+        entries = []
+        for name, entry in self.entries.items():
+            if isinstance(name, unicode):
+                entries.append([name, True] + list(entry))
+            else:
+                entries.append([name.decode('latin-1'), False] + list(entry))
+        index = {
+            'version': 2,
+            'stat': self._stat,
+            'entries': entries,
+        }
+        file = open(filename, 'wb')
+        try:
+            json.dump(index, file)
+        finally:
+            file.close()
+
+    def _read_entries(self):
+        # The local file header of each member can have different extra
+        # data to the central directory, so its length is read from the
+        # header itself (section 4.3.7 of the ZIP specification).
+        zip = zipfile.ZipFile(self._file)
+        entries = {}
+        for info in zip.infolist():
+            if info.filename.endswith('/'):
+                continue
+            header = self._map[info.header_offset:info.header_offset + 30]
+            if len(header) < 30 or header[:4] != asbytes('PK\x03\x04'):
+                raise zipfile.BadZipfile(
+                    'Bad local file header for %r' % info.filename)
+            name_length, extra_length = struct.unpack('<HH', header[26:30])
+            offset = info.header_offset + 30 + name_length + extra_length
+            entries[info.filename] = (offset, info.file_size,
+                                      info.compress_size, info.compress_type)
+        return entries
+
+    def open(self, name):
+        '''Open a member of the archive for reading.
+
+        :Parameters:
+            `name` : str
+                Full name of the member within the archive.
+
+        :rtype: file object
+        '''
+        try:
+            offset, size, compressed_size, compress_type = self.entries[name]
+        except KeyError:
+            raise ResourceNotFoundException(name)
+
+        if compress_type == zipfile.ZIP_STORED:
+            return _MappedFile(self._map, offset, size, name)
+        elif compress_type != zipfile.ZIP_DEFLATED:
+            zip = zipfile.ZipFile(self.path)
+            try:
+                return BytesIO(zip.read(name))
+            finally:
+                zip.close()
+        elif size * 4 > self.cache_size:
+            return _InflatingFile(self._map, offset, compressed_size, name)
+
+        self._lock.acquire()
+        try:
+            try:
+                data = self._cache.pop(name)
+            except KeyError:
+                data = zlib.decompress(
+                    self._map[offset:offset + compressed_size],
+                    -zlib.MAX_WBITS)
+                self._cache_used += len(data)
+                while self._cache_used > self.cache_size:
+                    self._cache_used -= \
+                        len(self._cache.popitem(last=False)[1])
+            self._cache[name] = data
+        finally:
+            self._lock.release()
+        return BytesIO(data)
+
+    def close(self):
+        '''Close the archive.
+
+        Files opened from stored members must not be read after the archive
+        is closed.
+        '''
+        self._cache.clear()
+        self._cache_used = 0
+        self._map.close()
+        self._file.close()
+
+class ArchiveLocation(Location):
+    '''Location within a `ZIPArchive`.
+
+    :since: pyglet 1.2
+    '''
+    def __init__(self, archive, dir):
+        '''Create a location given an open archive and a path within it.
+
+        :Parameters:
+            `archive` : `ZIPArchive`
+                An open archive.
+            `dir` : str
+                A path within the archive.  Can be empty to specify files at
+                the top level of the archive.
+
+        '''
+        self.archive = archive
+        self.dir = dir
+
+    def open(self, filename, mode='rb'):
+        if self.dir:
+            path = self.dir + '/' + filename
+        else:
+            path = filename
+        return self.archive.open(path)
+
 class URLLocation(Location):
     '''Location on the network.
 
@@ -277,8 +1231,25 @@ class Loader(object):
         `script_home` : str
             Base resource location, defaulting to the location of the
             application script.
+        `cache` : `ResourceCache`
+            Cache of loaded images, animations and textures, with hit,
+            miss and eviction counts.  Replaced by `reindex`.
 
     '''
+    #: Bytes of texture memory kept alive by `cache` for recently used
+    #: images, textures and animations no longer referenced elsewhere.
+    #: Takes effect on the next `reindex`.
+    cache_budget = 64 * 1024 * 1024
+
+    #: Maximum number of resources decoded at once by the ``_async``
+    #: methods, each in its own worker thread.
+    async_workers = 2
+
+    #: Seconds spent on each clock tick completing resources loaded by the
+    #: ``_async`` methods (for example, uploading textures).  At least one
+    #: resource is completed on each tick regardless.
+    async_time_budget = 0.004
+
     def __init__(self, path=None, script_home=None):
         '''Create a loader for the given path.
 
@@ -308,6 +1279,16 @@ class Loader(object):
         # Map bin size to list of atlases
         self._texture_atlas_bins = {}
 
+        # Map ZIP filename to ZIPArchive
+        self._archives = {}
+
+        # Map (ZIP filename, dir) to the index of the files within dir of
+        # the archive, so unmodified archives need not be listed again.
+        self._archive_indexes = {}
+
+        # Created when first needed by the _async methods
+        self._load_queue = None
+
     def _require_index(self):
         if self._index is None:
             self.reindex()
@@ -319,9 +1300,10 @@ class Loader(object):
         layout changes.
         '''
         # map name to image etc.
-        self._cached_textures = weakref.WeakValueDictionary()
-        self._cached_images = weakref.WeakValueDictionary()
-        self._cached_animations = weakref.WeakValueDictionary()
+        self.cache = ResourceCache(self.cache_budget)
+        self._cached_textures = self.cache.get_kind('texture')
+        self._cached_images = self.cache.get_kind('image')
+        self._cached_animations = self.cache.get_kind('animation')
 
         self._index = {}
         for path in self.path:
@@ -378,17 +1360,68 @@ class Loader(object):
                 dir = dir.rstrip('/')
 
                 # path is a ZIP file, dir resides within ZIP
-                if path and zipfile.is_zipfile(path):
+                if not path:
+                    continue
+                archive = self._get_archive(path)
+                if archive:
+                    self._merge_index(self._get_archive_index(archive, dir))
+                    continue
+                elif zipfile.is_zipfile(path):
                     zip = zipfile.ZipFile(path, 'r')
                     location = ZIPLocation(zip, dir)
-                    for zip_name in zip.namelist():
-                        #zip_name_dir, zip_name = os.path.split(zip_name)
-                        #assert '\\' not in name_dir
-                        #assert not name_dir.endswith('/')
-                        if zip_name.startswith(dir):
-                            if dir:
-                                zip_name = zip_name[len(dir)+1:]
-                            self._index_file(zip_name, location)
+                    zip_names = zip.namelist()
+                else:
+                    continue
+                for zip_name in zip_names:
+                    #zip_name_dir, zip_name = os.path.split(zip_name)
+                    #assert '\\' not in name_dir
+                    #assert not name_dir.endswith('/')
+                    if zip_name.startswith(dir):
+                        if dir:
+                            zip_name = zip_name[len(dir)+1:]
+                        self._index_file(zip_name, location)
+
+    def _get_archive(self, path):
+        # Archives are kept open between calls to `reindex`, so unmodified
+        # archives need not be listed again.  Returns None if the file is
+        # not a ZIP file or cannot be memory mapped.
+        archive = self._archives.get(path)
+        if archive and not archive.is_modified():
+            return archive
+        if archive:
+            archive.close()
+            del self._archives[path]
+            for key in self._archive_indexes.keys():
+                if key[0] == path:
+                    del self._archive_indexes[key]
+        try:
+            archive = ZIPArchive(path)
+        except (EnvironmentError, ValueError, zipfile.BadZipfile):
+            return None
+        self._archives[path] = archive
+        return archive
+
+    def _get_archive_index(self, archive, dir):
+        key = (archive.path, dir)
+        index = self._archive_indexes.get(key)
+        if index is None:
+            location = ArchiveLocation(archive, dir)
+            index = {}
+            for zip_name in archive.entries:
+                if zip_name.startswith(dir):
+                    if dir:
+                        zip_name = zip_name[len(dir)+1:]
+                    if zip_name not in index:
+                        index[zip_name] = location
+            self._archive_indexes[key] = index
+        return index
+
+    def _merge_index(self, index):
+        # Files already indexed were found on an earlier path, so they take
+        # precedence.
+        merged = index.copy()
+        merged.update(self._index)
+        self._index = merged
 
     def _index_file(self, name, location):
         if name not in self._index:
@@ -454,13 +1487,17 @@ class Loader(object):
         file = self.file(name)
         font.add_file(file)
 
-    def _alloc_image(self, name, atlas=True):
+    def _load_image(self, name):
         file = self.file(name)
         try:
-            img = pyglet.image.load(name, file=file)
+            return pyglet.image.load(name, file=file)
         finally:
             file.close()
 
+    def _alloc_image(self, name, atlas=True):
+        return self._create_image(self._load_image(name), atlas)
+
+    def _create_image(self, img, atlas=True):
         if not atlas:
             return img.get_texture(True)
 
@@ -533,6 +1570,83 @@ class Loader(object):
 
         return identity.get_transform(flip_x, flip_y, rotate)
 
+    def images(self, names, atlas=True, workers=None, processes=False,
+               callback=None):
+        '''Load several images, decoding them in parallel.
+
+        This has the same result as calling `image` for each name, but the
+        images not already cached are decoded together with
+        `pyglet.image.load_many`, and then packed into texture atlases
+        together with `TextureBin.add_many`.
+
+        :Parameters:
+            `names` : sequence of str
+                Filenames of the image sources to load.
+            `atlas` : bool
+                If True, images are loaded into atlases managed by pyglet,
+                as for `image`.
+            `workers` : int
+                Number of images to decode at once, as for
+                `pyglet.image.load_many`.
+            `processes` : bool
+                If True, decode in separate processes instead of threads.
+            `callback` : callable
+                Called as ``callback(count, total)`` whenever another image
+                has been decoded.
+
+        :rtype: list of `Texture`
+        :return: The textures or atlas regions, in the same order as
+            `names`.
+
+        :since: pyglet 1.2
+        '''
+        self._require_index()
+        names = list(names)
+        pending = []
+        for name in names:
+            if name not in self._cached_images and name not in pending:
+                pending.append(name)
+
+        # Files on disk are opened by the workers themselves, so that
+        # thousands of files are not held open at once.
+        filenames = []
+        files = []
+        for name in pending:
+            location = self.location(name)
+            if isinstance(location, FileLocation):
+                filenames.append(os.path.join(location.path, name))
+                files.append(None)
+            else:
+                filenames.append(name)
+                files.append(location.open(name))
+
+        try:
+            imgs = pyglet.image.load_many(filenames, files, workers=workers,
+                processes=processes, callback=callback)
+        finally:
+            for file in files:
+                if file:
+                    file.close()
+
+        textures = [None] * len(imgs)
+        bins = {}
+        for i, img in enumerate(imgs):
+            bin = None
+            if atlas:
+                bin = self._get_texture_atlas_bin(img.width, img.height)
+            if bin is None:
+                textures[i] = img.get_texture(True)
+            else:
+                bins.setdefault(bin, []).append(i)
+        for bin, indices in bins.items():
+            regions = bin.add_many([imgs[i] for i in indices])
+            for i, region in zip(indices, regions):
+                textures[i] = region
+
+        for name, texture in zip(pending, textures):
+            self._cached_images[name] = texture
+        return [self._cached_images[name] for name in names]
+
     def animation(self, name, flip_x=False, flip_y=False, rotate=0):
         '''Load an animation with optional transformation.
 
@@ -557,18 +1671,22 @@ class Loader(object):
             identity = self._cached_animations[name]
         except KeyError:
             animation = pyglet.image.load_animation(name, self.file(name))
-            bin = self._get_texture_atlas_bin(animation.get_max_width(),
-                                              animation.get_max_height())
-            if bin:
-                animation.add_to_texture_bin(bin)
-
-            identity = self._cached_animations[name] = animation
+            identity = self._add_animation(name, animation)
 
         if not rotate and not flip_x and not flip_y:
             return identity
 
         return identity.get_transform(flip_x, flip_y, rotate)
 
+    def _add_animation(self, name, animation):
+        bin = self._get_texture_atlas_bin(animation.get_max_width(),
+                                          animation.get_max_height())
+        if bin:
+            animation.add_to_texture_bin(bin)
+
+        self._cached_animations[name] = animation
+        return animation
+
     def get_cached_image_names(self):
         '''Get a list of image filenames that have been cached.
 
@@ -594,7 +1712,9 @@ class Loader(object):
     def get_texture_bins(self):
         '''Get a list of texture bins in use.
 
-        This is useful for debugging and profiling only.
+        This is useful for debugging and profiling only.  The texture memory
+        used by each bin is given by `TextureBin.get_memory_usage`; see
+        `get_texture_bin_memory_usage`.
 
         :rtype: list
         :return: List of `TextureBin`
@@ -602,6 +1722,69 @@ class Loader(object):
         self._require_index()
         return self._texture_atlas_bins.values()
 
+    def get_texture_bin_memory_usage(self):
+        '''Get the texture memory used by each texture bin.
+
+        This is useful for debugging and profiling only.
+
+        :rtype: dict
+        :return: Map of each `TextureBin` returned by `get_texture_bins` to
+            the number of bytes used by its atlases.
+
+        :since: pyglet 1.2
+        '''
+        self._require_index()
+        return dict((bin, bin.get_memory_usage()) \
+                    for bin in self._texture_atlas_bins.values())
+
+    def get_cached_sizes(self):
+        '''Get the estimated texture memory used by each cached image,
+        animation and texture.
+
+        This is useful for debugging and profiling only.  Images in a texture
+        bin count only their own area.  See `cache` for totals and hit, miss
+        and eviction counts.
+
+        :rtype: dict
+        :return: Map of ``(kind, name)`` to size in bytes, where kind is one
+            of ``'image'``, ``'animation'`` or ``'texture'``.
+
+        :since: pyglet 1.2
+        '''
+        self._require_index()
+        sizes = {}
+        for kind in ('image', 'animation', 'texture'):
+            for name, size in self.cache.get_sizes(kind).items():
+                sizes[(kind, name)] = size
+        return sizes
+
+    def pin(self, name):
+        '''Keep the image, animation and texture loaded from a file cached
+        regardless of `cache_budget`.
+
+        The file can be pinned before or after it is loaded.
+
+        :Parameters:
+            `name` : str
+                Filename of the resource to pin.
+
+        :since: pyglet 1.2
+        '''
+        self._require_index()
+        self.cache.pin(name)
+
+    def unpin(self, name):
+        '''Allow resources pinned with `pin` to be released from the cache.
+
+        :Parameters:
+            `name` : str
+                Filename of the resource to unpin.
+
+        :since: pyglet 1.2
+        '''
+        self._require_index()
+        self.cache.unpin(name)
+
     def media(self, name, streaming=True):
         '''Load a sound or video resource.
 
@@ -696,9 +1879,176 @@ class Loader(object):
         file = self.file(name)
         return pyglet.text.load(name, file, 'text/plain')
 
+    def _get_load_queue(self):
+        if self._load_queue is None:
+            self._load_queue = _LoadQueue(self.async_workers,
+                                          self.async_time_budget)
+        return self._load_queue
+
+    def _read_async(self, name):
+        def read():
+            file = self.file(name)
+            try:
+                return file.read()
+            finally:
+                file.close()
+        return read
+
+    def _load_async(self, name, priority, decode, finish=None):
+        self._require_index()
+        queue = self._get_load_queue()
+        future = LoadFuture(queue, name, priority, decode, finish)
+        queue.submit(future)
+        return future
+
+    def image_async(self, name, flip_x=False, flip_y=False, rotate=0,
+                    atlas=True, priority=0):
+        '''Load an image in the background.
+
+        The image is decoded by a worker thread, then uploaded to a texture
+        or atlas on the main thread.  See `image` for the parameters, and
+        `LoadFuture` for how the result is retrieved.
+
+        :Parameters:
+            `priority` : int
+                Resources with higher priority are loaded first; for example,
+                images that are visible could be given a higher priority
+                than those that are not.
+
+        :rtype: `LoadFuture`
+        :return: A future whose result is a `Texture` or `TextureRegion`.
+        '''
+        self._require_index()
+        # Hold a cached image until the future completes, so the cache
+        # cannot release it meanwhile.
+        cached = self._cached_images.get(name)
+        if cached is not None:
+            decode = lambda: None
+        else:
+            decode = lambda: self._load_image(name)
+
+        def finish(img):
+            identity = cached
+            if identity is None:
+                identity = self._cached_images.get(name)
+            if identity is None:
+                identity = self._cached_images[name] = \
+                    self._create_image(img, atlas)
+            if not rotate and not flip_x and not flip_y:
+                return identity
+            return identity.get_transform(flip_x, flip_y, rotate)
+
+        return self._load_async(name, priority, decode, finish)
+
+    def animation_async(self, name, flip_x=False, flip_y=False, rotate=0,
+                        priority=0):
+        '''Load an animation in the background.
+
+        See `animation` for the parameters and `image_async` for
+        `priority`.
+
+        :rtype: `LoadFuture`
+        :return: A future whose result is an `Animation`.
+        '''
+        self._require_index()
+        cached = self._cached_animations.get(name)
+        if cached is not None:
+            decode = lambda: None
+        else:
+            decode = lambda: pyglet.image.load_animation(name, 
+                                                         self.file(name))
+
+        def finish(animation):
+            identity = cached
+            if identity is None:
+                identity = self._cached_animations.get(name)
+            if identity is None:
+                identity = self._add_animation(name, animation)
+            if not rotate and not flip_x and not flip_y:
+                return identity
+            return identity.get_transform(flip_x, flip_y, rotate)
+
+        return self._load_async(name, priority, decode, finish)
+
+    def texture_async(self, name, priority=0):
+        '''Load a texture in the background.
+
+        See `texture` for the parameters and `image_async` for `priority`.
+
+        :rtype: `LoadFuture`
+        :return: A future whose result is a `Texture`.
+        '''
+        self._require_index()
+        cached = self._cached_textures.get(name)
+        if cached is not None:
+            decode = lambda: None
+        else:
+            decode = lambda: self._load_image(name)
+
+        def finish(img):
+            texture = cached
+            if texture is None:
+                texture = self._cached_textures.get(name)
+            if texture is not None:
+                return texture
+            texture = img.get_texture()
+            self._cached_textures[name] = texture
+            return texture
+
+        return self._load_async(name, priority, decode, finish)
+
+    def media_async(self, name, streaming=True, priority=0):
+        '''Load a sound or video resource in the background.
+
+        See `media` for the parameters and `image_async` for `priority`.
+
+        :rtype: `LoadFuture`
+        :return: A future whose result is a `media.Source`.
+        '''
+        return self._load_async(name, priority, 
+                                lambda: self.media(name, streaming))
+
+    def html_async(self, name, priority=0):
+        '''Load an HTML document in the background.
+
+        See `html` for the parameters and `image_async` for `priority`.
+
+        :rtype: `LoadFuture`
+        :return: A future whose result is a `FormattedDocument`.
+        '''
+        # Only the file is read by the worker; decoding can load images
+        # into textures, so it is done on the main thread.
+        return self._load_async(name, priority, self._read_async(name),
+            lambda data: pyglet.text.decode_html(data, self.location(name)))
+
+    def attributed_async(self, name, priority=0):
+        '''Load an attributed text document in the background.
+
+        See `attributed` for the parameters and `image_async` for
+        `priority`.
+
+        :rtype: `LoadFuture`
+        :return: A future whose result is a `FormattedDocument`.
+        '''
+        return self._load_async(name, priority, self._read_async(name),
+                                pyglet.text.decode_attributed)
+
+    def text_async(self, name, priority=0):
+        '''Load a plain text document in the background.
+
+        See `text` for the parameters and `image_async` for `priority`.
+
+        :rtype: `LoadFuture`
+        :return: A future whose result is an `UnformattedDocument`.
+        '''
+        return self._load_async(name, priority, self._read_async(name),
+                                pyglet.text.decode_text)
+
     def get_cached_texture_names(self):
         '''Get the names of textures currently cached.
 
+        See `get_cached_sizes` for the texture memory used by each.
+
         :rtype: list of str
         '''
         self._require_index()
@@ -730,13 +2080,25 @@ file = _default_loader.file
 location = _default_loader.location
 add_font = _default_loader.add_font
 image = _default_loader.image
+images = _default_loader.images
 animation = _default_loader.animation
 get_cached_image_names = _default_loader.get_cached_image_names
 get_cached_animation_names = _default_loader.get_cached_animation_names
 get_texture_bins = _default_loader.get_texture_bins
+get_texture_bin_memory_usage = _default_loader.get_texture_bin_memory_usage
+get_cached_sizes = _default_loader.get_cached_sizes
+pin = _default_loader.pin
+unpin = _default_loader.unpin
 media = _default_loader.media
 texture = _default_loader.texture
 html = _default_loader.html
 attributed = _default_loader.attributed
 text = _default_loader.text
 get_cached_texture_names = _default_loader.get_cached_texture_names
+image_async = _default_loader.image_async
+animation_async = _default_loader.animation_async
+texture_async = _default_loader.texture_async
+media_async = _default_loader.media_async
+html_async = _default_loader.html_async
+attributed_async = _default_loader.attributed_async
+text_async = _default_loader.text_async
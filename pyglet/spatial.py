@@ -0,0 +1,622 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+# 
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions 
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright 
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+# $Id:$
+
+'''Spatial indexes of axis-aligned rectangles.
+
+A spatial index answers "what is at this point?" and "what is inside this
+rectangle?" without testing every object, which keeps mouse picking, view
+culling and broad-phase collision detection fast in scenes with many
+thousands of objects.
+
+Any hashable object can be indexed, together with its bounding rectangle
+given by the corners ``(x1, y1, x2, y2)``, where ``x1 <= x2`` and
+``y1 <= y2``.  Rectangles include their edges, so rectangles that only share
+an edge overlap.  When an object moves, call `SpatialIndex.update` with its new
+rectangle::
+
+    index = pyglet.spatial.GridIndex(cell_size=64)
+    index.add(ship, ship.x, ship.y, ship.x + 32, ship.y + 32)
+    ...
+    index.update(ship, ship.x, ship.y, ship.x + 32, ship.y + 32)
+    under_mouse = index.get_at(mouse_x, mouse_y)
+
+Two implementations with the same interface are provided:
+
+`GridIndex`
+    A uniform grid of square cells.  Adding objects and moving them a short
+    distance is very cheap.  Works best when objects are of similar size,
+    such as the sprites and tiles of a game level; pick a cell size a little
+    larger than a typical object.
+`AABBTree`
+    A dynamic bounding volume tree.  Copes with objects of widely varying
+    size and with sparse or unbounded worlds, at a slightly higher cost per
+    update.
+
+Query results are lists in no particular order.  Only the rectangles are
+tested; callers needing an exact test (for example, against a rotated
+sprite) should filter the results.
+
+:since: pyglet 1.2
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+class SpatialIndex(object):
+    '''Abstract index of objects by their bounding rectangles.
+
+    Supports ``len``, ``in`` and iteration over the indexed objects.
+    '''
+    def __init__(self):
+        self._bounds = {}
+
+    def __len__(self):
+        return len(self._bounds)
+
+    def __contains__(self, obj):
+        return obj in self._bounds
+
+    def __iter__(self):
+        return iter(self._bounds)
+
+    def add(self, obj, x1, y1, x2, y2):
+        '''Add an object to the index.
+
+        If the object is already in the index it is moved to the new
+        rectangle.
+
+        :Parameters:
+            `obj` : object
+                Hashable object to add.
+            `x1` : float
+                Left edge of the object.
+            `y1` : float
+                Bottom edge of the object.
+            `x2` : float
+                Right edge of the object.
+            `y2` : float
+                Top edge of the object.
+
+        '''
+        raise NotImplementedError('abstract')
+
+    def remove(self, obj):
+        '''Remove an object from the index.
+
+        `KeyError` is raised if the object is not in the index.
+
+        :Parameters:
+            `obj` : object
+                Object to remove.
+
+        '''
+        raise NotImplementedError('abstract')
+
+    def update(self, obj, x1, y1, x2, y2):
+        '''Move an object in the index to a new rectangle.
+
+        `KeyError` is raised if the object is not in the index.  The
+        parameters are as for `add`.
+        '''
+        self.remove(obj)
+        self.add(obj, x1, y1, x2, y2)
+
+    def clear(self):
+        '''Remove all objects from the index.
+        '''
+        raise NotImplementedError('abstract')
+
+    def get_bounds(self, obj):
+        '''Get the rectangle of an object in the index.
+
+        :rtype: (float, float, float, float)
+        :return: The rectangle ``(x1, y1, x2, y2)``.
+        '''
+        return self._bounds[obj]
+
+    def get_at(self, x, y):
+        '''Get the objects whose rectangles contain a point.
+
+        :Parameters:
+            `x` : float
+                X coordinate of the point.
+            `y` : float
+                Y coordinate of the point.
+
+        :rtype: list
+        '''
+        return self.get_in_region(x, y, x, y)
+
+    def get_in_region(self, x1, y1, x2, y2):
+        '''Get the objects whose rectangles overlap a rectangle.
+
+        :Parameters:
+            `x1` : float
+                Left edge of the region.
+            `y1` : float
+                Bottom edge of the region.
+            `x2` : float
+                Right edge of the region.
+            `y2` : float
+                Top edge of the region.
+
+        :rtype: list
+        '''
+        raise NotImplementedError('abstract')
+
+    def get_overlapping(self, obj):
+        '''Get the other objects whose rectangles overlap that of an object
+        in the index.
+
+        :Parameters:
+            `obj` : object
+                Object in the index.
+
+        :rtype: list
+        '''
+        x1, y1, x2, y2 = self._bounds[obj]
+        return [other for other in self.get_in_region(x1, y1, x2, y2) \
+                if other is not obj]
+
+    def get_pairs(self):
+        '''Get every pair of objects whose rectangles overlap.
+
+        This is the broad phase of collision detection: each pair is
+        reported once, in either order, and can then be tested exactly.
+
+        :rtype: list of (object, object)
+        '''
+        pairs = []
+        done = set()
+        for obj in self._bounds:
+            done.add(obj)
+            for other in self.get_overlapping(obj):
+                if other not in done:
+                    pairs.append((obj, other))
+        return pairs
+
+class GridIndex(SpatialIndex):
+    '''Spatial index using a uniform grid of square cells.
+
+    Each object is recorded in every cell its rectangle touches, so objects
+    much larger than a cell are expensive to add and move.  Only cells
+    holding objects use memory; the grid is unbounded.
+
+    :Ivariables:
+        `cell_size` : float
+            Width and height of each cell.  Read-only.
+
+    '''
+    def __init__(self, cell_size=64):
+        '''Create an empty grid index.
+
+        :Parameters:
+            `cell_size` : float
+                Width and height of each cell.
+
+        '''
+        super(GridIndex, self).__init__()
+        self.cell_size = cell_size
+        self._cells = {}        # (i, j) -> set of objects
+        self._ranges = {}       # object -> (i1, j1, i2, j2)
+
+    def _get_range(self, x1, y1, x2, y2):
+        size = self.cell_size
+        return (int(x1 // size), int(y1 // size),
+                int(x2 // size), int(y2 // size))
+
+    def _insert(self, obj, cell_range, skip=None):
+        cells = self._cells
+        i1, j1, i2, j2 = cell_range
+        for i in xrange(i1, i2 + 1):
+            for j in xrange(j1, j2 + 1):
+                if skip and skip[0] <= i <= skip[2] and skip[1] <= j <= skip[3]:
+                    continue
+                try:
+                    cells[i, j].add(obj)
+                except KeyError:
+                    cells[i, j] = set([obj])
+
+    def _discard(self, obj, cell_range, keep=None):
+        cells = self._cells
+        i1, j1, i2, j2 = cell_range
+        for i in xrange(i1, i2 + 1):
+            for j in xrange(j1, j2 + 1):
+                if keep and keep[0] <= i <= keep[2] and keep[1] <= j <= keep[3]:
+                    continue
+                objs = cells[i, j]
+                objs.remove(obj)
+                if not objs:
+                    del cells[i, j]
+
+    def add(self, obj, x1, y1, x2, y2):
+        if obj in self._bounds:
+            self.update(obj, x1, y1, x2, y2)
+            return
+        self._bounds[obj] = (x1, y1, x2, y2)
+        cell_range = self._ranges[obj] = self._get_range(x1, y1, x2, y2)
+        self._insert(obj, cell_range)
+
+    def remove(self, obj):
+        del self._bounds[obj]
+        self._discard(obj, self._ranges.pop(obj))
+
+    def update(self, obj, x1, y1, x2, y2):
+        old_range = self._ranges[obj]
+        self._bounds[obj] = (x1, y1, x2, y2)
+        cell_range = self._get_range(x1, y1, x2, y2)
+        if cell_range != old_range:
+            # Only touch the cells the object entered or left.
+            self._discard(obj, old_range, keep=cell_range)
+            self._insert(obj, cell_range, skip=old_range)
+            self._ranges[obj] = cell_range
+
+    def clear(self):
+        self._bounds.clear()
+        self._cells.clear()
+        self._ranges.clear()
+
+    def get_at(self, x, y):
+        size = self.cell_size
+        objs = self._cells.get((int(x // size), int(y // size)))
+        if not objs:
+            return []
+        bounds = self._bounds
+        result = []
+        for obj in objs:
+            x1, y1, x2, y2 = bounds[obj]
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                result.append(obj)
+        return result
+
+    def get_in_region(self, x1, y1, x2, y2):
+        i1, j1, i2, j2 = self._get_range(x1, y1, x2, y2)
+        cells = self._cells
+        found = set()
+        if (i2 - i1 + 1) * (j2 - j1 + 1) > len(cells):
+            # Region covers more cells than are occupied.
+            for (i, j), objs in cells.iteritems():
+                if i1 <= i <= i2 and j1 <= j <= j2:
+                    found.update(objs)
+        else:
+            for i in xrange(i1, i2 + 1):
+                for j in xrange(j1, j2 + 1):
+                    objs = cells.get((i, j))
+                    if objs:
+                        found.update(objs)
+
+        bounds = self._bounds
+        result = []
+        for obj in found:
+            ox1, oy1, ox2, oy2 = bounds[obj]
+            if ox1 <= x2 and x1 <= ox2 and oy1 <= y2 and y1 <= oy2:
+                result.append(obj)
+        return result
+
+    def get_pairs(self):
+        bounds = self._bounds
+        pairs = set()
+        for objs in self._cells.itervalues():
+            if len(objs) < 2:
+                continue
+            objs = list(objs)
+            for k, a in enumerate(objs):
+                ax1, ay1, ax2, ay2 = bounds[a]
+                for b in objs[k + 1:]:
+                    bx1, by1, bx2, by2 = bounds[b]
+                    if ax1 <= bx2 and bx1 <= ax2 and ay1 <= by2 and by1 <= ay2:
+                        if id(a) < id(b):
+                            pairs.add((a, b))
+                        else:
+                            pairs.add((b, a))
+        return list(pairs)
+
+class _Node(object):
+    # Leaves have `obj` set and no children.
+    __slots__ = ('x1', 'y1', 'x2', 'y2', 'parent', 'left', 'right', 'height',
+                 'obj')
+
+    def __init__(self, x1, y1, x2, y2):
+        self.x1 = x1
+        self.y1 = y1
+        self.x2 = x2
+        self.y2 = y2
+        self.parent = self.left = self.right = self.obj = None
+        self.height = 0
+
+    def refit(self):
+        # Fit the box and height to the children; return True if they
+        # changed.
+        left = self.left
+        right = self.right
+        x1 = left.x1 if left.x1 < right.x1 else right.x1
+        y1 = left.y1 if left.y1 < right.y1 else right.y1
+        x2 = left.x2 if left.x2 > right.x2 else right.x2
+        y2 = left.y2 if left.y2 > right.y2 else right.y2
+        height = 1 + (left.height if left.height > right.height
+                      else right.height)
+        if (x1 == self.x1 and y1 == self.y1 and x2 == self.x2 and
+            y2 == self.y2 and height == self.height):
+            return False
+        self.x1 = x1
+        self.y1 = y1
+        self.x2 = x2
+        self.y2 = y2
+        self.height = height
+        return True
+
+class AABBTree(SpatialIndex):
+    '''Spatial index using a dynamic tree of axis-aligned bounding boxes.
+
+    Leaves are enlarged by `margin` on each side, so that an object can
+    move by up to that distance before the tree needs restructuring.  The
+    tree is kept balanced with rotations as objects are added and moved.
+
+    :Ivariables:
+        `margin` : float
+            Distance each leaf is enlarged by.  Read-only.
+
+    '''
+    def __init__(self, margin=8):
+        '''Create an empty tree.
+
+        :Parameters:
+            `margin` : float
+                Distance each leaf is enlarged by.  Larger values make small
+                movements cheaper and queries slightly slower.
+
+        '''
+        super(AABBTree, self).__init__()
+        self.margin = margin
+        self._root = None
+        self._leaves = {}
+
+    def add(self, obj, x1, y1, x2, y2):
+        if obj in self._bounds:
+            self.update(obj, x1, y1, x2, y2)
+            return
+        self._bounds[obj] = (x1, y1, x2, y2)
+        margin = self.margin
+        leaf = _Node(x1 - margin, y1 - margin, x2 + margin, y2 + margin)
+        leaf.obj = obj
+        self._leaves[obj] = leaf
+        self._insert_leaf(leaf)
+
+    def remove(self, obj):
+        leaf = self._leaves.pop(obj)
+        del self._bounds[obj]
+        self._remove_leaf(leaf)
+
+    def update(self, obj, x1, y1, x2, y2):
+        leaf = self._leaves[obj]
+        self._bounds[obj] = (x1, y1, x2, y2)
+        if leaf.x1 <= x1 and leaf.y1 <= y1 and x2 <= leaf.x2 and y2 <= leaf.y2:
+            return
+        self._remove_leaf(leaf)
+        margin = self.margin
+        leaf.x1 = x1 - margin
+        leaf.y1 = y1 - margin
+        leaf.x2 = x2 + margin
+        leaf.y2 = y2 + margin
+        self._insert_leaf(leaf)
+
+    def clear(self):
+        self._bounds.clear()
+        self._leaves.clear()
+        self._root = None
+
+    def _insert_leaf(self, leaf):
+        if self._root is None:
+            leaf.parent = None
+            self._root = leaf
+            return
+
+        # Descend to the sibling that minimises the total perimeter of the
+        # boxes enlarged by the new leaf.  Perimeters are halved throughout.
+        x1, y1, x2, y2 = leaf.x1, leaf.y1, leaf.x2, leaf.y2
+        node = self._root
+        while node.obj is None:
+            perimeter = (max(node.x2, x2) - min(node.x1, x1) +
+                         max(node.y2, y2) - min(node.y1, y1))
+            inherited = 2 * perimeter - 2 * (node.x2 - node.x1 +
+                                             node.y2 - node.y1)
+
+            left = node.left
+            cost_left = inherited + (max(left.x2, x2) - min(left.x1, x1) +
+                                     max(left.y2, y2) - min(left.y1, y1))
+            if left.obj is None:
+                cost_left -= left.x2 - left.x1 + left.y2 - left.y1
+            right = node.right
+            cost_right = inherited + (max(right.x2, x2) - min(right.x1, x1) +
+                                      max(right.y2, y2) - min(right.y1, y1))
+            if right.obj is None:
+                cost_right -= right.x2 - right.x1 + right.y2 - right.y1
+
+            cost = 2 * perimeter
+            if cost < cost_left and cost < cost_right:
+                break
+            if cost_left < cost_right:
+                node = left
+            else:
+                node = right
+
+        sibling = node
+        old_parent = sibling.parent
+        # The new parent is fitted to its children by `_refit`.
+        parent = _Node(x1, y1, x2, y2)
+        parent.height = -1
+        parent.parent = old_parent
+        parent.left = sibling
+        parent.right = leaf
+        sibling.parent = parent
+        leaf.parent = parent
+        if old_parent is None:
+            self._root = parent
+        elif old_parent.left is sibling:
+            old_parent.left = parent
+        else:
+            old_parent.right = parent
+        self._refit(parent)
+
+    def _remove_leaf(self, leaf):
+        parent = leaf.parent
+        if parent is None:
+            self._root = None
+            return
+
+        if parent.left is leaf:
+            sibling = parent.right
+        else:
+            sibling = parent.left
+        grandparent = parent.parent
+        sibling.parent = grandparent
+        if grandparent is None:
+            self._root = sibling
+        else:
+            if grandparent.left is parent:
+                grandparent.left = sibling
+            else:
+                grandparent.right = sibling
+            self._refit(grandparent)
+        leaf.parent = None
+
+    def _refit(self, node):
+        while node is not None:
+            balanced = self._balance(node)
+            if not balanced.refit() and balanced is node:
+                # Nothing above can change.
+                break
+            node = balanced.parent
+
+    def _balance(self, a):
+        # Rotate the taller child of `a` above it if the subtrees differ in
+        # height by more than one; return the root of the subtree.
+        if a.obj is not None:
+            return a
+        b = a.left
+        c = a.right
+        balance = c.height - b.height
+        if balance > 1:
+            return self._rotate(a, c, 'right')
+        elif balance < -1:
+            return self._rotate(a, b, 'left')
+        return a
+
+    def _rotate(self, a, up, side):
+        # Move child `up` (on `side` of `a`) above `a`, which takes the
+        # shorter child of `up` in its place.
+        f = up.left
+        g = up.right
+        if f.height > g.height:
+            taller, shorter = f, g
+        else:
+            taller, shorter = g, f
+
+        up.left = a
+        up.parent = a.parent
+        a.parent = up
+        if up.parent is None:
+            self._root = up
+        elif up.parent.left is a:
+            up.parent.left = up
+        else:
+            up.parent.right = up
+
+        up.right = taller
+        setattr(a, side, shorter)
+        shorter.parent = a
+        a.refit()
+        up.refit()
+        return up
+
+    def get_in_region(self, x1, y1, x2, y2):
+        result = []
+        if self._root is None:
+            return result
+        bounds = self._bounds
+        stack = [self._root]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            node = pop()
+            if node.x1 > x2 or node.x2 < x1 or node.y1 > y2 or node.y2 < y1:
+                continue
+            obj = node.obj
+            if obj is None:
+                push(node.left)
+                push(node.right)
+            else:
+                ox1, oy1, ox2, oy2 = bounds[obj]
+                if ox1 <= x2 and x1 <= ox2 and oy1 <= y2 and y1 <= oy2:
+                    result.append(obj)
+        return result
+
+    def get_pairs(self):
+        pairs = []
+        root = self._root
+        if root is None or root.obj is not None:
+            return pairs
+
+        # Test each internal node's two subtrees against each other, so
+        # that every pair of leaves is considered once.
+        bounds = self._bounds
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        nodes = [root]
+        while nodes:
+            node = nodes.pop()
+            if node.obj is not None:
+                continue
+            nodes.append(node.left)
+            nodes.append(node.right)
+            push((node.left, node.right))
+            while stack:
+                a, b = pop()
+                if a.x1 > b.x2 or b.x1 > a.x2 or a.y1 > b.y2 or b.y1 > a.y2:
+                    continue
+                if a.obj is not None and b.obj is not None:
+                    ax1, ay1, ax2, ay2 = bounds[a.obj]
+                    bx1, by1, bx2, by2 = bounds[b.obj]
+                    if ax1 <= bx2 and bx1 <= ax2 and ay1 <= by2 and by1 <= ay2:
+                        pairs.append((a.obj, b.obj))
+                elif b.obj is not None or (a.obj is None and
+                                           a.height >= b.height):
+                    push((a.left, b))
+                    push((a.right, b))
+                else:
+                    push((a, b.left))
+                    push((a, b.right))
+        return pairs
@@ -113,7 +113,9 @@ class SpriteGroup(graphics.Group):
     '''Shared sprite rendering group.
 
     The group is automatically coalesced with other sprite groups sharing the
-    same parent group, texture and blend parameters.
+    same parent group, texture and blend parameters.  Images added to a
+    `pyglet.image.atlas.TextureArrayBin` share a texture across all its
+    layers, so their sprites share one group.
     '''
     def __init__(self, texture, blend_src, blend_dest, parent=None):
         '''Create a sprite group.
@@ -181,6 +183,14 @@ class Sprite(event.EventDispatcher):
     _visible = True
     _vertex_list = None
 
+    #: Drawing mode of the vertex lists of sprites in a batch.  Set it to
+    #: `pyglet.graphics.INDEXED_QUADS` to draw sprites as indexed triangles,
+    #: which is faster with drivers that emulate ``GL_QUADS``.  It must be
+    #: changed before any sprites are created.
+    #:
+    #: :since: pyglet 1.2
+    quad_mode = GL_QUADS
+
     def __init__(self,
                  img, x=0, y=0,
                  blend_src=GL_SRC_ALPHA,
@@ -285,7 +295,8 @@ class Sprite(event.EventDispatcher):
             return
 
         if batch is not None and self._batch is not None:
-            self._batch.migrate(self._vertex_list, GL_QUADS, self._group, batch)
+            self._batch.migrate(self._vertex_list, self.quad_mode, self._group,
+                                batch)
             self._batch = batch
         else:
             self._vertex_list.delete()
@@ -315,8 +326,8 @@ class Sprite(event.EventDispatcher):
                                   group)
 
         if self._batch is not None:
-            self._batch.migrate(self._vertex_list, GL_QUADS, self._group,
-                                self._batch)
+            self._batch.migrate(self._vertex_list, self.quad_mode,
+                                self._group, self._batch)
 
     def _get_group(self):
         return self._group.parent
@@ -383,7 +394,7 @@ class Sprite(event.EventDispatcher):
                 vertex_format, 
                 'c4B', ('t3f', self._texture.tex_coords))
         else:
-            self._vertex_list = self._batch.add(4, GL_QUADS, self._group,
+            self._vertex_list = self._batch.add(4, self.quad_mode, self._group,
                 vertex_format, 
                 'c4B', ('t3f', self._texture.tex_coords))
         self._update_position()
@@ -61,7 +61,7 @@ class ImageElement(pyglet.text.document.InlineElement):
         y1 = y + self.descent
         x2 = x + self.width
         y2 = y + self.height + self.descent
-        vertex_list = layout.batch.add(4, pyglet.gl.GL_QUADS, group,
+        vertex_list = layout.batch.add(4, layout.quad_mode, group,
             ('v2i', (x1, y1, x2, y1, x2, y2, x1, y2)),
             ('c3B', (255, 255, 255) * 4),
             ('t3f', self.image.tex_coords))
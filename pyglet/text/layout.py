@@ -354,7 +354,7 @@ class _GlyphBox(_AbstractBox):
                 color = (0, 0, 0, 255)
             colors.extend(color * ((end - start) * 4))
 
-        vertex_list = layout.batch.add(n_glyphs * 4, GL_QUADS, group,
+        vertex_list = layout.batch.add(n_glyphs * 4, layout.quad_mode, group,
             ('v2f/dynamic', vertices),
             ('t3f/dynamic', tex_coords),
             ('c4B/dynamic', colors))
@@ -394,7 +394,7 @@ class _GlyphBox(_AbstractBox):
 
         if background_vertices:
             background_list = layout.batch.add(
-                len(background_vertices) // 2, GL_QUADS,
+                len(background_vertices) // 2, layout.quad_mode,
                 layout.background_group,
                 ('v2f/dynamic', background_vertices),
                 ('c4B/dynamic', background_colors))
@@ -720,6 +720,11 @@ class TextLayout(object):
             Rendering group for glyphs.
         `foreground_decoration_group` : `Group`
             Rendering group for glyph underlines.
+        `quad_mode` : int
+            Drawing mode of the quads of glyphs, backgrounds and images.
+            Set it to `pyglet.graphics.INDEXED_QUADS` on the class to draw
+            them as indexed triangles, which is faster with drivers that
+            emulate ``GL_QUADS``.  **Since:** pyglet 1.2
 
     '''
     _document = None
@@ -732,6 +737,8 @@ class TextLayout(object):
     foreground_decoration_group = \
         TextLayoutForegroundDecorationGroup(2, top_group)
 
+    quad_mode = GL_QUADS
+
     _update_enabled = True
     _own_batch = False
     _origin_layout = False  # Lay out relative to origin?  Otherwise to box.
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+
+'''Test that the event loop pacing strategies redraw the expected windows,
+return the expected timeouts and record frame times.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+import unittest
+
+import pyglet
+from pyglet import app
+from pyglet import clock
+from pyglet.app import pacing
+
+__noninteractive = True
+
+class FakeTime(object):
+    def __init__(self):
+        self.time = 100.
+
+    def __call__(self):
+        return self.time
+
+class FakeWindow(object):
+    invalid = True
+    _legacy_invalid = False
+
+    def __init__(self):
+        self.draws = 0
+        self.size = (100, 100)
+
+    def get_size(self):
+        return self.size
+
+    def switch_to(self):
+        pass
+
+    def dispatch_event(self, event_type):
+        self.draws += 1
+
+    def flip(self):
+        pass
+
+    def flush_coalesced_events(self):
+        pass
+
+class FrameTimeHistogramTest(unittest.TestCase):
+    def test_add(self):
+        histogram = pacing.FrameTimeHistogram(0.125, 4)
+        for t in (0.0625, 0.1875, 0.25, 0.3125, 2.):
+            histogram.add(t)
+        self.assertEqual(histogram.counts, [1, 1, 2, 1])
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.mean, 0.5625)
+        self.assertEqual(histogram.max, 2.)
+        self.assertEqual(histogram.get_percentile(50), 0.375)
+        self.assertEqual(histogram.get_percentile(100), 2.)
+
+    def test_reset(self):
+        histogram = pacing.FrameTimeHistogram()
+        histogram.add(0.1)
+        histogram.reset()
+        self.assertEqual(histogram.count, 0)
+        self.assertEqual(sum(histogram.counts), 0)
+        self.assertEqual(histogram.get_percentile(99), 0.)
+
+class PacingTest(unittest.TestCase):
+    def setUp(self):
+        self.time = FakeTime()
+        self.event_loop = app.EventLoop()
+        self.event_loop.clock = clock.Clock(time_function=self.time)
+        self.window = FakeWindow()
+        app.windows.add(self.window)
+
+    def tearDown(self):
+        app.windows.remove(self.window)
+
+    def idle(self):
+        return self.event_loop.idle()
+
+    def test_scheduled(self):
+        self.assertEqual(self.idle(), None)
+        self.assertEqual(self.window.draws, 0)
+        self.window._legacy_invalid = True
+        self.idle()
+        self.assertEqual(self.window.draws, 1)
+        self.event_loop.clock.schedule_once(lambda dt: None, 0.5)
+        self.assertEqual(self.idle(), 0.5)
+        self.time.time += 0.5
+        self.idle()
+        self.assertEqual(self.window.draws, 2)
+
+    def test_invalidated(self):
+        self.event_loop.pacing = pacing.InvalidatedPacing()
+        self.event_loop.clock.schedule(lambda dt: None)
+        self.idle()
+        self.assertEqual(self.window.draws, 1)
+        self.assertFalse(self.window.invalid)
+        self.idle()
+        self.assertEqual(self.window.draws, 1)
+        self.window.size = (200, 100)
+        self.idle()
+        self.assertEqual(self.window.draws, 2)
+        self.window.invalid = True
+        self.idle()
+        self.assertEqual(self.window.draws, 3)
+
+    def test_deadline(self):
+        self.event_loop.pacing = pacing.DeadlinePacing(0.25, 0.125)
+        self.assertEqual(self.idle(), 0.125)
+        self.assertEqual(self.window.draws, 1)
+        self.time.time += 0.0625
+        self.assertEqual(self.idle(), 0.0625)
+        self.assertEqual(self.window.draws, 1)
+        self.time.time += 0.1875
+        self.idle()
+        self.assertEqual(self.window.draws, 2)
+        self.assertEqual(self.event_loop.frame_times.count, 1)
+        self.assertEqual(self.event_loop.frame_times.total, 0.25)
+
+        # Missed deadlines restart from the current time.
+        self.time.time += 1.
+        self.assertEqual(self.idle(), 0.125)
+        self.assertEqual(self.window.draws, 3)
+
+    def test_deadline_to_scheduled(self):
+        self.event_loop.pacing = pacing.DeadlinePacing(0.25, 0.125)
+        self.idle()
+        self.assertEqual(self.window.draws, 1)
+        self.assertTrue(self.window.invalid)
+
+        # Handled events still redraw with the default strategy.
+        self.event_loop.pacing = pacing.ScheduledPacing()
+        self.idle()
+        self.assertEqual(self.window.draws, 1)
+        self.window._legacy_invalid = True
+        self.idle()
+        self.assertEqual(self.window.draws, 2)
+
+    def test_fixed_timestep(self):
+        steps = []
+        strategy = pacing.FixedTimestepPacing(steps.append, 0.125, 
+                                              interval=0., max_steps=4)
+        self.event_loop.pacing = strategy
+        self.idle()
+        self.time.time += 0.3125
+        self.idle()
+        self.assertEqual(steps, [0.125, 0.125])
+        self.assertEqual(strategy.alpha, 0.5)
+        self.time.time += 0.0625
+        self.idle()
+        self.assertEqual(len(steps), 3)
+        self.assertEqual(strategy.alpha, 0.)
+
+        # Backlog beyond max_steps is discarded.
+        self.time.time += 1.0625
+        self.idle()
+        self.assertEqual(len(steps), 7)
+        self.assertEqual(strategy.alpha, 0.5)
+        self.assertEqual(self.window.draws, 4)
+
+if __name__ == '__main__':
+    unittest.main()
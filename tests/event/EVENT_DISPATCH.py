@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+'''Test that EventDispatcher dispatches to the handler stack in order after
+the stack is modified, and that coalesced events are merged and delivered in
+order.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+import unittest
+
+from pyglet import event
+
+__noninteractive = True
+
+class Dispatcher(event.EventDispatcher):
+    pass
+
+Dispatcher.register_event_type('on_mouse_motion')
+Dispatcher.register_event_type('on_mouse_drag')
+Dispatcher.register_event_type('on_key_press')
+
+class Handler(object):
+    def __init__(self, name, calls, result=event.EVENT_UNHANDLED):
+        self.name = name
+        self.calls = calls
+        self.result = result
+
+    def on_key_press(self, symbol, modifiers):
+        self.calls.append((self.name, symbol))
+        return self.result
+
+class TEST_CASE(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = Dispatcher()
+        self.calls = []
+
+    def on_mouse_motion(self, x, y, dx, dy):
+        self.calls.append(('on_mouse_motion', x, y, dx, dy))
+
+    def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
+        self.calls.append(('on_mouse_drag', x, y, dx, dy, buttons))
+
+    def on_key_press(self, symbol, modifiers):
+        self.calls.append(('on_key_press', symbol))
+
+    def test_no_handlers(self):
+        self.assertEqual(self.dispatcher.dispatch_event('on_key_press', 1, 0),
+                         False)
+
+    def test_stack_changes(self):
+        a = Handler('a', self.calls)
+        b = Handler('b', self.calls)
+        self.dispatcher.push_handlers(a)
+        self.dispatcher.dispatch_event('on_key_press', 1, 0)
+        self.dispatcher.push_handlers(b)
+        self.dispatcher.dispatch_event('on_key_press', 2, 0)
+        self.dispatcher.pop_handlers()
+        self.dispatcher.dispatch_event('on_key_press', 3, 0)
+        self.dispatcher.remove_handler('on_key_press', a.on_key_press)
+        self.dispatcher.dispatch_event('on_key_press', 4, 0)
+        self.assertEqual(self.calls,
+                         [('a', 1), ('b', 2), ('a', 2), ('a', 3)])
+
+    def test_set_handler(self):
+        self.dispatcher.dispatch_event('on_key_press', 1, 0)
+        self.dispatcher.set_handler('on_key_press', self.on_key_press)
+        self.dispatcher.dispatch_event('on_key_press', 2, 0)
+        self.dispatcher.remove_handlers(self.on_key_press)
+        self.dispatcher.dispatch_event('on_key_press', 3, 0)
+        self.assertEqual(self.calls, [('on_key_press', 2)])
+
+    def test_handled(self):
+        a = Handler('a', self.calls)
+        b = Handler('b', self.calls, event.EVENT_HANDLED)
+        self.dispatcher.push_handlers(a)
+        self.dispatcher.push_handlers(b)
+        self.assertEqual(self.dispatcher.dispatch_event('on_key_press', 1, 0),
+                         event.EVENT_HANDLED)
+        self.assertEqual(self.calls, [('b', 1)])
+
+    def test_modify_during_dispatch(self):
+        a = Handler('a', self.calls)
+        def on_key_press(symbol, modifiers):
+            self.dispatcher.pop_handlers()
+        self.dispatcher.push_handlers(a)
+        self.dispatcher.push_handlers(on_key_press)
+        self.dispatcher.dispatch_event('on_key_press', 1, 0)
+        self.dispatcher.dispatch_event('on_key_press', 2, 0)
+        self.assertEqual(self.calls, [('a', 1), ('a', 2)])
+
+    def test_coalesce(self):
+        self.dispatcher.push_handlers(self)
+        self.dispatcher.coalesce_event('on_mouse_motion')
+        self.dispatcher.dispatch_event('on_mouse_motion', 1, 1, 1, 1)
+        self.dispatcher.dispatch_event('on_mouse_motion', 3, 4, 2, 3)
+        self.assertEqual(self.calls, [])
+        self.dispatcher.dispatch_event('on_key_press', 1, 0)
+        self.assertEqual(self.calls, [('on_mouse_motion', 3, 4, 2, 3),
+                                      ('on_key_press', 1)])
+
+    def test_merge_motion(self):
+        self.dispatcher.push_handlers(self)
+        self.dispatcher.coalesce_event('on_mouse_motion', event.merge_motion)
+        self.dispatcher.coalesce_event('on_mouse_drag', event.merge_motion)
+        self.dispatcher.dispatch_event('on_mouse_motion', 1, 1, 1, 1)
+        self.dispatcher.dispatch_event('on_mouse_motion', 3, 4, 2, 3)
+        self.dispatcher.dispatch_event('on_mouse_drag', 4, 4, 1, 0, 1, 0)
+        self.dispatcher.dispatch_event('on_mouse_drag', 5, 5, 1, 1, 1, 0)
+        self.dispatcher.dispatch_event('on_mouse_drag', 6, 5, 1, 0, 4, 0)
+        self.dispatcher.flush_coalesced_events()
+        self.assertEqual(self.calls, [('on_mouse_motion', 3, 4, 3, 4),
+                                      ('on_mouse_drag', 5, 5, 2, 1, 1),
+                                      ('on_mouse_drag', 6, 5, 1, 0, 4)])
+
+    def test_uncoalesce(self):
+        self.dispatcher.push_handlers(self)
+        self.dispatcher.coalesce_event('on_mouse_motion')
+        self.dispatcher.dispatch_event('on_mouse_motion', 1, 1, 1, 1)
+        self.dispatcher.uncoalesce_event('on_mouse_motion')
+        self.dispatcher.dispatch_event('on_mouse_motion', 2, 2, 1, 1)
+        self.assertEqual(self.calls, [('on_mouse_motion', 1, 1, 1, 1),
+                                      ('on_mouse_motion', 2, 2, 1, 1)])
+
+    def test_coalesce_unknown(self):
+        self.assertRaises(event.EventException,
+                          self.dispatcher.coalesce_event, 'on_foo')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Tests drawing only the vertex lists of a batch within a view rectangle.
+"""
+import unittest
+
+import pyglet
+from pyglet.gl import *
+
+from graphics_common import get_feedback
+
+__noninteractive = True
+
+
+def triangle(x, y):
+    return [x, y, x + 0.05, y, x, y + 0.05]
+
+
+class BatchCullingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.batch = pyglet.graphics.Batch(culling=True)
+        self.lists = [self.batch.add(3, GL_TRIANGLES, None,
+                                     ('v2f', triangle(i / 10., 0)))
+                      for i in range(10)]
+
+    def get_drawn(self, view_rect=None):
+        vertices, _, _ = get_feedback(lambda: self.batch.draw(view_rect))
+        return sorted([int(round(vertices[i] * 10))
+                       for i in range(0, len(vertices), 12)])
+
+    def test_cull(self):
+        self.assertEqual(self.get_drawn(), range(10))
+        self.assertEqual(self.get_drawn((0.22, -1, 0.52, 1)), [2, 3, 4, 5])
+        self.assertEqual(self.get_drawn((2, 2, 3, 3)), [])
+
+    def test_move(self):
+        self.get_drawn((0, 0, 0.5, 1))
+        self.lists[9].vertices[:] = triangle(0.1, 0.5)
+        self.assertEqual(self.get_drawn((0.05, 0.4, 0.15, 1)), [1])
+
+    def test_delete(self):
+        self.get_drawn((0, 0, 1, 1))
+        self.lists[3].delete()
+        self.assertEqual(self.get_drawn((0.25, 0, 0.45, 1)), [2, 4])
+        self.assertFalse(self.lists[3] in self.batch._cull_index)
+
+    def test_full_draw(self):
+        # Drawing the whole batch updates the index, releasing deleted
+        # lists.
+        self.lists[3].delete()
+        self.lists[4].vertices[:] = triangle(0.3, 0)
+        self.assertEqual(len(self.get_drawn()), 9)
+        self.assertEqual(len(self.batch._cull_dirty), 0)
+        self.assertFalse(self.lists[3] in self.batch._cull_index)
+        self.assertEqual(self.get_drawn((0.25, 0, 0.35, 1)), [3])
+
+    def test_migrate(self):
+        other = pyglet.graphics.Batch(culling=True)
+        self.batch.migrate(self.lists[5], GL_TRIANGLES, None, other)
+        self.assertEqual(self.get_drawn((0.45, 0, 0.55, 1)), [4])
+        vertices, _, _ = get_feedback(lambda: other.draw((0.45, 0, 0.55, 1)))
+        self.assertEqual(len(vertices), 12)
+
+    def test_uncullable(self):
+        # Instanced domains have no per-list bounds, and are always drawn.
+        instanced = self.batch.add_instanced(3, GL_TRIANGLES, None, None,
+            ['c3f'], ('v2f', triangle(0.9, 0.9)))
+        instanced.add_instance([1., 1., 1.])
+        self.assertEqual(self.get_drawn((0, 0, 0.05, 0.05)), [0, 9])
+
+if __name__ == '__main__':
+    unittest.main()
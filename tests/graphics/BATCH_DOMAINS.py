@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""Tests drawing a batch of several domains, which share the client state
+set up for the previous domain.
+"""
+import unittest
+
+import pyglet
+from pyglet.gl import *
+
+from graphics_common import get_feedback
+
+__noninteractive = True
+
+
+class BatchDomainsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.batch = pyglet.graphics.Batch()
+        self.expected = []
+
+    def add(self, order, v_fmt, c_fmt, indexed=False, parent=None):
+        n_v = int(v_fmt[1])
+        n_c = int(c_fmt[1])
+        offset = len(self.expected) / 4.
+        vertices = []
+        colors = []
+        for i in range(3):
+            vertex = [offset / 16 + i / 8., (order + i) / 8., 0.][:n_v]
+            color = [offset / 16, i / 4., order / 4., 1.][:n_c]
+            vertices.extend(vertex)
+            colors.extend(color)
+            self.expected.append((vertex[:2], color[:3]))
+        group = pyglet.graphics.OrderedGroup(order, parent)
+        if indexed:
+            return self.batch.add_indexed(3, GL_TRIANGLES, group, [0, 1, 2],
+                (v_fmt, vertices), (c_fmt, colors))
+        return self.batch.add(3, GL_TRIANGLES, group,
+            (v_fmt, vertices), (c_fmt, colors))
+
+    def check(self):
+        vertices, colors, _ = get_feedback(self.batch.draw)
+        result = []
+        for i in range(len(vertices) / 4):
+            result.append((vertices[i * 4:i * 4 + 2], colors[i * 4:i * 4 + 3]))
+        self.assertEqual(len(result), len(self.expected))
+        for (e_vertex, e_color), (r_vertex, r_color) in \
+                zip(self.expected, result):
+            for e, r in zip(e_vertex + e_color, r_vertex + r_color):
+                self.assertAlmostEqual(e, r, places=2)
+
+    def test_formats(self):
+        self.add(0, 'v2f', 'c4f')
+        self.add(1, 'v3f', 'c3f')
+        self.add(2, 'v2f', 'c4f')
+        self.check()
+        self.check()
+
+    def test_indexed(self):
+        self.add(0, 'v2f', 'c4f', indexed=True)
+        self.add(1, 'v2f', 'c3f')
+        self.add(2, 'v3f', 'c3f', indexed=True)
+        self.check()
+
+    def test_resize(self):
+        self.add(0, 'v2f', 'c4f')
+        self.add(1, 'v2f', 'c4f', indexed=True)
+        self.check()
+        # Growing the buffers invalidates the recorded client state.
+        extra = self.batch.add(1024, GL_TRIANGLES,
+                               pyglet.graphics.OrderedGroup(0),
+                               'v2f', 'c4f')
+        extra.delete()
+        self.check()
+
+    def test_client_arrays_in_group(self):
+        # A group drawing from client-side arrays between domains.
+        vertices = [0.5, 0.5, 0.75, 0.5, 0.5, 0.75]
+        colors = [0.25, 0.5, 0.75] * 3
+        class ImmediateGroup(pyglet.graphics.OrderedGroup):
+            def set_state(self):
+                pyglet.graphics.draw(3, GL_TRIANGLES,
+                    ('v2f', vertices), ('c3f', colors))
+
+        self.add(0, 'v2f', 'c4f', indexed=True)
+        self.expected.extend([(vertices[i:i + 2], colors[:3]) \
+                              for i in range(0, 6, 2)])
+        self.add(2, 'v2f', 'c4f', indexed=True, parent=ImmediateGroup(1))
+        self.check()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""Tests keeping the groups of a batch sorted, and rebuilding its draw list
+only for the groups that changed.
+"""
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet.graphics import Batch, Group, OrderedGroup
+
+from graphics_common import get_feedback
+
+__noninteractive = True
+
+
+class ReversedGroup(Group):
+    def __init__(self, name, parent=None):
+        super(ReversedGroup, self).__init__(parent)
+        self.name = name
+
+    def __lt__(self, other):
+        return other.name < self.name
+
+
+class BatchDrawListTestCase(unittest.TestCase):
+    def setUp(self):
+        self.batch = Batch()
+
+    def add(self, group, x=0.):
+        return self.batch.add(3, GL_TRIANGLES, group,
+            ('v2f', [x, 0., x, 0.25, x + 0.25, 0.]))
+
+    def check(self, expected):
+        vertices, _, _ = get_feedback(self.batch.draw)
+        xs = [vertices[i] for i in range(0, len(vertices), 12)]
+        self.assertEqual(len(xs), len(expected))
+        for e, r in zip(expected, xs):
+            self.assertAlmostEqual(e, r, places=3)
+
+    def test_order(self):
+        for order in (3, 1, 2):
+            self.add(OrderedGroup(order), order / 8.)
+        self.add(Group(), 0.)
+        self.add(OrderedGroup(-1), -1 / 8.)
+        self.assertEqual([getattr(group, 'order', 0)
+                          for group in self.batch.top_groups],
+                         [-1, 0, 1, 2, 3])
+        self.check([-1 / 8., 0., 1 / 8., 2 / 8., 3 / 8.])
+
+    def test_children(self):
+        parent = OrderedGroup(1)
+        self.add(parent, 0.5)
+        self.add(OrderedGroup(2, parent), 2 / 8.)
+        self.add(OrderedGroup(1, parent), 1 / 8.)
+        self.add(OrderedGroup(0), 0.)
+        self.assertEqual(self.batch.group_children[parent],
+                         [OrderedGroup(1, parent), OrderedGroup(2, parent)])
+        self.check([0., 0.5, 1 / 8., 2 / 8.])
+
+    def test_custom_order(self):
+        for name in 'bca':
+            self.add(ReversedGroup(name))
+        self.assertEqual([group.name for group in self.batch.top_groups],
+                         ['c', 'b', 'a'])
+
+    def test_remove(self):
+        parent = OrderedGroup(0)
+        child = self.add(OrderedGroup(0, parent), 0.)
+        other = self.add(OrderedGroup(1), 1 / 8.)
+        self.check([0., 1 / 8.])
+
+        # Groups left empty are removed, with parents left empty.
+        child.delete()
+        self.check([1 / 8.])
+        self.assertEqual(self.batch.top_groups, [OrderedGroup(1)])
+        self.assertFalse(parent in self.batch.group_map)
+        self.assertEqual(self.batch.group_children, {})
+
+        # A domain used again before drawing is kept.
+        other.delete()
+        self.add(OrderedGroup(1), 2 / 8.)
+        self.check([2 / 8.])
+        self.assertEqual(self.batch.get_stats()['domains'], 1)
+
+    def test_incremental(self):
+        groups = [OrderedGroup(i) for i in range(10)]
+        for group in groups:
+            self.add(group)
+        self.check([0.] * 10)
+        stats = self.batch.get_stats()
+        self.assertEqual(stats['groups'], 10)
+        self.assertEqual(stats['rebuilds'], 1)
+        self.assertEqual(stats['rebuilt_groups'], 10)
+
+        # Adding a list to a new child only rebuilds it and its parent.
+        self.add(OrderedGroup(0, groups[5]))
+        self.check([0.] * 11)
+        stats = self.batch.get_stats()
+        self.assertEqual(stats['rebuilds'], 2)
+        self.assertEqual(stats['rebuilt_groups'], 12)
+
+        # Drawing again does not rebuild.
+        self.check([0.] * 11)
+        self.assertEqual(self.batch.get_stats()['rebuilds'], 2)
+
+    def test_invalidate(self):
+        groups = [OrderedGroup(i) for i in range(3)]
+        for group in groups:
+            self.add(group, group.order / 8.)
+        self.check([0., 1 / 8., 2 / 8.])
+
+        # The hash of an ordered group depends on its order, so reorder
+        # a subclass that keeps its hash.
+        class MutableGroup(OrderedGroup):
+            __hash__ = object.__hash__
+
+            def __eq__(self, other):
+                return self is other
+        group = MutableGroup(1.5)
+        self.add(group, 3 / 8.)
+        self.check([0., 1 / 8., 3 / 8., 2 / 8.])
+        group.order = 3
+        self.batch.invalidate()
+        self.check([0., 1 / 8., 2 / 8., 3 / 8.])
+        self.assertEqual(self.batch.get_stats()['full_rebuilds'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
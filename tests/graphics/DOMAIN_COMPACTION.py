@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""Tests compacting vertex domains, and shrinking the domains of a batch
+left underused when it is drawn.
+"""
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet.graphics import vertexdomain
+
+from graphics_common import get_feedback
+
+__noninteractive = True
+
+
+class DomainCompactionTestCase(unittest.TestCase):
+    def create_lists(self, domain, n, *args):
+        vertex_lists = []
+        for i in range(n):
+            vertex_list = domain.create(3, *args)
+            vertex_list.vertices[:] = [i / 64., 0, i / 64., 0.25, 0.25, 0]
+            vertex_lists.append(vertex_list)
+        return vertex_lists
+
+    def check(self, domain, vertex_lists):
+        vertices, _, _ = get_feedback(lambda: domain.draw(GL_TRIANGLES))
+        xs = sorted([vertices[i] for i in range(0, len(vertices), 12)])
+        self.assertEqual(len(xs), len(vertex_lists))
+        for x, vertex_list in zip(xs, vertex_lists):
+            self.assertAlmostEqual(x, vertex_list.vertices[0], places=3)
+
+    def test_compact(self):
+        domain = vertexdomain.create_domain('v2f', 'c4B')
+        vertex_lists = self.create_lists(domain, 10)
+        for vertex_list in vertex_lists[1::2]:
+            vertex_list.delete()
+        vertex_lists = vertex_lists[0::2]
+
+        domain.compact()
+        self.assertEqual([vertex_list.start for vertex_list in vertex_lists],
+                         [0, 3, 6, 9, 12])
+        self.assertEqual(domain.allocator.get_allocated_regions(),
+                         ([0], [15]))
+        self.assertEqual(domain.get_stats()['compactions'], 1)
+        self.check(domain, vertex_lists)
+
+    def test_shrink(self):
+        batch = pyglet.graphics.Batch()
+        vertex_lists = [batch.add(3, GL_TRIANGLES, None, 'v2f', 'c4B') \
+                        for i in range(100)]
+        domain = vertex_lists[0].domain
+        for i, vertex_list in enumerate(vertex_lists):
+            vertex_list.vertices[:] = [i / 64., 0, i / 64., 0.25, 0.25, 0]
+        stats = domain.get_stats()
+        self.assertEqual(stats['capacity'], 512)
+        self.assertEqual(stats['allocated'], 300)
+
+        # The domain is only compacted when the batch is drawn.
+        for vertex_list in vertex_lists[:-4]:
+            vertex_list.delete()
+        stats = domain.get_stats()
+        self.assertEqual(stats['lists'], 4)
+        self.assertEqual(stats['allocated'], 12)
+        self.assertEqual(stats['capacity'], 512)
+        self.assertEqual(stats['compactions'], 0)
+
+        get_feedback(batch.draw)
+        stats = domain.get_stats()
+        self.assertTrue(stats['capacity'] <= 32)
+        self.assertEqual(stats['compactions'], 1)
+        self.check(domain, vertex_lists[-4:])
+
+    def test_shrink_reused(self):
+        # Vertex lists deleted and added again before drawing, as when a
+        # text layout is updated, leave the domain as it was.
+        batch = pyglet.graphics.Batch()
+        vertex_lists = [batch.add(3, GL_TRIANGLES, None, 'v2f') \
+                        for i in range(100)]
+        domain = vertex_lists[0].domain
+        for vertex_list in vertex_lists:
+            vertex_list.delete()
+        vertex_lists = [batch.add(3, GL_TRIANGLES, None, 'v2f') \
+                        for i in range(100)]
+        get_feedback(batch.draw)
+        stats = domain.get_stats()
+        self.assertEqual(stats['capacity'], 512)
+        self.assertEqual(stats['compactions'], 0)
+
+    def test_indexed(self):
+        domain = vertexdomain.create_indexed_domain('v2f')
+        vertex_lists = self.create_lists(domain, 8, 3)
+        for vertex_list in vertex_lists:
+            vertex_list.indices[:] = [vertex_list.start + i for i in range(3)]
+        for vertex_list in vertex_lists[:6]:
+            vertex_list.delete()
+        vertex_lists = vertex_lists[6:]
+
+        domain.compact()
+        for vertex_list in vertex_lists:
+            self.assertEqual(list(vertex_list.indices),
+                             [vertex_list.start + i for i in range(3)])
+        self.check(domain, vertex_lists)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Tests drawing a subset of the vertex lists of a batch, and culling them
+by their bounds.
+"""
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet.graphics import vertexdomain
+
+from graphics_common import get_feedback
+
+__noninteractive = True
+
+
+class MergeRegionsTestCase(unittest.TestCase):
+    def test_merge(self):
+        self.assertEqual(vertexdomain._merge_regions([]), ([], []))
+        self.assertEqual(
+            vertexdomain._merge_regions([(6, 3), (0, 3), (3, 3), (12, 3)]),
+            ([0, 12], [9, 3]))
+        self.assertEqual(
+            vertexdomain._merge_regions([(0, 6), (3, 3), (3, 6)]),
+            ([0], [9]))
+
+
+class DrawSubsetTestCase(unittest.TestCase):
+    def setUp(self):
+        self.batch = pyglet.graphics.Batch()
+        self.lists = []
+        for i in range(8):
+            group = pyglet.graphics.OrderedGroup(i % 2)
+            x = i / 8.
+            if i % 3:
+                vertex_list = self.batch.add(3, GL_TRIANGLES, group,
+                    ('v2f', [x, 0, x + 0.1, 0, x, 0.1]))
+            else:
+                vertex_list = self.batch.add_indexed(3, GL_TRIANGLES, group,
+                    [0, 1, 2], ('v2f', [x, 0, x + 0.1, 0, x, 0.1]))
+            self.lists.append(vertex_list)
+
+    def get_drawn(self, draw):
+        vertices, _, _ = get_feedback(draw)
+        # Index of each triangle drawn, from its first vertex.
+        return sorted([int(round(vertices[i] * 8))
+                       for i in range(0, len(vertices), 12)])
+
+    def test_subset(self):
+        subset = [self.lists[i] for i in (5, 0, 1, 2, 6)]
+        self.assertEqual(self.get_drawn(lambda: self.batch.draw_subset(subset)),
+                         [0, 1, 2, 5, 6])
+
+    def test_empty(self):
+        self.assertEqual(self.get_drawn(lambda: self.batch.draw_subset([])),
+                         [])
+
+    def test_bounds(self):
+        for e, r in zip((0, 0, 0.1, 0.1), self.lists[0].get_bounds()):
+            self.assertAlmostEqual(e, r, places=5)
+
+    def test_visible(self):
+        drawn = []
+        self.assertEqual(self.get_drawn(lambda: drawn.append(
+            self.batch.draw_visible(self.lists, rect=(0.3, 0, 0.6, 1)))),
+            [2, 3, 4])
+        self.assertEqual(drawn, [3])
+        self.assertEqual(self.get_drawn(lambda: self.batch.draw_visible(
+            self.lists, predicate=lambda l: l is self.lists[7])), [7])
+
+if __name__ == '__main__':
+    unittest.main()
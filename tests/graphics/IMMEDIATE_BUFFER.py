@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""Tests the attributes and memory reused by immediate drawing.
+"""
+import unittest
+
+import pyglet
+from pyglet import graphics
+
+from graphics_common import get_feedback, GL_TRIANGLES
+
+__noninteractive = True
+
+
+class ImmediateBufferTestCase(unittest.TestCase):
+    def setUp(self):
+        graphics._immediate_buffer = None
+
+    def draw(self, size, *data):
+        return get_feedback(lambda: graphics.draw(size, GL_TRIANGLES, *data))
+
+    def assert_drawn(self, expected, vertices, colors=None):
+        # Compare the x and y of each vertex drawn, and its color, in any
+        # order; the first vertex of a triangle in the feedback buffer need
+        # not be the first given.
+        drawn = []
+        for i in range(0, len(vertices), 4):
+            vertex = vertices[i:i + 2]
+            if colors is not None:
+                vertex += colors[i:i + 3]
+            drawn.append(tuple([round(v, 2) for v in vertex]))
+        expected = [tuple([round(v, 2) for v in vertex]) \
+                    for vertex in expected]
+        self.assertEqual(sorted(drawn), sorted(expected))
+
+    def test_reuse(self):
+        v2f = [0., 0., 0., 0.5, 0.5, 0.]
+        self.draw(3, ('v2f', v2f))
+        buffer = graphics._immediate_buffer
+        attribute = graphics._immediate_attributes['v2f']
+        self.assertEqual(buffer.size, 1024)
+
+        # Other formats use the same memory.
+        v3f = [0.25, 0.25, 0., 0.25, 0.75, 0., 0.75, 0.25, 0.]
+        vertices, colors, _ = self.draw(3, ('v3f', v3f),
+                                        ('c4B', [255, 0, 0, 255] * 3))
+        self.assertTrue(graphics._immediate_buffer is buffer)
+        self.assert_drawn([(0.25, 0.25, 1., 0., 0.),
+                           (0.25, 0.75, 1., 0., 0.),
+                           (0.75, 0.25, 1., 0., 0.)], vertices, colors)
+
+        # Larger data grows it to the next power of two, which is then kept.
+        n = 300
+        v3f = [i / float(n * 3) for i in range(n * 3)]
+        vertices, _, _ = self.draw(n, ('v3f', v3f))
+        large = graphics._immediate_buffer
+        self.assertEqual(large.size, 4096)
+        self.assert_drawn([v3f[i:i + 2] for i in range(0, n * 3, 3)],
+                          vertices)
+
+        vertices, _, _ = self.draw(3, ('v2f', v2f))
+        self.assertTrue(graphics._immediate_buffer is large)
+        self.assertTrue(graphics._immediate_attributes['v2f'] is attribute)
+        self.assert_drawn([(0., 0.), (0., 0.5), (0.5, 0.)], vertices)
+
+    def test_index_alignment(self):
+        # The c3B data ends at an odd offset; the unsigned short indices
+        # that follow it must be aligned.
+        n = 257
+        v2f = []
+        c3B = []
+        for i in range(n):
+            v2f.extend([i / 512., (i % 3) / 4.])
+            c3B.extend([i % 256, 0, 255])
+        offsets = []
+        set_immediate_data = graphics._set_immediate_data
+        def record(*args):
+            result = set_immediate_data(*args)
+            offsets.append(result[1])
+            return result
+        graphics._set_immediate_data = record
+        try:
+            vertices, colors, _ = get_feedback(
+                lambda: graphics.draw_indexed(n, GL_TRIANGLES, [254, 255, 256],
+                                              ('v2f', v2f), ('c3B', c3B)))
+        finally:
+            graphics._set_immediate_data = set_immediate_data
+        self.assertEqual(offsets, [2830])
+        self.assert_drawn([(254 / 512., 0.5, 254 / 255., 0., 1.),
+                           (255 / 512., 0., 1., 0., 1.),
+                           (256 / 512., 0.25, 0., 0., 1.)], vertices, colors)
+
+    def test_flush(self):
+        flushes = []
+        gl_flush = graphics.glFlush
+        immediate_flush = graphics._immediate_flush
+        graphics.glFlush = lambda: flushes.append(True)
+        try:
+            graphics._immediate_flush = True
+            self.draw(3, ('v2f', [0., 0., 0., 0.5, 0.5, 0.]))
+            self.assertEqual(len(flushes), 1)
+
+            graphics._immediate_flush = False
+            self.draw(3, ('v2f', [0., 0., 0., 0.5, 0.5, 0.]))
+            get_feedback(lambda: graphics.draw_indexed(3, GL_TRIANGLES,
+                [0, 1, 2], ('v2f', [0., 0., 0., 0.5, 0.5, 0.])))
+            self.assertEqual(len(flushes), 1)
+        finally:
+            graphics.glFlush = gl_flush
+            graphics._immediate_flush = immediate_flush
+
+if __name__ == '__main__':
+    unittest.main()
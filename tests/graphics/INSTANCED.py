@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Tests drawing instances of a mesh expanded on the CPU.
+
+Instanced arrays only apply to generic attributes, which need a vertex
+program; instances with a per-instance color are always expanded.
+"""
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet.graphics import vertexdomain
+
+from graphics_common import get_feedback
+
+__noninteractive = True
+
+
+class InstancedTestCase(unittest.TestCase):
+    mesh = [0., 0., 0.25, 0., 0., 0.25]
+
+    def create_domain(self, indices=None):
+        domain = vertexdomain.create_instanced_domain(3, indices,
+            ['v2f'], ['c3f'])
+        self.assertTrue(domain.expanded)
+        domain.set_mesh_attribute_data(0, self.mesh)
+        return domain
+
+    def check(self, domain, expected):
+        vertices, colors, _ = get_feedback(
+            lambda: domain.draw(GL_TRIANGLES))
+        result = []
+        for i in range(len(vertices) / 4):
+            result.append(
+                (vertices[i * 4:i * 4 + 2], colors[i * 4:i * 4 + 3]))
+        self.assertEqual(len(result), len(expected) * 3)
+        for i, color in enumerate(expected):
+            for j in range(3):
+                vertex, result_color = result[i * 3 + j]
+                for e, r in zip(self.mesh[j * 2:j * 2 + 2] + color,
+                                vertex + result_color):
+                    self.assertAlmostEqual(e, r, places=2)
+
+    def test_instances(self):
+        domain = self.create_domain()
+        red = domain.add_instance([1., 0., 0.])
+        green = domain.add_instance([0., 1., 0.])
+        self.assertEqual(domain.get_instance_count(), 2)
+        self.check(domain, [[1., 0., 0.], [0., 1., 0.]])
+
+        red.delete()
+        blue = domain.add_instance([0., 0., 1.])
+        green.set_attribute_data(0, [0., 0.5, 0.])
+        self.assertEqual(green.get_attribute_data(0), [0., 0.5, 0.])
+        self.check(domain, [[0., 0., 1.], [0., 0.5, 0.]])
+
+    def test_indexed(self):
+        domain = self.create_domain([2, 1, 0])
+        domain.add_instance([1., 1., 1.])
+        domain.add_instance([0., 1., 1.])
+        self.assertEqual(domain.get_instance_count(), 2)
+        vertices, colors, _ = get_feedback(
+            lambda: domain.draw(GL_TRIANGLES))
+        self.assertEqual(len(vertices), 2 * 3 * 4)
+
+    def test_mesh_update(self):
+        domain = self.create_domain()
+        domain.add_instance([1., 1., 1.])
+        self.mesh = [0., 0., 0.5, 0., 0., 0.5]
+        domain.set_mesh_attribute_data(0, self.mesh)
+        domain.add_instance([1., 0., 1.])
+        self.check(domain, [[1., 1., 1.], [1., 0., 1.]])
+
+    def test_batch(self):
+        batch = pyglet.graphics.Batch()
+        domain = batch.add_instanced(3, GL_TRIANGLES, None, None, ['c3f'],
+                                     ('v2f', self.mesh))
+        domain.add_instance([1., 1., 0.])
+        vertices, colors, _ = get_feedback(batch.draw)
+        self.assertEqual(len(vertices), 3 * 4)
+
+        domain.delete()
+        vertices, colors, _ = get_feedback(batch.draw)
+        self.assertEqual(len(vertices), 0)
+
+if __name__ == '__main__':
+    unittest.main()
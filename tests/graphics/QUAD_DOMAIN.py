@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Tests drawing quads as indexed triangles with a shared index buffer.
+"""
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet.graphics import vertexdomain
+
+from graphics_common import get_feedback
+
+__noninteractive = True
+
+
+def quad(x, y, size):
+    return [x, y, x + size, y, x + size, y + size, x, y + size]
+
+def triangles(vertices):
+    # Expected triangles of the quads, as drawn with the shared indices.
+    result = []
+    for i in range(0, len(vertices), 8):
+        v = vertices[i:i + 8]
+        result.extend(v[0:6] + v[0:2] + v[4:8])
+    return result
+
+
+class QuadDomainTestCase(unittest.TestCase):
+    def check(self, draw, vertices):
+        result, _, _ = get_feedback(draw)
+        result = [result[i] for i in range(len(result)) if i % 4 < 2]
+        expected = triangles(vertices)
+        self.assertEqual(len(result), len(expected))
+        for e, r in zip(expected, result):
+            self.assertAlmostEqual(e, r, places=2)
+
+    def test_batch(self):
+        batch = pyglet.graphics.Batch()
+        vertices = quad(0, 0, 0.25) + quad(0.5, 0.5, 0.25)
+        vertex_list = batch.add(8, pyglet.graphics.INDEXED_QUADS, None,
+                                ('v2f', vertices))
+        self.assertTrue(isinstance(vertex_list.domain,
+                                   vertexdomain.QuadVertexDomain))
+        self.check(batch.draw, vertices)
+        self.check(lambda: vertex_list.draw(GL_QUADS), vertices)
+
+    def test_regions(self):
+        batch = pyglet.graphics.Batch()
+        lists = [batch.add(4, pyglet.graphics.INDEXED_QUADS, None,
+                           ('v2f', quad(i / 8., 0, 0.1))) for i in range(5)]
+        lists[1].delete()
+        lists[3].delete()
+        vertices = quad(0, 0, 0.1) + quad(2 / 8., 0, 0.1) + \
+                   quad(4 / 8., 0, 0.1)
+        self.check(batch.draw, vertices)
+
+    def test_grow(self):
+        batch = pyglet.graphics.Batch()
+        vertices = []
+        for i in range(100):
+            vertices.extend(quad(i / 128., 0, 0.005))
+        vertex_list = batch.add(400, pyglet.graphics.INDEXED_QUADS, None,
+                                ('v2f', vertices))
+        self.assertTrue(vertex_list.domain.index_buffer.quads >= 100)
+        self.check(batch.draw, vertices)
+
+    def test_add_indexed(self):
+        batch = pyglet.graphics.Batch()
+        self.assertRaises(ValueError, batch.add_indexed, 4,
+                          pyglet.graphics.INDEXED_QUADS, None, [0, 1, 2, 3],
+                          'v2f')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""Tests updating vertex lists with stream usage every frame, with each
+streaming buffer strategy, and the dirty range tracking of mappable buffers.
+"""
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet.graphics import vertexbuffer
+
+from graphics_common import get_feedback
+
+__noninteractive = True
+
+
+class MergeRangesTestCase(unittest.TestCase):
+    def test_merge(self):
+        self.assertEqual(vertexbuffer._merge_ranges([], 0, 4), [])
+        self.assertEqual(
+            vertexbuffer._merge_ranges([[40, 50], [0, 10], [5, 20]], 0, 4),
+            [[0, 20], [40, 50]])
+        self.assertEqual(
+            vertexbuffer._merge_ranges([[0, 10], [30, 40]], 20, 4),
+            [[0, 40]])
+        self.assertEqual(
+            vertexbuffer._merge_ranges([[0, 10], [10, 20], [25, 30]], 0, 4),
+            [[0, 20], [25, 30]])
+
+    def test_max_ranges(self):
+        ranges = [[i * 100, i * 100 + 10] for i in range(5)]
+        self.assertEqual(vertexbuffer._merge_ranges(ranges, 0, 4),
+                         [[0, 410]])
+
+
+class StreamBufferTestCase(unittest.TestCase):
+    strategy = 'ring'
+
+    def setUp(self):
+        self._stream_buffer = vertexbuffer._stream_buffer
+        vertexbuffer._stream_buffer = self.strategy
+        self.batch = pyglet.graphics.Batch()
+
+    def tearDown(self):
+        vertexbuffer._stream_buffer = self._stream_buffer
+
+    def check(self, expected):
+        vertices, _, _ = get_feedback(self.batch.draw)
+        result = []
+        for i in range(len(vertices) / 4):
+            result.extend(vertices[i * 4:i * 4 + 2])
+        self.assertEqual(len(result), len(expected))
+        for e, r in zip(expected, result):
+            self.assertAlmostEqual(e, r, places=2)
+
+    def test_frames(self):
+        vertex_lists = [
+            self.batch.add(3, GL_TRIANGLES, None, 'v2f/stream', 'c4B/static')
+            for i in range(3)]
+        for frame in range(5):
+            expected = []
+            for i, vertex_list in enumerate(vertex_lists):
+                data = [(frame + i + j) / 16. for j in range(6)]
+                if i != 1 or frame == 0:
+                    # The middle list only changes in the first frame.
+                    vertex_list.vertices[:] = data
+                    expected.extend(data)
+                else:
+                    expected.extend([i / 16. + j / 16. for j in range(6)])
+            self.check(expected)
+
+    def test_resize(self):
+        vertex_list = self.batch.add(3, GL_TRIANGLES, None, 'v2f/stream')
+        vertex_list.vertices[:] = [j / 8. for j in range(6)]
+        self.check([j / 8. for j in range(6)])
+        others = [self.batch.add(3, GL_TRIANGLES, None, 'v2f/stream')
+                  for i in range(64)]
+        for other in others:
+            other.delete()
+        self.check([j / 8. for j in range(6)])
+
+
+class OrphanStreamBufferTestCase(StreamBufferTestCase):
+    strategy = 'orphan'
+
+
+class InPlaceStreamBufferTestCase(StreamBufferTestCase):
+    strategy = 'none'
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+'''Test that the BMP decoder expands palette and bitfield images to the same
+data as a straightforward per-pixel decode.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import ctypes
+import os
+import unittest
+
+from pyglet.image.codecs import bmp
+
+__noninteractive = True
+
+base = os.path.dirname(__file__)
+
+def reference_palette(bits, palette, bitcount):
+    data = []
+    pixels = 8 // bitcount
+    mask = (1 << bitcount) - 1
+    for row in bits:
+        for packed in row:
+            for i in range(pixels):
+                rgb = palette[(packed >> (8 - bitcount * (i + 1))) & mask]
+                data += [rgb.rgbRed, rgb.rgbGreen, rgb.rgbBlue]
+    return data
+
+def reference_bitfields(bits, masks):
+    data = []
+    for row in bits:
+        for packed in row:
+            for mask in masks:
+                shift1, shift2 = bmp.get_shift(mask)
+                data.append((packed & mask) >> shift1 << shift2 & 0xff)
+    return data
+
+class TEST_CASE(unittest.TestCase):
+    def get_data(self, image):
+        return list(bytearray(image._current_data))
+
+    def check_palette(self, bitcount, decoder):
+        palette = (bmp.RGBQUAD * (1 << bitcount))()
+        for i, rgb in enumerate(palette):
+            rgb.rgbRed, rgb.rgbGreen, rgb.rgbBlue = i * 3 & 0xff, 255 - i, i
+        bits = (ctypes.c_ubyte * 4 * 3)()
+        for i, row in enumerate(bits):
+            for j in range(len(row)):
+                row[j] = (i * 71 + j * 13) & 0xff
+        image = decoder(bits, palette, 4, 3, 4, 1)
+        self.assertEqual(self.get_data(image),
+                         reference_palette(bits, palette, bitcount))
+
+    def test_1bit(self):
+        self.check_palette(1, bmp.decode_1bit)
+
+    def test_4bit(self):
+        self.check_palette(4, bmp.decode_4bit)
+
+    def test_8bit(self):
+        self.check_palette(8, bmp.decode_8bit)
+
+    def check_bitfields(self, type, masks):
+        bits = (type * 5 * 2)()
+        for i, row in enumerate(bits):
+            for j in range(len(row)):
+                row[j] = (i * 0x9e3779b1 + j * 0x7f4a7c15) & 0xffffffff
+        image = bmp.decode_bitfields(bits, *(masks + (5, 2, 0, 1)))
+        self.assertEqual(self.get_data(image),
+                         reference_bitfields(bits, masks))
+
+    def test_565(self):
+        self.check_bitfields(ctypes.c_uint16, (0xf800, 0x07e0, 0x001f))
+
+    def test_555(self):
+        self.check_bitfields(ctypes.c_uint16, (0x7c00, 0x03e0, 0x001f))
+
+    def test_888(self):
+        self.check_bitfields(ctypes.c_uint32, 
+                             (0xff0000, 0x00ff00, 0x0000ff))
+
+    def test_101010(self):
+        self.check_bitfields(ctypes.c_uint32, 
+                             (0x3ff00000, 0x000ffc00, 0x000003ff))
+
+    def test_files(self):
+        decoder = bmp.BMPImageDecoder()
+        for name in ('rgb_1bpp.bmp', 'rgb_4bpp.bmp', 'rgb_8bpp.bmp', 
+                     'rgb_16bpp.bmp', 'rgb_32bpp.bmp'):
+            filename = os.path.join(base, name)
+            image = decoder.decode(open(filename, 'rb'), filename)
+            self.assertEqual((image.width, image.height), (235, 257))
+            self.assertEqual(len(image._current_data), 
+                             abs(image._current_pitch) * image.height)
+
+if __name__ == '__main__':
+    unittest.main()
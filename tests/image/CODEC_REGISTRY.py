@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+'''Test that codec modules added with add_codec_module are imported only
+when needed, that decoders are ordered by the format sniffed from the file
+and by preference, and that decode statistics are recorded.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+import sys
+import types
+import unittest
+
+from pyglet import image
+from pyglet.image import codecs
+from pyglet.compat import BytesIO
+
+__noninteractive = True
+
+PNG_HEADER = '\x89PNG\r\n\x1a\n' + '\0' * 16
+
+class FakeDecoder(codecs.ImageDecoder):
+    def __init__(self, name, extensions, fail=False, start=0):
+        self.name = name
+        self.extensions = extensions
+        self.fail = fail
+        self.start = start
+
+    def get_file_extensions(self):
+        return self.extensions
+
+    def decode(self, file, filename):
+        assert file.tell() == self.start
+        file.read()
+        if self.fail:
+            raise codecs.ImageDecodeException(self.name)
+        return self.name
+
+class TEST_CASE(unittest.TestCase):
+    registry = ['_decoders', '_decoder_extensions',
+                '_decoder_animation_extensions', '_encoders',
+                '_encoder_extensions', '_codec_modules', '_decoder_stats']
+
+    def setUp(self):
+        self.saved = dict([(name, getattr(codecs, name)) \
+                           for name in self.registry])
+        for name in self.registry:
+            setattr(codecs, name, type(getattr(codecs, name))())
+        self.imported = []
+
+    def tearDown(self):
+        for name, value in self.saved.items():
+            setattr(codecs, name, value)
+        for name in list(sys.modules):
+            if name.startswith('_fake_codec_'):
+                del sys.modules[name]
+
+    def add_module(self, name, decoders, extensions):
+        module = types.ModuleType('_fake_codec_' + name)
+        def get_decoders():
+            self.imported.append(name)
+            return decoders
+        module.get_decoders = get_decoders
+        module.get_encoders = lambda: []
+        sys.modules[module.__name__] = module
+        codecs.add_codec_module(module.__name__, extensions)
+
+    def test_guess_file_extension(self):
+        self.assertEqual(codecs.guess_file_extension(PNG_HEADER), '.png')
+        self.assertEqual(codecs.guess_file_extension('GIF89a...'), '.gif')
+        self.assertEqual(codecs.guess_file_extension('BM'), '.bmp')
+        self.assertEqual(codecs.guess_file_extension('????'), None)
+        self.assertEqual(codecs.guess_file_extension(''), None)
+
+    def test_lazy_import(self):
+        self.add_module('png', [FakeDecoder('png', ['.png'])], ['.png'])
+        self.add_module('bmp', [FakeDecoder('bmp', ['.bmp'])], ['.bmp'])
+        decoders = codecs.get_decoders('test.bmp')
+        self.assertEqual([d.name for d in decoders], ['bmp'])
+        self.assertEqual(self.imported, ['bmp'])
+
+    def test_unknown_imports_all(self):
+        self.add_module('png', [FakeDecoder('png', ['.png'])], ['.png'])
+        self.add_module('bmp', [FakeDecoder('bmp', ['.bmp'])], ['.bmp'])
+        decoders = codecs.get_decoders('test.xyz', '????')
+        self.assertEqual([d.name for d in decoders], ['png', 'bmp'])
+
+    def test_sniffed_first(self):
+        self.add_module('bmp', [FakeDecoder('bmp', ['.bmp'])], ['.bmp'])
+        self.add_module('png', [FakeDecoder('png', ['.png'])], ['.png'])
+        decoders = codecs.get_decoders('misnamed.bmp', PNG_HEADER)
+        self.assertEqual([d.name for d in decoders], ['png', 'bmp'])
+
+    def test_preference(self):
+        self.add_module('all', [FakeDecoder('all', ['.png', '.tga'])], 
+                        ['.png', '.tga'])
+        self.add_module('png', [FakeDecoder('png', ['.png'])], ['.png'])
+        self.add_module('tga', [FakeDecoder('tga', ['.tga'])], ['.tga'])
+        codecs.get_decoders('test.tga')
+        self.assertEqual(self.imported, ['all', 'tga'])
+        decoders = codecs.get_decoders('test.png')
+        self.assertEqual([d.name for d in decoders], ['all', 'png'])
+
+    def test_fallback(self):
+        self.add_module('gif', [FakeDecoder('gif', ['.gif'])], ['.gif'])
+        self.add_module('png', [FakeDecoder('png', ['.png'], fail=True)],
+                        ['.png'])
+        # Decoders for other formats are only tried once those for the
+        # format of the file fail, in order of preference.
+        result = image.load('test.png', file=BytesIO(PNG_HEADER))
+        self.assertEqual(result, 'gif')
+        self.assertEqual(self.imported, ['png', 'gif'])
+
+    def test_load_offset(self):
+        self.add_module('png', [FakeDecoder('png', ['.png'], start=4)], 
+                        ['.png'])
+        file = BytesIO('....' + PNG_HEADER)
+        file.seek(4)
+        self.assertEqual(image.load('test', file=file), 'png')
+
+    def test_default_extensions(self):
+        # The extensions given for the default codec modules match those
+        # of the codecs, where the module can be imported.
+        for name, extensions in codecs._default_codec_extensions.items():
+            try:
+                __import__(name)
+            except Exception:
+                continue
+            module = sys.modules[name]
+            try:
+                decoders = module.get_decoders()
+                encoders = module.get_encoders()
+            except Exception:
+                continue
+            found = (
+                [e for d in decoders for e in d.get_file_extensions()],
+                [e for d in decoders \
+                   for e in d.get_animation_file_extensions()],
+                [e for d in encoders for e in d.get_file_extensions()])
+            for expected, result in zip(extensions, found):
+                self.assertEqual(sorted(set(expected)), sorted(set(result)),
+                                 name)
+
+    def test_load_stats(self):
+        self.add_module('bad', [FakeDecoder('bad', ['.png'], fail=True)], 
+                        ['.png'])
+        self.add_module('png', [FakeDecoder('png', ['.png'])], ['.png'])
+        for i in range(2):
+            result = image.load('test', file=BytesIO(PNG_HEADER))
+            self.assertEqual(result, 'png')
+        stats = codecs.get_decoder_stats()['FakeDecoder']
+        self.assertEqual(stats.attempts, 4)
+        self.assertEqual(stats.failures, 2)
+
+if __name__ == '__main__':
+    unittest.main()
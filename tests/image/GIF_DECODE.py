@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+
+'''Test the pure-Python GIF decoder, including LZW decompression,
+interlacing, transparency, frame disposal and sharing of unchanged frames.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import os
+import random
+import struct
+import unittest
+
+from pyglet import image
+from pyglet.compat import BytesIO
+from pyglet.image.codecs import gif
+
+__noninteractive = True
+
+base = os.path.dirname(__file__)
+
+def encode_lzw(indices, lzw_code_size):
+    clear_code = 1 << lzw_code_size
+    table = dict((chr(i), i) for i in range(clear_code))
+    next_code = clear_code + 2
+    state = {'code_size': lzw_code_size + 1, 'bits': 0, 'bit_count': 0}
+    output = bytearray()
+
+    def emit(code):
+        state['bits'] |= code << state['bit_count']
+        state['bit_count'] += state['code_size']
+        while state['bit_count'] >= 8:
+            output.append(state['bits'] & 0xff)
+            state['bits'] >>= 8
+            state['bit_count'] -= 8
+
+    emit(clear_code)
+    prefix = ''
+    for c in indices:
+        if prefix + c in table:
+            prefix += c
+            continue
+        emit(table[prefix])
+        if next_code < 4096:
+            table[prefix + c] = next_code
+            next_code += 1
+            if next_code > 1 << state['code_size'] and \
+               state['code_size'] < 12:
+                state['code_size'] += 1
+        prefix = c
+    if prefix:
+        emit(table[prefix])
+    emit(clear_code + 1)
+    if state['bit_count']:
+        output.append(state['bits'])
+    return bytes(output)
+
+def make_gif(width, height, palette, frames):
+    data = ['GIF89a', struct.pack('<HHBBB', width, height, 0x87, 0, 0),
+            ''.join([chr(c) for color in palette for c in color]).ljust(
+                768, '\0')]
+    for frame in frames:
+        transparent = frame.get('transparent')
+        fields = frame.get('disposal', 0) << 2 | (transparent is not None)
+        data.append(struct.pack('<BBBBHBB', 0x21, 0xf9, 4, fields,
+                                frame.get('delay', 10), transparent or 0, 0))
+        x, y, w, h = frame['rect']
+        indices = frame['indices']
+        interlaced = frame.get('interlaced', False)
+        if interlaced:
+            rows = [indices[i * w:(i + 1) * w] for i in range(h)]
+            order = range(0, h, 8) + range(4, h, 8) + range(2, h, 4) + \
+                    range(1, h, 2)
+            indices = ''.join([rows[i] for i in order])
+        data.append(struct.pack('<BHHHHB', 0x2c, x, y, w, h, 
+                                interlaced and 0x40 or 0))
+        encoded = encode_lzw(indices, 8)
+        data.append('\x08')
+        for i in range(0, len(encoded), 255):
+            block = encoded[i:i + 255]
+            data.append(chr(len(block)) + block)
+        data.append('\0')
+    data.append(';')
+    return ''.join(data)
+
+palette = [(i, 255 - i, (i * 7) & 0xff) for i in range(256)]
+
+def get_pixels(img):
+    # Rows top first, as (r, g, b, a) tuples.
+    data = bytearray(img.get_image_data().get_data('RGBA', -img.width * 4))
+    return [tuple(data[i:i + 4]) for i in range(0, len(data), 4)]
+
+def rgba(index):
+    return palette[index] + (255,)
+
+class TEST_CASE(unittest.TestCase):
+    def decode_animation(self, width, height, frames):
+        data = make_gif(width, height, palette, frames)
+        return gif.GIFImageDecoder().decode_animation(BytesIO(data), 
+                                                      'test.gif')
+
+    def test_lzw(self):
+        rng = random.Random(1)
+        for length in (1, 2, 100, 20000):
+            # Runs of a few values give long table entries.
+            indices = [rng.choice((0, 1, 255, rng.randint(0, 255))) \
+                       for i in range(length)]
+            indices = ''.join([chr(i) for i in indices])
+            self.assertEqual(gif.decode_lzw(encode_lzw(indices, 8), 8), 
+                             indices)
+
+    def test_lzw_invalid(self):
+        self.assertRaises(image.codecs.ImageDecodeException,
+                          gif.decode_lzw, '\xff\xff', 2)
+
+    def test_single(self):
+        indices = ''.join([chr(i * 37 & 0xff) for i in range(12 * 5)])
+        for interlaced in (False, True):
+            data = make_gif(12, 5, palette, [{'rect': (0, 0, 12, 5), 
+                'indices': indices, 'interlaced': interlaced}])
+            img = gif.GIFImageDecoder().decode(BytesIO(data), 'test.gif')
+            self.assertEqual(get_pixels(img), 
+                             [rgba(ord(i)) for i in indices])
+
+    def test_compositing(self):
+        animation = self.decode_animation(4, 2, [
+            {'rect': (0, 0, 4, 2), 'indices': '\1' * 8},
+            # Transparent pixels leave the first frame visible.
+            {'rect': (1, 0, 2, 2), 'indices': '\2\0\0\2', 'transparent': 0,
+             'disposal': gif.DISPOSE_BACKGROUND},
+            # The second frame is cleared to transparent.
+            {'rect': (3, 1, 1, 1), 'indices': '\3',
+             'disposal': gif.DISPOSE_PREVIOUS},
+            # The third frame is restored.
+            {'rect': (0, 0, 1, 1), 'indices': '\4'},
+        ])
+        a, b, c, d = rgba(1), rgba(2), rgba(3), rgba(4)
+        clear = (0, 0, 0, 0)
+        expected = [
+            [a, a, a, a, a, a, a, a],
+            [a, b, a, a, a, a, b, a],
+            [a, clear, clear, a, a, clear, clear, c],
+            [d, clear, clear, a, a, clear, clear, a],
+        ]
+        self.assertEqual(len(animation.frames), 4)
+        for frame, pixels in zip(animation.frames, expected):
+            self.assertEqual(get_pixels(frame.image), pixels)
+            self.assertEqual(frame.duration, 0.1)
+        # Out of order access replays the changes from the start.
+        self.assertEqual(get_pixels(animation.frames[1].image), expected[1])
+
+    def test_shared_frames(self):
+        animation = self.decode_animation(2, 2, [
+            {'rect': (0, 0, 2, 2), 'indices': '\1\1\1\1'},
+            {'rect': (0, 0, 1, 1), 'indices': '\1'},
+            {'rect': (0, 0, 1, 1), 'indices': '\2'},
+            {'rect': (1, 1, 1, 1), 'indices': '\5', 'transparent': 5},
+        ])
+        images = [frame.image for frame in animation.frames]
+        self.assertTrue(images[0] is images[1])
+        self.assertTrue(images[2] is images[3])
+        self.assertTrue(images[0] is not images[2])
+        self.assertEqual(images[0].compositor.changes[1][:4], (0, 0, 1, 1))
+
+        added = []
+        class Bin(object):
+            def add(self, img):
+                added.append(img)
+                return 'region %d' % len(added)
+        animation.add_to_texture_bin(Bin())
+        self.assertEqual(added, [images[0], images[2]])
+        self.assertEqual([frame.image for frame in animation.frames],
+                         ['region 1', 'region 1', 'region 2', 'region 2'])
+
+    def test_file(self):
+        filename = os.path.join(base, '8bpp.gif')
+        img = gif.GIFImageDecoder().decode(open(filename, 'rb'), filename)
+        reference = image.load(os.path.join(base, 'rgb.png'))
+        self.assertEqual((img.width, img.height), 
+                         (reference.width, reference.height))
+        data = bytearray(img.get_data('RGB', img.width * 3))
+        reference = bytearray(reference.get_data('RGB', img.width * 3))
+        # The GIF is a palettised copy of the PNG.
+        error = sum([abs(x - y) for x, y in zip(data, reference)])
+        self.assertTrue(error / float(len(data)) < 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+'''Test that image.load_many decodes images in parallel and returns them in
+the requested order, and that TextureBin.add_many packs the tallest images
+first.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+import os
+import unittest
+
+from pyglet import image
+from pyglet.image import atlas
+from pyglet.image import codecs
+
+__noninteractive = True
+
+base = os.path.dirname(__file__)
+names = ['rgb.png', 'rgb_16bpp.bmp', 'la.png', 'rgba.png', 'rgb_24bpp.bmp',
+         'l.png']
+filenames = [os.path.join(base, name) for name in names]
+
+class TEST_CASE(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = [image.load(filename) for filename in filenames]
+
+    def check(self, images):
+        self.assertEqual(len(images), len(self.expected))
+        for img, expected in zip(images, self.expected):
+            self.assertEqual((img.width, img.height),
+                             (expected.width, expected.height))
+            self.assertEqual(img.get_data('RGBA', img.width * 4),
+                             expected.get_data('RGBA', expected.width * 4))
+
+    def test_serial(self):
+        self.check(image.load_many(filenames, workers=1))
+
+    def test_threads(self):
+        self.check(image.load_many(filenames, workers=3))
+
+    def test_processes(self):
+        self.check(image.load_many(filenames, workers=2, processes=True))
+
+    def test_files(self):
+        files = [open(filename, 'rb') for filename in filenames]
+        files[1].close()
+        files[1] = None
+        try:
+            self.check(image.load_many(filenames, files, workers=2))
+        finally:
+            for file in files:
+                if file:
+                    file.close()
+
+    def test_callback(self):
+        progress = []
+        image.load_many(filenames, workers=2,
+                        callback=lambda *args: progress.append(args))
+        total = len(filenames)
+        self.assertEqual(progress,
+                         [(i + 1, total) for i in range(total)])
+
+    def test_error(self):
+        self.assertRaises(codecs.ImageDecodeException, image.load_many,
+                          filenames + [__file__], workers=2)
+
+    def test_add_many(self):
+        added = []
+        bin = atlas.TextureBin()
+        def add(img):
+            added.append(img)
+            return img.height
+        bin.add = add
+        heights = [img.height for img in self.expected]
+        self.assertEqual(bin.add_many(self.expected), heights)
+        self.assertEqual([img.height for img in added],
+                         sorted(heights, reverse=True))
+
+if __name__ == '__main__':
+    unittest.main()
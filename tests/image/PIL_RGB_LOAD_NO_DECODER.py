@@ -18,7 +18,8 @@ def raise_error(obj, param):
     raise Exception()
 Image.Image.transpose = raise_error
 
-codecs.get_decoders = lambda filename: [PILImageDecoder(), PNGImageDecoder(),]
+codecs.get_decoders = lambda filename, header=None: [PILImageDecoder(),
+                                                     PNGImageDecoder(),]
 
 class TEST_PIL_RGB_LOAD_NO_DECODER(base_load.TestLoad):
     texture_file = 'rgb.png'
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+'''Test packing images into the layers of a texture array, and drawing
+sprites of different layers with one group.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet.image import *
+from pyglet.image import atlas
+
+from texture_base import colorbyte
+
+__noninteractive = True
+
+class TestTextureArray(unittest.TestCase):
+    def create_image(self, width, height, color):
+        data = colorbyte(color) * (width * height)
+        return ImageData(width, height, 'L', data)
+
+    def check_image(self, image, color):
+        image = image.get_image_data()
+        data = image.get_data('L', image.width)
+        self.assertTrue(data == colorbyte(color) * len(data))
+
+    def test_layers(self):
+        bin = atlas.TextureArrayBin(16, 16, layers=2)
+        regions = [bin.add(self.create_image(16, 16, i + 1))
+                   for i in range(5)]
+        self.assertEqual(len(bin.atlases), 3)
+        self.assertEqual([region.z for region in regions], [0, 1, 0, 1, 0])
+        self.assertTrue(regions[0].owner is regions[1].owner)
+        self.assertTrue(regions[1].owner is not regions[2].owner)
+
+        # Each region samples the centre of its layer.
+        self.assertAlmostEqual(regions[0].tex_coords[2], 0.25)
+        self.assertAlmostEqual(regions[1].tex_coords[2], 0.75)
+        for i, region in enumerate(regions):
+            self.check_image(region, i + 1)
+
+    def test_pack(self):
+        array = atlas.TextureArray(16, 16, layers=2)
+        regions = [array.add(self.create_image(8, 8, i + 1))
+                   for i in range(8)]
+        self.assertEqual([region.z for region in regions],
+                         [0, 0, 0, 0, 1, 1, 1, 1])
+        self.assertRaises(atlas.AllocatorException,
+                          array.add, self.create_image(8, 8, 9))
+        for i, region in enumerate(regions):
+            self.check_image(region, i + 1)
+
+    def test_sprite_group(self):
+        bin = atlas.TextureArrayBin(16, 16, layers=4)
+        batch = pyglet.graphics.Batch()
+        sprites = [pyglet.sprite.Sprite(
+                       bin.add(self.create_image(16, 16, i + 1)), batch=batch)
+                   for i in range(4)]
+        self.assertEqual(len(batch.top_groups), 1)
+        sprites[0].image = sprites[3].image
+        self.assertEqual(list(sprites[0]._vertex_list.tex_coords),
+                         list(sprites[3]._vertex_list.tex_coords))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+'''Test that AudioClock counts samples, interpolates between updates and
+returns scheduled events in order.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+import unittest
+
+from pyglet.media import AudioClock, MediaEvent
+
+__noninteractive = True
+
+class FakeTime(object):
+    def __init__(self):
+        self.time = 100.
+
+    def __call__(self):
+        return self.time
+
+class TEST_CASE(unittest.TestCase):
+    def setUp(self):
+        self.time = FakeTime()
+        self.clock = AudioClock(1000, time_func=self.time)
+
+    def test_paused(self):
+        self.clock.write(5000)
+        self.time.time += 1
+        self.assertEqual(self.clock.get_samples(), 0)
+
+    def test_interpolate(self):
+        self.clock.write(5000)
+        self.clock.play()
+        self.time.time += 0.25
+        self.assertEqual(self.clock.get_samples(), 250)
+        self.clock.update(300)
+        self.time.time += 0.125
+        self.assertEqual(self.clock.get_samples(), 425)
+        self.assertAlmostEqual(self.clock.get_time(), 0.425)
+
+    def test_monotonic(self):
+        self.clock.write(5000)
+        self.clock.play()
+        self.time.time += 0.5
+        self.assertEqual(self.clock.get_samples(), 500)
+
+        # Device reports it is behind the interpolated position.
+        self.clock.update(450)
+        self.assertEqual(self.clock.get_samples(), 500)
+        self.time.time += 0.125
+        self.assertEqual(self.clock.get_samples(), 575)
+
+    def test_pause(self):
+        self.clock.write(5000)
+        self.clock.play()
+        self.time.time += 0.5
+        self.clock.pause()
+        self.time.time += 1
+        self.assertEqual(self.clock.get_samples(), 500)
+        self.clock.play()
+        self.time.time += 0.125
+        self.assertEqual(self.clock.get_samples(), 625)
+
+    def test_underrun(self):
+        self.clock.write(100)
+        self.clock.play()
+        self.time.time += 1
+        self.assertEqual(self.clock.get_samples(), 100)
+
+        # Time spent waiting for data is not counted.
+        self.clock.write(1000)
+        self.time.time += 0.125
+        self.assertEqual(self.clock.get_samples(), 225)
+
+    def test_reset(self):
+        self.clock.write(5000)
+        self.clock.play()
+        self.time.time += 0.5
+        self.clock.schedule_event(600, MediaEvent(0, 'on_eos'))
+        self.clock.reset()
+        self.assertEqual(self.clock.get_samples(), 0)
+        self.assertEqual(self.clock.written, 0)
+        self.assertEqual(self.clock.get_next_event_samples(), None)
+
+    def test_events(self):
+        first = MediaEvent(0, 'on_eos')
+        second = MediaEvent(0, 'on_source_group_eos')
+        early = MediaEvent(0, 'on_early')
+        self.clock.write(5000)
+        self.clock.schedule_event(200, first)
+        self.clock.schedule_event(200, second)
+        self.clock.schedule_event(100, early)
+        self.assertEqual(self.clock.get_next_event_samples(), 100)
+
+        self.clock.play()
+        self.assertEqual(self.clock.get_due_events(), [])
+        self.time.time += 0.125
+        self.assertEqual(self.clock.get_due_events(), [early])
+        self.time.time += 0.125
+        self.assertEqual(self.clock.get_due_events(), [first, second])
+        self.assertEqual(self.clock.get_next_event_samples(), None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+
+'''Test that audio data is converted between sample rates, channel counts
+and sample sizes, and that SourceGroup converts queued sources to its own
+format.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+import array
+import math
+import unittest
+
+from pyglet import media
+from pyglet.media import convert
+
+__noninteractive = True
+
+def sine(audio_format, duration, frequency=440.):
+    '''Create a sine wave in the given format.'''
+    count = int(duration * audio_format.sample_rate)
+    step = frequency * math.pi * 2 / audio_format.sample_rate
+    if audio_format.sample_size == 8:
+        values = [int(math.sin(step * i) * 100 + 128) for i in range(count)]
+        samples = array.array('B')
+    else:
+        values = [int(math.sin(step * i) * 20000) for i in range(count)]
+        samples = array.array('h')
+    for value in values:
+        samples.extend([value] * audio_format.channels)
+    return samples.tostring()
+
+class ToneSource(media.Source):
+    def __init__(self, audio_format, duration):
+        self.audio_format = audio_format
+        self._duration = duration
+        self._data = sine(audio_format, duration)
+        self._offset = 0
+
+    def seek(self, timestamp):
+        self._offset = int(timestamp * self.audio_format.sample_rate) * \
+            self.audio_format.bytes_per_sample
+
+    def get_audio_data(self, bytes):
+        bytes -= bytes % self.audio_format.bytes_per_sample
+        data = self._data[self._offset:self._offset + bytes]
+        if not data:
+            return None
+        timestamp = self._offset / float(self.audio_format.bytes_per_second)
+        self._offset += len(data)
+        return media.AudioData(data, len(data), timestamp,
+            len(data) / float(self.audio_format.bytes_per_second), [])
+
+class TEST_CASE(unittest.TestCase):
+    qualities = ['fast', 'medium']
+    if convert.numpy:
+        qualities.append('best')
+
+    def check_convert(self, source_format, target_format):
+        data = sine(source_format, 0.5)
+        expected_length = int(0.5 * target_format.sample_rate) * \
+            target_format.bytes_per_sample
+        for quality in self.qualities:
+            converter = convert.AudioConverter(source_format, target_format,
+                                               quality)
+            # Convert in odd-sized packets to check streaming.
+            result = ''
+            for i in range(0, len(data), 1001):
+                result += converter.convert(data[i:i + 1001])
+
+            self.assertTrue(abs(len(result) - expected_length) <=
+                            32 * target_format.bytes_per_sample,
+                            '%s: length %d, expected %d' % (quality, 
+                                len(result), expected_length))
+            # Compare peak amplitude as a fraction of full scale.
+            if target_format.sample_size == 8:
+                peak = (max(array.array('B', result)) - 128) / 128.
+            else:
+                peak = max(array.array('h', result)) / 32768.
+            if source_format.sample_size == 8:
+                expected_peak = 100 / 128.
+            else:
+                expected_peak = 20000 / 32768.
+            self.assertTrue(abs(peak - expected_peak) < 0.03,
+                            '%s: peak %f, expected %f' % (quality, 
+                                peak, expected_peak))
+
+    def test_upsample(self):
+        self.check_convert(media.AudioFormat(1, 16, 22050),
+                           media.AudioFormat(1, 16, 44100))
+
+    def test_downsample(self):
+        self.check_convert(media.AudioFormat(2, 16, 48000),
+                           media.AudioFormat(2, 16, 44100))
+
+    def test_mono_to_stereo(self):
+        self.check_convert(media.AudioFormat(1, 16, 44100),
+                           media.AudioFormat(2, 16, 44100))
+
+    def test_stereo_to_mono(self):
+        self.check_convert(media.AudioFormat(2, 16, 44100),
+                           media.AudioFormat(1, 16, 22050))
+
+    def test_8bit(self):
+        self.check_convert(media.AudioFormat(1, 8, 22050),
+                           media.AudioFormat(2, 16, 44100))
+        self.check_convert(media.AudioFormat(2, 16, 44100),
+                           media.AudioFormat(1, 8, 44100))
+
+    def test_source_group(self):
+        target_format = media.AudioFormat(2, 16, 44100)
+        group = media.SourceGroup(target_format, None)
+        group.queue(ToneSource(media.AudioFormat(1, 16, 22050), 0.25))
+        group.queue(ToneSource(target_format, 0.25))
+        group.queue(ToneSource(media.AudioFormat(1, 8, 48000), 0.25))
+
+        length = 0
+        while True:
+            audio_data = group.get_audio_data(4096)
+            if not audio_data:
+                break
+            self.assertEqual(audio_data.length % 4, 0)
+            self.assertAlmostEqual(audio_data.duration,
+                audio_data.length / float(target_format.bytes_per_second))
+            length += audio_data.length
+        self.assertAlmostEqual(length / float(target_format.bytes_per_second),
+                               0.75, places=2)
+
+    def test_events(self):
+        # A source returning single bytes, with an event in each packet.
+        source = ToneSource(media.AudioFormat(1, 16, 22050), 0.25)
+        def get_audio_data(bytes):
+            data = source._data[source._offset:source._offset + 1]
+            timestamp = source._offset / 44100.
+            source._offset += 1
+            return media.AudioData(data, 1, timestamp, 0.,
+                                   [media.MediaEvent(timestamp, 'on_test')])
+        source.get_audio_data = get_audio_data
+
+        # The first byte converts to no data; its event is kept.
+        converted = convert.ConvertedSource(source,
+                                            media.AudioFormat(1, 16, 22050))
+        audio_data = converted.get_audio_data(2)
+        self.assertEqual(audio_data.length, 2)
+        self.assertEqual(audio_data.timestamp, 0)
+        self.assertEqual(len(audio_data.events), 2)
+
+    def test_player_groups(self):
+        player = media.Player()
+        player.queue(ToneSource(media.AudioFormat(2, 16, 44100), 0.25))
+        player.queue(ToneSource(media.AudioFormat(1, 8, 22050), 0.25))
+        self.assertEqual(len(player._groups), 1)
+
+        # Formats that cannot be converted start a new group.
+        self.assertFalse(convert.can_convert(media.AudioFormat(6, 16, 44100),
+                                             media.AudioFormat(2, 16, 44100)))
+        player.queue(ToneSource(media.AudioFormat(6, 16, 44100), 0.25))
+        self.assertEqual(len(player._groups), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+'''Test that the silent audio player's play time does not drift from the
+system clock while the process is under load, and that its EOS events are
+delivered together.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+import threading
+import time
+import unittest
+
+import pyglet
+from pyglet import media
+from pyglet.media.drivers import silent
+
+__noninteractive = True
+
+class Load(threading.Thread):
+    def __init__(self):
+        super(Load, self).__init__()
+        self.daemon = True
+        self.stopped = False
+
+    def run(self):
+        while not self.stopped:
+            sum(i * i for i in range(10000))
+
+class SilentSource(media.Source):
+    def __init__(self, duration):
+        self.audio_format = media.AudioFormat(channels=1, sample_size=16,
+                                              sample_rate=44100)
+        self._duration = duration
+        self._offset = 0
+        self._max_offset = \
+            int(duration * self.audio_format.sample_rate) * 2
+
+    def get_audio_data(self, bytes):
+        bytes = min(bytes & ~1, self._max_offset - self._offset)
+        if bytes <= 0:
+            return None
+        timestamp = self._offset / float(self.audio_format.bytes_per_second)
+        duration = bytes / float(self.audio_format.bytes_per_second)
+        self._offset += bytes
+        return media.AudioData('\0' * bytes, bytes, timestamp, duration, [])
+
+def create_source_group(duration):
+    source = SilentSource(duration)
+    group = media.SourceGroup(source.audio_format, None)
+    group.queue(source)
+    return group
+
+class EventRecorder(object):
+    def __init__(self):
+        self.events = []
+
+    def dispatch_event(self, event, *args):
+        self.events.append(event)
+
+class TEST_CASE(unittest.TestCase):
+    # Maximum permitted difference between play time and system time.
+    max_drift = 0.02
+
+    # Duration of measurement.
+    duration = 1.0
+
+    def measure(self, threads):
+        group = create_source_group(self.duration + 0.5)
+        recorder = EventRecorder()
+        audio_player = silent.SilentAudioPlayerPacketConsumer(group, recorder)
+
+        loads = [Load() for i in range(threads)]
+        for load in loads:
+            load.start()
+
+        try:
+            # Wait for the worker to buffer the first packet.
+            while audio_player.get_time() is None:
+                time.sleep(0.001)
+
+            # Each sample is bracketed by system time before and after the
+            # call, so that preemption of this thread is not counted as
+            # drift.
+            start_before = time.time()
+            audio_player.play()
+            start_after = time.time()
+            samples = []
+            while time.time() - start_before < self.duration:
+                sum(i * i for i in range(1000))
+                before = time.time()
+                play_time = audio_player.get_time()
+                after = time.time()
+                samples.append((before - start_after, play_time,
+                                after - start_before))
+        finally:
+            for load in loads:
+                load.stopped = True
+            audio_player.delete()
+
+        drift = max(max(earliest - play_time, play_time - latest)
+                    for earliest, play_time, latest in samples)
+        self.assertTrue(drift < self.max_drift, 
+                        'Drift %f exceeds %f' % (drift, self.max_drift))
+
+        play_times = [play_time for _, play_time, _ in samples]
+        self.assertEqual(play_times, sorted(play_times))
+
+    def test_drift(self):
+        self.measure(0)
+
+    def test_drift_under_load(self):
+        self.measure(3)
+
+    def test_eos_batch(self):
+        group = create_source_group(0.1)
+        recorder = EventRecorder()
+        audio_player = silent.SilentAudioPlayerPacketConsumer(group, recorder)
+        audio_player.play()
+        time.sleep(0.4)
+        audio_player.delete()
+
+        pyglet.app.platform_event_loop.dispatch_posted_events()
+        self.assertEqual(recorder.events, ['on_eos', 'on_source_group_eos'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+
+'''Test reading resources from ZIP archives through a memory map, with
+cached and streamed decompression and a pre-built index.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+__noninteractive = True
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from pyglet import resource
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'res.zip')
+        rng = random.Random(1)
+        self.members = {
+            'stored.txt': 'line 1\nline 2\nline 3',
+            'dir/small.txt': 'small ' * 100,
+            'dir/large.txt': ''.join([rng.choice('abc') 
+                                      for i in range(200000)]),
+            'other.bin': ''.join([chr(rng.randint(0, 255)) 
+                                  for i in range(5000)]),
+        }
+        self.write_archive()
+
+    def write_archive(self):
+        # Members under dir/ are deflated, others stored.
+        zip = zipfile.ZipFile(self.path, 'w')
+        for name, data in sorted(self.members.items()):
+            info = zipfile.ZipInfo(name)
+            if name.startswith('dir/'):
+                info.compress_type = zipfile.ZIP_DEFLATED
+            zip.writestr(info, data)
+        zip.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def open_archive(self, **kwargs):
+        archive = resource.ZIPArchive(self.path, **kwargs)
+        self.addCleanup(archive.close)
+        return archive
+
+    def test_read(self):
+        archive = self.open_archive()
+        self.assertEqual(sorted(archive.entries), sorted(self.members))
+        for name, data in self.members.items():
+            self.assertEqual(archive.open(name).read(), data)
+
+    def test_stored(self):
+        archive = self.open_archive()
+        file = archive.open('stored.txt')
+        self.assertEqual(file.readline(), 'line 1\n')
+        self.assertEqual(file.tell(), 7)
+        self.assertEqual(file.read(4), 'line')
+        file.seek(-6, 2)
+        self.assertEqual(file.read(), 'line 3')
+        self.assertEqual(file.read(), '')
+
+    def test_cache(self):
+        archive = self.open_archive(cache_size=2400)
+        archive.open('dir/small.txt')
+        self.assertEqual(list(archive._cache), ['dir/small.txt'])
+        self.assertEqual(archive._cache_used, 600)
+
+        # Too large to cache; decompressed while reading.
+        file = archive.open('dir/large.txt')
+        self.assertEqual(list(archive._cache), ['dir/small.txt'])
+        data = self.members['dir/large.txt']
+        self.assertEqual(file.read(10), data[:10])
+        file.seek(150000)
+        self.assertEqual(file.read(10), data[150000:150010])
+        file.seek(5)
+        self.assertEqual(file.tell(), 5)
+        self.assertEqual(file.read(), data[5:])
+
+    def test_cache_eviction(self):
+        # Room for four copies of small.txt.
+        archive = self.open_archive(cache_size=2400)
+        for i in range(2, 6):
+            archive.entries['dir/small%d.txt' % i] = \
+                archive.entries['dir/small.txt']
+        for name in ('small', 'small2', 'small3', 'small', 'small4', 
+                     'small5'):
+            archive.open('dir/%s.txt' % name)
+        self.assertEqual(list(archive._cache), 
+            ['dir/small3.txt', 'dir/small.txt', 'dir/small4.txt', 
+             'dir/small5.txt'])
+        self.assertEqual(archive._cache_used, 2400)
+
+    def test_index(self):
+        archive = self.open_archive()
+        archive.write_index()
+        entries = archive.entries
+
+        def fail():
+            raise AssertionError('Archive was listed')
+        original = resource.ZIPArchive._read_entries
+        resource.ZIPArchive._read_entries = lambda self: fail()
+        try:
+            archive = self.open_archive()
+        finally:
+            resource.ZIPArchive._read_entries = original
+        self.assertEqual(archive.entries, entries)
+        self.assertEqual(archive.open('dir/small.txt').read(), 
+                         self.members['dir/small.txt'])
+
+        # A modified archive is listed again.
+        self.members['new.txt'] = 'new'
+        self.write_archive()
+        os.utime(self.path, (0, 0))
+        archive = self.open_archive()
+        self.assertTrue('new.txt' in archive.entries)
+
+    def test_index_names(self):
+        # Names not encoded in UTF-8 are byte strings, others unicode.
+        self.members['caf\xe9.txt'] = 'latin-1'
+        self.members[u'\xfcber.txt'] = 'utf-8'
+        self.write_archive()
+        archive = self.open_archive()
+        archive.write_index()
+        def split(names):
+            return (set([name for name in names if isinstance(name, str)]),
+                    set([name for name in names 
+                         if isinstance(name, unicode)]))
+        names = split(archive.entries)
+        self.assertTrue('caf\xe9.txt' in names[0])
+        self.assertTrue(u'\xfcber.txt' in names[1])
+
+        indexed = self.open_archive()
+        self.assertEqual(split(indexed.entries), names)
+        self.assertEqual(indexed.open('caf\xe9.txt').read(), 'latin-1')
+        self.assertEqual(indexed.open(u'\xfcber.txt').read(), 'utf-8')
+
+    def test_loader(self):
+        loader = resource.Loader([self.path + '/dir', self.path], 
+                                 script_home=self.dir)
+        self.assertEqual(loader.file('small.txt').read(), 
+                         self.members['dir/small.txt'])
+        self.assertEqual(loader.file('stored.txt').read(), 
+                         self.members['stored.txt'])
+        archives = dict(loader._archives)
+        self.assertEqual(archives.keys(), [self.path])
+        loader.reindex()
+        self.assertTrue(loader._archives[self.path] is archives[self.path])
+
+        # Unmodified archives are not listed again.
+        class UnlistedEntries(dict):
+            def __iter__(self):
+                raise AssertionError('Archive was listed')
+        archive = archives[self.path]
+        archive.entries = UnlistedEntries(archive.entries)
+        loader.reindex()
+        self.assertEqual(loader.file('small.txt').read(), 
+                         self.members['dir/small.txt'])
+        self.assertEqual(loader.file('stored.txt').read(), 
+                         self.members['stored.txt'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+'''Test loading resources in the background with the Loader ``_async``
+methods.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+__noninteractive = True
+
+import os
+import threading
+import time
+import unittest
+
+import pyglet
+from pyglet import resource
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self.loader = resource.Loader(script_home=os.path.dirname(__file__))
+        self.loader.async_workers = 1
+        self.order = []
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def load(self, name, priority=0, finish=None, wait=False):
+        def decode():
+            if wait:
+                self.release.wait()
+            self.order.append(name)
+            return name
+        return self.loader._load_async(name, priority, decode, finish)
+
+    def block(self):
+        # Occupy the worker until `release` is set.
+        future = self.load('first', wait=True)
+        while future._state != future._running:
+            time.sleep(0.001)
+        return future
+
+    def tick_until(self, condition):
+        start = time.time()
+        while not condition():
+            self.assertTrue(time.time() - start < 5, 'Timed out')
+            pyglet.clock.tick()
+            time.sleep(0.001)
+
+    def test_text(self):
+        future = self.loader.text_async('file.txt')
+        self.tick_until(future.done)
+        self.assertEqual(future.result().text, 'F1\n')
+        self.assertEqual(future.exception(), None)
+
+    def test_html_images_on_main_thread(self):
+        # Images in the document are loaded into textures, which needs the
+        # context of the main thread.
+        w = pyglet.window.Window(width=10, height=10, visible=False)
+        threads = []
+        load = pyglet.image.load
+        def load_image(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return load(*args, **kwargs)
+        pyglet.image.load = load_image
+        try:
+            future = self.loader.html_async('image.html')
+            self.tick_until(future.done)
+            document = future.result()
+        finally:
+            pyglet.image.load = load
+            w.close()
+        self.assertEqual(threads, [threading.current_thread()])
+        self.assertEqual(document.text, u'Image: \0')
+        self.assertEqual(len(document._elements), 1)
+
+    def test_finish_on_main_thread(self):
+        threads = []
+        def finish(value):
+            threads.append(threading.current_thread())
+            return value.upper()
+        future = self.load('a', finish=finish)
+        done = []
+        future.add_done_callback(done.append)
+        self.tick_until(future.done)
+        self.assertEqual(future.result(), 'A')
+        self.assertEqual(threads, [threading.current_thread()])
+        self.assertEqual(done, [future])
+
+    def test_priority(self):
+        self.block()
+        futures = [self.load('low', 1), self.load('normal'), 
+                   self.load('high', 5)]
+        futures[1].set_priority(2)
+        self.release.set()
+        self.tick_until(lambda: all([f.done() for f in futures]))
+        self.assertEqual(self.order, ['first', 'high', 'normal', 'low'])
+
+    def test_cancel(self):
+        self.block()
+        future = self.load('cancelled')
+        done = []
+        future.add_done_callback(done.append)
+        self.assertTrue(future.cancel())
+        self.assertEqual(done, [future])
+        self.assertTrue(future.cancelled())
+        self.assertFalse(future.cancel())
+        self.assertRaises(resource.LoadCancelledException, future.result)
+        last = self.load('last')
+        self.release.set()
+        self.tick_until(last.done)
+        self.assertEqual(self.order, ['first', 'last'])
+
+    def test_cancel_running(self):
+        future = self.block()
+        future.cancel()
+        self.release.set()
+        last = self.load('last')
+        self.tick_until(last.done)
+        self.assertTrue(future.cancelled())
+        self.assertEqual(self.order, ['first', 'last'])
+
+    def test_result_runs_pending(self):
+        self.block()
+        future = self.load('pending')
+        self.assertEqual(future.result(), 'pending')
+        self.assertEqual(self.order, ['pending'])
+
+    def test_exception(self):
+        future = self.loader.text_async('missing.txt')
+        self.assertRaises(resource.ResourceNotFoundException, future.result)
+        self.assertTrue(isinstance(future.exception(),
+                                   resource.ResourceNotFoundException))
+
+    def test_callback_error(self):
+        def fail(future):
+            raise ValueError()
+        future = self.load('a')
+        future.add_done_callback(fail)
+        while future._state != future._decoded:
+            time.sleep(0.001)
+        queue = self.loader._load_queue
+        self.assertRaises(ValueError, queue._dispatch, 0)
+        self.assertTrue(future.done())
+        self.assertFalse(queue._scheduled)
+
+        # Later futures still complete.
+        last = self.load('last')
+        self.tick_until(last.done)
+        self.assertEqual(last.result(), 'last')
+
+    def test_workers(self):
+        self.loader.async_workers = 2
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+        def decode():
+            lock.acquire()
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            lock.release()
+            time.sleep(0.01)
+            lock.acquire()
+            running[0] -= 1
+            lock.release()
+        futures = [self.loader._load_async(str(i), 0, decode) \
+                   for i in range(8)]
+        self.tick_until(lambda: all([f.done() for f in futures]))
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(len(self.loader._load_queue._threads), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+'''Test the memory-budgeted resource cache used by the Loader.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+__noninteractive = True
+
+import gc
+import os
+import unittest
+
+from pyglet import gl
+from pyglet import image
+from pyglet import resource
+
+def make_texture(width, height, internalformat=gl.GL_RGBA):
+    texture = image.Texture(width, height, gl.GL_TEXTURE_2D, 0)
+    texture.internalformat = internalformat
+    return texture
+
+class TestCase(unittest.TestCase):
+    def test_resource_size(self):
+        self.assertEqual(resource.get_resource_size(make_texture(16, 8)),
+                         16 * 8 * 4)
+        self.assertEqual(resource.get_resource_size(
+            make_texture(16, 8, gl.GL_ALPHA)), 16 * 8)
+        self.assertEqual(resource.get_resource_size(
+            make_texture(16, 8, None)), 16 * 8 * 4)
+
+        owner = make_texture(256, 256)
+        region = owner.get_region(0, 0, 10, 20)
+        self.assertEqual(resource.get_resource_size(region), 10 * 20 * 4)
+
+        frame = make_texture(4, 4)
+        animation = image.Animation([image.AnimationFrame(frame, 0.1),
+                                     image.AnimationFrame(frame, 0.1)])
+        self.assertEqual(resource.get_resource_size(animation), 4 * 4 * 4)
+        self.assertEqual(resource.get_resource_size('text'), 0)
+
+    def test_counters(self):
+        cache = resource.ResourceCache(1024)
+        textures = cache.get_kind('texture')
+        texture = make_texture(4, 4)
+        self.assertFalse('a' in textures)
+        textures['a'] = texture
+        self.assertTrue(textures['a'] is texture)
+        self.assertTrue(textures['a'] is texture)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(cache.size, 64)
+        self.assertEqual(textures.keys(), ['a'])
+        self.assertEqual(textures.get('b'), None)
+
+    def test_strong_tier(self):
+        cache = resource.ResourceCache(1024)
+        textures = cache.get_kind('texture')
+        textures['a'] = make_texture(4, 4)
+        gc.collect()
+        self.assertTrue('a' in textures)
+
+    def test_eviction(self):
+        cache = resource.ResourceCache(2 * 64)
+        textures = cache.get_kind('texture')
+        textures['a'] = make_texture(4, 4)
+        textures['b'] = make_texture(4, 4)
+        textures['a']
+        textures['c'] = make_texture(4, 4)
+        gc.collect()
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.size, 2 * 64)
+        self.assertEqual(sorted(textures.keys()), ['a', 'c'])
+
+    def test_referenced_not_evicted(self):
+        cache = resource.ResourceCache(0)
+        textures = cache.get_kind('texture')
+        texture = textures['a'] = make_texture(4, 4)
+        gc.collect()
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.size, 0)
+        self.assertTrue(textures['a'] is texture)
+
+    def test_pin(self):
+        cache = resource.ResourceCache(0)
+        images = cache.get_kind('image')
+        cache.pin('a')
+        images['a'] = make_texture(4, 4)
+        images['b'] = make_texture(4, 4)
+        gc.collect()
+        self.assertEqual(images.keys(), ['a'])
+        self.assertEqual(cache.size, 64)
+        self.assertEqual(cache.get_pinned_names(), ['a'])
+
+        cache.unpin('a')
+        gc.collect()
+        self.assertEqual(images.keys(), [])
+        self.assertEqual(cache.size, 0)
+
+    def test_pin_loaded(self):
+        cache = resource.ResourceCache(0)
+        images = cache.get_kind('image')
+        texture = images['a'] = make_texture(4, 4)
+        cache.pin('a')
+        del texture
+        gc.collect()
+        self.assertTrue('a' in images)
+
+    def test_replace(self):
+        cache = resource.ResourceCache(1024)
+        textures = cache.get_kind('texture')
+        textures['a'] = make_texture(4, 4)
+        textures['a'] = make_texture(8, 8)
+        self.assertEqual(cache.size, 256)
+
+    def test_loader(self):
+        loader = resource.Loader(script_home=os.path.dirname(__file__))
+        loader.cache_budget = 100
+        loader.reindex()
+        self.assertEqual(loader.cache.budget, 100)
+        loader._cached_textures['a'] = make_texture(4, 4)
+        loader._cached_images['b'] = make_texture(2, 2)
+        self.assertEqual(loader.get_cached_sizes(),
+                         {('texture', 'a'): 64, ('image', 'b'): 16})
+        loader.pin('a')
+        self.assertEqual(loader.cache.get_pinned_names(), ['a'])
+        loader.unpin('a')
+        self.assertEqual(loader.get_texture_bin_memory_usage(), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+
+'''Test the GridIndex and AABBTree spatial indexes against a linear scan.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+__noninteractive = True
+
+import random
+import unittest
+
+from pyglet import spatial
+
+def overlaps(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+class SpatialIndexTestMixin(object):
+    def test_empty(self):
+        index = self.create_index()
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.get_at(0, 0), [])
+        self.assertEqual(index.get_in_region(-10, -10, 10, 10), [])
+        self.assertEqual(index.get_pairs(), [])
+
+    def test_point(self):
+        index = self.create_index()
+        index.add('a', 0, 0, 10, 10)
+        index.add('b', 5, 5, 20, 20)
+        self.assertEqual(sorted(index.get_at(7, 7)), ['a', 'b'])
+        self.assertEqual(sorted(index.get_at(10, 10)), ['a', 'b'])
+        self.assertEqual(index.get_at(15, 15), ['b'])
+        self.assertEqual(index.get_at(-1, 0), [])
+        self.assertTrue('a' in index)
+        self.assertEqual(index.get_bounds('b'), (5, 5, 20, 20))
+
+    def test_update(self):
+        index = self.create_index()
+        index.add('a', 0, 0, 10, 10)
+        index.update('a', 1000, 1000, 1010, 1010)
+        self.assertEqual(index.get_at(5, 5), [])
+        self.assertEqual(index.get_at(1005, 1005), ['a'])
+        index.add('a', 0, 0, 10, 10)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.get_at(5, 5), ['a'])
+
+    def test_remove(self):
+        index = self.create_index()
+        index.add('a', 0, 0, 10, 10)
+        index.add('b', 0, 0, 10, 10)
+        index.remove('a')
+        self.assertEqual(index.get_at(5, 5), ['b'])
+        self.assertRaises(KeyError, index.remove, 'a')
+        self.assertRaises(KeyError, index.update, 'a', 0, 0, 1, 1)
+        index.clear()
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.get_at(5, 5), [])
+
+    def test_overlapping(self):
+        index = self.create_index()
+        index.add('a', 0, 0, 10, 10)
+        index.add('b', 10, 0, 20, 10)
+        index.add('c', 30, 0, 40, 10)
+        self.assertEqual(index.get_overlapping('a'), ['b'])
+        self.assertEqual(index.get_overlapping('c'), [])
+        self.assertEqual([sorted(pair) for pair in index.get_pairs()],
+                         [['a', 'b']])
+
+    def test_random(self):
+        random.seed(0)
+        index = self.create_index()
+        rects = {}
+        for i in range(2000):
+            action = random.random()
+            if action < 0.4 or not rects:
+                x = random.uniform(-500, 500)
+                y = random.uniform(-500, 500)
+                rects[i] = (x, y, x + random.uniform(0, 50),
+                            y + random.uniform(0, 50))
+                index.add(i, *rects[i])
+            elif action < 0.55:
+                obj = random.choice(rects.keys())
+                del rects[obj]
+                index.remove(obj)
+            else:
+                obj = random.choice(rects.keys())
+                dx = random.uniform(-20, 20)
+                dy = random.uniform(-20, 20)
+                x1, y1, x2, y2 = rects[obj]
+                rects[obj] = (x1 + dx, y1 + dy, x2 + dx, y2 + dy)
+                index.update(obj, *rects[obj])
+
+            if i % 50 == 0:
+                x = random.uniform(-500, 500)
+                y = random.uniform(-500, 500)
+                region = (x, y, x + random.uniform(0, 300),
+                          y + random.uniform(0, 300))
+                self.assertEqual(sorted(index.get_at(x, y)),
+                    sorted([obj for obj, rect in rects.items() \
+                            if overlaps(rect, (x, y, x, y))]))
+                self.assertEqual(sorted(index.get_in_region(*region)),
+                    sorted([obj for obj, rect in rects.items() \
+                            if overlaps(rect, region)]))
+
+        self.assertEqual(len(index), len(rects))
+        items = rects.items()
+        expected = set()
+        for i, (a, rect_a) in enumerate(items):
+            for b, rect_b in items[i + 1:]:
+                if overlaps(rect_a, rect_b):
+                    expected.add(frozenset((a, b)))
+        pairs = [frozenset(pair) for pair in index.get_pairs()]
+        self.assertEqual(len(pairs), len(expected))
+        self.assertEqual(set(pairs), expected)
+
+class GridIndexTestCase(SpatialIndexTestMixin, unittest.TestCase):
+    def create_index(self):
+        return spatial.GridIndex(cell_size=16)
+
+    def test_large_region(self):
+        index = self.create_index()
+        index.add('a', 0, 0, 10, 10)
+        self.assertEqual(index.get_in_region(-1e6, -1e6, 1e6, 1e6), ['a'])
+
+class AABBTreeTestCase(SpatialIndexTestMixin, unittest.TestCase):
+    def create_index(self):
+        return spatial.AABBTree(margin=4)
+
+    def test_balanced(self):
+        index = self.create_index()
+        for i in range(1024):
+            index.add(i, i * 10, 0, i * 10 + 5, 5)
+        self.assertTrue(index._root.height <= 20)
+
+if __name__ == '__main__':
+    unittest.main()
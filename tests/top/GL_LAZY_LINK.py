@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+'''Test that GL functions are linked on their first call, replace themselves
+in the calling module, and raise MissingFunctionException if unavailable.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+import sys
+import types
+import unittest
+
+import pyglet
+from pyglet.gl import lib
+
+__noninteractive = True
+
+class TEST_CASE(unittest.TestCase):
+    def setUp(self):
+        self.linked = []
+        self.module = types.ModuleType('_lazy_link_test')
+        sys.modules[self.module.__name__] = self.module
+
+    def tearDown(self):
+        del sys.modules[self.module.__name__]
+
+    def link(self, name, restype, argtypes, requires=None, suggestions=None):
+        self.linked.append(name)
+        if name == 'glMissing':
+            return lib.missing_function(name, requires, suggestions)
+        return lambda *args: (name,) + args
+
+    def create(self, name):
+        # Link from within the fake module, as the generated modules do.
+        self.module.link_function = lib._lazy_link(self.link)
+        exec ('%s = link_function(%r, None, [])' % (name, name), 
+              self.module.__dict__)
+        return getattr(self.module, name)
+
+    def test_link_on_call(self):
+        proxy = self.create('glFoo')
+        self.assertTrue(isinstance(proxy, lib.LazyFunctionProxy))
+        self.assertEqual(self.linked, [])
+        self.assertEqual(proxy(1, 2), ('glFoo', 1, 2))
+        self.assertEqual(proxy(3), ('glFoo', 3))
+        self.assertEqual(self.linked, ['glFoo'])
+
+    def test_replace_in_module(self):
+        proxy = self.create('glFoo')
+        proxy()
+        self.assertFalse(self.module.glFoo is proxy)
+        self.assertEqual(self.module.glFoo(), ('glFoo',))
+
+    def test_replace_in_caller(self):
+        glFoo = self.create('glFoo')
+        caller = {'glFoo': glFoo}
+        exec 'result = glFoo(1)' in caller
+        self.assertEqual(caller['result'], ('glFoo', 1))
+        self.assertFalse(caller['glFoo'] is glFoo)
+
+    def test_missing(self):
+        proxy = self.create('glMissing')
+        self.assertRaises(lib.MissingFunctionException, proxy)
+        self.assertRaises(lib.MissingFunctionException, self.module.glMissing)
+
+    def test_gl_namespace(self):
+        # Linking must not be needed to access function names.
+        from pyglet import gl
+        self.assertTrue(callable(gl.glClear))
+        self.assertTrue(callable(gl.gluErrorString))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -32,6 +32,7 @@ modules = [
     'image.atlas',
     'media',
     'resource',
+    'spatial',
     'sprite',
     'text',
     'text.caret',
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+'''Test that the startup profiler accumulates a tree of phase timings and
+writes it as JSON and as folded stacks.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+import __builtin__
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import pyglet
+
+__noninteractive = True
+
+class FakeTime(object):
+    def __init__(self):
+        self.time = 100.
+
+    def __call__(self):
+        return self.time
+
+class TEST_CASE(unittest.TestCase):
+    def setUp(self):
+        handle, self.filename = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def create_profile(self, filename):
+        profiler = pyglet._StartupProfiler(filename)
+        time = FakeTime()
+        profiler.time = time
+        profiler.start = time()
+
+        profiler.begin('import a')
+        time.time += 0.25
+        for i in range(2):
+            profiler.begin('link')
+            time.time += 0.125
+            profiler.end()
+        profiler.end()
+        profiler.begin('import b')
+        time.time += 0.5
+        profiler.end()
+        return profiler
+
+    def test_tree(self):
+        tree = self.create_profile(self.filename).get_tree()
+        self.assertEqual(tree['name'], 'pyglet')
+        self.assertEqual(tree['time'], 1.)
+        a, b = tree['children']
+        self.assertEqual((a['name'], a['time'], a['count']), 
+                         ('import a', 0.5, 1))
+        self.assertEqual((b['name'], b['time']), ('import b', 0.5))
+        link, = a['children']
+        self.assertEqual((link['time'], link['count']), (0.25, 2))
+
+    def test_write_json(self):
+        self.create_profile(self.filename + '.json').write()
+        try:
+            tree = json.load(open(self.filename + '.json'))
+        finally:
+            os.remove(self.filename + '.json')
+        self.assertEqual(tree['children'][0]['name'], 'import a')
+
+    def test_write_folded(self):
+        self.create_profile(self.filename).write()
+        lines = open(self.filename).read().splitlines()
+        self.assertEqual(lines, ['pyglet 0',
+                                 'pyglet;import a 250000',
+                                 'pyglet;import a;link 250000',
+                                 'pyglet;import b 500000'])
+
+    def test_import_hook(self):
+        profiler = pyglet._StartupProfiler(self.filename)
+        builtin_import = __builtin__.__import__
+        sys.modules.pop('colorsys', None)
+        profiler.install_import_hook()
+        try:
+            # Plugin loaders commonly pass keyword arguments.
+            module = __import__('colorsys', fromlist=['rgb_to_hsv'])
+        finally:
+            __builtin__.__import__ = builtin_import
+        self.assertEqual(module.__name__, 'colorsys')
+        names = [child['name'] for child in profiler.get_tree()['children']]
+        self.assertTrue('import colorsys' in names)
+
+    def test_disabled(self):
+        def func():
+            pass
+        if not pyglet._startup_profiler:
+            self.assertTrue(pyglet._profile_startup('func')(func) is func)
+
+if __name__ == '__main__':
+    unittest.main()
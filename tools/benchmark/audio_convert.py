@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+'''Measure throughput of pyglet.media.convert for each resampler quality.
+
+Usage::
+
+    audio_convert.py [seconds]
+
+Converts `seconds` (default 10) of stereo 16-bit audio between common rates
+and channel counts, in 4096-byte packets, and prints the throughput as
+a multiple of real time.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet.media import AudioFormat
+from pyglet.media import convert
+
+PACKET_SIZE = 4096
+
+conversions = [
+    (AudioFormat(2, 16, 44100), AudioFormat(2, 16, 48000)),
+    (AudioFormat(2, 16, 48000), AudioFormat(2, 16, 44100)),
+    (AudioFormat(1, 16, 22050), AudioFormat(2, 16, 44100)),
+    (AudioFormat(1, 8, 22050), AudioFormat(2, 16, 44100)),
+    (AudioFormat(2, 16, 44100), AudioFormat(1, 16, 44100)),
+]
+
+def describe(audio_format):
+    return '%dch/%dbit/%dHz' % (audio_format.channels, 
+        audio_format.sample_size, audio_format.sample_rate)
+
+def benchmark(source_format, target_format, quality, seconds):
+    data = os.urandom(int(seconds * source_format.bytes_per_second))
+    converter = convert.AudioConverter(source_format, target_format, quality)
+    start = time.time()
+    for i in range(0, len(data), PACKET_SIZE):
+        converter.convert(data[i:i + PACKET_SIZE])
+    return seconds / (time.time() - start)
+
+def main():
+    seconds = 10.
+    if len(sys.argv) > 1:
+        seconds = float(sys.argv[1])
+
+    qualities = ['fast', 'medium']
+    if convert.numpy:
+        qualities.append('best')
+    else:
+        print 'NumPy not installed; skipping "best" quality.'
+
+    print '%-36s %s' % ('conversion', 
+        ''.join('%12s' % quality for quality in qualities))
+    for source_format, target_format in conversions:
+        name = '%s -> %s' % (describe(source_format), describe(target_format))
+        results = [benchmark(source_format, target_format, quality, seconds)
+                   for quality in qualities]
+        print '%-36s %s' % (name, 
+            ''.join('%11.0fx' % result for result in results))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+'''Compare drawing a large tiled world with and without culling.
+
+Usage::
+
+    culling.py [tiles] [frames]
+
+Adds `tiles` (default 1000000) 32x32 tiles, each its own vertex list, to a
+batch created with culling, then scrolls a 1280x720 view across the world
+for `frames` (default 100) frames.  Prints the time taken to build the
+batch and the culling index, and the time per frame drawing the visible
+tiles with ``draw(view_rect)``, drawing them after moving 1000 tiles, and
+drawing every tile with ``draw()``.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import math
+import os
+import sys
+import time
+
+base = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, base)
+
+import pyglet
+from pyglet import gl
+
+tile_size = 32
+view_width = 1280
+view_height = 720
+
+def main():
+    n_tiles = 1000000
+    frames = 100
+    if len(sys.argv) > 1:
+        n_tiles = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        frames = int(sys.argv[2])
+
+    window = pyglet.window.Window(view_width, view_height, visible=False)
+    columns = int(math.sqrt(n_tiles))
+
+    start = time.time()
+    batch = pyglet.graphics.Batch(culling=True)
+    tiles = []
+    for i in range(n_tiles):
+        x = (i % columns) * tile_size
+        y = (i // columns) * tile_size
+        tiles.append(batch.add(4, gl.GL_QUADS, None,
+            ('v2i', (x, y, x + tile_size, y,
+                     x + tile_size, y + tile_size, x, y + tile_size)),
+            ('c3B', ((i * 7) % 256, (i * 13) % 256, 128) * 4)))
+    print 'Build batch:         %8.3f s' % (time.time() - start)
+
+    start = time.time()
+    batch.draw((0, 0, view_width, view_height))
+    gl.glFinish()
+    print 'Build culling index: %8.3f s' % (time.time() - start)
+
+    def view_rect(frame):
+        x = frame * 17 % max(1, columns * tile_size - view_width)
+        y = frame * 11 % max(1, columns * tile_size - view_height)
+        return (x, y, x + view_width, y + view_height)
+
+    def measure(label, draw):
+        start = time.time()
+        for frame in range(frames):
+            gl.glMatrixMode(gl.GL_MODELVIEW)
+            gl.glLoadIdentity()
+            x, y, _, _ = view_rect(frame)
+            gl.glTranslatef(-x, -y, 0)
+            window.clear()
+            draw(frame)
+        gl.glFinish()
+        elapsed = time.time() - start
+        print '%-20s %8.3f ms/frame' % (label + ':', elapsed * 1000 / frames)
+
+    measure('Culled draw', lambda frame: batch.draw(view_rect(frame)))
+
+    def move_and_draw(frame):
+        for tile in tiles[frame * 1000 % n_tiles:][:1000]:
+            vertices = tile.vertices
+            vertices[:] = [v + 1 for v in vertices]
+        batch.draw(view_rect(frame))
+    measure('Culled, 1000 moved', move_and_draw)
+
+    measure('Full draw', lambda frame: batch.draw())
+
+    window.close()
+
+if __name__ == '__main__':
+    main()
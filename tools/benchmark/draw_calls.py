@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+'''Count the OpenGL calls made to draw a batch of many domains.
+
+Usage::
+
+    draw_calls.py [domains] [frames]
+
+Creates a batch with `domains` (default 100) vertex domains of different
+formats, each holding a few vertex lists, and draws it `frames` (default
+200) times: with vertex array objects (if the context supports them), with
+the client state tracker alone, and by drawing each domain on its own.
+Prints the number of OpenGL calls made by pyglet.graphics per frame and the
+time taken per frame.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import os
+import sys
+import time
+
+base = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, base)
+
+import pyglet
+from pyglet import gl
+from pyglet.graphics import vertexattribute, vertexbuffer, vertexdomain
+
+calls = [0]
+
+def counted(func):
+    def counter(*args):
+        calls[0] += 1
+        return func(*args)
+    return counter
+
+def count_calls(module):
+    # Replace the OpenGL functions the module calls through its namespace.
+    for name, value in vars(module).items():
+        if name.startswith('gl') and name[2:3].isupper() and callable(value):
+            setattr(module, name, counted(value))
+
+formats = [
+    ('v2f', 'c3B'),
+    ('v2f', 'c4B'),
+    ('v2f', 't2f'),
+    ('v2f', 'c4B', 't2f'),
+    ('v3f', 'n3f', 'c4B'),
+    ('v2f/stream', 'c4B/static'),
+]
+
+def create_batch(n_domains):
+    batch = pyglet.graphics.Batch()
+    for i in range(n_domains):
+        # A distinct group per domain keeps the domains separate.
+        group = pyglet.graphics.OrderedGroup(i)
+        format = formats[i % len(formats)]
+        for j in range(4):
+            batch.add(3, gl.GL_TRIANGLES, group, *format)
+    return batch
+
+def measure(label, draw, frames):
+    draw()
+    calls[0] = 0
+    start = time.time()
+    for i in range(frames):
+        draw()
+    gl.glFinish()
+    elapsed = time.time() - start
+    print '%-24s %8.1f calls/frame %8.3f ms/frame' % (
+        label, calls[0] / float(frames), elapsed * 1000 / frames)
+
+def main():
+    n_domains = 100
+    frames = 200
+    if len(sys.argv) > 1:
+        n_domains = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        frames = int(sys.argv[2])
+
+    window = pyglet.window.Window(visible=False)
+    for module in (vertexattribute, vertexbuffer, vertexdomain):
+        count_calls(module)
+
+    batch = create_batch(n_domains)
+    state = vertexdomain.get_client_state()
+    domains = []
+    for group in batch.top_groups:
+        domains.extend(batch.group_map[group].items())
+
+    def draw_domains():
+        for (_, mode, _), domain in domains:
+            domain.draw(mode)
+
+    if state.have_vao:
+        measure('Batch.draw (VAO)', batch.draw, frames)
+    else:
+        print 'Vertex array objects are not supported.'
+    state.have_vao = False
+    measure('Batch.draw (tracked)', batch.draw, frames)
+    measure('VertexDomain.draw', draw_domains, frames)
+
+    window.close()
+
+if __name__ == '__main__':
+    main()
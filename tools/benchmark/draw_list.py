@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+'''Measure rebuilding the draw list of a batch as groups come and go.
+
+Usage::
+
+    draw_list.py [groups] [frames]
+
+Creates a batch with `groups` (default 1000) ordered groups, each holding a
+vertex list in a child group, and for `frames` (default 200) frames deletes
+the list of one group and adds a list to another before drawing the batch.
+Prints the time per frame, and the draw list statistics of the batch.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import os
+import sys
+import time
+
+base = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, base)
+
+import pyglet
+from pyglet import gl
+
+def add(batch, i):
+    group = pyglet.graphics.Group(pyglet.graphics.OrderedGroup(i))
+    return batch.add(3, gl.GL_TRIANGLES, group, 'v2f', 'c4B')
+
+def main():
+    n_groups = 1000
+    frames = 200
+    if len(sys.argv) > 1:
+        n_groups = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        frames = int(sys.argv[2])
+
+    window = pyglet.window.Window(visible=False)
+    batch = pyglet.graphics.Batch()
+    vertex_lists = [add(batch, i) for i in range(n_groups)]
+    batch.draw()
+
+    start = time.time()
+    for frame in range(frames):
+        i = frame * 7 % n_groups
+        vertex_lists[i].delete()
+        vertex_lists[i] = add(batch, i + n_groups)
+        batch.draw()
+    gl.glFinish()
+    elapsed = time.time() - start
+    print 'Draw with changes: %8.3f ms/frame' % (elapsed * 1000 / frames)
+
+    stats = batch.get_stats()
+    print 'Rebuilds:          %8d (%d full)' % (
+        stats['rebuilds'], stats['full_rebuilds'])
+    print 'Groups rebuilt:    %8.1f per rebuild' % (
+        stats['rebuilt_groups'] / float(stats['rebuilds']))
+    print 'Rebuild time:      %8.3f ms per rebuild' % (
+        stats['rebuild_time'] * 1000 / stats['rebuilds'])
+
+    window.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+'''Measure the cost of pyglet.event.EventDispatcher.dispatch_event.
+
+Usage::
+
+    event_dispatch.py [iterations]
+
+Dispatches `iterations` (default 200000) events to dispatchers with varying
+handler stacks, and to a dispatcher coalescing ``on_mouse_motion``, and
+prints the time per dispatch.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet import event
+
+class Dispatcher(event.EventDispatcher):
+    pass
+
+Dispatcher.register_event_type('on_mouse_motion')
+Dispatcher.register_event_type('on_draw')
+
+class MethodDispatcher(Dispatcher):
+    def on_mouse_motion(self, x, y, dx, dy):
+        pass
+
+class Handler(object):
+    def on_mouse_motion(self, x, y, dx, dy):
+        pass
+
+def on_draw():
+    pass
+
+def create_pushed(n_frames):
+    dispatcher = Dispatcher()
+    for i in range(n_frames):
+        dispatcher.push_handlers(Handler())
+        dispatcher.push_handlers(on_draw)
+    return dispatcher
+
+def create_coalesced(merge):
+    dispatcher = create_pushed(1)
+    dispatcher.coalesce_event('on_mouse_motion', merge)
+    return dispatcher
+
+def benchmark(dispatcher, iterations):
+    dispatch_event = dispatcher.dispatch_event
+    start = time.time()
+    for i in xrange(iterations):
+        dispatch_event('on_mouse_motion', i, i, 1, 1)
+    dispatcher.flush_coalesced_events()
+    return (time.time() - start) / iterations
+
+cases = [
+    ('no handlers', Dispatcher),
+    ('instance method', MethodDispatcher),
+    ('1 pushed frame', lambda: create_pushed(1)),
+    ('5 pushed frames', lambda: create_pushed(5)),
+    ('coalesced (latest)', lambda: create_coalesced(None)),
+    ('coalesced (merge_motion)', lambda: create_coalesced(event.merge_motion)),
+]
+
+def main():
+    iterations = 200000
+    if len(sys.argv) > 1:
+        iterations = int(sys.argv[1])
+
+    for name, factory in cases:
+        elapsed = benchmark(factory(), iterations)
+        print '%-26s %8.3f us/dispatch' % (name, elapsed * 1000000)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+'''Time drawing many small primitives with `pyglet.graphics.draw`.
+
+Usage::
+
+    immediate.py [calls] [frames]
+
+Draws `calls` (default 500) small primitives per frame, alternating between
+`pyglet.graphics.draw` and `pyglet.graphics.draw_indexed` and between
+several formats, as a debug overlay might, for `frames` (default 100)
+frames.  Prints the time taken per frame with and without the ``glFlush``
+after each call (see the ``graphics_immediate_flush`` option).
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import os
+import sys
+import time
+
+base = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, base)
+
+import pyglet
+from pyglet import gl
+
+def draw_gizmos(calls):
+    for i in range(calls):
+        x = i % 40 * 16
+        y = i // 40 * 16
+        if i % 3 == 0:
+            pyglet.graphics.draw(2, gl.GL_LINES,
+                ('v2i', (x, y, x + 12, y + 12)),
+                ('c3B', (255, 0, 0, 0, 255, 0)))
+        elif i % 3 == 1:
+            pyglet.graphics.draw(3, gl.GL_TRIANGLES,
+                ('v2f', (x, y, x + 12, y, x, y + 12)),
+                ('c4B', (255, 255, 0, 128) * 3))
+        else:
+            pyglet.graphics.draw_indexed(4, gl.GL_TRIANGLES,
+                [0, 1, 2, 0, 2, 3],
+                ('v2i', (x, y, x + 12, y, x + 12, y + 12, x, y + 12)))
+
+def measure(label, window, calls, frames):
+    start = time.time()
+    for frame in range(frames):
+        window.clear()
+        draw_gizmos(calls)
+    gl.glFinish()
+    elapsed = time.time() - start
+    print '%-16s %8.3f ms/frame' % (label, elapsed * 1000 / frames)
+
+def main():
+    calls = 500
+    frames = 100
+    if len(sys.argv) > 1:
+        calls = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        frames = int(sys.argv[2])
+
+    window = pyglet.window.Window(visible=False)
+    pyglet.graphics._immediate_flush = True
+    measure('With glFlush:', window, calls, frames)
+    pyglet.graphics._immediate_flush = False
+    measure('Without glFlush:', window, calls, frames)
+    window.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+'''Measure the time taken to import pyglet modules.
+
+Usage::
+
+    import_time.py [repeats]
+
+Each module is imported in a fresh interpreter `repeats` (default 5) times,
+with and without the ``gl_lazy_link`` option, and the best time is printed.
+The shadow window is disabled, so no display connection is made by
+importing `pyglet.gl`.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import os
+import subprocess
+import sys
+
+modules = ['pyglet', 'pyglet.gl', 'pyglet.window', 'pyglet.text']
+
+script = '''
+import time
+start = time.time()
+import %s
+print time.time() - start
+'''
+
+def time_import(module, lazy_link):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.join(os.path.dirname(__file__), '..', '..')
+    env['PYGLET_SHADOW_WINDOW'] = 'False'
+    env['PYGLET_GL_LAZY_LINK'] = str(lazy_link)
+    output = subprocess.Popen([sys.executable, '-c', script % module],
+                              env=env, stdout=subprocess.PIPE).communicate()[0]
+    return float(output)
+
+def main():
+    repeats = 5
+    if len(sys.argv) > 1:
+        repeats = int(sys.argv[1])
+
+    print '%-16s %10s %10s' % ('module', 'eager', 'lazy')
+    for module in modules:
+        eager = min([time_import(module, False) for i in range(repeats)])
+        lazy = min([time_import(module, True) for i in range(repeats)])
+        print '%-16s %8.1fms %8.1fms' % (module, eager * 1000, lazy * 1000)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+'''Compare loading images one at a time with pyglet.image.load_many.
+
+Usage::
+
+    load_many.py [count] [image...]
+
+Decodes `count` (default 64) copies of the given images (default: the PNG
+and BMP images in tests/image) serially, with a thread pool and with a
+process pool, and prints the time taken by each.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import glob
+import os
+import sys
+import time
+
+base = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, base)
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet import image
+
+def main():
+    count = 64
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    sources = sys.argv[2:]
+    if not sources:
+        sources = glob.glob(os.path.join(base, 'tests', 'image', '*.png')) + \
+                  glob.glob(os.path.join(base, 'tests', 'image', '*.bmp'))
+    filenames = (sources * count)[:count]
+
+    start = time.time()
+    for filename in filenames:
+        image.load(filename)
+    print 'load (serial):         %.3fs' % (time.time() - start)
+
+    start = time.time()
+    image.load_many(filenames, workers=1)
+    print 'load_many (serial):    %.3fs' % (time.time() - start)
+
+    start = time.time()
+    image.load_many(filenames)
+    print 'load_many (threads):   %.3fs' % (time.time() - start)
+
+    start = time.time()
+    image.load_many(filenames, processes=True)
+    print 'load_many (processes): %.3fs' % (time.time() - start)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+'''Compare drawing sprites as GL_QUADS with drawing them as indexed
+triangles.
+
+Usage::
+
+    quads.py [sprites] [frames]
+
+Draws a batch of `sprites` (default 5000) sprites `frames` (default 200)
+times with each mode and prints the time taken per frame.  Run it with
+``LIBGL_ALWAYS_SOFTWARE=1`` to measure Mesa's software renderer, which
+emulates ``GL_QUADS``.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import os
+import random
+import sys
+import time
+
+base = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, base)
+
+import pyglet
+from pyglet import gl
+
+def measure(label, mode, n_sprites, frames, window, image):
+    pyglet.sprite.Sprite.quad_mode = mode
+    batch = pyglet.graphics.Batch()
+    random.seed(0)
+    sprites = [pyglet.sprite.Sprite(image,
+                                    random.randint(0, window.width),
+                                    random.randint(0, window.height),
+                                    batch=batch)
+               for i in range(n_sprites)]
+
+    batch.draw()
+    gl.glFinish()
+    start = time.time()
+    for i in range(frames):
+        window.clear()
+        batch.draw()
+    gl.glFinish()
+    elapsed = time.time() - start
+    print '%-20s %8.3f ms/frame' % (label, elapsed * 1000 / frames)
+
+def main():
+    n_sprites = 5000
+    frames = 200
+    if len(sys.argv) > 1:
+        n_sprites = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        frames = int(sys.argv[2])
+
+    window = pyglet.window.Window(640, 480, visible=False)
+    print 'Renderer:', gl.gl_info.get_renderer()
+    pattern = pyglet.image.SolidColorImagePattern((255, 255, 255, 255))
+    image = pattern.create_image(16, 16)
+
+    measure('GL_QUADS', gl.GL_QUADS, n_sprites, frames, window, image)
+    measure('INDEXED_QUADS', pyglet.graphics.INDEXED_QUADS, n_sprites,
+            frames, window, image)
+
+    window.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+'''Compare point and region queries on pyglet.spatial indexes with a linear
+scan.
+
+Usage::
+
+    spatial.py [count]
+
+Places `count` (default 50000) rectangles of 8 to 64 pixels randomly in a
+4096x4096 world and times building each index, moving every object a few
+pixels, 10000 point queries, 1000 screen-sized region queries and finding
+all overlapping pairs.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pyglet import spatial
+
+WORLD = 4096
+
+class LinearScan(spatial.SpatialIndex):
+    def add(self, obj, x1, y1, x2, y2):
+        self._bounds[obj] = (x1, y1, x2, y2)
+
+    def remove(self, obj):
+        del self._bounds[obj]
+
+    def update(self, obj, x1, y1, x2, y2):
+        self._bounds[obj] = (x1, y1, x2, y2)
+
+    def clear(self):
+        self._bounds.clear()
+
+    def get_in_region(self, x1, y1, x2, y2):
+        return [obj for obj, (ox1, oy1, ox2, oy2) in self._bounds.iteritems() \
+                if ox1 <= x2 and x1 <= ox2 and oy1 <= y2 and y1 <= oy2]
+
+def timed(label, func, *args):
+    start = time.time()
+    func(*args)
+    print '  %-12s %8.3fs' % (label, time.time() - start)
+
+def main():
+    count = 50000
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+
+    random.seed(0)
+    rects = []
+    for i in range(count):
+        x = random.uniform(0, WORLD)
+        y = random.uniform(0, WORLD)
+        rects.append((x, y, x + random.uniform(8, 64), y + random.uniform(8, 64)))
+    points = [(random.uniform(0, WORLD), random.uniform(0, WORLD)) \
+              for i in range(10000)]
+    regions = [(x, y, x + 640, y + 480) for x, y in points[:1000]]
+
+    def build(index):
+        for obj, rect in enumerate(rects):
+            index.add(obj, *rect)
+
+    def move(index):
+        for obj, (x1, y1, x2, y2) in enumerate(rects):
+            dx = random.uniform(-4, 4)
+            dy = random.uniform(-4, 4)
+            index.update(obj, x1 + dx, y1 + dy, x2 + dx, y2 + dy)
+
+    def point_queries(index):
+        for x, y in points:
+            index.get_at(x, y)
+
+    def region_queries(index):
+        for region in regions:
+            index.get_in_region(*region)
+
+    for name, index in (('GridIndex', spatial.GridIndex(64)),
+                        ('AABBTree', spatial.AABBTree(8)),
+                        ('linear scan', LinearScan())):
+        print name
+        timed('build', build, index)
+        timed('move', move, index)
+        if isinstance(index, LinearScan):
+            # Scanning is too slow to run every query.
+            del points[1000:]
+            del regions[100:]
+            print '  (1000 point and 100 region queries)'
+        timed('points', point_queries, index)
+        timed('regions', region_queries, index)
+        if not isinstance(index, LinearScan):
+            timed('pairs', index.get_pairs)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+'''Pack a directory of resources into a ZIP archive for pyglet.resource.
+
+Members are stored uncompressed, with their data aligned within the archive,
+so that `pyglet.resource.ZIPArchive` can read them straight from a memory map.
+Members with the extensions given to --deflate are compressed instead.  An
+index is written alongside the archive so that it does not need to be listed
+when the resource path is indexed.
+
+Usage::
+
+    pack_resources.py [options] <directory> <archive.zip>
+
+Options:
+  -a <n>, --align=<n>      Align stored member data to n bytes (default 16).
+  -d <exts>, --deflate=<exts>
+                           Comma-separated extensions of members to compress,
+                           e.g. ``.txt,.html,.json``.
+  -n, --no-index           Don't write an index.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import optparse
+import os
+import struct
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Identifier of the extra field used for padding (as used by zipalign).
+PADDING_EXTRA_ID = 0xd935
+
+def add_member(zip, filename, name, align, compress_type):
+    stat = os.stat(filename)
+    info = zipfile.ZipInfo(name, time.localtime(stat.st_mtime)[:6])
+    info.compress_type = compress_type
+    info.external_attr = (stat.st_mode & 0xffff) << 16
+    if compress_type == zipfile.ZIP_STORED and align > 1:
+        # The local file header is 30 bytes followed by the name and extra
+        # field; pad the extra field so the data starts on a multiple of
+        # `align`.  An extra field record needs at least 4 bytes.
+        offset = zip.fp.tell() + 30 + len(name)
+        padding = -offset % align
+        if 0 < padding < 4:
+            padding += align
+        if padding:
+            info.extra = struct.pack('<HH', PADDING_EXTRA_ID, padding - 4) + \
+                         b'\0' * (padding - 4)
+    data = open(filename, 'rb').read()
+    zip.writestr(info, data)
+
+def pack(directory, archive, align, deflate):
+    zip = zipfile.ZipFile(archive, 'w')
+    try:
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, directory).replace(os.sep, '/')
+                if os.path.splitext(name)[1].lower() in deflate:
+                    compress_type = zipfile.ZIP_DEFLATED
+                else:
+                    compress_type = zipfile.ZIP_STORED
+                add_member(zip, path, name, align, compress_type)
+    finally:
+        zip.close()
+
+def main():
+    parser = optparse.OptionParser(
+        usage='%prog [options] <directory> <archive.zip>')
+    parser.add_option('-a', '--align', type='int', default=16)
+    parser.add_option('-d', '--deflate', default='')
+    parser.add_option('-n', '--no-index', action='store_true')
+    options, args = parser.parse_args()
+    if len(args) != 2:
+        parser.error('Expected a directory and an archive filename')
+    directory, archive = args
+
+    deflate = [ext.strip().lower() for ext in options.deflate.split(',')
+               if ext.strip()]
+    pack(directory, archive, options.align, deflate)
+
+    if not options.no_index:
+        import pyglet
+        pyglet.options['shadow_window'] = False
+        from pyglet import resource
+        zip_archive = resource.ZIPArchive(archive)
+        zip_archive.write_index()
+        zip_archive.close()
+        print 'Packed %d members into %s' % (len(zip_archive.entries), 
+                                             archive)
+
+if __name__ == '__main__':
+    main()
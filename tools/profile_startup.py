@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+'''Profile pyglet's startup and compare it against a baseline.
+
+Runs a headless interpreter (no shadow window, silent audio) with the
+``profile_startup`` option enabled, which imports the common pyglet modules,
+registers the image codecs, queries fontconfig and creates the audio driver.
+The resulting timing tree is printed, and optionally saved or compared with a
+previously saved baseline.
+
+Usage::
+
+    profile_startup.py [options]
+
+Options:
+  -r <n>, --repeat=<n>     Run n times and keep the fastest time of each
+                           phase (default 3).
+  -s <file>, --save=<file> Save the timing tree as JSON, for use as a
+                           baseline.
+  -b <file>, --baseline=<file>
+                           Compare against a baseline saved with --save.
+                           Exits with status 1 if any phase regressed.
+  -t <fraction>, --threshold=<fraction>
+                           Relative slowdown counted as a regression
+                           (default 0.25).
+  -m <ms>, --min-time=<ms> Ignore phases faster than this in both runs
+                           (default 2).
+  -f <file>, --folded=<file>
+                           Also write the fastest run in the folded stacks
+                           format, for flame graph tools.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import json
+import optparse
+import os
+import subprocess
+import sys
+import tempfile
+
+script = '''
+import pyglet
+import pyglet.gl
+import pyglet.window
+import pyglet.text
+import pyglet.image
+import pyglet.media
+pyglet.font.have_font('Arial')
+pyglet.media.get_audio_driver()
+'''
+
+def run(filename):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.join(os.path.dirname(__file__), '..')
+    env['PYGLET_SHADOW_WINDOW'] = 'False'
+    env['PYGLET_AUDIO'] = 'silent'
+    env['PYGLET_PROFILE_STARTUP'] = filename
+    subprocess.check_call([sys.executable, '-c', script], env=env)
+
+def get_phases(node, prefix='', phases=None):
+    # Flatten the tree into a dict of {path: time}, keeping tree order in
+    # the 'order' list.
+    if phases is None:
+        phases = {}
+        phases['order'] = []
+    path = prefix + node['name']
+    phases[path] = node['time']
+    phases['order'].append(path)
+    for child in node['children']:
+        get_phases(child, path + ';', phases)
+    return phases
+
+def get_tree_fastest(trees):
+    # Combine trees, keeping the minimum time of each phase.
+    phases = [get_phases(tree) for tree in trees]
+    def combine(node, prefix=''):
+        path = prefix + node['name']
+        node = dict(node)
+        node['time'] = min([p.get(path, node['time']) for p in phases])
+        node['children'] = [combine(child, path + ';') \
+                            for child in node['children']]
+        return node
+    return combine(trees[0])
+
+def write_folded(node, f, prefix=''):
+    path = prefix + node['name']
+    self_time = node['time'] - sum([c['time'] for c in node['children']])
+    f.write('%s %d\n' % (path, max(self_time, 0) * 1000000))
+    for child in node['children']:
+        write_folded(child, f, path + ';')
+
+def describe(path):
+    depth = path.count(';')
+    return '  ' * depth + path.split(';')[-1]
+
+def report(tree, baseline, threshold, min_time):
+    current = get_phases(tree)
+    if baseline:
+        base = get_phases(baseline)
+        print '%-56s %9s %9s %7s' % ('phase', 'baseline', 'current', 'change')
+    else:
+        base = {}
+        print '%-56s %9s' % ('phase', 'time')
+
+    regressions = []
+    for path in current['order']:
+        time = current[path]
+        base_time = base.get(path)
+        if max(time, base_time) * 1000 < min_time:
+            continue
+        name = describe(path)[:56]
+        if not baseline:
+            print '%-56s %7.1fms' % (name, time * 1000)
+        elif base_time is None:
+            print '%-56s %9s %7.1fms %7s' % (name, '-', time * 1000, 'new')
+        else:
+            change = (time - base_time) / max(base_time, 1e-6)
+            flag = ''
+            if change > threshold and (time - base_time) * 1000 >= min_time:
+                flag = ' !'
+                regressions.append(path)
+            print '%-56s %7.1fms %7.1fms %+6.0f%%%s' % (name, 
+                base_time * 1000, time * 1000, change * 100, flag)
+
+    if baseline:
+        for path in base['order']:
+            if path not in current and base[path] * 1000 >= min_time:
+                print '%-56s %7.1fms %9s %7s' % (describe(path)[:56], 
+                    base[path] * 1000, '-', 'removed')
+    return regressions
+
+def main():
+    op = optparse.OptionParser()
+    op.add_option('-r', '--repeat', type='int', default=3)
+    op.add_option('-s', '--save')
+    op.add_option('-b', '--baseline')
+    op.add_option('-t', '--threshold', type='float', default=0.25)
+    op.add_option('-m', '--min-time', dest='min_time', type='float',
+                  default=2.)
+    op.add_option('-f', '--folded')
+    (options, args) = op.parse_args(sys.argv[1:])
+
+    trees = []
+    handle, filename = tempfile.mkstemp(suffix='.json')
+    os.close(handle)
+    try:
+        for i in range(options.repeat):
+            run(filename)
+            trees.append(json.load(open(filename)))
+    finally:
+        os.remove(filename)
+    tree = get_tree_fastest(trees)
+
+    if options.save:
+        json.dump(tree, open(options.save, 'w'), indent=1)
+    if options.folded:
+        write_folded(tree, open(options.folded, 'w'))
+
+    baseline = None
+    if options.baseline:
+        baseline = json.load(open(options.baseline))
+
+    regressions = report(tree, baseline, options.threshold, options.min_time)
+    if regressions:
+        print
+        print '%d phase(s) regressed by more than %d%%.' % (
+            len(regressions), options.threshold * 100)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()